@@ -37,6 +37,44 @@ class Settings(BaseSettings):
     WORKER_COUNT: int = 2
     LOG_LEVEL: str = "INFO"
 
+    # 元数据提取
+    IMAGE_METADATA_EXTRACTOR: str = "fast"  # 'fast'（只读头部元数据片段、只解析映射用到的键）| 'exifread'（全量解析）
+    FFPROBE_CACHE_DIR: str = ""  # ffprobe 结果磁盘缓存目录（进程池/同机 Worker 共享）；为空则使用系统临时目录
+    FFPROBE_CACHE_TTL_SECONDS: float = 3600  # 磁盘缓存有效期（覆盖一次导入及其后的异步任务即可）
+    IMAGE_REDUCED_DECODE: bool = True  # 缩略图/感知哈希按需降分辨率解码（内嵌缩略图、JPEG DCT 缩放、reduce）；预览图仍完整解码
+    IMAGE_DECODE_MAX_PIXELS: int = 100_000_000  # 进程内单次图片解码的像素预算；超出时按预算缩小，draft 无法缩到预算内则转子进程解码；0 表示不限制
+    IMAGE_DECODE_SOURCE_MAX_PIXELS: int = 1_000_000_000  # 文件头像素数上限，超过视为解压炸弹直接拒绝；0 表示不限制
+    IMAGE_DECODE_ISOLATED_MAX_MB: int = 4096  # 超出预算的图片在子进程中解码时的内存上限（MB）；0 表示不启用子进程，直接失败
+    THUMBNAIL_LADDER_SIZES: str = "256,512,1024,2048"  # 图片多档缩略图长边，逗号分隔（与 800 主缩略图同一次解码生成）；为空则只生成主缩略图
+    SMART_CROP_PROXY_SIZE: int = 256  # 智能裁剪分析用代理图长边（像素）；0 表示按 smartcrop 默认预缩放（约缩略图尺寸）分析
+    VIDEO_STORYBOARD_FRAMES: int = 100  # 视频故事板（拖动预览雪碧图）最多帧数（间隔不小于 1 秒）；0 表示不生成
+    VIDEO_STORYBOARD_FRAME_WIDTH: int = 160  # 故事板单帧宽度（像素）
+    DEEP_ZOOM_MIN_PIXELS: int = 50_000_000  # 达到该像素数（宽×高）的图片额外生成 DZI 切片金字塔；0 表示不生成
+    DEEP_ZOOM_TILE_SIZE: int = 254  # DZI 切片边长（像素，两侧各 1px 重叠）
+    IMPORT_DERIVE_LAZILY: bool = False  # 导入时不生成缩略图/预览图，改为首次请求 /assets/{id}/derivatives/{size}.{fmt} 时生成并缓存
+    DERIVATIVE_CACHE_DIR: str = ""  # 按需衍生图磁盘缓存目录；为空则使用 NAS_DATA_PATH/processed/derivatives
+    DERIVATIVE_CACHE_MAX_MB: int = 2048  # 按需衍生图缓存字节预算（MB），超出后淘汰最久未访问的文件
+    DERIVATIVE_FAILURE_TTL_SECONDS: int = 3600  # 按需衍生图生成失败后的冷却时间（秒），期间不再重试，素材 URL 回退为空
+    DERIVATIVE_REGEN_WORKERS: int = 0  # 重新生成衍生图作业的进程池大小；0 表示 CPU 核数
+    DERIVATIVE_REGEN_CHUNK_SIZE: int = 100  # 重新生成衍生图时每批素材数（并行生成，每批提交一次结果与进度）
+    RAW_METADATA_STORE_ENABLED: bool = True  # 按文件哈希留存完整原始元数据供重新映射标签（图片仍只读头部片段，一次解析全部 IFD 标签，映射只用需要的键）；关闭时不能重新映射
+    TAG_REMAP_CHUNK_SIZE: int = 1000  # 重新映射标签时每批处理的素材数（每批一次提交）
+    TAG_REMAP_ON_MAPPING_CHANGE: bool = True  # 映射规则增删改后自动排队重新映射作业（需开启 RAW_METADATA_STORE_ENABLED）
+
+    # 分布式扫描导入（目录分片后由多个 Worker 并行导入）
+    INGESTION_SHARD_MAX_FILES: int = 2000  # 每个分片的目标文件数上限
+    INGESTION_LOCK_WAIT_SECONDS: float = 600  # 同内容文件正被其他 Worker 导入时的最长等待
+
+    # 监控模式（持续增量导入）
+    WATCH_ENABLED: bool = False  # run.py 是否拉起监控进程
+    WATCH_PATHS: str = ""  # 监控的源目录，逗号分隔；为空则监控 NAS_DATA_PATH
+    WATCH_CREATED_BY: int = 1  # 监控导入素材的创建者用户ID
+    WATCH_VISIBILITY: str = "general"  # 监控导入素材的可见性
+    WATCH_DEBOUNCE_SECONDS: float = 2.0  # 文件静默多久后导入（合并同一文件的连续事件）
+    WATCH_POLL_INTERVAL: float = 5.0  # 轮询模式（非 Linux 或 inotify 不可用）的遍历间隔
+    WATCH_USE_INOTIFY: bool = True  # Linux 下优先使用 inotify
+    WATCH_INITIAL_SCAN: bool = True  # 启动时整目录补扫一次（覆盖监控停止期间新增的文件）
+
     # 地理编码服务配置
     AMAP_API_KEY: str = ""  # 高德地图 API Key（可选，不配置则使用 Nominatim）
 
@@ -45,6 +83,7 @@ class Settings(BaseSettings):
     MEDIA_BASE_PATH: str = "/media"  # 本地文件对外访问的 URL 前缀（StaticFiles mount path）
     ASSET_URL_PROVIDER: str = "local"  # 'local' | 'oss'（未来可扩展）
     ASSET_STORAGE_PROVIDER: str = "local"  # 'local' | 'oss'（与 ASSET_URL_PROVIDER 建议保持一致）
+    ASSET_STAGE_STRATEGY: str = "copy"  # 扫描目录不在 NAS 内时的入库方式: copy（内核态复制）| reflink（写时复制）| hardlink（硬链接，与源文件共享 inode）
     OSS_PUBLIC_BASE_URL: str = ""  # 当 ASSET_URL_PROVIDER=oss 时必填，如 https://cdn.example.com
 
     class Config:
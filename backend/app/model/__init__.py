@@ -2,7 +2,7 @@
 Models Package
 
 导出所有数据库模型，使其他模块可以通过以下方式导入：
-    from app.model import User, Asset, Note, TagDefinition, AssetTag, AssetTemplateTag, Album, AlbumAsset, UserFavorite, TaskLog, Template, TemplateField, TagMapping, TaskDefinition, Base
+    from app.model import User, Asset, Note, TagDefinition, AssetTag, AssetTemplateTag, Album, AlbumAsset, UserFavorite, TaskLog, Template, TemplateField, TagMapping, TaskDefinition, ScanManifest, UploadSession, IngestionJob, IngestionJobShard, AssetRawMetadata, TagRemapJob, Base
 
 模型说明：
     User: 用户表
@@ -19,6 +19,12 @@ Models Package
     TemplateField: 模板字段
     TagMapping: 元数据源键映射
     TaskDefinition: 可开关后处理任务
+    ScanManifest: 扫描清单（stat 签名 -> 文件哈希）
+    UploadSession: 断点续传上传会话
+    IngestionJob: 可暂停/续跑的导入作业
+    IngestionJobShard: 分布式扫描导入的目录分片
+    AssetRawMetadata: 原始元数据（按文件哈希，供重新映射标签）
+    TagRemapJob: 标签重新映射作业（可续跑）
 """
 from ..db import Base
 from .user import User
@@ -36,6 +42,12 @@ from .template import Template
 from .template_field import TemplateField
 from .tag_mapping import TagMapping
 from .task_definition import TaskDefinition
+from .scan_manifest import ScanManifest
+from .upload_session import UploadSession
+from .ingestion_job import IngestionJob
+from .ingestion_job_shard import IngestionJobShard
+from .asset_raw_metadata import AssetRawMetadata
+from .tag_remap_job import TagRemapJob
 
 # 导出所有模型，方便其他模块导入
 __all__ = [
@@ -55,4 +67,10 @@ __all__ = [
     'TemplateField',
     'TagMapping',
     'TaskDefinition',
+    'ScanManifest',
+    'UploadSession',
+    'IngestionJob',
+    'IngestionJobShard',
+    'AssetRawMetadata',
+    'TagRemapJob',
 ]
@@ -1,5 +1,5 @@
 """资源模型"""
-from sqlalchemy import Column, String, DateTime, BIGINT, Boolean, Index, func, DECIMAL
+from sqlalchemy import Column, String, DateTime, BIGINT, Boolean, Index, JSON, func, DECIMAL
 from ..db import Base
 
 
@@ -11,6 +11,11 @@ class Asset(Base):
         created_by: 创建者用户ID
         original_path: NAS 物理相对路径
         thumbnail_path: 缩略图路径
+        thumbnail_sizes: 多尺寸缩略图 {宽度: 相对路径}（含主缩略图）
+        storyboard: 视频故事板（雪碧图、WebVTT 相对路径与格子几何信息）
+        deep_zoom: 超大图片的 DZI 切片金字塔（描述文件相对路径与尺寸、切片参数）
+        derivative_versions: 衍生图生成记录 {thumbnail|preview: {version, source_hash, source_signature}}（重新生成作业据此跳过已是最新的）
+        derive_lazily: 导入时是否跳过了缩略图/预览图生成（按需生成模式，URL 指向衍生图接口）
         asset_type: 资源类型（image, video, audio）
         mime_type: MIME类型
         file_size: 文件大小（字节）
@@ -32,6 +37,11 @@ class Asset(Base):
     original_path = Column(String(255), nullable=False, index=True, comment='NAS 物理相对路径')
     thumbnail_path = Column(String(255), nullable=True, comment='缩略图路径')
     preview_path = Column(String(255), nullable=True, comment='预览图路径（用于浏览器不支持的格式如HEIC）')
+    thumbnail_sizes = Column(JSON, nullable=True, comment='多尺寸缩略图 {宽度: 相对路径}（含主缩略图）')
+    storyboard = Column(JSON, nullable=True, comment='视频故事板 {sprite, vtt, count, columns, rows, frame_width, frame_height, interval}')
+    deep_zoom = Column(JSON, nullable=True, comment='DZI 切片金字塔 {dzi, width, height, tile_size, overlap, format, levels, tiles}')
+    derivative_versions = Column(JSON, nullable=True, comment='衍生图生成记录 {thumbnail|preview: {version, source_hash, source_signature}}')
+    derive_lazily = Column(Boolean, nullable=False, default=False, comment='导入时是否跳过衍生图生成（按需生成模式）')
 
     # 文件基础信息
     asset_type = Column(String(20), nullable=False, comment='资源类型: image, video, audio')
@@ -0,0 +1,35 @@
+"""原始元数据模型"""
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary, func
+from sqlalchemy.dialects.mysql import MEDIUMBLOB
+from ..db import Base
+
+
+class AssetRawMetadata(Base):
+    """原始元数据表
+
+    保存导入时提取器输出的原始元数据（EXIF 标签 / ffprobe 整理结果），按文件内容哈希存一份，
+    新增或修改映射规则后可直接从这里重新映射标签，无需再读 NAS 上的原文件。
+
+    Attributes:
+        file_hash: 文件内容哈希（与 assets.file_hash 同口径，主键）
+        asset_type: 素材类型（image, video, audio）
+        extractor: 提取器名称（判断提取口径，如 FastImageMetadataExtractor）
+        payload: 序列化后的元数据（zlib 压缩的紧凑 JSON）
+        payload_size: 未压缩的 JSON 字节数
+        created_at: 创建时间
+        updated_at: 更新时间
+    """
+    __tablename__ = "asset_raw_metadata"
+
+    file_hash = Column(String(64), primary_key=True, comment='文件内容哈希')
+    asset_type = Column(String(20), nullable=False, comment='素材类型: image, video, audio')
+    extractor = Column(String(50), nullable=False, comment='提取器名称')
+    payload = Column(LargeBinary().with_variant(MEDIUMBLOB(), 'mysql'), nullable=False, comment='zlib 压缩的 JSON')
+    payload_size = Column(Integer, nullable=False, default=0, comment='未压缩的 JSON 字节数')
+
+    # 时间戳
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<AssetRawMetadata(file_hash={self.file_hash}, asset_type={self.asset_type}, size={self.payload_size})>"
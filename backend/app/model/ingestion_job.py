@@ -0,0 +1,67 @@
+"""导入作业模型"""
+from sqlalchemy import Column, String, DateTime, BIGINT, Boolean, Float, Text, JSON, func
+from ..db import Base
+
+
+class IngestionJob(Base):
+    """导入作业表
+
+    扫描导入作为持久化作业由 Taskiq Worker 执行，每处理 N 个文件保存一次检查点，
+    暂停或 Worker 重启后从检查点继续。
+
+    Attributes:
+        id: 作业ID
+        job_type: 作业类型（scan 单进程扫描；sharded_scan 目录分片后由多个 Worker 并行导入，进度由分片汇总）
+        status: 作业状态（queued, running, paused, done, failed）
+        params: 导入参数（扫描路径、可见性、相册、默认 GPS 等）
+        pause_requested: 是否已请求暂停（执行中的作业在下一个检查点停止）
+        checkpoint_path: 检查点：扫描顺序中最后一个已处理完成的文件（相对扫描路径）
+        scan_complete: 目录是否已扫描完毕（未完成时 files_total 仍在增长）
+        files_total: 已发现的文件总数
+        files_done: 已处理完成的文件数（截至检查点）
+        files_imported: 成功导入数
+        files_skipped: 跳过数（去重）
+        files_failed: 失败数
+        bytes_total: 已发现文件的总字节数
+        bytes_done: 已处理完成的字节数
+        files_per_second: 本次运行的文件处理速率
+        bytes_per_second: 本次运行的字节处理速率
+        error_message: 错误信息（仅失败时记录）
+        started_at: 本次运行开始时间
+        finished_at: 结束时间
+        created_at: 创建时间
+        updated_at: 更新时间（运行中的作业每个检查点刷新，用于判断 Worker 是否已中断）
+    """
+    __tablename__ = "ingestion_jobs"
+
+    # 主键
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment='作业ID')
+    job_type = Column(String(20), nullable=False, default='scan', comment='作业类型: scan, sharded_scan')
+
+    # 状态
+    status = Column(String(20), nullable=False, default='queued', comment='作业状态: queued, running, paused, done, failed')
+    params = Column(JSON, nullable=False, comment='导入参数')
+    pause_requested = Column(Boolean, nullable=False, default=False, comment='是否已请求暂停')
+
+    # 检查点与进度
+    checkpoint_path = Column(Text, comment='最后一个已处理完成的文件（扫描顺序）')
+    scan_complete = Column(Boolean, nullable=False, default=False, comment='目录是否已扫描完毕')
+    files_total = Column(BIGINT, nullable=False, default=0, comment='已发现的文件总数')
+    files_done = Column(BIGINT, nullable=False, default=0, comment='已处理完成的文件数')
+    files_imported = Column(BIGINT, nullable=False, default=0, comment='成功导入数')
+    files_skipped = Column(BIGINT, nullable=False, default=0, comment='跳过数')
+    files_failed = Column(BIGINT, nullable=False, default=0, comment='失败数')
+    bytes_total = Column(BIGINT, nullable=False, default=0, comment='已发现文件的总字节数')
+    bytes_done = Column(BIGINT, nullable=False, default=0, comment='已处理完成的字节数')
+    files_per_second = Column(Float, comment='文件处理速率')
+    bytes_per_second = Column(Float, comment='字节处理速率')
+    error_message = Column(Text, comment='错误信息（仅失败时记录）')
+
+    # 时间戳
+    started_at = Column(DateTime, comment='本次运行开始时间')
+    finished_at = Column(DateTime, comment='结束时间')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<IngestionJob(id={self.id}, status={self.status}, files_done={self.files_done}/{self.files_total})>"
@@ -0,0 +1,71 @@
+"""导入作业分片模型"""
+from sqlalchemy import Column, String, DateTime, BIGINT, Boolean, Float, Text, JSON, Index, func
+from ..db import Base
+
+
+class IngestionJobShard(Base):
+    """导入作业分片表
+
+    分布式扫描导入（job_type=sharded_scan）把目录树切成若干分片，每个分片作为独立任务
+    由任意 Worker 执行，进度按检查点写回分片记录并汇总到所属作业。
+
+    Attributes:
+        id: 分片ID
+        job_id: 所属作业ID（ingestion_jobs.id）
+        scopes: 扫描范围 [[相对目录, 是否递归], ...]（相对作业扫描路径，按扫描顺序）
+        status: 分片状态（queued, running, paused, done, failed）
+        worker: 最近一次执行的 Worker（主机名:进程号）
+        checkpoint_path: 检查点：分片内扫描顺序中最后一个已处理完成的文件（相对作业扫描路径）
+        scan_complete: 分片是否已扫描完毕
+        files_total: 文件总数（规划时统计，扫描完毕后以实际为准）
+        files_done: 已处理完成的文件数（截至检查点）
+        files_imported: 成功导入数
+        files_skipped: 跳过数（去重）
+        files_failed: 失败数
+        bytes_total: 文件总字节数
+        bytes_done: 已处理完成的字节数
+        files_per_second: 本次运行的文件处理速率
+        bytes_per_second: 本次运行的字节处理速率
+        error_message: 错误信息（仅失败时记录）
+        started_at: 本次运行开始时间
+        finished_at: 结束时间
+        created_at: 创建时间
+        updated_at: 更新时间（运行中的分片每个检查点刷新，用于判断 Worker 是否已中断）
+    """
+    __tablename__ = "ingestion_job_shards"
+
+    # 主键
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment='分片ID')
+    job_id = Column(BIGINT, nullable=False, comment='所属作业ID')
+    scopes = Column(JSON, nullable=False, comment='扫描范围 [[相对目录, 是否递归], ...]')
+
+    # 状态
+    status = Column(String(20), nullable=False, default='queued', comment='分片状态: queued, running, paused, done, failed')
+    worker = Column(String(100), comment='最近一次执行的 Worker')
+
+    # 检查点与进度
+    checkpoint_path = Column(Text, comment='最后一个已处理完成的文件（扫描顺序）')
+    scan_complete = Column(Boolean, nullable=False, default=False, comment='分片是否已扫描完毕')
+    files_total = Column(BIGINT, nullable=False, default=0, comment='文件总数')
+    files_done = Column(BIGINT, nullable=False, default=0, comment='已处理完成的文件数')
+    files_imported = Column(BIGINT, nullable=False, default=0, comment='成功导入数')
+    files_skipped = Column(BIGINT, nullable=False, default=0, comment='跳过数')
+    files_failed = Column(BIGINT, nullable=False, default=0, comment='失败数')
+    bytes_total = Column(BIGINT, nullable=False, default=0, comment='文件总字节数')
+    bytes_done = Column(BIGINT, nullable=False, default=0, comment='已处理完成的字节数')
+    files_per_second = Column(Float, comment='文件处理速率')
+    bytes_per_second = Column(Float, comment='字节处理速率')
+    error_message = Column(Text, comment='错误信息（仅失败时记录）')
+
+    # 时间戳
+    started_at = Column(DateTime, comment='本次运行开始时间')
+    finished_at = Column(DateTime, comment='结束时间')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    __table_args__ = (
+        Index('idx_job_status', 'job_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<IngestionJobShard(id={self.id}, job_id={self.job_id}, status={self.status}, files_done={self.files_done}/{self.files_total})>"
@@ -0,0 +1,45 @@
+"""扫描清单模型"""
+from sqlalchemy import Column, String, DateTime, BIGINT, Text, func
+from ..db import Base
+
+
+class ScanManifest(Base):
+    """扫描清单表
+
+    记录扫描源文件的 stat 签名与内容哈希，重复扫描时签名未变化的文件
+    直接复用哈希，无需再次读取文件内容。
+
+    Attributes:
+        id: 清单记录ID
+        path_hash: 源文件绝对路径的 SHA256（唯一键，避免长路径索引）
+        source_path: 源文件绝对路径
+        file_size: 文件大小（字节）
+        mtime_ns: 修改时间（纳秒）
+        inode: inode 编号
+        file_hash: 文件内容哈希（与 assets.file_hash 同口径）
+        created_at: 创建时间
+        updated_at: 更新时间
+    """
+    __tablename__ = "scan_manifests"
+
+    # 主键
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment='清单记录ID')
+
+    # 路径
+    path_hash = Column(String(64), unique=True, nullable=False, comment='源文件绝对路径的 SHA256')
+    source_path = Column(Text, nullable=False, comment='源文件绝对路径')
+
+    # stat 签名
+    file_size = Column(BIGINT, nullable=False, comment='文件大小（字节）')
+    mtime_ns = Column(BIGINT, nullable=False, comment='修改时间（纳秒）')
+    inode = Column(BIGINT, nullable=False, comment='inode 编号')
+
+    # 内容哈希
+    file_hash = Column(String(64), nullable=False, index=True, comment='文件内容哈希')
+
+    # 时间戳
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<ScanManifest(id={self.id}, path={self.source_path}, file_hash={self.file_hash})>"
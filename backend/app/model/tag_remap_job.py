@@ -0,0 +1,57 @@
+"""标签重新映射作业模型"""
+from sqlalchemy import Column, String, DateTime, BIGINT, Float, Text, func
+from ..db import Base
+
+
+class TagRemapJob(Base):
+    """标签重新映射作业表
+
+    映射规则变更（或手动触发）后，由 Taskiq Worker 从留存的原始元数据为已有素材重新映射标签，
+    按素材 ID 分批处理，每批与标签写入一起提交检查点，失败或 Worker 中断后从检查点续跑。
+
+    Attributes:
+        id: 作业ID
+        asset_type: 处理的素材类型（为空表示全部）
+        trigger_type: 触发方式（manual 手动；mapping_change 映射规则变更）
+        status: 作业状态（queued, running, done, failed）
+        last_asset_id: 检查点：最后一个已处理完成的素材 ID
+        assets_total: 作业开始时待处理的素材数
+        assets_done: 已处理的素材数（截至检查点）
+        assets_missing_metadata: 没有留存原始元数据的素材数
+        tags_inserted: 新增标签数
+        tags_updated: 更新标签数（值随新规则变化）
+        assets_per_second: 本次运行的处理速率
+        error_message: 错误信息（仅失败时记录）
+        started_at: 本次运行开始时间
+        finished_at: 结束时间
+        created_at: 创建时间
+        updated_at: 更新时间（每批刷新，用于判断 Worker 是否已中断）
+    """
+    __tablename__ = "tag_remap_jobs"
+
+    # 主键
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment='作业ID')
+    asset_type = Column(String(20), nullable=True, comment='素材类型（为空表示全部）')
+    trigger_type = Column(String(20), nullable=False, default='manual', comment='触发方式: manual, mapping_change')
+
+    # 状态
+    status = Column(String(20), nullable=False, default='queued', comment='作业状态: queued, running, done, failed')
+
+    # 检查点与进度
+    last_asset_id = Column(BIGINT, nullable=False, default=0, comment='最后一个已处理完成的素材ID')
+    assets_total = Column(BIGINT, nullable=False, default=0, comment='待处理的素材数')
+    assets_done = Column(BIGINT, nullable=False, default=0, comment='已处理的素材数')
+    assets_missing_metadata = Column(BIGINT, nullable=False, default=0, comment='没有原始元数据的素材数')
+    tags_inserted = Column(BIGINT, nullable=False, default=0, comment='新增标签数')
+    tags_updated = Column(BIGINT, nullable=False, default=0, comment='更新标签数')
+    assets_per_second = Column(Float, comment='素材处理速率')
+    error_message = Column(Text, comment='错误信息（仅失败时记录）')
+
+    # 时间戳
+    started_at = Column(DateTime, comment='本次运行开始时间')
+    finished_at = Column(DateTime, comment='结束时间')
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<TagRemapJob(id={self.id}, status={self.status}, assets_done={self.assets_done}/{self.assets_total})>"
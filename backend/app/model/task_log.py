@@ -9,6 +9,7 @@ class TaskLog(Base):
     用于记录各种异步任务的执行状态，包括：
     - phash 计算
     - 地理位置编码
+    - 衍生图重新生成（批量作业，一行记录整个作业，进度写在 task_params.progress）
     - 人脸识别
     - 其他耗时任务
 
@@ -16,7 +17,7 @@ class TaskLog(Base):
         id: 任务日志ID
         task_type: 任务类型（phash, geocoding, face_detection 等）
         task_status: 任务状态（pending, running, success, failed）
-        asset_id: 关联的资源ID
+        asset_id: 关联的资源ID（批量作业为 0）
         task_params: 任务参数（JSON 格式）
         retry_count: 当前重试次数
         max_retries: 最大重试次数
@@ -31,11 +32,11 @@ class TaskLog(Base):
     id = Column(BIGINT, primary_key=True, autoincrement=True, comment='任务日志ID')
 
     # 任务标识
-    task_type = Column(String(50), nullable=False, comment='任务类型: phash, geocoding, face_detection 等')
+    task_type = Column(String(50), nullable=False, comment='任务类型: phash, geocoding, regenerate_derivatives, face_detection 等')
     task_status = Column(String(20), nullable=False, default='pending', comment='任务状态: pending, running, success, failed')
 
     # 关联资源
-    asset_id = Column(BIGINT, nullable=False, index=True, comment='关联的资源ID')
+    asset_id = Column(BIGINT, nullable=False, index=True, comment='关联的资源ID（批量作业为 0）')
 
     # 任务参数（JSON 格式，适配不同任务类型）
     task_params = Column(JSON, comment='任务参数，如: {"latitude": 39.9042, "longitude": 116.4074}')
@@ -0,0 +1,59 @@
+"""断点续传上传会话模型"""
+from sqlalchemy import Column, String, DateTime, BIGINT, Text, JSON, func
+from ..db import Base
+
+
+class UploadSession(Base):
+    """上传会话表
+
+    大文件分块上传：客户端先创建会话，再按偏移量逐块追加，全部到达后 finalize。
+    已接收的数据保存在 NAS 上，连接中断后可查询偏移量从断点继续。
+
+    Attributes:
+        id: 会话记录ID
+        upload_id: 对外暴露的上传ID（随机十六进制串）
+        filename: 原始文件名
+        total_size: 文件总大小（字节）
+        received_size: 已接收字节数（以 NAS 上的分块文件为准）
+        expected_hash: 客户端提供的完整 SHA256（finalize 时校验，可选）
+        status: 会话状态（uploading, finalizing, stored, completed, failed, aborted）
+        file_hash: finalize 计算出的去重哈希（移动到内容寻址路径前记录）
+        stored_path: finalize 移动后的 NAS 相对路径（导入失败或中断后重试直接重新导入）
+        created_by: 创建者用户ID
+        import_options: 导入参数（可见性、地标、默认 GPS、相册关联等）
+        result: finalize 后的导入结果
+        error_message: 错误信息（仅失败时记录）
+        created_at: 创建时间
+        updated_at: 更新时间
+    """
+    __tablename__ = "upload_sessions"
+
+    # 主键
+    id = Column(BIGINT, primary_key=True, autoincrement=True, comment='会话记录ID')
+    upload_id = Column(String(32), unique=True, nullable=False, comment='上传ID')
+
+    # 文件信息
+    filename = Column(String(255), nullable=False, comment='原始文件名')
+    total_size = Column(BIGINT, nullable=False, comment='文件总大小（字节）')
+    received_size = Column(BIGINT, nullable=False, default=0, comment='已接收字节数')
+    expected_hash = Column(String(64), comment='客户端提供的完整 SHA256')
+
+    # 状态
+    status = Column(String(20), nullable=False, default='uploading', comment='会话状态: uploading, finalizing, stored, completed, failed, aborted')
+
+    # finalize 结果（导入失败或中断后重试时沿用）
+    file_hash = Column(String(64), comment='去重哈希')
+    stored_path = Column(String(255), comment='内容寻址路径（NAS 相对路径）')
+
+    # 导入参数与结果
+    created_by = Column(BIGINT, nullable=False, comment='创建者用户ID')
+    import_options = Column(JSON, comment='导入参数')
+    result = Column(JSON, comment='导入结果')
+    error_message = Column(Text, comment='错误信息（仅失败时记录）')
+
+    # 时间戳
+    created_at = Column(DateTime, server_default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<UploadSession(upload_id={self.upload_id}, filename={self.filename}, status={self.status})>"
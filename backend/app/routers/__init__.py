@@ -7,7 +7,7 @@ Routers Package
 路由模块说明：
     assets: 素材查询和管理（查询、列表、详情、收藏等）
     albums: 相册管理（创建、查询、更新、删除、素材管理）
-    ingestion: 素材摄入（本地扫描、上传等）
+    ingestion: 素材摄入（本地扫描、上传、导入作业进度等）
     management: 系统管理任务（健康检查、统计、清理等）
     home: 首页相关（精选照片、时间轴、地点地图等）
     tags: 标签定义管理
@@ -19,6 +19,7 @@ from .assets import router as assets_router
 from .albums import router as albums_router
 from .ingestion.scan import router as ingestion_scan_router
 from .ingestion.upload import router as ingestion_upload_router
+from .ingestion.jobs import router as ingestion_jobs_router
 from .management import router as management_router
 from .home import router as home_router
 from .tags import router as tags_router
@@ -30,6 +31,7 @@ from .map import router as map_router
 ingestion_router = APIRouter()
 ingestion_router.include_router(ingestion_scan_router)
 ingestion_router.include_router(ingestion_upload_router)
+ingestion_router.include_router(ingestion_jobs_router)
 
 __all__ = [
     'assets_router',
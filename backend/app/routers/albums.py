@@ -123,8 +123,8 @@ def list_albums(
         if album.cover_asset_id:
             cover_asset = cover_asset_map.get(album.cover_asset_id)
             if cover_asset:
-                cover_thumbnail_url = url_provider.maybe_to_public_url(cover_asset.thumbnail_path)
-                cover_preview_url = url_provider.maybe_to_public_url(cover_asset.preview_path)
+                cover_thumbnail_url = AssetService.thumbnail_url(cover_asset, url_provider)
+                cover_preview_url = AssetService.preview_url(cover_asset, url_provider)
                 cover_original_url = url_provider.maybe_to_public_url(cover_asset.original_path)
 
         album_dict["cover_thumbnail_url"] = cover_thumbnail_url
@@ -175,8 +175,8 @@ def get_album(
         ).first()
         if cover_asset:
             url_provider = AssetService.get_url_provider()
-            cover_thumbnail_url = url_provider.maybe_to_public_url(cover_asset.thumbnail_path)
-            cover_preview_url = url_provider.maybe_to_public_url(cover_asset.preview_path)
+            cover_thumbnail_url = AssetService.thumbnail_url(cover_asset, url_provider)
+            cover_preview_url = AssetService.preview_url(cover_asset, url_provider)
             cover_original_url = url_provider.maybe_to_public_url(cover_asset.original_path)
 
     album_dict['cover_thumbnail_url'] = cover_thumbnail_url
@@ -1,5 +1,6 @@
 """资源相关路由"""
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from typing import Optional, List
@@ -8,6 +9,9 @@ import json
 from ..db import get_db
 from .. import model, schema
 from ..services.asset import AssetService
+from ..services.derivative import DeepZoomService, DerivativeFile, DerivativeService
+from ..services.derivative.deepzoom import DEEP_ZOOM_CACHE_CONTROL
+from ..services.derivative.service import IMMUTABLE_CACHE_CONTROL
 from ..services.metadata_dictionary import MetadataDictionaryService
 from ..services.similar import AssetSimilarService
 from ..services.tags.service import TagService
@@ -185,6 +189,62 @@ def get_asset(
     )))
 
 
+@router.get("/{asset_id}/derivatives/{size}.{fmt}")
+def get_asset_derivative(
+    asset_id: int,
+    size: int,
+    fmt: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """按需衍生图（缩略图/预览图）
+
+    首次请求时生成并写入磁盘缓存，之后直接返回缓存文件。
+    URL 内容随文件哈希与生成器版本（素材 URL 上的 ?v= 参数）固定，响应带 immutable 长期缓存头；If-None-Match 命中时返回 304。
+
+    参数:
+    - size: 长边尺寸（800 或多档缩略图尺寸；0 为原尺寸预览图）
+    - fmt: 输出格式（webp/jpeg）
+    """
+    derivative = DerivativeService.get_or_create(db, asset_id, size, fmt)
+    return _cached_file_response(request, derivative, IMMUTABLE_CACHE_CONTROL)
+
+
+@router.get("/{asset_id}/deepzoom.dzi")
+def get_asset_deep_zoom_descriptor(
+    asset_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """超大图片的 DZI 描述文件（尺寸、切片大小、重叠、格式）
+
+    查看器据此推导切片 URL：/assets/{asset_id}/deepzoom_files/{level}/{col}_{row}.{fmt}
+    """
+    descriptor = DeepZoomService.get_descriptor(db, asset_id)
+    return _cached_file_response(request, descriptor, DEEP_ZOOM_CACHE_CONTROL)
+
+
+@router.get("/{asset_id}/deepzoom_files/{level}/{col}_{row}.{fmt}")
+def get_asset_deep_zoom_tile(
+    asset_id: int,
+    level: int,
+    col: int,
+    row: int,
+    fmt: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """超大图片的 DZI 切片
+
+    参数:
+    - level: 缩放级别（0 为 1×1，最高级为原尺寸）
+    - col / row: 切片列号 / 行号
+    - fmt: 切片格式（与描述文件中的 Format 一致）
+    """
+    tile = DeepZoomService.get_tile(db, asset_id, level, col, row, fmt)
+    return _cached_file_response(request, tile, DEEP_ZOOM_CACHE_CONTROL)
+
+
 @router.get("/{asset_id}/tags", response_model=schema.ApiResponse[dict])
 def get_asset_tags(
     asset_id: int,
@@ -272,8 +332,8 @@ def get_similar_assets(
             "id": similar_asset.id,
             "asset_type": similar_asset.asset_type,
             "thumbnail_path": similar_asset.thumbnail_path,
-            "thumbnail_url": url_provider.maybe_to_public_url(similar_asset.thumbnail_path),
-            "preview_url": url_provider.maybe_to_public_url(similar_asset.preview_path),
+            "thumbnail_url": AssetService.thumbnail_url(similar_asset, url_provider),
+            "preview_url": AssetService.preview_url(similar_asset, url_provider),
             "original_url": url_provider.maybe_to_public_url(similar_asset.original_path),
             "shot_at": similar_asset.shot_at,
             "is_favorited": similar_asset.id in favorited_ids,
@@ -409,3 +469,11 @@ def _apply_extra_tag_filters(db: Session, query, tag_filters: Optional[str]):
         ).distinct()
         query = query.filter(model.Asset.id.in_(ids))
     return query
+
+
+def _cached_file_response(request: Request, file: DerivativeFile, cache_control: str):
+    """返回带缓存头的文件；If-None-Match 命中时返回 304"""
+    headers = {'Cache-Control': cache_control, 'ETag': file.etag}
+    if request.headers.get('if-none-match') == file.etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(file.path, media_type=file.media_type, headers=headers)
@@ -8,6 +8,7 @@ from ...model.asset import Asset
 from ...model.user_favorite import UserFavorite
 from ...model.asset_tag import AssetTag
 from ...services.templates.service import TemplateService
+from ...services.asset import AssetService
 from ...services.asset_url import AssetUrlProviderFactory
 from ...schema.home.featured import FeaturedResponse, FeaturedAsset
 
@@ -122,7 +123,7 @@ def get_featured_assets(
 
         original_url = url_provider.to_public_url(asset.original_path)
         thumbnail_url = (
-            url_provider.maybe_to_public_url(asset.thumbnail_path)
+            AssetService.thumbnail_url(asset, url_provider)
             or original_url
         )
 
@@ -9,6 +9,7 @@ from typing import List, Optional
 
 from ...db import get_db
 from ... import model, schema
+from ...services.asset import AssetService
 from ...services.asset_url import AssetUrlProviderFactory
 
 
@@ -58,7 +59,7 @@ def get_timeline(
         for asset in cover_assets:
             cover_assets_map[asset.id] = {
                 'id': asset.id,
-                'thumbnail_url': url_provider.maybe_to_public_url(asset.thumbnail_path),
+                'thumbnail_url': AssetService.thumbnail_url(asset, url_provider),
                 'type': asset.asset_type,
             }
 
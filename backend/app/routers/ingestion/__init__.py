@@ -4,7 +4,7 @@
 负责将外部素材纳入系统的所有入口：
 - 本地文件系统扫描
 - HTTP 上传接口
-- 目录监控（未来）
+- 目录监控（独立进程 app.services.ingestion.watch，无 HTTP 接口）
 - 第三方云存储同步（未来）
 """
 from .scan import router as scan_router
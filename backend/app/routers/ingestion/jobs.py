@@ -0,0 +1,57 @@
+"""导入作业查询与控制
+
+作业由 POST /ingestion/scan 创建，Taskiq Worker 执行；此处提供进度查询、暂停与续跑。
+分布式扫描作业（sharded_scan）另提供分片进度查询。
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ...db import get_db
+from ... import schema
+from ...schema.ingestion import IngestionJobOut, IngestionJobShardOut
+from ...services.ingestion.jobs import IngestionJobService
+from ...services.ingestion.sharding import ShardedScanService
+
+router = APIRouter(
+    prefix="/ingestion",
+    tags=["Ingestion"],
+)
+
+
+@router.get("/jobs", response_model=schema.ApiResponse[List[IngestionJobOut]])
+def list_ingestion_jobs(
+    status: Optional[str] = Query(None, description="按状态过滤: queued, running, paused, done, failed"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    jobs = IngestionJobService.list_jobs(db, status, limit)
+    return schema.ApiResponse.success(data=[IngestionJobService.to_out(job) for job in jobs])
+
+
+@router.get("/jobs/{job_id}", response_model=schema.ApiResponse[IngestionJobOut])
+def get_ingestion_job(job_id: int, db: Session = Depends(get_db)):
+    """作业进度：已处理文件数/字节数、files/s、bytes/s 与预计剩余时间"""
+    job = IngestionJobService.get_job(db, job_id)
+    return schema.ApiResponse.success(data=IngestionJobService.to_out(job))
+
+
+@router.get("/jobs/{job_id}/shards", response_model=schema.ApiResponse[List[IngestionJobShardOut]])
+def list_ingestion_job_shards(job_id: int, db: Session = Depends(get_db)):
+    """分布式扫描作业的分片进度（执行的 Worker、检查点与计数）"""
+    IngestionJobService.get_job(db, job_id)
+    shards = ShardedScanService.list_shards(db, job_id)
+    return schema.ApiResponse.success(data=[IngestionJobShardOut.model_validate(shard) for shard in shards])
+
+
+@router.post("/jobs/{job_id}/pause", response_model=schema.ApiResponse[IngestionJobOut])
+def pause_ingestion_job(job_id: int, db: Session = Depends(get_db)):
+    """暂停作业（运行中的作业在下一个检查点停止）"""
+    job = IngestionJobService.pause(db, job_id)
+    return schema.ApiResponse.success(data=IngestionJobService.to_out(job), message="已请求暂停")
+
+
+@router.post("/jobs/{job_id}/resume", response_model=schema.ApiResponse[IngestionJobOut])
+def resume_ingestion_job(job_id: int, db: Session = Depends(get_db)):
+    """续跑作业（从检查点之后的文件继续）"""
+    job = IngestionJobService.resume(db, job_id)
+    return schema.ApiResponse.success(data=IngestionJobService.to_out(job), message="作业已续跑")
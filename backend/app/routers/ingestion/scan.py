@@ -2,15 +2,15 @@
 
 重构说明：
 - 路由层仅负责参数验证和任务调度
-- 业务逻辑完全委托给 AssetImportService
+- 导入以作业形式持久化，由 Taskiq Worker 执行（IngestionJobService），进度通过 /ingestion/jobs 查询
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ...db import get_db
 from ... import schema
 from ...config import settings
 from ...schema.ingestion import ScanRequest, ScanResponseData
-from ...services.ingestion import AssetImportService, ImportConfig
+from ...services.ingestion.jobs import IngestionJobService
 from ...services.album import AlbumService
 from ...tools.utils import get_logger
 import os
@@ -26,7 +26,6 @@ router = APIRouter(
 @router.post("/scan", response_model=schema.ApiResponse[ScanResponseData])
 def scan_and_import(
     request: ScanRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """扫描文件系统并导入素材
@@ -39,9 +38,15 @@ def scan_and_import(
             - import_to_album: 是否导入到相册（默认: False）
             - album_info: 相册信息（当 import_to_album=True 时必填）
             - default_gps: 默认经纬度，格式：'经度,纬度'（可选）
+            - pipeline: 是否启用多阶段并行导入流水线（默认: False）
+            - verify: 是否忽略扫描清单、强制重新计算文件哈希（默认: False）
+            - stage_strategy: 入库方式 copy / reflink / hardlink（默认使用服务端配置）
+            - derive_lazily: 是否跳过缩略图/预览图生成、改为按需生成（默认使用服务端配置）
+            - distributed: 是否按目录分片、由多个 Worker 并行导入（默认: False）
+            - shard_max_files: 每个分片的目标文件数上限（默认使用服务端配置）
 
     返回:
-        任务状态信息
+        作业信息（job_id 用于查询进度、暂停与续跑）
     """
     scan_path = request.source_path or settings.NAS_DATA_PATH
 
@@ -80,61 +85,31 @@ def scan_and_import(
         except ValueError:
             raise HTTPException(status_code=400, detail="经纬度格式错误")
 
-    # 添加后台任务
-    background_tasks.add_task(_run_import_task, scan_path, request, db, default_gps)
+    # 创建导入作业并投递到任务队列
+    album_info = request.album_info
+    job = IngestionJobService.create_scan_job(db, {
+        'scan_path': scan_path,
+        'created_by': request.created_by,
+        'visibility': request.visibility,
+        'import_to_album': request.import_to_album,
+        'album_id': album_info.album_id if album_info else None,
+        'album_name': album_info.album_name if album_info else None,
+        'album_start_time': album_info.start_time.isoformat() if album_info and album_info.start_time else None,
+        'album_end_time': album_info.end_time.isoformat() if album_info and album_info.end_time else None,
+        'default_gps': list(default_gps) if default_gps else None,
+        'pipeline': request.pipeline,
+        'verify': request.verify,
+        'stage_strategy': request.stage_strategy,
+        'derive_lazily': request.derive_lazily,
+        'shard_max_files': request.shard_max_files,
+    }, job_type='sharded_scan' if request.distributed else 'scan')
+    IngestionJobService.enqueue(db, job)
 
     return schema.ApiResponse.success(
         data=ScanResponseData(
-            status="scanning",
-            path=scan_path
+            status="queued",
+            path=scan_path,
+            job_id=job.id
         ),
-        message="素材扫描任务已在后台启动"
+        message="素材导入作业已创建"
     )
-
-
-def _run_import_task(
-    scan_path: str,
-    request: ScanRequest,
-    db: Session,
-    default_gps: tuple[float, float] = None
-):
-    """后台导入任务
-
-    职责：
-    - 创建导入配置
-    - 执行导入服务
-    - 记录最终结果
-    """
-    logger.info("后台任务开始执行: 素材导入")
-
-    try:
-        # 创建导入配置
-        config = ImportConfig(
-            scan_path=scan_path,
-            created_by=request.created_by,
-            visibility=request.visibility,
-            db=db,
-            import_to_album=request.import_to_album,
-            album_id=request.album_info.album_id if request.album_info else None,
-            album_name=request.album_info.album_name if request.album_info else None,
-            album_start_time=request.album_info.start_time if request.album_info else None,
-            album_end_time=request.album_info.end_time if request.album_info else None,
-            default_gps=default_gps
-        )
-
-        # 执行导入服务
-        service = AssetImportService(config)
-        statistics = service.import_assets()
-
-        # 最终统计
-        logger.info(statistics.get_summary())
-
-        # 如果有失败，记录详情
-        if statistics.has_failures():
-            logger.warning(f"以下 {statistics.failed} 个文件导入失败:")
-            for file_path, error in statistics.failed_files[:10]:  # 最多显示 10 个
-                logger.warning(f"  - {file_path}: {error}")
-
-    except Exception as e:
-        logger.error(f"导入任务执行失败: {e}")
-        db.rollback()
@@ -1,21 +1,27 @@
 """HTTP 上传导入素材"""
-from dataclasses import dataclass
-from fastapi import APIRouter, UploadFile, File, Depends, Form, HTTPException
+from dataclasses import asdict, dataclass, fields
+from fastapi import APIRouter, UploadFile, File, Depends, Form, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from pathlib import Path
+from ...config import settings
 from ...db import get_db
 from ... import schema, model
 from ...tools.utils import get_logger
-from ...services.ingestion import AssetImportService, ImportConfig
+from ...services.ingestion import AssetImportService, ImportConfig, FilesystemScanner
+from ...schema.ingestion import UploadSessionCreate, UploadSessionOut
+from ...services.ingestion.storage import AssetStorageBackend, IngestionStorageFactory, StreamedAssetFile
+from ...services.ingestion.upload_session import UploadFinalizeConflict, UploadOffsetConflict, UploadSessionService
 from ...services.album import AlbumService
 from ...services.tags import TagService
 import os
-import shutil
-import tempfile
 
 logger = get_logger(__name__)
 
+# 上传数据按块写入存储（边写边算哈希）
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 router = APIRouter(
     prefix="/ingestion",
     tags=["Ingestion"],
@@ -33,6 +39,14 @@ class AlbumUploadParams:
     album_end_time: Optional[str] = None  # 'YYYY-MM-DD'
 
 
+@dataclass
+class _UploadSource:
+    """待写入存储的上传数据（multipart 文件或原始请求体）"""
+    filename: str
+    chunks: AsyncIterator[bytes]
+    upload_file: Optional[UploadFile] = None  # multipart 文件，处理完需关闭
+
+
 @router.post("/upload", response_model=schema.ApiResponse[dict])
 async def upload_single_asset(
     file: UploadFile = File(...),
@@ -69,7 +83,9 @@ async def upload_single_asset(
     album_params = AlbumUploadParams(
         import_to_album, album_id, album_name, album_description, album_start_time, album_end_time
     )
-    return await _handle_upload([file], created_by, visibility, location_poi, default_gps, album_params, db)
+    return await _handle_upload(
+        _to_upload_sources([file]), created_by, visibility, location_poi, default_gps, album_params, db
+    )
 
 
 @router.post("/upload/batch", response_model=schema.ApiResponse[dict])
@@ -98,11 +114,234 @@ async def upload_batch_assets(
     album_params = AlbumUploadParams(
         import_to_album, album_id, album_name, album_description, album_start_time, album_end_time
     )
-    return await _handle_upload(files, created_by, visibility, location_poi, default_gps, album_params, db)
+    return await _handle_upload(
+        _to_upload_sources(files), created_by, visibility, location_poi, default_gps, album_params, db
+    )
+
+
+@router.post("/upload/stream", response_model=schema.ApiResponse[dict])
+async def upload_stream_asset(
+    request: Request,
+    filename: str = Query(..., description="原始文件名（决定素材类型与入库文件名）"),
+    created_by: int = Query(1),
+    visibility: str = Query("general"),
+    location_poi: Optional[str] = Query(None),
+    default_gps: Optional[str] = Query(None),
+    import_to_album: bool = Query(False),
+    album_id: Optional[int] = Query(None),
+    album_name: Optional[str] = Query(None),
+    album_description: Optional[str] = Query(None),
+    album_start_time: Optional[str] = Query(None),
+    album_end_time: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """以原始请求体上传单个素材（适合大视频）
+
+    请求体即文件内容（`Content-Type: application/octet-stream`），不做 multipart 解析、
+    不落临时文件：数据边接收边写入 NAS、边计算哈希，完成后直接落到内容寻址路径。
+    其余参数同 `upload_single_asset`，以查询参数传递。
+
+    返回:
+        上传结果信息
+    """
+    logger.info(f"接收流式上传: {filename}, 大小: {request.headers.get('content-length', '未知')}")
+    album_params = AlbumUploadParams(
+        import_to_album, album_id, album_name, album_description, album_start_time, album_end_time
+    )
+    source = _UploadSource(filename=Path(filename).name or "upload_1", chunks=request.stream())
+    return await _handle_upload([source], created_by, visibility, location_poi, default_gps, album_params, db)
+
+
+@router.post("/uploads", response_model=schema.ApiResponse[UploadSessionOut])
+def create_upload_session(request: UploadSessionCreate, db: Session = Depends(get_db)):
+    """创建断点续传上传会话（大视频推荐）
+
+    流程：
+        1. POST /ingestion/uploads 创建会话，得到 upload_id
+        2. PATCH /ingestion/uploads/{upload_id} 逐块上传，请求头 Upload-Offset 为本块起始偏移量，
+           请求体为原始数据；中断后 GET 会话查询 offset，从该位置继续
+        3. POST /ingestion/uploads/{upload_id}/finalize 校验大小与 SHA256 后导入
+
+    返回:
+        会话状态
+    """
+    filename = Path(request.filename).name
+    album_params = AlbumUploadParams(
+        request.import_to_album, request.album_id, request.album_name,
+        request.album_description, request.album_start_time, request.album_end_time
+    )
+    # 导入参数在创建时即校验，避免传完几个 GB 才发现参数错误
+    _parse_default_gps(request.default_gps)
+    _parse_album_params(album_params)
+
+    import_options = {
+        "visibility": request.visibility,
+        "location_poi": request.location_poi,
+        "default_gps": request.default_gps,
+        **asdict(album_params),
+    }
+    service = _upload_sessions(db)
+    try:
+        session = service.create(filename, request.total_size, request.created_by, request.sha256, import_options)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return schema.ApiResponse.success(data=_session_out(service, session))
+
+
+@router.get("/uploads/{upload_id}", response_model=schema.ApiResponse[UploadSessionOut])
+def get_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    """查询上传会话（断点续传时获取已接收的偏移量）"""
+    service = _upload_sessions(db)
+    return schema.ApiResponse.success(data=_session_out(service, _get_session(service, upload_id)))
+
+
+@router.patch("/uploads/{upload_id}", response_model=schema.ApiResponse[UploadSessionOut])
+async def upload_session_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    db: Session = Depends(get_db)
+):
+    """上传一个分块（请求体为原始数据，从 Upload-Offset 开始追加）
+
+    偏移量与服务端已接收字节数不一致、或同一会话有其他请求正在上传时返回 409，detail 中带当前 offset。
+    连接中途断开时已写入的数据会保留，下次从新的 offset 继续即可。
+    文件写入与数据库提交都在线程池中执行，不阻塞事件循环。
+    """
+    service = _upload_sessions(db)
+    session = await run_in_threadpool(_get_session, service, upload_id)
+
+    try:
+        writer = await run_in_threadpool(service.open_chunk_writer, session, upload_offset)
+    except UploadOffsetConflict as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "offset": exc.offset})
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        async for chunk in _coalesce_chunks(request.stream()):
+            await run_in_threadpool(writer.write, chunk)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        await run_in_threadpool(writer.close)
+
+    return schema.ApiResponse.success(data=await run_in_threadpool(_session_out, service, session))
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=schema.ApiResponse[dict])
+def finalize_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    """完成上传：校验大小与 SHA256，移动到内容寻址路径并导入
+
+    重复调用（如客户端未收到响应后重试）直接返回首次导入的结果；另一个 finalize 正在进行时返回 409。
+    导入失败后会话回到 stored，文件保留在内容寻址路径，再次调用 finalize 直接重新导入。
+    """
+    sessions = _upload_sessions(db)
+    session = _get_session(sessions, upload_id)
+    if session.status == 'completed':
+        return schema.ApiResponse.success(data=session.result)
+
+    options = session.import_options or {}
+    try:
+        parsed_gps = _parse_default_gps(options.get("default_gps"))
+        album_kwargs = _parse_album_params(AlbumUploadParams(**{
+            field.name: options[field.name] for field in fields(AlbumUploadParams) if field.name in options
+        }))
+        service = _create_import_service(
+            session.created_by, options.get("visibility", "general"), parsed_gps, album_kwargs, db
+        )
+        streamed = sessions.finalize(session)
+    except HTTPException:
+        raise
+    except UploadFinalizeConflict as exc:
+        if session.status == 'completed':
+            return schema.ApiResponse.success(data=session.result)
+        raise HTTPException(status_code=409, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        logger.error(f"上传会话 finalize 失败 {upload_id}: {exc}", exc_info=True)
+        raise HTTPException(status_code=500, detail="上传 finalize 失败")
+
+    try:
+        result = _import_streamed_files(
+            service, [streamed], _normalize_location_poi(options.get("location_poi")), db
+        )
+        result["upload_id"] = session.upload_id
+        sessions.complete(session, result)
+        return schema.ApiResponse.success(data=result)
+    except Exception as exc:
+        logger.error(f"上传会话导入失败 {upload_id}: {exc}", exc_info=True)
+        db.rollback()
+        sessions.release(session, str(exc))
+        raise HTTPException(status_code=500, detail="上传导入失败")
+
+
+@router.delete("/uploads/{upload_id}", response_model=schema.ApiResponse[UploadSessionOut])
+def abort_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    """取消上传并删除已接收的数据"""
+    service = _upload_sessions(db)
+    session = _get_session(service, upload_id)
+    service.abort(session)
+    return schema.ApiResponse.success(data=_session_out(service, session))
+
+
+def _upload_sessions(db: Session) -> UploadSessionService:
+    storage = IngestionStorageFactory.create(settings.ASSET_STORAGE_PROVIDER, settings.NAS_DATA_PATH)
+    return UploadSessionService(db, storage)
+
+
+def _get_session(service: UploadSessionService, upload_id: str):
+    session = service.get(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"上传会话不存在: {upload_id}")
+    return session
+
+
+def _session_out(service: UploadSessionService, session) -> UploadSessionOut:
+    return UploadSessionOut(
+        upload_id=session.upload_id,
+        filename=session.filename,
+        total_size=session.total_size,
+        offset=service.current_offset(session),
+        status=session.status,
+        result=session.result,
+        error_message=session.error_message,
+    )
+
+
+async def _coalesce_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """把请求体的小块合并为 UPLOAD_CHUNK_SIZE 再产出（减少线程池切换）"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= UPLOAD_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _to_upload_sources(files: List[UploadFile]) -> List[_UploadSource]:
+    sources = []
+    for index, file in enumerate(files, 1):
+        filename = Path(file.filename or "").name
+        if not filename:
+            filename = f"upload_{index}"
+        sources.append(_UploadSource(filename=filename, chunks=_iter_upload_file(file), upload_file=file))
+    return sources
 
 
 async def _handle_upload(
-    files: List[UploadFile],
+    sources: List[_UploadSource],
     created_by: int,
     visibility: str,
     location_poi: Optional[str],
@@ -110,32 +349,19 @@ async def _handle_upload(
     album_params: AlbumUploadParams,
     db: Session
 ) -> schema.ApiResponse[dict]:
-    if not files:
+    if not sources:
         raise HTTPException(status_code=400, detail="未选择上传文件")
 
     parsed_gps = _parse_default_gps(default_gps)
     album_kwargs = _parse_album_params(album_params)
 
-    temp_dir = tempfile.mkdtemp(prefix="ingestion-upload-")
     normalized_location = _normalize_location_poi(location_poi)
     try:
-        _save_upload_files(files, temp_dir)
-        stats, imported_ids, album_result = _import_uploaded_files(
-            temp_dir, created_by, visibility, parsed_gps, album_kwargs, db
-        )
-        location_tags = 0
-        if normalized_location:
-            location_tags = _apply_location_poi_tags(db, imported_ids, normalized_location)
-
-        return schema.ApiResponse.success(data={
-            "status": "completed",
-            "total": stats.total,
-            "imported": stats.imported,
-            "skipped": stats.skipped,
-            "failed": stats.failed,
-            "location_tags": location_tags,
-            "album": album_result
-        })
+        service = await run_in_threadpool(_create_import_service, created_by, visibility, parsed_gps, album_kwargs, db)
+        streamed_files = await _stream_upload_sources(service.storage, sources)
+        # 导入（解码、ffmpeg、数据库）是同步阻塞操作，放到线程池执行
+        result = await run_in_threadpool(_import_streamed_files, service, streamed_files, normalized_location, db)
+        return schema.ApiResponse.success(data=result)
     except HTTPException:
         raise
     except ValueError as exc:
@@ -144,14 +370,13 @@ async def _handle_upload(
         logger.error(f"上传导入失败: {exc}", exc_info=True)
         raise HTTPException(status_code=500, detail="上传导入失败")
     finally:
-        try:
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        finally:
-            for file in files:
-                try:
-                    await file.close()
-                except Exception:
-                    continue
+        for source in sources:
+            if source.upload_file is None:
+                continue
+            try:
+                await source.upload_file.close()
+            except Exception:
+                continue
 
 
 def _parse_default_gps(default_gps: Optional[str]) -> Optional[tuple[float, float]]:
@@ -198,35 +423,73 @@ def _parse_album_params(params: AlbumUploadParams) -> dict:
     }
 
 
-def _save_upload_files(files: List[UploadFile], temp_dir: str) -> None:
-    for index, file in enumerate(files, 1):
-        filename = Path(file.filename or "").name
-        if not filename:
-            filename = f"upload_{index}"
-        target_path = os.path.join(temp_dir, f"{index}_{filename}")
-        with open(target_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+async def _stream_upload_sources(
+    storage: AssetStorageBackend,
+    sources: List[_UploadSource]
+) -> List[StreamedAssetFile]:
+    """把上传数据直接写入存储的最终位置（每个文件只写一次，写入时同步计算哈希）
+
+    不支持的格式直接跳过（与扫描目录时忽略不支持的文件一致）。
+    文件写入与哈希计算在线程池中执行，请求体按 UPLOAD_CHUNK_SIZE 合并后再写入，不阻塞事件循环。
+    """
+    supported = FilesystemScanner.get_supported_extensions()
+    streamed_files = []
+    for source in sources:
+        if os.path.splitext(source.filename)[1].lower() not in supported:
+            logger.warning(f"跳过不支持的文件格式: {source.filename}")
+            continue
+
+        stage = await run_in_threadpool(storage.open_stream, source.filename)
+        try:
+            async for chunk in _coalesce_chunks(source.chunks):
+                await run_in_threadpool(stage.write, chunk)
+        except Exception:
+            await run_in_threadpool(stage.abort)
+            raise
+        streamed_files.append(await run_in_threadpool(stage.commit))
+    return streamed_files
+
+
+def _import_streamed_files(
+    service: AssetImportService,
+    streamed_files: List[StreamedAssetFile],
+    normalized_location: Optional[str],
+    db: Session
+) -> dict:
+    """导入已写入存储的文件，返回上传接口统一的结果结构"""
+    stats = service.import_staged_files(streamed_files)
+
+    location_tags = 0
+    if normalized_location:
+        location_tags = _apply_location_poi_tags(db, service.imported_asset_ids, normalized_location)
+
+    return {
+        "status": "completed",
+        "total": stats.total,
+        "imported": stats.imported,
+        "skipped": stats.skipped,
+        "failed": stats.failed,
+        "location_tags": location_tags,
+        "album": service.album_result
+    }
 
 
-def _import_uploaded_files(
-    temp_dir: str,
+def _create_import_service(
     created_by: int,
     visibility: str,
     default_gps: Optional[tuple[float, float]],
     album_kwargs: dict,
     db: Session
-):
+) -> AssetImportService:
     config = ImportConfig(
-        scan_path=temp_dir,
+        scan_path=settings.NAS_DATA_PATH,  # 上传文件直接写入 NAS，不扫描目录
         created_by=created_by,
         visibility=visibility,
         default_gps=default_gps,
         db=db,
         **album_kwargs
     )
-    service = AssetImportService(config)
-    stats = service.import_assets()
-    return stats, service.imported_asset_ids, service.album_result
+    return AssetImportService(config)
 
 
 def _apply_location_poi_tags(db: Session, asset_ids: List[int], location_poi: str) -> int:
@@ -214,7 +214,7 @@ def get_footprint_detail(
             assets=[
                 {
                     'id': asset.id,
-                    'thumbnail_url': url_provider.maybe_to_public_url(asset.thumbnail_path),
+                    'thumbnail_url': AssetService.thumbnail_url(asset, url_provider),
                     'shot_at': asset.shot_at,
                     'asset_type': asset.asset_type
                 }
@@ -10,6 +10,7 @@ from typing import List, Optional, Tuple
 from ..db import get_db
 from .. import model, schema
 from ..services.note import NoteService
+from ..services.asset import AssetService
 from ..services.asset_url import AssetUrlProviderFactory
 
 
@@ -41,7 +42,7 @@ def _cover_meta_for_notes(db: Session, notes: List[model.Note]) -> dict:
     for asset in cover_assets:
         mapping[asset.id] = (
             asset.thumbnail_path,
-            url_provider.maybe_to_public_url(asset.thumbnail_path),
+            AssetService.thumbnail_url(asset, url_provider),
         )
     return mapping
 
@@ -100,11 +101,11 @@ def _cover_detail_meta_for_note(db: Session, cover_asset_id: int) -> dict:
     url_provider = AssetUrlProviderFactory.create()
     return {
         'thumbnail_path': asset.thumbnail_path,
-        'thumbnail_url': url_provider.maybe_to_public_url(asset.thumbnail_path),
+        'thumbnail_url': AssetService.thumbnail_url(asset, url_provider),
         'original_path': asset.original_path,
         'original_url': url_provider.maybe_to_public_url(asset.original_path),
         'preview_path': asset.preview_path,
-        'preview_url': url_provider.maybe_to_public_url(asset.preview_path),
+        'preview_url': AssetService.preview_url(asset, url_provider),
     }
 
 
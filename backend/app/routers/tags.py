@@ -9,6 +9,7 @@ from ..db import get_db
 from .. import model, schema
 from ..services.tags.admin import TagAdminService
 from ..services.tags.mapping_service import TagMappingService
+from ..services.tags.remap import TagRemapService
 
 router = APIRouter(
     prefix="/tags",
@@ -89,6 +90,49 @@ def create_tag_mapping(
     return schema.ApiResponse.success(data=schema.TagMappingOut.model_validate(item))
 
 
+def _remap_job_out(job: model.TagRemapJob) -> schema.TagRemapJobOut:
+    out = schema.TagRemapJobOut.model_validate(job)
+    out.eta_seconds = TagRemapService.eta_seconds(job)
+    return out
+
+
+@router.post("/mappings/remap", response_model=schema.ApiResponse[schema.TagRemapJobOut])
+def remap_asset_tags(
+    asset_type: Optional[str] = Query(None, description="只处理某类素材（image/video/audio），为空表示全部"),
+    db: Session = Depends(get_db),
+):
+    """按当前映射规则，从留存的原始元数据重新映射已有素材的标签（后台作业，不读取原文件）。
+
+    规则增删改后会自动排队作业，此接口用于模板字段变更等场景手动触发。
+    """
+    job = TagRemapService.schedule(db, asset_type, 'manual')
+    return schema.ApiResponse.success(data=_remap_job_out(job), message="已排队重新映射")
+
+
+@router.get("/remap-jobs", response_model=schema.ApiResponse[List[schema.TagRemapJobOut]])
+def list_remap_jobs(
+    status: Optional[str] = Query(None, description="按状态过滤: queued, running, done, failed"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    jobs = TagRemapService.list_jobs(db, status, limit)
+    return schema.ApiResponse.success(data=[_remap_job_out(job) for job in jobs])
+
+
+@router.get("/remap-jobs/{job_id}", response_model=schema.ApiResponse[schema.TagRemapJobOut])
+def get_remap_job(job_id: int, db: Session = Depends(get_db)):
+    """作业进度：已处理素材数、新增/更新标签数、assets/s 与预计剩余时间"""
+    job = TagRemapService.get_job(db, job_id)
+    return schema.ApiResponse.success(data=_remap_job_out(job))
+
+
+@router.post("/remap-jobs/{job_id}/resume", response_model=schema.ApiResponse[schema.TagRemapJobOut])
+def resume_remap_job(job_id: int, db: Session = Depends(get_db)):
+    """续跑失败或中断的作业（从检查点之后的素材继续）"""
+    job = TagRemapService.resume(db, job_id)
+    return schema.ApiResponse.success(data=_remap_job_out(job), message="作业已续跑")
+
+
 @router.patch("/mappings/{mapping_id}", response_model=schema.ApiResponse[schema.TagMappingOut])
 def update_tag_mapping(
     mapping_id: int,
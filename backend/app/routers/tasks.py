@@ -49,3 +49,12 @@ def trigger_batch_phash(
 ):
     result = TaskDefinitionService.trigger_batch_phash(db, payload)
     return schema.ApiResponse.success(data=result)
+
+
+@router.post("/regenerate-derivatives", response_model=schema.ApiResponse[dict])
+def trigger_regenerate_derivatives(
+    payload: schema.RegenerateDerivativesRequest,
+    db: Session = Depends(get_db),
+):
+    result = TaskDefinitionService.trigger_regenerate_derivatives(db, payload)
+    return schema.ApiResponse.success(data=result)
@@ -15,7 +15,7 @@ Schema 说明：
     AlbumDetailOut: 相册详情输出 Schema
     ApiResponse: 统一 API 响应格式
 """
-from .asset import AssetBase, AssetOut, AssetsPageResponse, AssetBatchDeleteRequest
+from .asset import AssetBase, AssetOut, AssetStoryboard, AssetDeepZoom, AssetsPageResponse, AssetBatchDeleteRequest
 from .common import ApiResponse
 from .tag_definition import (
     TagDefinitionOut,
@@ -24,6 +24,7 @@ from .tag_definition import (
     TagMappingOut,
     TagMappingCreate,
     TagMappingUpdate,
+    TagRemapJobOut,
     AssetTagUpsert,
 )
 from .template import (
@@ -40,6 +41,7 @@ from .task_definition import (
     TaskDefinitionUpdate,
     TaskLogOut,
     BatchPhashRequest,
+    RegenerateDerivativesRequest,
 )
 from .album import (
     AlbumCreate,
@@ -72,6 +74,8 @@ from .home import (
 __all__ = [
     'AssetBase',
     'AssetOut',
+    'AssetStoryboard',
+    'AssetDeepZoom',
     'AssetsPageResponse',
     'AssetBatchDeleteRequest',
     'ApiResponse',
@@ -81,6 +85,7 @@ __all__ = [
     'TagMappingOut',
     'TagMappingCreate',
     'TagMappingUpdate',
+    'TagRemapJobOut',
     'AssetTagUpsert',
     'TemplateOut',
     'TemplateCreate',
@@ -93,6 +98,7 @@ __all__ = [
     'TaskDefinitionUpdate',
     'TaskLogOut',
     'BatchPhashRequest',
+    'RegenerateDerivativesRequest',
     'AlbumCreate',
     'AlbumUpdate',
     'AlbumOut',
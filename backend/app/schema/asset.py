@@ -1,7 +1,7 @@
 """资源相关 Schema"""
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class AssetBase(BaseModel):
@@ -21,6 +21,55 @@ class AssetBase(BaseModel):
     shot_at: Optional[datetime]
 
 
+class AssetStoryboard(BaseModel):
+    """视频故事板（拖动预览雪碧图）
+
+    第 k 格对应 [k × interval, (k+1) × interval) 秒，位于第 k // columns 行、第 k % columns 列。
+
+    Attributes:
+        sprite_url: 雪碧图 URL
+        vtt_url: WebVTT 索引 URL（供支持缩略图轨道的播放器使用）
+        count: 帧数
+        columns: 列数
+        rows: 行数
+        frame_width: 单帧宽度
+        frame_height: 单帧高度
+        interval: 取帧间隔（秒）
+    """
+    sprite_url: str
+    vtt_url: Optional[str] = None
+    count: int
+    columns: int
+    rows: int
+    frame_width: int
+    frame_height: int
+    interval: float
+
+
+class AssetDeepZoom(BaseModel):
+    """超大图片的 DZI 切片金字塔
+
+    查看器（如 OpenSeadragon）以 dzi_url 为切片源，切片 URL 为去掉 .dzi 后加
+    `_files/{level}/{col}_{row}.{format}`；第 levels - 1 级为原尺寸。
+
+    Attributes:
+        dzi_url: DZI 描述文件 URL
+        width: 原图宽度
+        height: 原图高度
+        tile_size: 切片边长
+        overlap: 切片重叠像素
+        format: 切片格式
+        levels: 缩放级别数
+    """
+    dzi_url: str
+    width: int
+    height: int
+    tile_size: int
+    overlap: int
+    format: str
+    levels: int
+
+
 class AssetOut(AssetBase):
     """资源输出 Schema（包含所有字段）
 
@@ -30,6 +79,8 @@ class AssetOut(AssetBase):
         id: 资源唯一ID
         created_by: 创建者用户ID
         thumbnail_path: 缩略图路径
+        thumbnail_srcset: 多尺寸缩略图 {宽度: URL}（按宽度升序，客户端取不小于显示宽度的最小一档）
+        storyboard: 视频故事板（拖动预览雪碧图；图片与未生成时为 None）
         visibility: 可见性（general: 公共, private: 私有）
         created_at: 创建时间
         updated_at: 更新时间
@@ -50,7 +101,10 @@ class AssetOut(AssetBase):
     # 对外可访问 URL（由后端根据存储策略生成）
     original_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    thumbnail_srcset: Optional[Dict[int, str]] = None  # 多尺寸缩略图 {宽度: URL}
     preview_url: Optional[str] = None  # 预览图 URL（用于 HEIC 等浏览器不支持的格式）
+    storyboard: Optional[AssetStoryboard] = None  # 视频故事板（拖动预览雪碧图）
+    deep_zoom: Optional[AssetDeepZoom] = None  # 超大图片的 DZI 切片（查看器按视口取切片）
 
     # 扩展字段
     is_favorited: bool = False
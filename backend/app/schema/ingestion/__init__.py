@@ -4,9 +4,15 @@ Ingestion Schema Package
 导入相关的所有请求/响应模型
 """
 from .scan import ScanRequest, ScanResponseData
+from .upload_session import UploadSessionCreate, UploadSessionOut
+from .job import IngestionJobOut, IngestionJobShardOut
 
 # 导出所有 Schema
 __all__ = [
     'ScanRequest',
     'ScanResponseData',
+    'UploadSessionCreate',
+    'UploadSessionOut',
+    'IngestionJobOut',
+    'IngestionJobShardOut',
 ]
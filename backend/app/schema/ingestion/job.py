@@ -0,0 +1,75 @@
+"""导入作业相关 Schema"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class IngestionJobOut(BaseModel):
+    """导入作业详情（含进度、速率与预计剩余时间）
+
+    Attributes:
+        job_type: scan（单个 Worker 导入）或 sharded_scan（目录分片后由多个 Worker 并行导入，计数与速率为所有分片之和）
+        status: 作业状态（queued, running, paused, done, failed）
+        pause_requested: 已请求暂停、等待运行中的导入到达下一个检查点
+        scan_complete: 目录是否已扫描完毕；未完成时 files_total / eta_seconds 随扫描进度变化
+        files_per_second / bytes_per_second: 本次运行的处理速率
+        eta_seconds: 预计剩余秒数（按字节速率估算，仅运行中的作业提供）
+    """
+    id: int
+    job_type: str
+    status: str
+    params: Dict[str, Any]
+    pause_requested: bool
+    checkpoint_path: Optional[str] = None
+    scan_complete: bool
+    files_total: int
+    files_done: int
+    files_imported: int
+    files_skipped: int
+    files_failed: int
+    bytes_total: int
+    bytes_done: int
+    files_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = Field(default=None, description="预计剩余秒数")
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionJobShardOut(BaseModel):
+    """分布式扫描导入的分片进度
+
+    Attributes:
+        scopes: 扫描范围 [[相对目录, 是否递归], ...]（相对作业扫描路径）
+        status: 分片状态（queued, running, paused, done, failed）
+        worker: 最近一次执行的 Worker（主机名:进程号）
+    """
+    id: int
+    job_id: int
+    scopes: List[List[Any]]
+    status: str
+    worker: Optional[str] = None
+    checkpoint_path: Optional[str] = None
+    scan_complete: bool
+    files_total: int
+    files_done: int
+    files_imported: int
+    files_skipped: int
+    files_failed: int
+    bytes_total: int
+    bytes_done: int
+    files_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
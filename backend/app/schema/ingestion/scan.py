@@ -64,6 +64,12 @@ class ScanRequest(BaseModel):
         import_to_album: 是否导入到相册（默认: False）
         album_info: 相册信息（当 import_to_album=True 时必填）
         default_gps: 默认经纬度，格式：'经度,纬度'，小数点后不超过6位（可选）
+        pipeline: 是否启用多阶段并行导入流水线（默认: False）
+        verify: 是否忽略扫描清单、强制重新计算文件哈希（默认: False）
+        stage_strategy: 入库方式 copy / reflink / hardlink（默认使用 ASSET_STAGE_STRATEGY 配置）
+        derive_lazily: 是否跳过缩略图/预览图生成、改为首次访问时按需生成（默认使用 IMPORT_DERIVE_LAZILY 配置）
+        distributed: 是否按目录分片、由多个 Worker 并行导入（默认: False）
+        shard_max_files: 每个分片的目标文件数上限（默认使用 INGESTION_SHARD_MAX_FILES 配置）
     """
     source_path: Optional[str] = Field(
         default=None,
@@ -90,6 +96,32 @@ class ScanRequest(BaseModel):
         default=None,
         description="默认经纬度（格式：'经度,纬度'，例如：'120.814675,32.103241'）"
     )
+    pipeline: bool = Field(
+        default=False,
+        description="是否启用多阶段并行导入流水线（大目录首次导入建议开启）"
+    )
+    verify: bool = Field(
+        default=False,
+        description="是否强制重新计算文件哈希（默认复用扫描清单，跳过大小/修改时间/inode 未变化的文件）"
+    )
+
+    stage_strategy: Optional[Literal["copy", "reflink", "hardlink"]] = Field(
+        default=None,
+        description="扫描目录不在 NAS 内时的入库方式：copy(内核态复制)、reflink(写时复制)、hardlink(硬链接，与源文件共享 inode)；默认使用服务端配置"
+    )
+    derive_lazily: Optional[bool] = Field(
+        default=None,
+        description="是否在导入时跳过缩略图/预览图生成，改为首次访问衍生图接口时按需生成并缓存；默认使用服务端配置"
+    )
+    distributed: bool = Field(
+        default=False,
+        description="是否把目录树切成分片、分发给多个 Worker 并行导入（大目录首次导入、多个 Worker 节点时使用）"
+    )
+    shard_max_files: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="每个分片的目标文件数上限；默认使用服务端配置"
+    )
 
     @field_validator('default_gps')
     @classmethod
@@ -157,20 +189,26 @@ class ScanResponseData(BaseModel):
     """扫描任务响应数据（作为 ApiResponse[ScanResponseData] 的 result 字段）
 
     Attributes:
-        status: 任务状态（'scanning', 'completed', 'failed'）
+        status: 任务状态（'queued', 'scanning', 'completed', 'failed'）
         path: 扫描路径
+        job_id: 导入作业ID（通过 GET /ingestion/jobs/{job_id} 查询进度）
     """
-    status: Literal["scanning", "completed", "failed"] = Field(
+    status: Literal["queued", "scanning", "completed", "failed"] = Field(
         description="任务状态"
     )
     path: str = Field(
         description="扫描路径"
     )
+    job_id: Optional[int] = Field(
+        default=None,
+        description="导入作业ID"
+    )
 
     class Config:
         json_schema_extra = {
             "example": {
-                "status": "scanning",
-                "path": "/Volumes/NAS/media"
+                "status": "queued",
+                "path": "/Volumes/NAS/media",
+                "job_id": 1
             }
         }
@@ -0,0 +1,70 @@
+"""断点续传上传会话相关 Schema"""
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+
+
+class UploadSessionCreate(BaseModel):
+    """创建上传会话请求模型
+
+    导入参数与 `/ingestion/upload` 的表单字段一致（相册参数同样拍平），
+    在 finalize 时使用。
+
+    Attributes:
+        filename: 原始文件名（决定素材类型与入库文件名）
+        total_size: 文件总大小（字节）
+        sha256: 文件完整 SHA256（可选，finalize 时校验）
+        created_by: 创建者用户ID（默认: 1）
+        visibility: 素材可见性（默认: general）
+        location_poi: 地标名称（可选）
+        default_gps: 默认经纬度，格式：'经度,纬度'（可选）
+        import_to_album ~ album_end_time: 相册关联参数（同上传接口）
+    """
+    filename: str = Field(min_length=1, max_length=255, description="原始文件名")
+    total_size: int = Field(ge=1, description="文件总大小（字节）")
+    sha256: Optional[str] = Field(
+        default=None,
+        pattern=r'^[0-9a-fA-F]{64}$',
+        description="文件完整 SHA256（finalize 时校验）"
+    )
+    created_by: int = Field(default=1, ge=1, description="创建者用户ID")
+    visibility: Literal["general", "private"] = Field(default="general", description="素材可见性")
+    location_poi: Optional[str] = Field(default=None, description="地标名称")
+    default_gps: Optional[str] = Field(default=None, description="默认经纬度（格式：'经度,纬度'）")
+    import_to_album: bool = Field(default=False, description="是否关联相册")
+    album_id: Optional[int] = Field(default=None, description="现有相册ID（与 album_name 二选一）")
+    album_name: Optional[str] = Field(default=None, description="新建相册名称（与 album_id 二选一）")
+    album_description: Optional[str] = Field(default=None, description="新建相册描述")
+    album_start_time: Optional[str] = Field(default=None, description="新建相册开始日期 YYYY-MM-DD")
+    album_end_time: Optional[str] = Field(default=None, description="新建相册结束日期 YYYY-MM-DD")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "IMG_0001.MOV",
+                "total_size": 3221225472,
+                "sha256": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                "created_by": 1,
+                "visibility": "general"
+            }
+        }
+
+
+class UploadSessionOut(BaseModel):
+    """上传会话状态（作为 ApiResponse[UploadSessionOut] 的 result 字段）
+
+    Attributes:
+        upload_id: 上传ID
+        filename: 原始文件名
+        total_size: 文件总大小（字节）
+        offset: 已接收字节数（下一块从该偏移量开始）
+        status: 会话状态
+        result: finalize 后的导入结果
+        error_message: 错误信息
+    """
+    upload_id: str = Field(description="上传ID")
+    filename: str = Field(description="原始文件名")
+    total_size: int = Field(description="文件总大小（字节）")
+    offset: int = Field(description="已接收字节数")
+    status: Literal["uploading", "completed", "failed", "aborted"] = Field(description="会话状态")
+    result: Optional[dict] = Field(default=None, description="导入结果")
+    error_message: Optional[str] = Field(default=None, description="错误信息")
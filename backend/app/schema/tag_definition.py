@@ -1,5 +1,6 @@
 """标签定义与映射 Schema"""
 
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, Any, Dict, List
 
@@ -62,6 +63,40 @@ class TagMappingUpdate(BaseModel):
     priority: Optional[int] = None
 
 
+class TagRemapJobOut(BaseModel):
+    """标签重新映射作业详情（含进度、速率与预计剩余时间）
+
+    Attributes:
+        asset_type: 处理的素材类型（为空表示全部）
+        trigger_type: manual（手动）或 mapping_change（映射规则变更自动排队）
+        status: 作业状态（queued, running, done, failed）
+        last_asset_id: 检查点，续跑时从其后的素材继续
+        assets_missing_metadata: 没有留存原始元数据的素材数（需重新导入才能重新映射）
+        assets_per_second: 本次运行的处理速率
+        eta_seconds: 预计剩余秒数（仅运行中的作业提供）
+    """
+    id: int
+    asset_type: Optional[str] = None
+    trigger_type: str
+    status: str
+    last_asset_id: int
+    assets_total: int
+    assets_done: int
+    assets_missing_metadata: int
+    tags_inserted: int
+    tags_updated: int
+    assets_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class AssetTagUpsert(BaseModel):
     """人工覆盖用户标签"""
     tags: Dict[str, Optional[str]]
@@ -32,6 +32,7 @@ class TaskLogOut(BaseModel):
     asset_id: int
     retry_count: Optional[int] = None
     max_retries: Optional[int] = None
+    task_params: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     executed_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
@@ -43,3 +44,22 @@ class TaskLogOut(BaseModel):
 class BatchPhashRequest(BaseModel):
     asset_ids: Optional[List[int]] = None
     missing_only: bool = True
+
+
+class RegenerateDerivativesRequest(BaseModel):
+    """重新生成衍生图的筛选条件
+
+    Attributes:
+        asset_type: 素材类型（image / video，为空表示全部）
+        start_date: 拍摄时间下限
+        end_date: 拍摄时间上限
+        missing_only: 只补生成记录为空或文件已丢失的衍生图
+        force: 不比对生成记录，全部重建
+        kinds: 衍生图类型（thumbnail / preview，为空表示全部）
+    """
+    asset_type: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    missing_only: bool = False
+    force: bool = False
+    kinds: Optional[List[str]] = None
@@ -5,10 +5,13 @@
 - scanning: 文件系统扫描
 - metadata: 元数据提取
 - thumbnail: 缩略图生成
+- preview: 预览图与 Deep Zoom 切片生成
 
 所有服务遵循策略模式和工厂模式，支持扩展新的素材类型。
 """
 
+from ..config import settings
+
 # 导入扫描服务
 from .scanning import FilesystemScanner
 
@@ -17,6 +20,7 @@ from .metadata import (
     MetadataExtractor,
     MetadataExtractorFactory,
     ImageMetadataExtractor,
+    FastImageMetadataExtractor,
     VideoMetadataExtractor
 )
 
@@ -25,19 +29,42 @@ from .thumbnail import (
     ThumbnailGenerator,
     ThumbnailGeneratorFactory,
     ImageThumbnailGenerator,
-    VideoThumbnailGenerator
+    VideoThumbnailGenerator,
+    VideoStoryboardGenerator
 )
 
+# 导入预览图服务
+from .preview import PreviewGeneratorFactory, DeepZoomGenerator
+
 # 自动注册所有提取器和生成器
 def _register_services():
     """注册所有服务实例到工厂"""
     # 注册元数据提取器
-    MetadataExtractorFactory.register('image', ImageMetadataExtractor())
+    if settings.IMAGE_METADATA_EXTRACTOR == 'exifread':
+        MetadataExtractorFactory.register('image', ImageMetadataExtractor())
+    else:
+        MetadataExtractorFactory.register('image', FastImageMetadataExtractor())
     MetadataExtractorFactory.register('video', VideoMetadataExtractor())
 
     # 注册缩略图生成器
-    ThumbnailGeneratorFactory.register('image', ImageThumbnailGenerator())
+    ThumbnailGeneratorFactory.register('image', ImageThumbnailGenerator(
+        reduced_decode=settings.IMAGE_REDUCED_DECODE,
+        smart_crop_proxy_size=settings.SMART_CROP_PROXY_SIZE,
+        ladder_sizes=[int(size) for size in settings.THUMBNAIL_LADDER_SIZES.split(',') if size.strip()],
+    ))
     ThumbnailGeneratorFactory.register('video', VideoThumbnailGenerator())
+    if settings.VIDEO_STORYBOARD_FRAMES > 0:
+        ThumbnailGeneratorFactory.register_storyboard('video', VideoStoryboardGenerator(
+            frame_count=settings.VIDEO_STORYBOARD_FRAMES,
+            frame_width=settings.VIDEO_STORYBOARD_FRAME_WIDTH,
+        ))
+
+    # 注册超大图片的 Deep Zoom 切片生成器（预览图生成器由 preview 包自行注册）
+    if settings.DEEP_ZOOM_MIN_PIXELS > 0:
+        PreviewGeneratorFactory.register_deep_zoom('image', DeepZoomGenerator(
+            min_pixels=settings.DEEP_ZOOM_MIN_PIXELS,
+            tile_size=settings.DEEP_ZOOM_TILE_SIZE,
+        ))
 
 
 # 初始化时自动注册
@@ -52,6 +79,7 @@ __all__ = [
     'MetadataExtractor',
     'MetadataExtractorFactory',
     'ImageMetadataExtractor',
+    'FastImageMetadataExtractor',
     'VideoMetadataExtractor',
 
     # 缩略图服务
@@ -59,4 +87,7 @@ __all__ = [
     'ThumbnailGeneratorFactory',
     'ImageThumbnailGenerator',
     'VideoThumbnailGenerator',
+    'VideoStoryboardGenerator',
+    'PreviewGeneratorFactory',
+    'DeepZoomGenerator',
 ]
@@ -7,6 +7,7 @@
 """
 from typing import Dict, List, Optional, Set
 from pathlib import Path
+import os
 from datetime import datetime
 import shutil
 from sqlalchemy.orm import Session
@@ -14,7 +15,12 @@ from sqlalchemy import and_
 
 from .. import model
 from .asset_url import AssetUrlProviderFactory, AssetUrlProvider
+from .derivative import DeepZoomService, DerivativeService
+from .derivative.service import PREVIEW_SIZE
 from .metadata_dictionary import MetadataDictionaryService
+from .preview import needs_preview
+from .thumbnail import ThumbnailGeneratorFactory
+from .thumbnail.image import DEFAULT_BASE_SIZE
 from ..config import settings
 from ..tools.utils import get_logger
 
@@ -50,14 +56,22 @@ class AssetService:
             可用于构建 AssetOut 的字典
         """
         tags = tags_map or {}
+        aspect_ratio = float(tags.get('aspect_ratio')) if tags.get('aspect_ratio') else None
         return {
             'id': asset.id,
             'created_by': asset.created_by,
             'original_path': asset.original_path,
             'original_url': url_provider.maybe_to_public_url(asset.original_path),
             'thumbnail_path': asset.thumbnail_path,
-            'thumbnail_url': url_provider.maybe_to_public_url(asset.thumbnail_path),
-            'preview_url': url_provider.maybe_to_public_url(asset.preview_path),
+            'thumbnail_url': AssetService.thumbnail_url(asset, url_provider),
+            'thumbnail_srcset': (
+                AssetService.build_thumbnail_srcset(asset.thumbnail_sizes, url_provider)
+                if asset.thumbnail_sizes or asset.thumbnail_path
+                else AssetService.build_derivative_srcset(asset, aspect_ratio)
+            ),
+            'preview_url': AssetService.preview_url(asset, url_provider),
+            'storyboard': AssetService.build_storyboard(asset.storyboard, url_provider),
+            'deep_zoom': AssetService.build_deep_zoom(asset),
             'asset_type': asset.asset_type,
             'mime_type': asset.mime_type,
             'file_size': asset.file_size,
@@ -67,11 +81,112 @@ class AssetService:
             'is_deleted': asset.is_deleted,
             'visibility': asset.visibility,
             'is_favorited': is_favorited,
-            'aspect_ratio': float(tags.get('aspect_ratio')) if tags.get('aspect_ratio') else None,
+            'aspect_ratio': aspect_ratio,
             'location_city': tags.get('location_city'),
             'location_poi': tags.get('location_poi'),
         }
 
+    @staticmethod
+    def thumbnail_url(asset: model.Asset, url_provider: AssetUrlProvider) -> Optional[str]:
+        """缩略图 URL；按需生成模式导入的图片/视频返回衍生图接口 URL（近期生成失败的除外）
+
+        其他情况没有缩略图时返回 None，由调用方回退（如首页精选回退到原图）。
+        """
+        if asset.thumbnail_path:
+            return url_provider.to_public_url(asset.thumbnail_path)
+        if (
+            asset.derive_lazily
+            and asset.asset_type in ('image', 'video')
+            and DerivativeService.is_available(asset, DEFAULT_BASE_SIZE)
+        ):
+            return DerivativeService.url(asset, DEFAULT_BASE_SIZE)
+        return None
+
+    @staticmethod
+    def preview_url(asset: model.Asset, url_provider: AssetUrlProvider) -> Optional[str]:
+        """预览图 URL；按需生成模式导入、需要预览图（HEIC 等）的图片返回衍生图接口 URL（近期生成失败的除外）"""
+        if asset.preview_path:
+            return url_provider.to_public_url(asset.preview_path)
+        if (
+            asset.derive_lazily
+            and asset.asset_type == 'image'
+            and needs_preview(asset.mime_type)
+            and DerivativeService.is_available(asset, PREVIEW_SIZE)
+        ):
+            return DerivativeService.url(asset, PREVIEW_SIZE)
+        return None
+
+    @staticmethod
+    def build_derivative_srcset(asset: model.Asset, aspect_ratio: Optional[float]) -> Optional[Dict[int, str]]:
+        """按需生成模式的多尺寸缩略图 {宽度: 衍生图 URL}
+
+        宽度由宽高比标签估算（长边即档位尺寸）；不是按需生成模式导入的图片、没有宽高比
+        或近期生成失败时返回 None。
+        """
+        if not asset.derive_lazily or asset.asset_type != 'image' or not aspect_ratio:
+            return None
+        if not DerivativeService.is_available(asset, DEFAULT_BASE_SIZE):
+            return None
+        sizes = sorted({DEFAULT_BASE_SIZE, *ThumbnailGeneratorFactory.ladder_sizes('image')})
+        return {
+            size if aspect_ratio >= 1 else max(1, round(size * aspect_ratio)): DerivativeService.url(asset, size)
+            for size in sizes
+        }
+
+    @staticmethod
+    def build_thumbnail_srcset(
+        thumbnail_sizes: Optional[Dict[str, str]],
+        url_provider: AssetUrlProvider
+    ) -> Optional[Dict[int, str]]:
+        """多尺寸缩略图 {宽度: URL}，按宽度升序
+
+        Args:
+            thumbnail_sizes: 素材记录的 {宽度: 相对路径}
+            url_provider: URL 生成器
+
+        Returns:
+            {宽度: URL}；没有多尺寸记录（旧数据、视频）时返回 None
+        """
+        if not thumbnail_sizes:
+            return None
+        return {
+            int(width): url_provider.maybe_to_public_url(path)
+            for width, path in sorted(thumbnail_sizes.items(), key=lambda item: int(item[0]))
+        }
+
+    @staticmethod
+    def build_storyboard(storyboard: Optional[Dict], url_provider: AssetUrlProvider) -> Optional[Dict]:
+        """视频故事板：相对路径转为 URL，几何信息原样输出
+
+        Args:
+            storyboard: 素材记录的故事板 {sprite, vtt, count, columns, rows, frame_width, frame_height, interval}
+            url_provider: URL 生成器
+
+        Returns:
+            可用于构建 AssetStoryboard 的字典；没有故事板时返回 None
+        """
+        if not storyboard or not storyboard.get('sprite'):
+            return None
+        return {
+            'sprite_url': url_provider.to_public_url(storyboard['sprite']),
+            'vtt_url': url_provider.maybe_to_public_url(storyboard.get('vtt')),
+            **{key: storyboard[key] for key in ('count', 'columns', 'rows', 'frame_width', 'frame_height', 'interval')},
+        }
+
+    @staticmethod
+    def build_deep_zoom(asset: model.Asset) -> Optional[Dict]:
+        """超大图片的 DZI 切片：描述文件 URL（切片经接口访问）与尺寸、切片参数
+
+        Returns:
+            可用于构建 AssetDeepZoom 的字典；没有切片时返回 None
+        """
+        if not asset.deep_zoom or not asset.deep_zoom.get('dzi'):
+            return None
+        return {
+            'dzi_url': DeepZoomService.dzi_url(asset.id),
+            **{key: asset.deep_zoom[key] for key in ('width', 'height', 'tile_size', 'overlap', 'format', 'levels')},
+        }
+
     @staticmethod
     def batch_query_asset_tags(
         db: Session,
@@ -212,10 +327,20 @@ class AssetService:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         for asset in assets:
             asset_root = trash_root / timestamp / f"asset_{asset.id}"
+            ladder_paths = [
+                ("thumbnail", path)
+                for path in (asset.thumbnail_sizes or {}).values()
+                if path != asset.thumbnail_path
+            ]
             for label, path in (
                 ("original", asset.original_path),
                 ("thumbnail", asset.thumbnail_path),
                 ("preview", getattr(asset, 'preview_path', None)),
+                *ladder_paths,
+                ("storyboard", (asset.storyboard or {}).get('sprite')),
+                ("storyboard", (asset.storyboard or {}).get('vtt')),
+                ("deep_zoom", (asset.deep_zoom or {}).get('dzi')),
+                ("deep_zoom", AssetService._deep_zoom_tiles_dir(asset.deep_zoom)),
             ):
                 full_path, rel_path = AssetService._resolve_asset_path(trash_root.parent, path)
                 if not full_path or not rel_path:
@@ -257,6 +382,13 @@ class AssetService:
             return None
         return nas_root / "recycle_bin"
 
+    @staticmethod
+    def _deep_zoom_tiles_dir(deep_zoom: Optional[Dict]) -> Optional[str]:
+        """DZI 切片目录相对路径（描述文件去掉 .dzi 加 _files）"""
+        if not deep_zoom or not deep_zoom.get('dzi'):
+            return None
+        return f"{os.path.splitext(deep_zoom['dzi'])[0]}_files"
+
     @staticmethod
     def _resolve_asset_path(
         nas_root: Path,
@@ -0,0 +1,6 @@
+"""衍生图访问模块（按需生成的缩略图/预览图，磁盘 LRU 缓存；超大图片的 DZI 切片；调整参数后的批量重建）"""
+from .service import DerivativeService, DerivativeFile
+from .deepzoom import DeepZoomService
+from .regenerate import DerivativeRegenerationService
+
+__all__ = ['DerivativeService', 'DerivativeFile', 'DeepZoomService', 'DerivativeRegenerationService']
@@ -0,0 +1,95 @@
+"""Deep Zoom（DZI）切片访问
+
+超大图片导入时生成的切片金字塔（见 services/preview/deepzoom.py）按 DZI 约定的 URL 对外提供：
+
+    /assets/{id}/deepzoom.dzi                               # 描述文件
+    /assets/{id}/deepzoom_files/{level}/{col}_{row}.{fmt}   # 切片
+
+OpenSeadragon 等查看器由描述文件 URL 推导切片 URL（去掉 .dzi 加 _files/），只请求视口内的切片。
+"""
+import os
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ... import model
+from ...config import settings
+from .service import DerivativeFile
+
+# 切片内容随文件哈希与切片参数固定；重新生成（如调整切片大小）时可能变化，不标记 immutable
+DEEP_ZOOM_CACHE_CONTROL = 'public, max-age=604800'
+
+TILE_MEDIA_TYPES = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+
+class DeepZoomService:
+    """DZI 描述文件与切片查找"""
+
+    @staticmethod
+    def dzi_url(asset_id: int) -> str:
+        """描述文件的对外 URL"""
+        return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/assets/{asset_id}/deepzoom.dzi"
+
+    @staticmethod
+    def get_descriptor(db: Session, asset_id: int) -> DerivativeFile:
+        """DZI 描述文件
+
+        Raises:
+            HTTPException: 素材不存在或没有切片（404）
+        """
+        asset, base = DeepZoomService._load(db, asset_id)
+        path = os.path.join(settings.NAS_DATA_PATH, f"{base}.dzi")
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="切片描述文件不存在")
+        return DerivativeFile(path=path, media_type='application/xml', etag=DeepZoomService._etag(asset, 'dzi'))
+
+    @staticmethod
+    def get_tile(db: Session, asset_id: int, level: int, column: int, row: int, fmt: str) -> DerivativeFile:
+        """单个切片
+
+        Args:
+            db: 数据库会话
+            asset_id: 素材ID
+            level: 缩放级别（0 为 1×1，levels - 1 为原尺寸）
+            column: 列号
+            row: 行号
+            fmt: 切片格式（须与生成时一致）
+
+        Raises:
+            HTTPException: 格式/级别不匹配（400）、素材不存在或切片不存在（404）
+        """
+        asset, base = DeepZoomService._load(db, asset_id)
+        if fmt != asset.deep_zoom.get('format') or fmt not in TILE_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"不支持的切片格式: {fmt}")
+        if not 0 <= level < asset.deep_zoom.get('levels', 0):
+            raise HTTPException(status_code=400, detail=f"不支持的缩放级别: {level}")
+
+        path = os.path.join(settings.NAS_DATA_PATH, f"{base}_files", str(level), f"{column}_{row}.{fmt}")
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="切片不存在")
+        return DerivativeFile(
+            path=path,
+            media_type=TILE_MEDIA_TYPES[fmt],
+            etag=DeepZoomService._etag(asset, f"{level}_{column}_{row}.{fmt}"),
+        )
+
+    @staticmethod
+    def _load(db: Session, asset_id: int):
+        """素材与切片路径前缀（描述文件相对路径去掉 .dzi）"""
+        asset = db.query(model.Asset).filter(
+            model.Asset.id == asset_id,
+            model.Asset.is_deleted == False
+        ).first()
+        if not asset:
+            raise HTTPException(status_code=404, detail="素材不存在")
+        if not asset.deep_zoom or not asset.deep_zoom.get('dzi'):
+            raise HTTPException(status_code=404, detail="该素材没有切片")
+        return asset, os.path.splitext(asset.deep_zoom['dzi'])[0]
+
+    @staticmethod
+    def _etag(asset: model.Asset, name: str) -> str:
+        return f'"{asset.id}_{(asset.file_hash or "")[:16]}_{asset.deep_zoom.get("tile_size")}_{name}"'
@@ -0,0 +1,364 @@
+"""重新生成衍生图作业
+
+调整缩略图/预览图的质量、尺寸档位或格式后，不需要重新导入即可为已有素材重建衍生图：
+- 按筛选条件（素材类型、拍摄时间范围、只补缺失）按素材 ID 分批（键集分页）读取素材
+- 每个素材比对记录的生成记录（derivative_versions：生成器版本指纹 + 源文件哈希 + 源文件 stat 签名）
+  与当前生成器、磁盘上的源文件，三者都一致且文件存在时跳过；force 时全部重建
+- 需要重建的素材提交到进程池，复用导入时的编码函数 render_derivatives_job（每个素材只读取、解码一次）
+- 文件先写临时文件再替换（见 tools/atomic_file.py），重建过程中旧文件一直可读
+- 数据库只在作业进程中读写：每批结果与进度（task_logs.task_params.progress）一起提交
+
+作业以一行 task_logs 记录（task_type=regenerate_derivatives，asset_id=0）跟踪状态与进度。
+中断或失败后重新触发同样的作业即可：已重建的素材版本已是最新，会被跳过。
+"""
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ... import model, schema
+from ...config import settings
+from ...db import SessionLocal
+from ...tools.utils import get_logger
+from ..ingestion.manifest import ScanManifestStore
+from ..ingestion.processor import AssetProcessor, render_derivatives_job
+from ..preview import PreviewGeneratorFactory, needs_preview
+from ..thumbnail import ThumbnailGeneratorFactory
+
+logger = get_logger(__name__)
+
+TASK_TYPE = 'regenerate_derivatives'
+KIND_THUMBNAIL = 'thumbnail'
+KIND_PREVIEW = 'preview'
+KINDS = (KIND_THUMBNAIL, KIND_PREVIEW)
+ASSET_TYPES = ('image', 'video')
+
+
+@dataclass
+class _AssetPlan:
+    """单个素材需要重建的衍生图（相对路径）"""
+
+    asset: model.Asset
+    thumbnail_path: Optional[str] = None
+    thumbnail_ladder: Optional[Dict[int, str]] = None
+    preview_path: Optional[str] = None
+
+
+class DerivativeRegenerationService:
+    """重新生成衍生图作业的创建、执行与跳过判断"""
+
+    @staticmethod
+    def schedule(db: Session, payload: schema.RegenerateDerivativesRequest) -> model.TaskLog:
+        """校验筛选条件，创建作业记录（pending）并投递到 Taskiq 队列
+
+        Raises:
+            HTTPException: 筛选条件不合法（400）、任务队列不可用（503，作业标记为失败）
+        """
+        from ...tasks.derivative_tasks import regenerate_derivatives_task
+        from ...tasks.sender import run_coroutine_sync
+
+        kinds = list(dict.fromkeys(payload.kinds or KINDS))
+        if any(kind not in KINDS for kind in kinds):
+            raise HTTPException(status_code=400, detail=f"不支持的衍生图类型，可选: {', '.join(KINDS)}")
+        if payload.asset_type and payload.asset_type not in ASSET_TYPES:
+            raise HTTPException(status_code=400, detail=f"不支持的素材类型: {payload.asset_type}")
+        if payload.start_date and payload.end_date and payload.start_date > payload.end_date:
+            raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+
+        filters = {
+            'asset_type': payload.asset_type,
+            'start_date': payload.start_date.isoformat() if payload.start_date else None,
+            'end_date': payload.end_date.isoformat() if payload.end_date else None,
+            'missing_only': payload.missing_only,
+            'force': payload.force,
+            'kinds': kinds,
+        }
+        task_log = model.TaskLog(
+            task_type=TASK_TYPE,
+            task_status='pending',
+            asset_id=0,
+            task_params={'filters': filters, 'progress': _new_progress()},
+            max_retries=0,
+        )
+        db.add(task_log)
+        db.commit()
+        db.refresh(task_log)
+
+        try:
+            run_coroutine_sync(regenerate_derivatives_task.kiq(task_log_id=task_log.id))
+        except Exception as e:
+            logger.error(f"重新生成衍生图作业投递失败 - Task Log ID: {task_log.id}: {e}")
+            task_log.task_status = 'failed'
+            task_log.error_message = f"作业投递失败: {e}"
+            db.commit()
+            raise HTTPException(status_code=503, detail="任务队列不可用，作业已标记为失败")
+        return task_log
+
+    @staticmethod
+    def run(task_log_id: int) -> Dict:
+        """执行作业（Worker 中调用，阻塞直到处理完所有素材）
+
+        Returns:
+            执行结果 {'task_log_id', 'status', 'summary'}
+        """
+        db = SessionLocal()
+        try:
+            # 只处理待执行的作业，避免重复投递时并发执行
+            claimed = db.query(model.TaskLog).filter(
+                model.TaskLog.id == task_log_id,
+                model.TaskLog.task_type == TASK_TYPE,
+                model.TaskLog.task_status == 'pending',
+            ).update({'task_status': 'running', 'executed_at': datetime.now()})
+            db.commit()
+            if not claimed:
+                logger.info(f"重新生成衍生图作业不在待执行状态，跳过 - Task Log ID: {task_log_id}")
+                return {'task_log_id': task_log_id, 'status': 'skipped', 'summary': None}
+
+            task_log = db.query(model.TaskLog).filter(model.TaskLog.id == task_log_id).one()
+            summary = DerivativeRegenerationService.execute(db, task_log)
+            return {'task_log_id': task_log_id, 'status': task_log.task_status, 'summary': summary}
+
+        except Exception as e:
+            logger.error(f"重新生成衍生图作业失败 - Task Log ID: {task_log_id}: {e}", exc_info=True)
+            db.rollback()
+            db.query(model.TaskLog).filter(model.TaskLog.id == task_log_id).update({
+                'task_status': 'failed',
+                'error_message': str(e),
+            })
+            db.commit()
+            return {'task_log_id': task_log_id, 'status': 'failed', 'summary': str(e)}
+        finally:
+            db.close()
+
+    @staticmethod
+    def execute(
+        db: Session,
+        task_log: model.TaskLog,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> str:
+        """分批规划、并行生成并提交结果，直到没有更多素材（异常由调用方处理）
+
+        Args:
+            db: 数据库会话
+            task_log: 已领取的作业记录
+            chunk_size: 每批素材数（默认 DERIVATIVE_REGEN_CHUNK_SIZE）
+            workers: 进程池大小（默认 DERIVATIVE_REGEN_WORKERS，0 为 CPU 核数）
+
+        Returns:
+            结果摘要
+        """
+        chunk_size = chunk_size or settings.DERIVATIVE_REGEN_CHUNK_SIZE
+        workers = workers or settings.DERIVATIVE_REGEN_WORKERS or None
+        filters = task_log.task_params['filters']
+        progress = dict(task_log.task_params.get('progress') or _new_progress())
+        progress['total'] = DerivativeRegenerationService._asset_query(db, filters, 0).count()
+        DerivativeRegenerationService._save_progress(db, task_log, progress)
+        logger.info(
+            f"重新生成衍生图作业开始 - Task Log ID: {task_log.id}, 筛选: {filters}, 待检查: {progress['total']}"
+        )
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                chunk = DerivativeRegenerationService._asset_query(
+                    db, filters, progress['last_asset_id']
+                ).order_by(model.Asset.id.asc()).limit(chunk_size).all()
+                if not chunk:
+                    break
+
+                plans = []
+                for asset in chunk:
+                    plan = DerivativeRegenerationService.plan(
+                        asset, filters['kinds'], filters['missing_only'], filters['force']
+                    )
+                    if plan:
+                        plans.append(plan)
+                    else:
+                        progress['skipped'] += 1
+
+                futures = [
+                    (plan, executor.submit(*DerivativeRegenerationService._job_args(plan))) for plan in plans
+                ]
+                for plan, future in futures:
+                    if DerivativeRegenerationService._apply_result(plan, future):
+                        progress['regenerated'] += 1
+                    else:
+                        progress['failed'] += 1
+
+                # 本批衍生图记录与进度一起提交
+                progress['last_asset_id'] = chunk[-1].id
+                progress['done'] += len(chunk)
+                elapsed = time.perf_counter() - started
+                if elapsed > 0:
+                    progress['assets_per_second'] = round(progress['done'] / elapsed, 1)
+                DerivativeRegenerationService._save_progress(db, task_log, progress)
+
+        task_log.task_status = 'success'
+        db.commit()
+
+        summary = (
+            f"检查: {progress['done']}, 重建: {progress['regenerated']}, 已是最新: {progress['skipped']}, "
+            f"失败: {progress['failed']}, 速率: {progress['assets_per_second']}/s"
+        )
+        logger.info(f"重新生成衍生图作业完成 - Task Log ID: {task_log.id}, {summary}")
+        return summary
+
+    @staticmethod
+    def plan(asset: model.Asset, kinds: List[str], missing_only: bool, force: bool) -> Optional[_AssetPlan]:
+        """判断素材需要重建哪些衍生图（都不需要时返回 None）
+
+        - 缩略图：该类型有缩略图生成器时处理；预览图：仅浏览器不支持的图片格式（与导入一致）
+        - missing_only：只重建记录为空或文件已丢失的衍生图
+        - 否则跳过生成器版本、源文件哈希、源文件 stat 签名都与记录一致、且文件存在的衍生图（force 时不跳过）
+        """
+        plan = _AssetPlan(asset=asset)
+        signature = ScanManifestStore.stat_signature(_full_path(asset.original_path))
+        if KIND_THUMBNAIL in kinds and ThumbnailGeneratorFactory.version(asset.asset_type):
+            if DerivativeRegenerationService._is_stale(
+                asset, KIND_THUMBNAIL, asset.thumbnail_path, signature, missing_only, force
+            ):
+                plan.thumbnail_path = asset.thumbnail_path or AssetProcessor.thumbnail_rel_path(asset.original_path)
+                plan.thumbnail_ladder = AssetProcessor.thumbnail_ladder_rel_paths(asset.asset_type, asset.original_path)
+        if (
+            KIND_PREVIEW in kinds
+            and asset.asset_type == 'image'
+            and needs_preview(asset.mime_type)
+            and PreviewGeneratorFactory.version(asset.asset_type)
+        ):
+            if DerivativeRegenerationService._is_stale(
+                asset, KIND_PREVIEW, asset.preview_path, signature, missing_only, force
+            ):
+                plan.preview_path = asset.preview_path or AssetProcessor.preview_rel_path(asset.original_path)
+        if plan.thumbnail_path is None and plan.preview_path is None:
+            return None
+        return plan
+
+    @staticmethod
+    def _is_stale(
+        asset: model.Asset,
+        kind: str,
+        rel_path: Optional[str],
+        signature: Optional[tuple],
+        missing_only: bool,
+        force: bool
+    ) -> bool:
+        """该衍生图是否需要重建
+
+        Args:
+            signature: 源文件当前的 stat 签名（源文件不存在时为 None，签名比对视为不一致）
+        """
+        exists = bool(rel_path) and os.path.exists(os.path.join(settings.NAS_DATA_PATH, rel_path))
+        if missing_only or not exists:
+            return not exists
+        if force:
+            return True
+        factory = ThumbnailGeneratorFactory if kind == KIND_THUMBNAIL else PreviewGeneratorFactory
+        recorded = (asset.derivative_versions or {}).get(kind) or {}
+        return (
+            recorded.get('version') != factory.version(asset.asset_type)
+            or recorded.get('source_hash') != asset.file_hash
+            or signature is None
+            or recorded.get('source_signature') != list(signature)
+        )
+
+    @staticmethod
+    def _job_args(plan: _AssetPlan) -> tuple:
+        """进程池任务参数（复用导入时的编码函数，不计算感知哈希、不生成故事板与切片）"""
+        asset = plan.asset
+        return (
+            render_derivatives_job,
+            asset.asset_type,
+            os.path.join(settings.NAS_DATA_PATH, asset.original_path),
+            _full_path(plan.thumbnail_path),
+            _full_path(plan.preview_path),
+            False,
+            {size: _full_path(rel_path) for size, rel_path in (plan.thumbnail_ladder or {}).items()},
+        )
+
+    @staticmethod
+    def _apply_result(plan: _AssetPlan, future: Future) -> bool:
+        """把生成结果写到素材对象上（不提交），返回是否全部成功"""
+        asset = plan.asset
+        try:
+            thumbnails, preview_ok, _, _, _ = future.result()
+        except Exception as e:
+            logger.warning(f"重新生成衍生图失败 - Asset ID: {asset.id}: {type(e).__name__} - {e}")
+            return False
+
+        ok = True
+        if plan.thumbnail_path:
+            if thumbnails is None:
+                logger.warning(f"重新生成缩略图失败 - Asset ID: {asset.id}")
+                ok = False
+            else:
+                rel_paths = {
+                    _full_path(rel_path): rel_path
+                    for rel_path in (plan.thumbnail_path, *plan.thumbnail_ladder.values())
+                }
+                previous = set((asset.thumbnail_sizes or {}).values())
+                asset.thumbnail_path = plan.thumbnail_path
+                asset.thumbnail_sizes = AssetProcessor.thumbnail_sizes(thumbnails, rel_paths)
+                AssetProcessor.record_derivative_version(asset, KIND_THUMBNAIL, _full_path(asset.original_path))
+                _remove_orphans(previous - set((asset.thumbnail_sizes or {}).values()) - {asset.thumbnail_path})
+        if plan.preview_path:
+            if not preview_ok:
+                logger.warning(f"重新生成预览图失败 - Asset ID: {asset.id}")
+                ok = False
+            else:
+                asset.preview_path = plan.preview_path
+                AssetProcessor.record_derivative_version(asset, KIND_PREVIEW, _full_path(asset.original_path))
+        return ok
+
+    @staticmethod
+    def _asset_query(db: Session, filters: Dict, after_id: int):
+        """检查点之后、符合筛选条件的素材"""
+        query = db.query(model.Asset).filter(
+            model.Asset.is_deleted == False,
+            model.Asset.asset_type.in_(ASSET_TYPES),
+            model.Asset.id > after_id,
+        )
+        if filters.get('asset_type'):
+            query = query.filter(model.Asset.asset_type == filters['asset_type'])
+        if filters.get('start_date'):
+            query = query.filter(model.Asset.shot_at >= datetime.fromisoformat(filters['start_date']))
+        if filters.get('end_date'):
+            query = query.filter(model.Asset.shot_at <= datetime.fromisoformat(filters['end_date']))
+        return query
+
+    @staticmethod
+    def _save_progress(db: Session, task_log: model.TaskLog, progress: Dict) -> None:
+        """提交进度（重新赋值新字典，JSON 列才会被标记为已修改）"""
+        task_log.task_params = {**task_log.task_params, 'progress': dict(progress)}
+        task_log.executed_at = datetime.now()
+        db.commit()
+
+
+def _new_progress() -> Dict:
+    return {
+        'total': 0,
+        'done': 0,
+        'regenerated': 0,
+        'skipped': 0,
+        'failed': 0,
+        'last_asset_id': 0,
+        'assets_per_second': None,
+    }
+
+
+def _full_path(rel_path: Optional[str]) -> Optional[str]:
+    return os.path.join(settings.NAS_DATA_PATH, rel_path) if rel_path else None
+
+
+def _remove_orphans(rel_paths) -> None:
+    """删除不再被引用的旧档位缩略图（尺寸档位调整后）"""
+    for rel_path in rel_paths:
+        try:
+            os.remove(os.path.join(settings.NAS_DATA_PATH, rel_path))
+        except OSError:
+            pass
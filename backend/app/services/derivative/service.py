@@ -0,0 +1,216 @@
+"""按需衍生图服务
+
+缩略图/预览图可在导入时不生成（见导入的 derive_lazily 选项），改为首次请求时生成：
+- 缓存键 = 素材ID + 文件哈希前缀 + 生成器版本短哈希 + 尺寸 + 格式；源文件与生成参数不变则 URL 对应的内容不变，可按 immutable 长期缓存；
+  调整质量、格式、算法后版本变化，URL 与 ETag 随之变化，旧缓存文件不再被访问，由 LRU 淘汰
+- 生成结果写入磁盘 LRU 缓存（DERIVATIVE_CACHE_DIR，字节预算 DERIVATIVE_CACHE_MAX_MB），超出预算淘汰最久未访问的文件
+- 同一进程内对同一键的并发请求合并为一次生成（SingleFlight），其余请求等待并复用结果
+- 生成失败的源文件在冷却期（DERIVATIVE_FAILURE_TTL_SECONDS）内不再重试，素材 URL 也不再指向衍生图接口
+
+尺寸取值：
+- 0：原尺寸预览图（仅图片，WebP），对应导入时的 preview_path
+- 800 及 THUMBNAIL_LADDER_SIZES 中的档位：缩略图长边
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ... import model
+from ...config import settings
+from ...tools.disk_cache import DiskLRUCache, FailureCache, SingleFlight
+from ...tools.utils import get_logger
+from ..preview import PreviewGeneratorFactory
+from ..thumbnail import ImageThumbnailGenerator, ThumbnailGeneratorFactory, VideoThumbnailGenerator
+from ..thumbnail.image import DEFAULT_BASE_SIZE
+
+logger = get_logger(__name__)
+
+# 预览图尺寸（原尺寸）
+PREVIEW_SIZE = 0
+
+# URL 中的格式 -> (Pillow 格式名, Content-Type)
+FORMATS: Dict[str, tuple] = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+# 缓存文件内容只由缓存键决定（键含文件哈希与生成器版本）
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+derivative_cache = DiskLRUCache(
+    settings.DERIVATIVE_CACHE_DIR or os.path.join(settings.NAS_DATA_PATH, 'processed', 'derivatives'),
+    settings.DERIVATIVE_CACHE_MAX_MB * 1024 * 1024,
+)
+_single_flight = SingleFlight()
+_failures = FailureCache(settings.DERIVATIVE_FAILURE_TTL_SECONDS)
+
+
+@dataclass
+class DerivativeFile:
+    """已生成（或命中缓存）的衍生图文件"""
+    path: str
+    media_type: str
+    etag: str
+
+
+class DerivativeService:
+    """按需衍生图生成与缓存"""
+
+    @staticmethod
+    def allowed_sizes() -> Set[int]:
+        """允许请求的尺寸（0 为预览图）"""
+        ladder = ThumbnailGeneratorFactory.ladder_sizes('image')
+        return {PREVIEW_SIZE, DEFAULT_BASE_SIZE, *ladder}
+
+    @staticmethod
+    def url(asset: model.Asset, size: int, fmt: str = 'webp') -> str:
+        """衍生图的对外 URL（带生成器版本参数，版本变化后浏览器不再使用旧的 immutable 缓存）"""
+        version = DerivativeService.version_tag(asset.asset_type, size, fmt)
+        return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/assets/{asset.id}/derivatives/{size}.{fmt}?v={version}"
+
+    @staticmethod
+    def cache_key(asset: model.Asset, size: int, fmt: str) -> str:
+        """缓存键（同时用作缓存文件名与 ETag）"""
+        version = DerivativeService.version_tag(asset.asset_type, size, fmt)
+        return f"{asset.id}_{(asset.file_hash or '')[:16]}_{version}_{size}.{fmt}"
+
+    @staticmethod
+    def version_tag(asset_type: str, size: int, fmt: str) -> str:
+        """生成该衍生图所用生成器版本指纹的短哈希"""
+        return _version_tag(asset_type, size, fmt)
+
+    @staticmethod
+    def failure_key(asset: model.Asset, size: int) -> str:
+        """生成失败记录的键（同一源文件的各档缩略图共用一条，预览图单独一条）"""
+        kind = 'preview' if size == PREVIEW_SIZE else 'thumbnail'
+        return f"{asset.id}_{(asset.file_hash or '')[:16]}_{kind}"
+
+    @staticmethod
+    def is_available(asset: model.Asset, size: int) -> bool:
+        """衍生图是否值得请求（冷却期内生成失败过的返回 False）"""
+        return DerivativeService.failure_key(asset, size) not in _failures
+
+    @staticmethod
+    def get_or_create(db: Session, asset_id: int, size: int, fmt: str) -> DerivativeFile:
+        """获取衍生图，缓存未命中时生成
+
+        Args:
+            db: 数据库会话
+            asset_id: 素材ID
+            size: 长边尺寸（0 为原尺寸预览图）
+            fmt: 输出格式（webp/jpeg）
+
+        Returns:
+            衍生图文件
+
+        Raises:
+            HTTPException: 尺寸/格式不支持（400）、素材不存在（404）、生成失败或冷却期内失败过（500）
+        """
+        if fmt not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"不支持的格式: {fmt}")
+        if size not in DerivativeService.allowed_sizes():
+            raise HTTPException(status_code=400, detail=f"不支持的尺寸: {size}")
+
+        asset = db.query(model.Asset).filter(
+            model.Asset.id == asset_id,
+            model.Asset.is_deleted == False
+        ).first()
+        if not asset:
+            raise HTTPException(status_code=404, detail="素材不存在")
+        if size == PREVIEW_SIZE and (asset.asset_type != 'image' or fmt != 'webp'):
+            raise HTTPException(status_code=400, detail="预览图仅支持图片素材的 webp 格式")
+
+        key = DerivativeService.cache_key(asset, size, fmt)
+        _, media_type = FORMATS[fmt]
+        path = derivative_cache.get(key)
+        if path is None:
+            failure_key = DerivativeService.failure_key(asset, size)
+            if failure_key in _failures:
+                raise HTTPException(status_code=500, detail="衍生图生成失败")
+            source_path = os.path.join(settings.NAS_DATA_PATH, asset.original_path)
+            poster_path = (
+                os.path.join(settings.NAS_DATA_PATH, asset.thumbnail_path) if asset.thumbnail_path else None
+            )
+            try:
+                path = _single_flight.do(key, lambda: derivative_cache.get(key) or derivative_cache.put(
+                    key,
+                    lambda tmp_path: DerivativeService._render(
+                        asset.asset_type, source_path, poster_path, size, fmt, tmp_path
+                    ),
+                ))
+            except Exception as e:
+                _failures.add(failure_key)
+                logger.error(f"衍生图生成失败: asset_id={asset_id}, size={size}, fmt={fmt}, 错误: {e}")
+                raise HTTPException(status_code=500, detail="衍生图生成失败")
+
+        return DerivativeFile(path=path, media_type=media_type, etag=f'"{key}"')
+
+    @staticmethod
+    def _render(
+        asset_type: str,
+        source_path: str,
+        poster_path: Optional[str],
+        size: int,
+        fmt: str,
+        dest_path: str
+    ) -> None:
+        """生成衍生图到 dest_path（失败时抛出 RuntimeError）"""
+        if size == PREVIEW_SIZE:
+            if not PreviewGeneratorFactory.generate('image', source_path, dest_path):
+                raise RuntimeError(f"预览图生成失败: {source_path}")
+            return
+
+        generator = DerivativeService._thumbnail_generator(size, fmt)
+        if asset_type == 'image':
+            if not generator.generate(source_path, dest_path):
+                raise RuntimeError(f"缩略图生成失败: {source_path}")
+            return
+
+        if asset_type != 'video':
+            raise RuntimeError(f"不支持的素材类型: {asset_type}")
+
+        # 视频：以封面帧为源缩放（已有封面直接使用，否则经管道提取封面帧，不写临时文件）
+        if poster_path and os.path.exists(poster_path):
+            if not generator.generate(poster_path, dest_path):
+                raise RuntimeError(f"缩略图生成失败: {poster_path}")
+            return
+        frames = VideoThumbnailGenerator().extract_frames(source_path, max_long_edge=size)
+        if not frames:
+            raise RuntimeError(f"视频封面提取失败: {source_path}")
+        try:
+            if not generator.generate_from_image(frames[0], dest_path):
+                raise RuntimeError(f"缩略图生成失败: {source_path}")
+        finally:
+            for frame in frames:
+                frame.close()
+
+    @staticmethod
+    def _thumbnail_generator(size: int, fmt: str) -> ImageThumbnailGenerator:
+        """按需缩略图的生成器（图片直接生成，视频以封面帧为源）"""
+        pil_format, _ = FORMATS[fmt]
+        return ImageThumbnailGenerator(
+            base_size=size,
+            reduced_decode=settings.IMAGE_REDUCED_DECODE,
+            smart_crop_proxy_size=settings.SMART_CROP_PROXY_SIZE,
+            output_format=pil_format,
+        )
+
+
+@lru_cache(maxsize=None)
+def _version_tag(asset_type: str, size: int, fmt: str) -> str:
+    """生成器版本指纹的短哈希（配置在进程内不变，按参数缓存）
+
+    预览图取预览图生成器版本；缩略图取实际生成用的图片生成器版本，视频再加上封面帧提取所用的视频生成器版本。
+    """
+    if size == PREVIEW_SIZE:
+        version = PreviewGeneratorFactory.version('image') or ''
+    else:
+        version = DerivativeService._thumbnail_generator(size, fmt).version()
+        if asset_type == 'video':
+            version += f"|{ThumbnailGeneratorFactory.version('video') or ''}"
+    return hashlib.sha1(version.encode('utf-8')).hexdigest()[:8]
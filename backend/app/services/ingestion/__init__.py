@@ -5,11 +5,12 @@
 from ..scanning import FilesystemScanner
 from .importer import AssetImportService
 from .config import ImportConfig
-from .statistics import ImportStatistics
+from .statistics import ImportStatistics, ImportCheckpoint
 
 __all__ = [
     'FilesystemScanner',
     'AssetImportService',
     'ImportConfig',
     'ImportStatistics',
+    'ImportCheckpoint',
 ]
@@ -0,0 +1,278 @@
+"""单素材分析上下文
+
+导入时同一个文件会被多个环节使用：文件哈希、元数据提取、标签映射、缩略图、预览图、感知哈希。
+AssetAnalysis 把这些环节的输入统一到一次读取、一次元数据提取、一次解码上：
+
+- 图片文件内容（小于 max_buffer_bytes 时）只读入内存一次，哈希、EXIF 解析与解码都基于内存；
+  视频由 ffmpeg 按路径读取，不整体读入内存
+- 元数据只提取一次，创建记录与标签映射共用
+- 图片只解码一次，缩略图（含多档尺寸）、预览图、感知哈希共用同一个解码结果；
+  不需要原尺寸预览图时按最大缩略图档位降分辨率解码（见 tools/image_decode.py，解码受像素预算约束）
+- 视频只运行一次 ffmpeg，同时取回封面帧与中间帧（见 tools/video_frames.py），缩略图与感知哈希共用
+"""
+import io
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageOps
+from pillow_heif import register_heif_opener
+from ...services.metadata import MetadataExtractorFactory
+from ...services.preview import PreviewGeneratorFactory, needs_preview
+from ...services.thumbnail import ThumbnailGeneratorFactory, VideoThumbnailGenerator
+from ...tools.file_hash import LARGE_FILE_THRESHOLD, calculate_file_hash, hash_bytes
+from ...tools.image_decode import decode_metrics, open_image
+from ...tools.perceptual_hash import MultiHashCalculator
+from ...tools.utils import get_logger
+
+# 注册 HEIF/HEIC 解码器（支持苹果 HEIC 格式）
+register_heif_opener()
+
+logger = get_logger(__name__)
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+@dataclass
+class AnalysisStats:
+    """分析过程计数（用于基准测试与排查）"""
+
+    bytes_read: int = 0  # 读取的文件字节数
+    decodes: int = 0  # 图片解码次数
+    decode_peak_bytes: int = 0  # 图片解码峰值内存（见 tools/image_decode.py 的 DecodeRecord）
+    frame_extractions: int = 0  # 视频 ffmpeg 提取帧次数
+    metadata_extractions: int = 0  # 元数据提取次数
+
+
+class AssetAnalysis:
+    """单素材分析上下文（按需计算，结果缓存）
+
+    示例：
+        >>> with AssetAnalysis('/nas/original/ab/abcd_IMG_0001.HEIC', 'image') as analysis:
+        ...     metadata, shot_at = analysis.metadata()
+        ...     analysis.render_thumbnail('/nas/processed/thumbnails/x_thumbnail.webp')
+        ...     hashes = analysis.perceptual_hashes()
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        asset_type: str,
+        file_hash: Optional[str] = None,
+        max_buffer_bytes: int = LARGE_FILE_THRESHOLD
+    ):
+        """初始化分析上下文
+
+        Args:
+            file_path: 文件完整路径
+            asset_type: 素材类型
+            file_hash: 已知的文件哈希（如来自扫描清单），避免重复计算
+            max_buffer_bytes: 图片读入内存的大小上限；超过则各环节按路径读取
+        """
+        self.file_path = file_path
+        self.asset_type = asset_type
+        self.max_buffer_bytes = max_buffer_bytes
+        self.stats = AnalysisStats()
+
+        self._file_hash = file_hash
+        self._content: Optional[bytes] = None
+        self._content_loaded = False
+        self._metadata: Optional[Tuple[Dict, Optional[datetime]]] = None
+        self._raw_image: Optional[Image.Image] = None
+        self._image: Optional[Image.Image] = None
+        self._image_loaded = False
+        self._video_frames: Optional[List[Image.Image]] = None
+        self._video_frames_loaded = False
+        self._perceptual_hashes: Optional[Dict[str, str]] = None
+        self._perceptual_hashes_loaded = False
+
+    def __enter__(self) -> 'AssetAnalysis':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """释放内存中的文件内容与解码结果"""
+        self.release_content()
+        if self._image is not None and self._image is not self._raw_image:
+            self._image.close()
+        if self._raw_image is not None:
+            self._raw_image.close()
+        self._image = None
+        self._raw_image = None
+        for frame in self._video_frames or ():
+            frame.close()
+        self._video_frames = None
+
+    def relocate(self, file_path: str) -> None:
+        """文件入库后改为指向 NAS 中的副本（内容相同，已缓存的结果继续有效）"""
+        self.file_path = file_path
+
+    def release_content(self) -> None:
+        """仅释放文件内容缓冲（已计算的哈希、元数据等结果保留）"""
+        self._content = None
+        self._content_loaded = False
+
+    @property
+    def buffered_bytes(self) -> int:
+        """当前占用的文件内容缓冲大小"""
+        return len(self._content) if self._content is not None else 0
+
+    @property
+    def content(self) -> Optional[bytes]:
+        """图片文件完整内容（非图片或超过 max_buffer_bytes 时为 None）"""
+        if not self._content_loaded:
+            self._content_loaded = True
+            if self.asset_type == 'image' and os.path.getsize(self.file_path) < self.max_buffer_bytes:
+                with open(self.file_path, 'rb') as f:
+                    self._content = f.read()
+                self.stats.bytes_read += len(self._content)
+        return self._content
+
+    def file_hash(self) -> str:
+        """文件哈希（与 calculate_file_hash(smart_mode=True) 同口径）"""
+        if self._file_hash is None:
+            content = self.content
+            if content is not None:
+                self._file_hash = hash_bytes(content)
+            else:
+                # 视频/大文件按路径流式计算（≥100MB 头尾采样）
+                self._file_hash = calculate_file_hash(self.file_path, smart_mode=True)
+        return self._file_hash
+
+    def metadata(self) -> Tuple[Dict, Optional[datetime]]:
+        """元数据与拍摄时间（只提取一次）"""
+        if self._metadata is None:
+            self.stats.metadata_extractions += 1
+            content = self.content
+            if content is not None:
+                self._metadata = MetadataExtractorFactory.extract_from_bytes(
+                    self.asset_type, content, self.file_path
+                )
+            else:
+                self._metadata = MetadataExtractorFactory.extract(self.asset_type, self.file_path)
+        return self._metadata
+
+    def image(self) -> Optional[Image.Image]:
+        """已按 EXIF 方向修正的解码图片（仅图片素材，只解码一次；解码失败返回 None）"""
+        if not self._image_loaded:
+            self._image_loaded = True
+            if self.asset_type != 'image':
+                return None
+            try:
+                content = self.content
+                source = io.BytesIO(content) if content is not None else self.file_path
+                raw = open_image(source, self._decode_size())
+                self.stats.decodes += 1
+                record = decode_metrics.last()
+                self.stats.decode_peak_bytes = record.peak_bytes if record else 0
+                self._raw_image = raw
+                # 无需旋转时直接复用原图，避免 exif_transpose 额外复制一份像素
+                if raw.getexif().get(EXIF_ORIENTATION_TAG, 1) in (None, 1):
+                    self._image = raw
+                else:
+                    self._image = ImageOps.exif_transpose(raw)
+            except Exception as e:
+                logger.error(f"图片解码失败 {self.file_path}: {e}")
+        return self._image
+
+    def video_frames(self) -> Optional[List[Image.Image]]:
+        """视频的 [封面帧, 中间帧]（仅视频素材，一次 ffmpeg 调用只提取一次；时长未知时只有封面帧，失败返回 None）"""
+        if not self._video_frames_loaded:
+            self._video_frames_loaded = True
+            generator = ThumbnailGeneratorFactory.create(self.asset_type)
+            if self.asset_type != 'video' or not isinstance(generator, VideoThumbnailGenerator):
+                return None
+            self.stats.frame_extractions += 1
+            self._video_frames = generator.extract_frames(self.file_path, with_hash_frame=True)
+        return self._video_frames
+
+    def _decode_size(self) -> Optional[int]:
+        """解码所需的最小长边：需要原尺寸预览图时完整解码，否则按缩略图生成器的最大档位"""
+        ext = os.path.splitext(self.file_path)[1].lower().lstrip('.')
+        if needs_preview(f"{self.asset_type}/{ext}"):
+            return None
+        generator = ThumbnailGeneratorFactory.create(self.asset_type)
+        return generator.decode_size() if generator else None
+
+    def render_thumbnail(self, dest_path: str) -> bool:
+        """生成缩略图（图片复用解码结果，其他类型交给对应生成器）"""
+        return self.render_thumbnail_ladder(dest_path, {}) is not None
+
+    def render_thumbnail_ladder(self, dest_path: str, ladder_paths: Dict[int, str]) -> Optional[Dict[str, int]]:
+        """生成主缩略图与多档缩略图（仅图片支持多档，复用解码结果）
+
+        Args:
+            dest_path: 主缩略图保存路径
+            ladder_paths: 档位保存路径 {长边: 保存路径}
+
+        Returns:
+            已生成的文件 {保存路径: 宽度}（非图片为空字典），失败返回 None
+        """
+        if self.asset_type == 'video':
+            frames = self.video_frames()
+            img = frames[0] if frames else None
+        elif self.asset_type == 'image':
+            img = self.image()
+        else:
+            return {} if ThumbnailGeneratorFactory.generate(self.asset_type, self.file_path, dest_path) else None
+
+        generator = ThumbnailGeneratorFactory.create(self.asset_type)
+        if img is None or generator is None:
+            return None
+        return generator.generate_ladder_from_image(img, dest_path, ladder_paths)
+
+    def render_storyboard(self, sprite_path: str, vtt_path: str) -> Optional[Dict]:
+        """生成视频故事板（单独一次 ffmpeg 调用，只解码关键帧）
+
+        Returns:
+            几何信息 {count, columns, rows, frame_width, frame_height, interval}；该类型不支持或失败返回 None
+        """
+        generator = ThumbnailGeneratorFactory.create_storyboard(self.asset_type)
+        if generator is None:
+            return None
+        return generator.generate(self.file_path, sprite_path, vtt_path)
+
+    def render_preview(self, dest_path: str) -> bool:
+        """生成预览图（图片复用解码结果，其他类型交给对应生成器）"""
+        if self.asset_type != 'image':
+            return PreviewGeneratorFactory.generate(self.asset_type, self.file_path, dest_path)
+
+        img = self.image()
+        generator = PreviewGeneratorFactory.create(self.asset_type)
+        if img is None or generator is None:
+            return False
+        return generator.generate_from_image(img, dest_path)
+
+    def render_deep_zoom(self, dest_base: str) -> Optional[Dict]:
+        """生成 DZI 切片金字塔（已按原尺寸解码时复用解码结果，否则由生成器按需完整解码）
+
+        Returns:
+            {width, height, tile_size, overlap, format, levels, tiles}；该类型不支持、未达到阈值或失败返回 None
+        """
+        generator = PreviewGeneratorFactory.create_deep_zoom(self.asset_type)
+        if generator is None:
+            return None
+        if self._decode_size() is None and self.image() is not None:
+            return generator.generate(self.file_path, dest_base, image=self.image())
+        content = self.content
+        return generator.generate(content if content is not None else self.file_path, dest_base)
+
+    def perceptual_hashes(self) -> Optional[Dict[str, str]]:
+        """图片/视频感知哈希（复用解码结果或已提取的中间帧；其他类型或失败返回 None，由异步任务处理）"""
+        if not self._perceptual_hashes_loaded:
+            self._perceptual_hashes_loaded = True
+            source = None
+            if self.asset_type == 'image' and self.image() is not None:
+                # 与异步任务同口径：基于未做方向修正的原始图像
+                source = self._raw_image
+            elif self.asset_type == 'video':
+                frames = self.video_frames()
+                source = frames[1] if frames and len(frames) > 1 else None
+            if source is not None:
+                try:
+                    self._perceptual_hashes = MultiHashCalculator().calculate_from_image(source)
+                except Exception as e:
+                    logger.error(f"计算多哈希失败 {self.file_path}: {e}")
+        return self._perceptual_hashes
@@ -1,7 +1,8 @@
 """导入配置对象"""
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 from datetime import datetime
+from .statistics import ImportCheckpoint, ImportStatistics
 
 
 @dataclass
@@ -30,6 +31,45 @@ class ImportConfig:
     # 默认经纬度配置
     default_gps: Optional[tuple[float, float]] = None  # 默认经纬度 (longitude, latitude)
 
+    # 增量导入：只处理扫描路径下的这些文件（相对路径，监控模式使用），None 表示扫描整个目录
+    include_paths: Optional[List[str]] = None
+
+    # 分片导入：只扫描 scan_path 下的这些目录 [(相对目录, 是否递归)]（按扫描顺序、互不重叠），None 表示整个目录
+    scan_scopes: Optional[List[Tuple[str, bool]]] = None
+    # 多个 Worker 并发导入同一目录树时，按文件哈希加跨进程锁去重（MySQL GET_LOCK）
+    distributed_dedupe: bool = False
+    lock_wait_seconds: float = 600  # 同内容文件正被其他 Worker 导入时，最后重试的等待上限
+
+    # 扫描清单配置（重复扫描时签名未变化的文件免哈希）
+    use_manifest: bool = False  # 是否查询/维护扫描清单
+    verify: bool = False  # 强制重新计算哈希（忽略清单命中，并刷新清单）
+
+    # 入库方式（源文件不在 NAS 内时）：copy / reflink / hardlink，None 使用 settings.ASSET_STAGE_STRATEGY
+    stage_strategy: Optional[str] = None
+
+    # 缩略图/预览图按需生成：导入时跳过，首次请求衍生图接口时生成并缓存；None 使用 settings.IMPORT_DERIVE_LAZILY
+    derive_lazily: Optional[bool] = None
+
+    # 流式扫描配置
+    scan_batch_size: int = 500  # 每批扫描结果的文件数（扫描与处理并发进行）
+    dedupe_batch_size: int = 64  # 串行模式每批去重查询的文件数（一条 IN 查询）
+    analysis_buffer_mb: int = 256  # 串行模式每批保留在内存中的文件内容上限（哈希后复用于元数据与解码）
+    persist_batch_size: int = 32  # 每个事务写入的素材数（素材、标签、任务日志整批提交；1 即逐个提交）
+
+    # 检查点配置（导入作业暂停/续跑使用）
+    resume_after: Optional[str] = None  # 续跑：跳过扫描顺序中该文件及之前的文件（相对扫描路径）
+    checkpoint_interval: int = 100  # 每处理完成多少个文件触发一次检查点回调
+    on_checkpoint: Optional[Callable[[ImportCheckpoint, ImportStatistics], bool]] = None  # 检查点回调，返回 False 则停止拉取新文件
+
+    # 并行流水线配置（pipeline=False 时保持逐个文件串行处理）
+    pipeline: bool = False  # 是否启用多阶段并行流水线
+    hash_workers: int = 4  # 哈希计算线程数（I/O 密集）
+    copy_workers: int = 2  # 入库复制线程数（I/O 密集）
+    metadata_workers: int = 2  # 元数据提取 worker 数（CPU 密集）
+    derive_workers: int = 2  # 缩略图/预览图编码 worker 数（CPU 密集）
+    cpu_executor: str = "thread"  # CPU 阶段执行器: thread / process
+    stage_queue_factor: int = 2  # 每个阶段在途上限 = worker 数 × 该倍数
+
     def __post_init__(self):
         """验证配置参数"""
         if not self.scan_path:
@@ -47,3 +87,14 @@ class ImportConfig:
                 raise ValueError("当 import_to_album=True 时，album_id 或 album_name 必须提供一个")
             if self.album_id is not None and self.album_name is not None:
                 raise ValueError("album_id 和 album_name 只能提供一个")
+
+        # 验证流水线配置
+        for name in ("scan_batch_size", "dedupe_batch_size", "analysis_buffer_mb", "persist_batch_size", "checkpoint_interval", "hash_workers", "copy_workers", "metadata_workers", "derive_workers", "stage_queue_factor"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} 必须 >= 1, 当前值: {getattr(self, name)}")
+        if self.include_paths is not None and self.scan_scopes is not None:
+            raise ValueError("include_paths 和 scan_scopes 只能提供一个")
+        if self.stage_strategy is not None and self.stage_strategy not in ["copy", "reflink", "hardlink"]:
+            raise ValueError(f"stage_strategy 必须是 'copy'、'reflink' 或 'hardlink', 当前值: {self.stage_strategy}")
+        if self.cpu_executor not in ["thread", "process"]:
+            raise ValueError(f"cpu_executor 必须是 'thread' 或 'process', 当前值: {self.cpu_executor}")
@@ -0,0 +1,94 @@
+"""跨进程哈希锁
+
+分片导入时多个 Worker 并发处理同一棵目录树，同内容文件可能落在不同分片：
+批量去重查询与写入之间存在时间窗，仅靠 file_hash 查询无法避免重复入库。
+
+占用哈希时用 MySQL 命名锁（GET_LOCK）串行化同一哈希的导入：
+- 拿到锁后在独立连接（自动提交，读到其他 Worker 已提交的素材）上重新查重
+- 锁一直持有到素材提交（或导入失败）后释放
+- 拿不到锁说明另一个 Worker 正在导入同内容文件，由导入服务推迟到最后、在不持有其他锁时等待重试，避免死锁
+
+命名锁属于连接，锁专用一个连接，不经过会话（会话提交后连接会归还连接池）。
+"""
+from typing import Optional, Set
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+from ...model import Asset
+from ...tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class AssetHashLock:
+    """按文件哈希加跨进程锁并查重"""
+
+    LOCK_PREFIX = 'lumi:'
+    MAX_LOCK_NAME = 64  # MySQL 命名锁名称长度上限
+
+    def __init__(self, engine: Engine):
+        self._conn: Optional[Connection] = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        self._held: Set[str] = set()
+
+    @classmethod
+    def create(cls, engine: Engine) -> Optional['AssetHashLock']:
+        """仅 MySQL 支持命名锁；其他数据库返回 None（单机导入不需要）"""
+        if engine.dialect.name != 'mysql':
+            logger.warning(f"跨进程哈希锁仅支持 MySQL（当前: {engine.dialect.name}），并发导入同内容文件可能重复入库")
+            return None
+        return cls(engine)
+
+    def claim(self, file_hash: str, stored_path: str, wait_seconds: float = 0) -> Optional[str]:
+        """占用哈希
+
+        Args:
+            file_hash: 文件哈希
+            stored_path: 本次入库路径（用于区分完全相同与重复备份）
+            wait_seconds: 锁被占用时的等待秒数（0 表示不等待）
+
+        Returns:
+            None - 已占用（导入完成后调用 release）
+            'same' / 'duplicate' - 其他 Worker 已提交同内容素材
+            'busy' - 其他 Worker 正在导入同内容文件（等待超时）
+        """
+        acquired = self._conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {'name': self._lock_name(file_hash), 'timeout': wait_seconds},
+        ).scalar()
+        if acquired != 1:
+            return 'busy'
+        self._held.add(file_hash)
+
+        paths = self._conn.execute(
+            select(Asset.original_path).where(Asset.file_hash == file_hash, Asset.is_deleted == False)
+        ).scalars().all()
+        if paths:
+            self.release(file_hash)
+            return 'same' if stored_path in paths else 'duplicate'
+        return None
+
+    def release(self, file_hash: str) -> None:
+        """释放哈希锁（未持有时忽略）"""
+        if file_hash not in self._held:
+            return
+        self._held.discard(file_hash)
+        try:
+            self._conn.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': self._lock_name(file_hash)})
+        except Exception as e:
+            logger.warning(f"释放哈希锁失败 {file_hash}: {e}")
+
+    def close(self) -> None:
+        """释放所有锁并关闭连接"""
+        if self._conn is None:
+            return
+        try:
+            if self._held:
+                self._conn.execute(text("SELECT RELEASE_ALL_LOCKS()"))
+        except Exception as e:
+            logger.warning(f"释放哈希锁失败: {e}")
+        finally:
+            self._held.clear()
+            self._conn.close()
+            self._conn = None
+
+    def _lock_name(self, file_hash: str) -> str:
+        return f"{self.LOCK_PREFIX}{file_hash}"[:self.MAX_LOCK_NAME]
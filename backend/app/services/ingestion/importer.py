@@ -2,23 +2,43 @@
 
 核心协调类，负责编排整个素材导入流程。
 """
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from ...model import Asset
 from ...config import settings
 from ...tools.utils import get_logger
 from ...services.album import AlbumService
-from ..scanning import FilesystemScanner
+from ..scanning import FilesystemScanner, prefetch_batches
 from .config import ImportConfig
-from .statistics import ImportStatistics
+from .statistics import ImportCheckpoint, ImportStatistics
 from .validator import AssetValidator
 from .processor import AssetProcessor
-from .storage import IngestionStorageFactory, AssetStorageBackend, StagedAssetFile
+from .pipeline import ImportPipeline
+from .manifest import ScanManifestStore
+from .hash_lock import AssetHashLock
+from .analysis import AssetAnalysis
+from .writer import AssetBatchWriter, PendingAsset
+from .storage import IngestionStorageFactory, AssetStorageBackend, StagedAssetFile, StreamedAssetFile
 import os
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class _HashedAsset:
+    """已完成哈希计算、等待批量去重的素材"""
+
+    index: int
+    data: Dict
+    source_rel_path: str
+    source_full_path: str
+    file_hash: str
+    staged: StagedAssetFile
+    analysis: AssetAnalysis
+
+
 class AssetImportService:
     """素材导入服务
 
@@ -38,12 +58,35 @@ class AssetImportService:
         self.validator = AssetValidator(config.db)
         self.storage: AssetStorageBackend = IngestionStorageFactory.create(
             settings.ASSET_STORAGE_PROVIDER,
-            settings.NAS_DATA_PATH
+            settings.NAS_DATA_PATH,
+            config.stage_strategy or settings.ASSET_STAGE_STRATEGY
         )
         self.storage.ensure_ready()
-        self.processor = AssetProcessor(config.db, str(self.storage.processing_root), config.default_gps)
+        self.processor = AssetProcessor(
+            config.db,
+            str(self.storage.processing_root),
+            config.default_gps,
+            derive_lazily=config.derive_lazily if config.derive_lazily is not None else settings.IMPORT_DERIVE_LAZILY,
+        )
+        self.manifest: Optional[ScanManifestStore] = ScanManifestStore(config.db) if config.use_manifest else None
+        self.writer = AssetBatchWriter(self, config.persist_batch_size)
         self.statistics = ImportStatistics()
+        # 本次导入中已占用的哈希 -> 入库路径（覆盖尚未提交的素材，避免同内容文件重复入库）
+        self._claimed_hashes: Dict[str, str] = {}
+        # 多 Worker 并发导入：跨进程哈希锁；同内容文件正被其他 Worker 导入时推迟到最后重试
+        self.hash_lock: Optional[AssetHashLock] = (
+            AssetHashLock.create(config.db.get_bind()) if config.distributed_dedupe else None
+        )
+        self._deferred: List[Tuple[int, Dict]] = []
+        self._retrying_deferred = False
         self.imported_asset_ids = []  # 记录成功导入的素材ID列表
+        # 检查点：扫描序号 -> (相对路径, 字节数)；按扫描顺序推进已处理完成的低水位
+        self.checkpoint = ImportCheckpoint()
+        self._scanned: Dict[int, Tuple[str, int]] = {}
+        self._outcomes: Dict[int, str] = {}
+        self._next_done_index = 1
+        self._since_checkpoint = 0
+        self._stop_requested = False
         self.album_result: Optional[Dict] = None  # 相册关联结果（供调用方展示）
 
     def import_assets(self) -> ImportStatistics:
@@ -59,126 +102,471 @@ class AssetImportService:
             f"可见性: {self.config.visibility}"
         )
 
-        # 1. 扫描目录获取素材数据
+        # 1. 流式扫描目录（后台线程持续发现文件，边扫描边处理）
         assets_data = self._scan_directory()
 
-        # 2. 逐个处理素材
-        for idx, data in enumerate(assets_data, 1):
-            self._process_single_asset(idx, data)
+        # 2. 处理素材（并行流水线 / 按批串行），入库记录按批写入
+        try:
+            self.processor.load_task_switches()
+            self.processor.load_metadata_keys()
+            if self.config.pipeline:
+                ImportPipeline(self).run(self._prefetch_manifest_chunks(assets_data))
+            else:
+                index = 1
+                while True:
+                    batch = list(islice(assets_data, self.config.dedupe_batch_size))
+                    if not batch:
+                        break
+                    self._process_batch(index, batch)
+                    index += len(batch)
+
+            # 3. 其他 Worker 正在导入同内容文件而推迟的文件
+            self._retry_deferred()
+            return self._finish()
+        finally:
+            if self.hash_lock:
+                self.hash_lock.close()
+
+    def import_staged_files(self, files: List[StreamedAssetFile]) -> ImportStatistics:
+        """导入已流式写入存储的文件（上传入口：免扫描、免重新哈希、免复制）
+
+        Args:
+            files: storage.open_stream() 写入完成的文件（哈希已在写入时计算）
 
-        # 3. 相册关联（如果需要）
+        Returns:
+            导入统计结果
+        """
+        logger.info(f"开始导入流式上传素材 - 共 {len(files)} 个文件, 用户: {self.config.created_by}")
+
+        self.processor.load_task_switches()
+        self.processor.load_metadata_keys()
+        hashed_assets = []
+        for index, streamed in enumerate(files, 1):
+            self.statistics.total += 1
+            staged = streamed.staged
+            try:
+                data = FilesystemScanner.describe_file(
+                    staged.local_path, staged.stored_path, self.config.created_by, self.config.visibility
+                )
+                analysis = AssetAnalysis(staged.local_path, data['asset_type'], file_hash=streamed.file_hash)
+                hashed_assets.append((streamed, _HashedAsset(
+                    index, data, streamed.original_filename, staged.local_path, streamed.file_hash, staged, analysis
+                )))
+            except Exception as e:
+                self.storage.discard(streamed)
+                self._record_failure(index, streamed.original_filename, e)
+
+        if hashed_assets:
+            try:
+                duplicates = self.validator.check_duplicates_bulk(
+                    [(item.file_hash, item.staged.stored_path) for _, item in hashed_assets]
+                )
+            except Exception as e:
+                for _, item in hashed_assets:
+                    item.analysis.close()
+                    self._record_failure(item.index, item.source_rel_path, e)
+                return self._finish()
+
+            for (streamed, item), (is_duplicate, dup_type) in zip(hashed_assets, duplicates):
+                if not is_duplicate:
+                    dup_type = self._claim_hash(item.file_hash, item.staged.stored_path)
+                    is_duplicate = dup_type is not None
+
+                if is_duplicate:
+                    item.analysis.close()
+                    # 同内容不同文件名：本次新写入的文件是多余的备份
+                    if dup_type == 'duplicate':
+                        self.storage.discard(streamed)
+                    self._record_skip(item.index, item.source_rel_path, self._duplicate_reason(dup_type))
+                    continue
+
+                with item.analysis:
+                    self._import_hashed_asset(item)
+
+        return self._finish()
+
+    def _finish(self) -> ImportStatistics:
+        """写入剩余记录、关联相册、输出统计"""
+        # 1. 写入尚未提交的素材，保存最终检查点
+        self.writer.flush()
+        self._emit_checkpoint()
+        self.statistics.stopped = self._stop_requested and not self.statistics.scan_complete
+
+        # 2. 相册关联（如果需要）
         if self.config.import_to_album and self.imported_asset_ids:
             self._associate_assets_to_album()
 
-        # 4. 记录结果
+        # 3. 记录结果
         logger.info(self.statistics.get_summary())
 
         return self.statistics
 
-    def _scan_directory(self) -> List[Dict]:
-        """扫描目录获取素材数据"""
-        assets_data = FilesystemScanner.scan(
-            self.config.scan_path,
-            self.config.created_by,
-            self.config.visibility
-        )
-
-        self.statistics.total = len(assets_data)
-        logger.info(f"扫描完成，共发现 {self.statistics.total} 个素材文件")
+    def _scan_directory(self) -> Iterator[Dict]:
+        """流式扫描目录获取素材数据
 
-        return assets_data
+        扫描在后台线程中按批进行，statistics.total 随发现进度递增，
+        下游无需等待整棵目录树遍历完成即可开始处理。
 
-    def _process_single_asset(self, index: int, data: Dict):
-        """处理单个素材
-
-        Args:
-            index: 序号（用于日志）
-            data: 素材数据字典
+        配置了 include_paths 时只处理这些文件（不遍历目录），配置了 scan_scopes 时只遍历这些目录；
+        配置了 resume_after 时跳过扫描顺序中检查点及之前的文件；
+        检查点回调要求停止后不再产出新文件，已产出的文件照常处理完毕。
         """
-        source_rel_path = data.get('original_path', 'unknown')
+        if self.config.include_paths is not None:
+            scanned = FilesystemScanner.iter_paths(
+                self.config.scan_path,
+                self.config.include_paths,
+                self.config.created_by,
+                self.config.visibility,
+                batch_size=self.config.scan_batch_size
+            )
+        elif self.config.scan_scopes is not None:
+            scanned = FilesystemScanner.iter_scopes(
+                self.config.scan_path,
+                self.config.scan_scopes,
+                self.config.created_by,
+                self.config.visibility,
+                batch_size=self.config.scan_batch_size
+            )
+        else:
+            scanned = FilesystemScanner.iter_scan(
+                self.config.scan_path,
+                self.config.created_by,
+                self.config.visibility,
+                batch_size=self.config.scan_batch_size
+            )
+        batches = prefetch_batches(scanned)
+        resume_key = FilesystemScanner.order_key(self.config.resume_after) if self.config.resume_after else None
+        if resume_key:
+            logger.info(f"从检查点续跑: {self.config.resume_after}")
 
+        index = 0
         try:
-            # 1. 计算文件哈希 + 去重检查 + 入库复制（如需要）
-            is_valid, file_hash, staged, reason = self._validate_and_stage_asset(index, data)
-            if not is_valid:
-                logger.debug(
-                    f"[{index}/{self.statistics.total}] "
-                    f"跳过: {data['original_path']} ({reason})"
-                )
-                self.statistics.record_skip()
-                return
-
-            # 2. 提取元数据 + 创建数据库记录（original_path 必须是相对 NAS 根目录）
-            data['original_path'] = staged.stored_path
-            asset = self._create_asset_record(data, file_hash, staged.local_path)
-
-            # 3. 处理素材（标签、缩略图、异步任务）
-            self.processor.process_asset(asset, asset.original_path)
+            for batch in batches:
+                if resume_key:
+                    remaining = [data for data in batch if FilesystemScanner.order_key(data['original_path']) > resume_key]
+                    self.statistics.resumed += len(batch) - len(remaining)
+                    batch = remaining
+                    if batch:
+                        resume_key = None  # 扫描顺序单调，之后的文件都在检查点之后
+
+                self.statistics.total += len(batch)
+                self.statistics.total_bytes += sum(data['file_size'] for data in batch)
+                if batch:
+                    logger.info(f"扫描中，已发现 {self.statistics.total} 个素材文件")
+
+                for data in batch:
+                    if self._stop_requested:
+                        logger.info("已停止拉取新文件，剩余文件留待续跑")
+                        return
+                    index += 1
+                    self._scanned[index] = (data['original_path'], data['file_size'])
+                    yield data
+        finally:
+            batches.close()
+
+        self.statistics.scan_complete = True
+        logger.info(f"扫描完成，共发现 {self.statistics.total} 个素材文件")
 
-            # 4. 记录成功导入的素材ID
-            self.imported_asset_ids.append(asset.id)
+    def _process_batch(self, start_index: int, batch: List[Dict]) -> None:
+        """按批处理素材：逐个计算哈希，整批一次去重查询，再逐个入库
 
-            logger.info(
-                f"[{index}/{self.statistics.total}] "
-                f"已导入素材 ID={asset.id}: {source_rel_path} -> {asset.original_path}"
+        Args:
+            start_index: 本批第一个素材的序号（用于日志）
+            batch: 素材数据字典列表
+        """
+        # 1. 计算文件哈希（扫描清单命中则免读取，整批一条 IN 查询预取）+ 规划入库路径
+        #    文件内容在预算内保留在内存中，入库时直接用于元数据提取与解码
+        self._prefetch_manifest(batch)
+        hashed_assets = []
+        buffer_budget = self.config.analysis_buffer_mb * 1024 * 1024
+        for offset, data in enumerate(batch):
+            index = start_index + offset
+            source_rel_path = data.get('original_path', 'unknown')
+            try:
+                item = self._hash_asset(index, data)
+            except Exception as e:
+                self._record_failure(index, source_rel_path, e)
+                continue
+
+            if item.analysis.buffered_bytes > buffer_budget:
+                item.analysis.release_content()
+            buffer_budget -= item.analysis.buffered_bytes
+            hashed_assets.append(item)
+
+        if not hashed_assets:
+            return
+
+        # 2. 整批去重（一次 IN 查询）
+        try:
+            if self.manifest:
+                self.manifest.flush()
+                self.config.db.commit()  # 持久化本批新写入的清单记录
+            duplicates = self.validator.check_duplicates_bulk(
+                [(item.file_hash, item.staged.stored_path) for item in hashed_assets]
             )
-
-            self.statistics.record_success()
-
         except Exception as e:
-            error_msg = str(e)
-            logger.error(
-                f"[{index}/{self.statistics.total}] "
-                f"导入失败: {data.get('original_path', 'unknown')} - {error_msg}"
+            for item in hashed_assets:
+                item.analysis.close()
+                self._record_failure(item.index, item.source_rel_path, e)
+            return
+
+        # 3. 逐个入库：同内容文件先到先得
+        for item, (is_duplicate, dup_type) in zip(hashed_assets, duplicates):
+            if not is_duplicate:
+                dup_type = self._claim_hash(item.file_hash, item.staged.stored_path)
+                is_duplicate = dup_type is not None
+
+            if dup_type == 'busy':
+                item.analysis.close()
+                self._defer(item.index, item.data)
+                continue
+
+            if is_duplicate:
+                item.analysis.close()
+                self._record_skip(item.index, item.source_rel_path, self._duplicate_reason(dup_type))
+                continue
+
+            with item.analysis:
+                self._import_hashed_asset(item)
+
+    def _defer(self, index: int, data: Dict) -> None:
+        """同内容文件正被其他 Worker 导入：推迟到最后重试（重试时等待对方提交后再查重）"""
+        if self._retrying_deferred:
+            self._record_failure(
+                index, data.get('original_path', 'unknown'),
+                TimeoutError(f"等待其他 Worker 导入同内容文件超时（{self.config.lock_wait_seconds}s）"),
             )
-            self.statistics.record_failure(source_rel_path, error_msg)
-            self.config.db.rollback()
+            return
+        logger.debug(f"同内容文件正被其他 Worker 导入，稍后重试: {data.get('original_path')}")
+        self._deferred.append((index, data))
+
+    def _retry_deferred(self) -> None:
+        """逐个重试推迟的文件
+
+        先写入所有待提交素材（释放本 Worker 持有的哈希锁），再逐个等待锁、导入并立即提交：
+        等待期间不持有其他锁，不会与其他 Worker 互相等待。
+        """
+        if not self._deferred:
+            return
+
+        deferred, self._deferred = self._deferred, []
+        logger.info(f"重试 {len(deferred)} 个推迟的文件（同内容文件曾被其他 Worker 占用）")
+        self.writer.flush()
+        self._retrying_deferred = True
+        try:
+            for index, data in deferred:
+                self._process_batch(index, [data])
+                self.writer.flush()
+        finally:
+            self._retrying_deferred = False
 
-    def _validate_and_stage_asset(self, index: int, data: Dict) -> tuple[bool, str, StagedAssetFile, str]:
-        """验证素材并确保文件已入库（复制到 NAS_DATA_PATH）
+    def _hash_asset(self, index: int, data: Dict) -> _HashedAsset:
+        """计算文件哈希并规划入库路径
 
         Args:
             index: 序号
             data: 素材数据
 
         Returns:
-            (是否通过, 文件哈希, 入库信息, 拒绝原因)
+            等待去重的素材
         """
         source_rel_path = data['original_path']
         source_full_path = os.path.join(self.config.scan_path, source_rel_path)
 
-        logger.debug(f"[{index}/{self.statistics.total}] 计算文件哈希: {source_rel_path}")
-        file_hash = self.validator.calculate_hash(source_full_path)
+        manifest_hash = self._lookup_manifest_hash(source_full_path, data)
+        analysis = AssetAnalysis(source_full_path, data['asset_type'], file_hash=manifest_hash)
+        if manifest_hash is None:
+            # 哈希与后续元数据提取、解码共用同一次读取
+            logger.debug(f"[{index}/{self.statistics.total}] 计算文件哈希: {source_rel_path}")
+            self._remember_manifest_hash(source_full_path, data, analysis.file_hash())
+
+        file_hash = analysis.file_hash()
         staged = self.storage.plan_stage(source_full_path, file_hash, source_rel_path)
+        return _HashedAsset(index, data, source_rel_path, source_full_path, file_hash, staged, analysis)
 
-        is_duplicate, dup_type = self.validator.check_duplicate(file_hash, staged.stored_path)
-        if is_duplicate:
-            if dup_type == 'same':
-                return False, file_hash, staged, "已存在相同文件"
-            return False, file_hash, staged, "发现重复备份"
+    def _import_hashed_asset(self, item: _HashedAsset) -> None:
+        """入库复制 + 构建记录 + 衍生文件（已通过去重），记录交给批量写入器"""
+        try:
+            # 1. 入库复制（如需要），之后分析上下文指向 NAS 中的副本
+            self.storage.ensure_staged(item.staged, item.source_full_path)
+            item.analysis.relocate(item.staged.local_path)
+
+            # 2. 提取元数据 + 构建素材对象（original_path 必须是相对 NAS 根目录）
+            item.data['original_path'] = item.staged.stored_path
+            metadata, shot_at = item.analysis.metadata()
+            metadata, raw_metadata = self.processor.split_metadata(item.data['asset_type'], metadata or {})
+            asset = self._build_asset_record(item.data, item.file_hash, metadata, shot_at)
+
+            # 3. 缩略图、预览图、感知哈希（复用同一分析结果，只写到对象上）
+            phash_ready = self.processor.render_derivatives(asset, asset.original_path, item.analysis)
+
+            # 4. 素材、标签、任务日志按批在一个事务中写入，提交后发送异步任务
+            self.writer.add(PendingAsset(
+                index=item.index,
+                source_rel_path=item.source_rel_path,
+                asset=asset,
+                local_path=item.staged.local_path,
+                metadata=metadata,
+                raw_metadata=raw_metadata,
+                phash_ready=phash_ready,
+            ))
 
-        self.storage.ensure_staged(staged, source_full_path)
+        except Exception as e:
+            self._release_claim(item.file_hash, item.staged.stored_path)
+            self._record_failure(item.index, item.source_rel_path, e)
 
-        return True, file_hash, staged, ""
+    def _claim_hash(self, file_hash: str, stored_path: str) -> Optional[str]:
+        """占用哈希（串行与流水线模式共用）
 
-    def _create_asset_record(self, data: Dict, file_hash: str, file_full_path: str) -> Asset:
-        """创建素材数据库记录
+        Returns:
+            已被本次导入（或其他 Worker 已提交的素材）占用时返回重复类型（same / duplicate），
+            其他 Worker 正在导入同内容文件时返回 busy，否则占用成功返回 None
+        """
+        claimed_path = self._claimed_hashes.get(file_hash)
+        if claimed_path is not None:
+            return 'same' if claimed_path == stored_path else 'duplicate'
+        if self.hash_lock:
+            wait_seconds = self.config.lock_wait_seconds if self._retrying_deferred else 0
+            dup_type = self.hash_lock.claim(file_hash, stored_path, wait_seconds)
+            if dup_type is not None:
+                return dup_type
+        self._claimed_hashes[file_hash] = stored_path
+        return None
+
+    def _release_claim(self, file_hash: str, stored_path: str) -> None:
+        """失败的文件释放其哈希占用，避免后续同内容文件被误判为重复"""
+        if file_hash and self._claimed_hashes.get(file_hash) == stored_path:
+            self._claimed_hashes.pop(file_hash, None)
+            self._release_hash_lock(file_hash)
+
+    def _release_hash_lock(self, file_hash: str) -> None:
+        """素材已提交或导入失败：释放跨进程哈希锁"""
+        if self.hash_lock:
+            self.hash_lock.release(file_hash)
+
+    def _record_success(self, index: int, source_rel_path: str, asset_id: int, stored_path: str) -> None:
+        """记录成功导入（串行与流水线模式共用）"""
+        self.imported_asset_ids.append(asset_id)
+        logger.info(
+            f"[{index}/{self.statistics.total}] "
+            f"已导入素材 ID={asset_id}: {source_rel_path} -> {stored_path}"
+        )
+        self.statistics.record_success()
+        self._mark_done(index, 'imported')
+
+    def _record_skip(self, index: int, source_rel_path: str, reason: str) -> None:
+        """记录跳过（串行与流水线模式共用）"""
+        logger.debug(
+            f"[{index}/{self.statistics.total}] "
+            f"跳过: {source_rel_path} ({reason})"
+        )
+        self.statistics.record_skip()
+        self._mark_done(index, 'skipped')
+
+    def _record_failure(self, index: int, source_rel_path: str, error: Exception, rollback: bool = True) -> None:
+        """记录失败并回滚当前会话（串行与流水线模式共用；批量写入的行级失败已回滚到保存点，无需整体回滚）"""
+        error_msg = str(error)
+        logger.error(
+            f"[{index}/{self.statistics.total}] "
+            f"导入失败: {source_rel_path} - {error_msg}"
+        )
+        self.statistics.record_failure(source_rel_path, error_msg)
+        self._mark_done(index, 'failed')
+        if rollback:
+            self.config.db.rollback()
+
+    def _mark_done(self, index: int, outcome: str) -> None:
+        """文件处理完成（导入/跳过/失败）：推进检查点低水位，每 checkpoint_interval 个文件触发一次回调
+
+        流水线与批量写入使完成顺序与扫描顺序不一致，检查点只推进到连续完成的最后一个文件，
+        保证续跑时检查点之前的文件都已提交。非扫描入口（流式上传）不记录检查点。
+        """
+        if index not in self._scanned:
+            return
+        self._outcomes[index] = outcome
+
+        checkpoint = self.checkpoint
+        while self._next_done_index in self._outcomes:
+            done_outcome = self._outcomes.pop(self._next_done_index)
+            rel_path, file_size = self._scanned.pop(self._next_done_index)
+            checkpoint.checkpoint_path = rel_path
+            checkpoint.files_done += 1
+            checkpoint.bytes_done += file_size
+            setattr(checkpoint, done_outcome, getattr(checkpoint, done_outcome) + 1)
+            self._next_done_index += 1
+            self._since_checkpoint += 1
+
+        if self._since_checkpoint >= self.config.checkpoint_interval:
+            self._emit_checkpoint()
+
+    def _emit_checkpoint(self) -> None:
+        """调用检查点回调；回调返回 False 时停止拉取新文件（回调异常不影响导入）"""
+        self._since_checkpoint = 0
+        if self.config.on_checkpoint is None:
+            return
+        try:
+            if self.config.on_checkpoint(self.checkpoint, self.statistics) is False and not self._stop_requested:
+                logger.info(f"检查点回调要求停止 - 已处理 {self.checkpoint.files_done} 个文件")
+                self._stop_requested = True
+        except Exception as e:
+            logger.warning(f"检查点回调失败: {e}")
+
+    @staticmethod
+    def _duplicate_reason(dup_type: str) -> str:
+        """重复类型 -> 跳过原因"""
+        if dup_type == 'same':
+            return "已存在相同文件"
+        return "发现重复备份"
+
+    def _prefetch_manifest(self, batch: List[Dict]) -> None:
+        """一条 IN 查询预取一批文件的扫描清单记录（未启用清单或 verify=True 时跳过）"""
+        if not self.manifest or self.config.verify:
+            return
+
+        self.manifest.prefetch(
+            os.path.join(self.config.scan_path, data.get('original_path', 'unknown')) for data in batch
+        )
+
+    def _prefetch_manifest_chunks(self, assets_data: Iterable[Dict]) -> Iterator[Dict]:
+        """按 dedupe_batch_size 分块预取扫描清单，再逐个产出（供流水线按需拉取）"""
+        assets_data = iter(assets_data)
+        while True:
+            chunk = list(islice(assets_data, self.config.dedupe_batch_size))
+            if not chunk:
+                return
+            self._prefetch_manifest(chunk)
+            yield from chunk
+
+    def _lookup_manifest_hash(self, source_full_path: str, data: Dict) -> Optional[str]:
+        """查询扫描清单（未启用清单或 verify=True 时返回 None）"""
+        if not self.manifest or self.config.verify:
+            return None
+
+        file_hash = self.manifest.lookup(source_full_path, data)
+        if file_hash:
+            self.statistics.record_hash_reused()
+        return file_hash
+
+    def _remember_manifest_hash(self, source_full_path: str, data: Dict, file_hash: str) -> None:
+        """把新计算的哈希写入扫描清单（随后续提交一起落库）"""
+        if self.manifest:
+            self.manifest.remember(source_full_path, data, file_hash)
+
+    def _build_asset_record(self, data: Dict, file_hash: str, metadata: dict, shot_at) -> Asset:
+        """根据扫描数据与已提取的元数据构建素材对象（不落库）
 
         Args:
             data: 素材数据
             file_hash: 文件哈希
-            file_full_path: 文件完整路径（用于元数据提取）
+            metadata: 元数据字典
+            shot_at: 元数据中的拍摄时间
 
         Returns:
-            创建的素材对象
+            未持久化的素材对象
         """
         # 设置文件哈希
         data['file_hash'] = file_hash
 
-        # 提取元数据获取拍摄时间
-        asset_type = data['asset_type']
-        metadata, shot_at = self.processor.extract_metadata(asset_type, file_full_path)
-
         # 使用元数据中的拍摄时间，如果没有则使用文件创建时间
         if shot_at:
             data['shot_at'] = shot_at
@@ -199,14 +587,13 @@ class AssetImportService:
 
         # 移除临时字段
         data.pop('file_created_at', None)
+        data.pop('file_mtime_ns', None)
+        data.pop('file_inode', None)
 
-        # 创建数据库记录
-        new_asset = Asset(**data)
-        self.config.db.add(new_asset)
-        self.config.db.commit()
-        self.config.db.refresh(new_asset)
+        # 按需生成模式：缩略图/预览图由衍生图接口首次请求时生成
+        data['derive_lazily'] = self.processor.derive_lazily
 
-        return new_asset
+        return Asset(**data)
 
     def _associate_assets_to_album(self) -> None:
         """将导入的素材关联到相册
@@ -0,0 +1,271 @@
+"""导入作业
+
+扫描导入以作业形式持久化（ingestion_jobs 表），由 Taskiq Worker 执行：
+- 创建作业后投递任务，Worker 领取后运行导入，每个检查点写回进度与速率
+- 暂停：设置 pause_requested，运行中的导入在下一个检查点停止拉取新文件，已在途的文件处理完后退出
+- 续跑：从检查点之后的文件继续，计数在上次的基础上累加
+- Worker 中断（重启、崩溃）后作业停留在 running，超过 STALE_SECONDS 未更新即可续跑
+- 分布式扫描（sharded_scan）：作业任务只负责规划与投递分片，导入由各分片任务执行（见 sharding.py）
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from ...schema.ingestion import IngestionJobOut
+from ...db import SessionLocal
+from ...model import IngestionJob
+from ...tools.utils import get_logger
+from .config import ImportConfig
+from .importer import AssetImportService
+from .statistics import ImportCheckpoint, ImportStatistics
+
+logger = get_logger(__name__)
+
+
+class IngestionJobService:
+    """导入作业的创建、调度、暂停/续跑与执行"""
+
+    # 运行中的作业超过该时长未更新进度，视为 Worker 已中断（单个大视频可能长时间没有检查点，留足余量）
+    STALE_SECONDS = 1800
+
+    @staticmethod
+    def create_scan_job(db: Session, params: Dict, job_type: str = 'scan') -> IngestionJob:
+        """创建扫描导入作业（状态 queued）
+
+        Args:
+            params: 导入参数（scan_path、created_by、visibility、相册、default_gps、pipeline、verify）
+            job_type: scan（单个 Worker 导入）或 sharded_scan（目录分片后由多个 Worker 并行导入）
+        """
+        job = IngestionJob(job_type=job_type, status='queued', params=params)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def enqueue(db: Session, job: IngestionJob) -> None:
+        """投递作业到 Taskiq 队列；投递失败则标记作业失败"""
+        from ...tasks.ingestion_tasks import run_ingestion_job_task
+        from ...tasks.sender import run_coroutine_sync
+
+        try:
+            run_coroutine_sync(run_ingestion_job_task.kiq(job_id=job.id))
+        except Exception as e:
+            logger.error(f"导入作业投递失败 - Job ID: {job.id}: {e}")
+            job.status = 'failed'
+            job.error_message = f"作业投递失败: {e}"
+            db.commit()
+            raise HTTPException(status_code=503, detail="任务队列不可用，作业已标记为失败，可稍后续跑")
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> IngestionJob:
+        job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="导入作业不存在")
+        return job
+
+    @staticmethod
+    def list_jobs(db: Session, status: Optional[str] = None, limit: int = 20) -> List[IngestionJob]:
+        query = db.query(IngestionJob)
+        if status:
+            query = query.filter(IngestionJob.status == status)
+        return query.order_by(IngestionJob.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def pause(db: Session, job_id: int) -> IngestionJob:
+        """暂停作业：排队中的直接暂停，运行中的在下一个检查点停止"""
+        job = IngestionJobService.get_job(db, job_id)
+        if job.status == 'queued':
+            job.status = 'paused'
+        elif job.status == 'running':
+            job.pause_requested = True
+        else:
+            raise HTTPException(status_code=400, detail=f"作业状态为 {job.status}，不能暂停")
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def resume(db: Session, job_id: int) -> IngestionJob:
+        """续跑作业：已暂停、失败或 Worker 中断的作业从检查点重新排队；尚未生效的暂停请求直接撤销"""
+        job = IngestionJobService.get_job(db, job_id)
+        stale = IngestionJobService.is_stale(job)
+
+        if job.status == 'running' and job.pause_requested and not stale:
+            job.pause_requested = False
+            db.commit()
+            db.refresh(job)
+            return job
+
+        if job.status not in ('paused', 'failed') and not stale:
+            raise HTTPException(status_code=400, detail=f"作业状态为 {job.status}，不能续跑")
+
+        job.status = 'queued'
+        job.pause_requested = False
+        job.error_message = None
+        job.finished_at = None
+        db.commit()
+        IngestionJobService.enqueue(db, job)
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def is_stale(job: IngestionJob) -> bool:
+        """排队或运行中的作业长时间未更新（任务丢失或 Worker 中断）"""
+        if job.status not in ('queued', 'running') or not job.updated_at:
+            return False
+        return datetime.now() - job.updated_at > timedelta(seconds=IngestionJobService.STALE_SECONDS)
+
+    @staticmethod
+    def to_out(job: IngestionJob) -> IngestionJobOut:
+        """作业详情，附带预计剩余时间"""
+        out = IngestionJobOut.model_validate(job)
+        out.eta_seconds = IngestionJobService.eta_seconds(job)
+        return out
+
+    @staticmethod
+    def eta_seconds(job: IngestionJob) -> Optional[float]:
+        """预计剩余秒数：优先按字节速率估算（文件大小差异大），没有字节数时按文件速率"""
+        if job.status != 'running':
+            return None
+        if job.bytes_per_second and job.bytes_total:
+            return max(job.bytes_total - job.bytes_done, 0) / job.bytes_per_second
+        if job.files_per_second:
+            return max(job.files_total - job.files_done, 0) / job.files_per_second
+        return None
+
+    @staticmethod
+    def run(job_id: int) -> Dict:
+        """执行作业（Worker 中调用，阻塞直到导入结束或在检查点暂停）
+
+        导入与进度更新使用两个会话：导入过程中的回滚不会丢失已写回的进度。
+
+        Returns:
+            执行结果 {'job_id', 'status', 'summary'}
+        """
+        db = SessionLocal()
+        job_db = SessionLocal()
+        try:
+            # 1. 领取作业（只处理排队中的作业，避免重复投递时并发执行）
+            claimed = job_db.query(IngestionJob).filter(
+                IngestionJob.id == job_id,
+                IngestionJob.status == 'queued',
+            ).update({'status': 'running', 'started_at': datetime.now()})
+            job_db.commit()
+            if not claimed:
+                logger.info(f"导入作业不在排队状态，跳过 - Job ID: {job_id}")
+                return {'job_id': job_id, 'status': 'skipped', 'summary': None}
+
+            job = job_db.query(IngestionJob).filter(IngestionJob.id == job_id).one()
+            if job.job_type == 'sharded_scan':
+                from .sharding import ShardedScanService
+
+                return ShardedScanService.dispatch(job_db, job)
+
+            base = ImportCheckpoint(
+                checkpoint_path=job.checkpoint_path,
+                files_done=job.files_done,
+                bytes_done=job.bytes_done,
+                imported=job.files_imported,
+                skipped=job.files_skipped,
+                failed=job.files_failed,
+            )
+            logger.info(f"导入作业开始 - Job ID: {job_id}, 检查点: {base.checkpoint_path or '无'}")
+
+            # 2. 每个检查点写回进度，并读取暂停请求
+            started = time.monotonic()
+
+            def on_checkpoint(checkpoint: ImportCheckpoint, statistics: ImportStatistics) -> bool:
+                try:
+                    IngestionJobService._apply_progress(job, base, checkpoint, statistics, time.monotonic() - started)
+                    job_db.commit()
+                    return not job.pause_requested  # 提交后属性已过期，此处重新读取
+                except Exception:
+                    job_db.rollback()
+                    raise
+
+            config = IngestionJobService._build_config(job.params, db, base.checkpoint_path, on_checkpoint)
+            job_db.commit()  # 结束读事务，导入期间不长时间持有快照
+            statistics = AssetImportService(config).import_assets()
+
+            # 3. 结束：暂停（检查点回调要求停止）或完成
+            job.status = 'paused' if statistics.stopped else 'done'
+            job.pause_requested = False
+            if not statistics.stopped:
+                job.scan_complete = True
+                job.finished_at = datetime.now()
+            job_db.commit()
+
+            summary = statistics.get_summary()
+            logger.info(f"导入作业{'已暂停' if statistics.stopped else '完成'} - Job ID: {job_id}, {summary}")
+            if statistics.has_failures():
+                logger.warning(f"以下 {statistics.failed} 个文件导入失败:")
+                for file_path, error in statistics.failed_files[:10]:  # 最多显示 10 个
+                    logger.warning(f"  - {file_path}: {error}")
+            return {'job_id': job_id, 'status': job.status, 'summary': summary}
+
+        except Exception as e:
+            logger.error(f"导入作业执行失败 - Job ID: {job_id}: {e}", exc_info=True)
+            db.rollback()
+            job_db.rollback()
+            job_db.query(IngestionJob).filter(IngestionJob.id == job_id).update({
+                'status': 'failed',
+                'error_message': str(e),
+                'finished_at': datetime.now(),
+            })
+            job_db.commit()
+            return {'job_id': job_id, 'status': 'failed', 'summary': str(e)}
+        finally:
+            db.close()
+            job_db.close()
+
+    @staticmethod
+    def _apply_progress(
+        job: IngestionJob,
+        base: ImportCheckpoint,
+        checkpoint: ImportCheckpoint,
+        statistics: ImportStatistics,
+        elapsed: float
+    ) -> None:
+        """把本次运行的检查点累加到作业记录（base 为续跑前的进度）"""
+        if checkpoint.checkpoint_path:
+            job.checkpoint_path = checkpoint.checkpoint_path
+        job.files_done = base.files_done + checkpoint.files_done
+        job.bytes_done = base.bytes_done + checkpoint.bytes_done
+        job.files_imported = base.imported + checkpoint.imported
+        job.files_skipped = base.skipped + checkpoint.skipped
+        job.files_failed = base.failed + checkpoint.failed
+        job.files_total = base.files_done + statistics.total
+        job.bytes_total = base.bytes_done + statistics.total_bytes
+        job.scan_complete = statistics.scan_complete
+        if elapsed > 0:
+            job.files_per_second = round(checkpoint.files_done / elapsed, 3)
+            job.bytes_per_second = round(checkpoint.bytes_done / elapsed, 1)
+
+    @staticmethod
+    def _build_config(params: Dict, db: Session, resume_after: Optional[str], on_checkpoint) -> ImportConfig:
+        """作业参数 -> 导入配置"""
+        def parse_time(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+
+        default_gps = params.get('default_gps')
+        return ImportConfig(
+            scan_path=params['scan_path'],
+            created_by=params['created_by'],
+            visibility=params.get('visibility', 'general'),
+            db=db,
+            import_to_album=params.get('import_to_album', False),
+            album_id=params.get('album_id'),
+            album_name=params.get('album_name'),
+            album_start_time=parse_time(params.get('album_start_time')),
+            album_end_time=parse_time(params.get('album_end_time')),
+            default_gps=tuple(default_gps) if default_gps else None,
+            pipeline=params.get('pipeline', False),
+            use_manifest=True,
+            verify=params.get('verify', False),
+            stage_strategy=params.get('stage_strategy'),
+            derive_lazily=params.get('derive_lazily'),
+            resume_after=resume_after,
+            on_checkpoint=on_checkpoint,
+        )
@@ -0,0 +1,164 @@
+"""扫描清单
+
+记录源文件的 stat 签名（大小、修改时间、inode）与内容哈希。
+重复扫描时签名未变化的文件直接复用清单中的哈希，不再读取文件内容。
+查询与写入都按批进行：每批文件一条 IN 查询预取，新哈希缓冲到提交前一次写入。
+"""
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from ...model import ScanManifest
+from ...tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ScanManifestStore:
+    """扫描清单存取
+
+    职责：
+    - 按批预取清单记录（一条 IN 查询），签名一致时返回哈希
+    - 缓冲新计算的哈希，flush 时一条 executemany 写入/更新（由调用方提交）
+    """
+
+    def __init__(self, db: Session):
+        """初始化清单存取
+
+        Args:
+            db: 数据库会话
+        """
+        self.db = db
+        # 已预取、尚未查询的记录：path_key -> 清单行（None 表示清单中不存在）
+        self._prefetched: Dict[str, Optional[object]] = {}
+        # 已查询过的文件在清单中的记录 ID（None 表示需新增），供 flush 区分插入/更新
+        self._known_ids: Dict[str, Optional[int]] = {}
+        # 待写入的记录：path_key -> 行数据
+        self._pending: Dict[str, Dict] = {}
+
+    @staticmethod
+    def path_key(source_full_path: str) -> str:
+        """源文件绝对路径 -> 唯一键"""
+        return hashlib.sha256(os.path.abspath(source_full_path).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def signature(data: Dict) -> Optional[tuple[int, int, int]]:
+        """从扫描数据中取出 stat 签名 (file_size, mtime_ns, inode)，缺失时返回 None"""
+        file_size = data.get('file_size')
+        mtime_ns = data.get('file_mtime_ns')
+        inode = data.get('file_inode')
+        if file_size is None or mtime_ns is None or inode is None:
+            return None
+        return file_size, mtime_ns, inode
+
+    @staticmethod
+    def stat_signature(path: str) -> Optional[tuple[int, int, int]]:
+        """直接 stat 文件取签名 (file_size, mtime_ns, inode)，与扫描数据同口径；文件不存在时返回 None"""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+    def prefetch(self, source_full_paths: Iterable[str]) -> None:
+        """一条 IN 查询预取一批文件的清单记录
+
+        Args:
+            source_full_paths: 源文件完整路径
+        """
+        keys = {self.path_key(path) for path in source_full_paths} - self._prefetched.keys()
+        if not keys:
+            return
+
+        for row in self._query(keys):
+            self._prefetched[row.path_hash] = row
+        for key in keys:
+            self._prefetched.setdefault(key, None)
+
+    def lookup(self, source_full_path: str, data: Dict) -> Optional[str]:
+        """查询签名未变化的文件哈希（未预取时单独查询一次）
+
+        Args:
+            source_full_path: 源文件完整路径
+            data: 扫描数据（含 file_size / file_mtime_ns / file_inode）
+
+        Returns:
+            签名一致时返回清单中的文件哈希，否则返回 None
+        """
+        signature = self.signature(data)
+        if signature is None:
+            return None
+
+        path_key = self.path_key(source_full_path)
+        if path_key not in self._prefetched:
+            self.prefetch([source_full_path])
+        entry = self._prefetched.pop(path_key)
+        if entry is None:
+            self._known_ids[path_key] = None
+            return None
+
+        if (entry.file_size, entry.mtime_ns, entry.inode) != signature:
+            logger.debug(f"文件已变化，需重新计算哈希: {source_full_path}")
+            self._known_ids[path_key] = entry.id
+            return None
+
+        return entry.file_hash
+
+    def remember(self, source_full_path: str, data: Dict, file_hash: str) -> None:
+        """缓冲一条清单记录，flush 时写入
+
+        Args:
+            source_full_path: 源文件完整路径
+            data: 扫描数据（含 file_size / file_mtime_ns / file_inode）
+            file_hash: 文件内容哈希
+        """
+        signature = self.signature(data)
+        if signature is None:
+            return
+
+        file_size, mtime_ns, inode = signature
+        self._pending[self.path_key(source_full_path)] = {
+            'source_path': os.path.abspath(source_full_path),
+            'file_size': file_size,
+            'mtime_ns': mtime_ns,
+            'inode': inode,
+            'file_hash': file_hash,
+        }
+
+    def flush(self) -> int:
+        """把缓冲的记录写入会话（不提交）：新记录一条 executemany INSERT，已有记录一条按主键的批量 UPDATE
+
+        Returns:
+            写入的记录数
+        """
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        # verify 模式不经过 lookup，一条 IN 查询补齐已有记录的 ID
+        unknown = pending.keys() - self._known_ids.keys()
+        if unknown:
+            for row in self._query(unknown):
+                self._known_ids[row.path_hash] = row.id
+
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        for path_key, values in pending.items():
+            entry_id = self._known_ids.pop(path_key, None)
+            if entry_id is None:
+                inserts.append({'path_hash': path_key, **values})
+            else:
+                updates.append({'id': entry_id, **values})
+
+        if inserts:
+            self.db.execute(insert(ScanManifest), inserts)
+        if updates:
+            self.db.execute(update(ScanManifest), updates)
+        return len(pending)
+
+    def _query(self, keys: Iterable[str]) -> List:
+        return self.db.query(
+            ScanManifest.id, ScanManifest.path_hash, ScanManifest.file_size,
+            ScanManifest.mtime_ns, ScanManifest.inode, ScanManifest.file_hash
+        ).filter(ScanManifest.path_hash.in_(list(keys))).all()
@@ -0,0 +1,391 @@
+"""多阶段并行导入流水线
+
+把单个文件的 hash → stage → metadata → thumbnail/preview 拆成独立阶段：
+- I/O 密集阶段（哈希计算、入库复制）使用线程池
+- CPU 密集阶段（元数据提取、缩略图/预览图编码）使用线程池或进程池
+- 每个阶段有独立的等待队列与在途上限，避免大目录一次性压入内存
+- 哈希完成的文件先进入待去重列表，每轮调度用一条 IN 查询批量去重
+- 去重检查、创建记录、保存标签、发送异步任务等数据库操作全部留在调用线程，
+  串行复用 ImportConfig.db 这一个 Session；记录交给 AssetBatchWriter 按批写入
+
+统计语义与串行模式一致：每个文件最终只会记为 成功 / 跳过 / 失败 之一。
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from ...services.metadata import MetadataExtractorFactory
+from ...services.preview import needs_preview
+from ...tools.utils import get_logger
+from .processor import render_derivatives_job
+from .storage import StagedAssetFile
+from .writer import PendingAsset
+
+if TYPE_CHECKING:
+    from .importer import AssetImportService
+
+logger = get_logger(__name__)
+
+STAGE_HASH = 'hash'
+STAGE_COPY = 'copy'
+STAGE_METADATA = 'metadata'
+STAGE_DERIVE = 'derive'
+
+STAGES = (STAGE_HASH, STAGE_COPY, STAGE_METADATA, STAGE_DERIVE)
+
+
+def _init_process_worker(required_keys: Dict[str, frozenset]) -> None:
+    """进程池子进程初始化：同步主进程设置的元数据需要键（spawn 启动的子进程不继承）"""
+    for asset_type, keys in required_keys.items():
+        MetadataExtractorFactory.set_required_keys(asset_type, keys)
+
+
+def _extract_metadata_job(asset_type: str, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+    """元数据提取阶段（模块级函数，便于进程池序列化）"""
+    return MetadataExtractorFactory.extract(asset_type, file_path)
+
+
+@dataclass
+class _PipelineItem:
+    """流水线中单个文件的处理状态"""
+
+    index: int
+    data: Dict
+    source_rel_path: str
+    source_full_path: str
+    file_hash: str = ''
+    staged: Optional[StagedAssetFile] = None
+    metadata: Dict = field(default_factory=dict)
+    shot_at: Optional[datetime] = None
+    thumbnail_path: Optional[str] = None
+    thumbnail_ladder: Dict[int, str] = field(default_factory=dict)
+    thumbnail_sizes: Optional[Dict[str, str]] = None
+    preview_path: Optional[str] = None
+    perceptual_hashes: Optional[Dict[str, str]] = None
+    storyboard_paths: Optional[Tuple[str, str]] = None
+    storyboard: Optional[Dict] = None
+    deep_zoom_base: Optional[str] = None
+    deep_zoom: Optional[Dict] = None
+
+
+class ImportPipeline:
+    """多阶段并行导入流水线
+
+    职责：
+    - 按阶段调度文件到对应的执行器
+    - 控制每个阶段的在途数量（背压）
+    - 在调用线程中串行完成所有数据库读写
+    """
+
+    def __init__(self, service: 'AssetImportService'):
+        """初始化流水线
+
+        Args:
+            service: 导入服务（复用其配置、校验器、存储后端、处理器与统计）
+        """
+        self.service = service
+        config = service.config
+        self._workers: Dict[str, int] = {
+            STAGE_HASH: config.hash_workers,
+            STAGE_COPY: config.copy_workers,
+            STAGE_METADATA: config.metadata_workers,
+            STAGE_DERIVE: config.derive_workers,
+        }
+        self._limits: Dict[str, int] = {
+            stage: workers * config.stage_queue_factor
+            for stage, workers in self._workers.items()
+        }
+        self._queues: Dict[str, Deque[_PipelineItem]] = {stage: deque() for stage in STAGES}
+        self._load: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._inflight: Dict[Future, Tuple[str, _PipelineItem]] = {}
+        self._executors: Dict[str, Executor] = {}
+        # 已得到哈希、等待批量去重的文件
+        self._pending_dedupe: List[_PipelineItem] = []
+        self._thumbnail_enabled = True
+        self._preview_enabled = True
+        self._phash_enabled = True
+
+    def run(self, assets_data: Iterable[Dict]) -> None:
+        """执行流水线直到所有文件处理完毕
+
+        Args:
+            assets_data: 扫描得到的素材数据（可迭代，按需拉取）
+        """
+        processor = self.service.processor
+        self._thumbnail_enabled = processor.is_task_enabled('thumbnail')
+        self._preview_enabled = processor.is_task_enabled('preview')
+        self._phash_enabled = processor.is_task_enabled('phash')
+
+        logger.info(
+            "启用并行导入流水线 - " + ", ".join(
+                f"{stage}: {self._workers[stage]} workers" for stage in STAGES
+            ) + f", CPU 执行器: {self.service.config.cpu_executor}"
+        )
+
+        source = enumerate(assets_data, 1)
+        # 扫描清单命中的文件会直接进入待去重列表，上限至少容纳一整批去重查询
+        max_items = max(sum(self._limits.values()), self.service.config.dedupe_batch_size)
+        exhausted = False
+
+        self._start_executors()
+        try:
+            while True:
+                # 1. 仅在流水线未满时拉取新文件
+                while not exhausted and self._items_in_pipeline() < max_items:
+                    next_item = next(source, None)
+                    if next_item is None:
+                        exhausted = True
+                        break
+                    self._admit(self._new_item(*next_item))
+
+                # 2. 对本轮得到哈希的文件批量去重，再把各阶段队列中的文件提交到执行器
+                self._resolve_duplicates()
+                self._pump()
+
+                if not self._inflight:
+                    if exhausted:
+                        break
+                    continue
+
+                # 3. 等待任一阶段完成，并在当前线程推进到下一阶段
+                done, _ = wait(list(self._inflight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, item = self._inflight.pop(future)
+                    self._load[stage] -= 1
+                    self._on_stage_done(stage, item, future)
+        finally:
+            self._shutdown_executors()
+
+    def _new_item(self, index: int, data: Dict) -> _PipelineItem:
+        source_rel_path = data.get('original_path', 'unknown')
+        return _PipelineItem(
+            index=index,
+            data=data,
+            source_rel_path=source_rel_path,
+            source_full_path=os.path.join(self.service.config.scan_path, source_rel_path),
+        )
+
+    def _admit(self, item: _PipelineItem) -> None:
+        """新文件进入流水线：扫描清单命中则跳过哈希阶段"""
+        try:
+            file_hash = self.service._lookup_manifest_hash(item.source_full_path, item.data)
+            if file_hash is None:
+                self._enqueue(STAGE_HASH, item)
+            else:
+                self._after_hash(item, file_hash, hashed=False)
+        except Exception as e:
+            self._release_claim(item)
+            self.service._record_failure(item.index, item.source_rel_path, e)
+
+    def _items_in_pipeline(self) -> int:
+        return (
+            len(self._inflight)
+            + len(self._pending_dedupe)
+            + sum(len(queue) for queue in self._queues.values())
+        )
+
+    def _start_executors(self) -> None:
+        use_process = self.service.config.cpu_executor == 'process'
+        for stage in STAGES:
+            workers = self._workers[stage]
+            if use_process and stage in (STAGE_METADATA, STAGE_DERIVE):
+                self._executors[stage] = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_process_worker,
+                    initargs=(MetadataExtractorFactory.required_keys(),),
+                )
+            else:
+                self._executors[stage] = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix=f"ingest-{stage}",
+                )
+
+    def _shutdown_executors(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors.clear()
+
+    def _enqueue(self, stage: str, item: _PipelineItem) -> None:
+        self._queues[stage].append(item)
+
+    def _pump(self) -> None:
+        """在不超过在途上限的前提下，把排队文件提交到各阶段执行器"""
+        for stage in STAGES:
+            queue = self._queues[stage]
+            while queue and self._load[stage] < self._limits[stage]:
+                item = queue.popleft()
+                func, args = self._job_for(stage, item)
+                future = self._executors[stage].submit(func, *args)
+                self._inflight[future] = (stage, item)
+                self._load[stage] += 1
+
+    def _job_for(self, stage: str, item: _PipelineItem) -> Tuple[Callable, tuple]:
+        if stage == STAGE_HASH:
+            return self.service.validator.calculate_hash, (item.source_full_path,)
+        if stage == STAGE_COPY:
+            return self.service.storage.ensure_staged, (item.staged, item.source_full_path)
+        if stage == STAGE_METADATA:
+            return _extract_metadata_job, (item.data['asset_type'], item.staged.local_path)
+        return render_derivatives_job, (
+            item.data['asset_type'],
+            item.staged.local_path,
+            self._to_full_path(item.thumbnail_path),
+            self._to_full_path(item.preview_path),
+            self._wants_perceptual_hashes(item),
+            {size: self._to_full_path(rel_path) for size, rel_path in item.thumbnail_ladder.items()},
+            tuple(self._to_full_path(rel_path) for rel_path in item.storyboard_paths) if item.storyboard_paths else None,
+            self._to_full_path(item.deep_zoom_base),
+        )
+
+    def _wants_perceptual_hashes(self, item: _PipelineItem) -> bool:
+        """图片/视频的感知哈希在编码阶段顺带计算（视频与封面共用一次 ffmpeg 提取帧）"""
+        return self._phash_enabled and item.data.get('asset_type') in ('image', 'video')
+
+    def _to_full_path(self, rel_path: Optional[str]) -> Optional[str]:
+        if not rel_path:
+            return None
+        return os.path.join(self.service.processor.scan_path, rel_path)
+
+    def _on_stage_done(self, stage: str, item: _PipelineItem, future: Future) -> None:
+        try:
+            result = future.result()
+            if stage == STAGE_HASH:
+                self._after_hash(item, result)
+            elif stage == STAGE_COPY:
+                self._enqueue(STAGE_METADATA, item)
+            elif stage == STAGE_METADATA:
+                item.metadata, item.shot_at = result
+                self._after_metadata(item)
+            else:
+                self._after_derive(item, result)
+        except Exception as e:
+            self._release_claim(item)
+            self.service._record_failure(item.index, item.source_rel_path, e)
+
+    def _release_claim(self, item: _PipelineItem) -> None:
+        """失败的文件释放其哈希占用，避免后续同内容文件被误判为重复"""
+        if item.staged:
+            self.service._release_claim(item.file_hash, item.staged.stored_path)
+
+    def _after_hash(self, item: _PipelineItem, file_hash: str, hashed: bool = True) -> None:
+        item.file_hash = file_hash
+        if hashed:
+            self.service._remember_manifest_hash(item.source_full_path, item.data, file_hash)
+        item.staged = self.service.storage.plan_stage(item.source_full_path, file_hash, item.source_rel_path)
+        self._pending_dedupe.append(item)
+
+    def _resolve_duplicates(self) -> None:
+        """批量去重：一条 IN 查询处理本轮所有得到哈希的文件，未重复的进入复制阶段"""
+        if not self._pending_dedupe:
+            return
+
+        items, self._pending_dedupe = self._pending_dedupe, []
+        service = self.service
+        try:
+            if service.manifest:
+                service.manifest.flush()
+                service.config.db.commit()  # 持久化清单记录，下次扫描免哈希
+            duplicates = service.validator.check_duplicates_bulk(
+                [(item.file_hash, item.staged.stored_path) for item in items]
+            )
+        except Exception as e:
+            for item in items:
+                service._record_failure(item.index, item.source_rel_path, e)
+            return
+
+        for item, (is_duplicate, dup_type) in zip(items, duplicates):
+            # 本次导入中已被占用的哈希（覆盖尚未提交的素材）
+            if not is_duplicate:
+                dup_type = service._claim_hash(item.file_hash, item.staged.stored_path)
+                is_duplicate = dup_type is not None
+
+            if dup_type == 'busy':
+                service._defer(item.index, item.data)
+                continue
+
+            if is_duplicate:
+                service._record_skip(item.index, item.source_rel_path, service._duplicate_reason(dup_type))
+                continue
+
+            self._enqueue(STAGE_COPY, item)
+
+    def _after_metadata(self, item: _PipelineItem) -> None:
+        processor = self.service.processor
+        stored_path = item.staged.stored_path
+
+        if self._thumbnail_enabled:
+            item.thumbnail_path = processor.thumbnail_rel_path(stored_path)
+            item.thumbnail_ladder = processor.thumbnail_ladder_rel_paths(item.data['asset_type'], stored_path)
+            item.storyboard_paths = processor.storyboard_rel_paths(item.data['asset_type'], stored_path)
+        if self._preview_enabled and needs_preview(item.data.get('mime_type')):
+            item.preview_path = processor.preview_rel_path(stored_path)
+        if self._preview_enabled:
+            item.deep_zoom_base = processor.deep_zoom_rel_base(item.data['asset_type'], stored_path)
+
+        if (item.thumbnail_path or item.preview_path or item.storyboard_paths or item.deep_zoom_base
+                or self._wants_perceptual_hashes(item)):
+            self._enqueue(STAGE_DERIVE, item)
+        else:
+            self._persist(item)
+
+    def _after_derive(
+        self,
+        item: _PipelineItem,
+        result: Tuple[Optional[Dict[str, int]], bool, Optional[Dict[str, str]], Optional[Dict], Optional[Dict]]
+    ) -> None:
+        thumbnails, preview_ok, item.perceptual_hashes, storyboard, deep_zoom = result
+        if item.thumbnail_path and thumbnails is None:
+            logger.warning(f"缩略图生成失败: {item.staged.stored_path}")
+            item.thumbnail_path = None
+        elif item.thumbnail_path:
+            rel_paths = {
+                self._to_full_path(rel_path): rel_path
+                for rel_path in (item.thumbnail_path, *item.thumbnail_ladder.values())
+            }
+            item.thumbnail_sizes = self.service.processor.thumbnail_sizes(thumbnails, rel_paths)
+        if item.preview_path and not preview_ok:
+            logger.warning(f"预览图生成失败: {item.staged.stored_path}")
+            item.preview_path = None
+        if item.storyboard_paths:
+            item.storyboard = self.service.processor.storyboard_record(storyboard, item.storyboard_paths)
+        if item.deep_zoom_base:
+            item.deep_zoom = self.service.processor.deep_zoom_record(deep_zoom, item.deep_zoom_base)
+        self._persist(item)
+
+    def _persist(self, item: _PipelineItem) -> None:
+        """构建记录并交给批量写入器（素材、标签、任务日志按批提交后发送异步任务）"""
+        item.data['original_path'] = item.staged.stored_path
+        metadata, raw_metadata = self.service.processor.split_metadata(item.data['asset_type'], item.metadata or {})
+        asset = self.service._build_asset_record(item.data, item.file_hash, metadata, item.shot_at)
+        asset.thumbnail_path = item.thumbnail_path
+        asset.thumbnail_sizes = item.thumbnail_sizes
+        asset.preview_path = item.preview_path
+        asset.storyboard = item.storyboard
+        asset.deep_zoom = item.deep_zoom
+        if asset.thumbnail_path:
+            self.service.processor.record_derivative_version(asset, 'thumbnail', item.staged.local_path)
+        if asset.preview_path:
+            self.service.processor.record_derivative_version(asset, 'preview', item.staged.local_path)
+        phash_ready = self.service.processor.apply_perceptual_hashes(asset, item.perceptual_hashes)
+
+        self.service.writer.add(PendingAsset(
+            index=item.index,
+            source_rel_path=item.source_rel_path,
+            asset=asset,
+            local_path=item.staged.local_path,
+            metadata=metadata,
+            raw_metadata=raw_metadata,
+            phash_ready=phash_ready,
+        ))
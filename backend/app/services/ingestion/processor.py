@@ -1,128 +1,192 @@
 """素材处理器
 
-负责单个素材的元数据提取、标签保存、缩略图生成、预览图生成等处理逻辑。
+负责单个素材的元数据键裁剪、标签映射、缩略图生成、预览图生成等处理逻辑。
+结果只写到素材对象上，由 AssetBatchWriter 统一落库（见 writer.py）。
 """
 from sqlalchemy.orm import Session
-from ...model import Asset, TaskLog
+from ...config import settings
+from ...model import Asset
 from ...services.metadata import MetadataExtractorFactory
 from ...services.thumbnail import ThumbnailGeneratorFactory
 from ...services.preview import PreviewGeneratorFactory, needs_preview
-from ...services.tags import TagService, MetadataTagMapper
+from ...services.tags import MetadataTagMapper
 from ...services.tags.mapping_service import TagMappingService
 from ...services.tasks import TaskDefinitionService
 from ...tasks.phash_tasks import calculate_phash_task
 from ...tasks.geocoding_tasks import calculate_location_task
 from ...tasks.sender import run_coroutine_sync
 from ...tools.utils import get_logger
+from .analysis import AssetAnalysis
+from .manifest import ScanManifestStore
+from typing import Dict, List, Optional, Tuple
 import os
 from datetime import datetime
 
 logger = get_logger(__name__)
 
 
+
+def render_derivatives_job(
+    asset_type: str,
+    file_path: str,
+    thumbnail_dest: Optional[str],
+    preview_dest: Optional[str],
+    with_perceptual_hashes: bool = False,
+    ladder_dests: Optional[Dict[int, str]] = None,
+    storyboard_dests: Optional[Tuple[str, str]] = None,
+    deep_zoom_dest: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, int]], bool, Optional[Dict[str, str]], Optional[Dict], Optional[Dict]]:
+    """缩略图（含多档尺寸）/预览图编码 + 感知哈希 + 视频故事板 + DZI 切片（模块级函数，便于进程池序列化）
+
+    导入流水线的编码阶段与重新生成衍生图作业共用。
+    图片只读取、解码一次，三者共用解码结果（超大图片的切片需原尺寸，缩略图为降分辨率解码时另行解码）；
+    视频只运行一次 ffmpeg，封面与哈希共用提取的帧，故事板另需一次只解码关键帧的 ffmpeg 调用。
+
+    Returns:
+        (已生成的缩略图 {完整路径: 宽度} 或 None, 预览图是否成功, 感知哈希或 None,
+         故事板几何信息或 None, 切片信息或 None)
+    """
+    thumbnails = None
+    preview_ok = False
+    hashes = None
+    storyboard = None
+    deep_zoom = None
+    with AssetAnalysis(file_path, asset_type) as analysis:
+        if thumbnail_dest:
+            thumbnails = analysis.render_thumbnail_ladder(thumbnail_dest, ladder_dests or {})
+        if preview_dest:
+            preview_ok = analysis.render_preview(preview_dest)
+        if with_perceptual_hashes:
+            hashes = analysis.perceptual_hashes()
+        if storyboard_dests:
+            storyboard = analysis.render_storyboard(*storyboard_dests)
+        if deep_zoom_dest:
+            deep_zoom = analysis.render_deep_zoom(deep_zoom_dest)
+    return thumbnails, preview_ok, hashes, storyboard, deep_zoom
+
+
 class AssetProcessor:
     """素材处理器
 
     职责：
-    - 提取元数据
-    - 保存标签（不含地理位置）
+    - 按映射规则设置/裁剪元数据键
+    - 元数据映射为标签（支持默认 GPS 覆盖）
     - 生成缩略图
     - 生成预览图（针对 HEIC 等浏览器不支持的格式）
-    - 发送异步任务（phash、地理编码）
+    - 生成超大图片的 DZI 切片金字塔（随预览图任务开关）
+    - 生成视频故事板（拖动预览雪碧图，随缩略图任务开关）
+    - 计算图片/视频感知哈希（复用解码结果 / 封面提取时的同一次 ffmpeg 调用）
+    - 规划与投递异步任务（导入时未算出的 phash、地理编码）
     """
 
-    def __init__(self, db: Session, scan_path: str, default_gps: tuple[float, float] = None):
+    # 导入过程中会检查开关的后处理任务
+    TASK_CODES = ('thumbnail', 'preview', 'phash', 'geocoding')
+    # 按需生成模式下导入时跳过的任务（由衍生图接口在首次请求时生成）
+    LAZY_TASK_CODES = ('thumbnail', 'preview')
+
+    def __init__(
+        self,
+        db: Session,
+        scan_path: str,
+        default_gps: tuple[float, float] = None,
+        derive_lazily: bool = False
+    ):
         """初始化处理器
 
         Args:
             db: 数据库会话
             scan_path: 扫描根路径
             default_gps: 默认经纬度 (longitude, latitude)
+            derive_lazily: 是否跳过缩略图/预览图生成（按需生成模式）
         """
         self.db = db
         self.scan_path = scan_path
         self.default_gps = default_gps
+        self.derive_lazily = derive_lazily
+        self._task_switches: Optional[Dict[str, bool]] = None
+        self._metadata_keys: Dict[str, set] = {}
+
+    def load_task_switches(self) -> Dict[str, bool]:
+        """一次性读取后处理任务开关并缓存（一次导入内保持不变，避免每个素材重复查询）"""
+        self._task_switches = {
+            code: self.is_task_enabled(code)
+            for code in self.TASK_CODES
+        }
+        return self._task_switches
+
+    def load_metadata_keys(self) -> None:
+        """按生效的映射规则设置元数据提取器需要的键（一次导入内保持不变）
+
+        没有生效规则时使用 MetadataTagMapper 的内置映射回退用到的键。
+        开启原始元数据留存（RAW_METADATA_STORE_ENABLED）时提取器不裁剪、解析全部键，
+        完整结果只写入原始元数据表，素材列与标签仍只使用需要的键（见 split_metadata）。
+        """
+        for asset_type in ('image', 'video'):
+            keys = {mapping.source_key for mapping in TagMappingService.list_active(self.db, asset_type)}
+            self._metadata_keys[asset_type] = keys or set(MetadataTagMapper.FALLBACK_MAP)
+            MetadataExtractorFactory.set_required_keys(
+                asset_type, None if settings.RAW_METADATA_STORE_ENABLED else self._metadata_keys[asset_type]
+            )
+        if settings.RAW_METADATA_STORE_ENABLED:
+            logger.info("已开启原始元数据留存：提取全部元数据键（解析不裁剪）")
 
-    @staticmethod
-    def _format_send_task_error(exc: Exception) -> str:
-        root = exc.__cause__ or exc.__context__
-        if root:
-            return f"{type(root).__name__}: {root}"
-        return f"{type(exc).__name__}: {exc}"
-
-    def extract_metadata(self, asset_type: str, file_path: str) -> tuple[dict, any]:
-        """提取元数据
-
-        Args:
-            asset_type: 素材类型
-            file_path: 文件完整路径
+    def split_metadata(self, asset_type: str, metadata: dict) -> Tuple[dict, dict]:
+        """拆分提取结果：(素材列与标签映射用的裁剪结果, 原始元数据表留存的完整结果)
 
-        Returns:
-            (元数据字典, 拍摄时间)
+        未开启原始元数据留存时提取器已按需要的键裁剪，留存部分为空。
         """
-        return MetadataExtractorFactory.extract(asset_type, file_path)
+        if not settings.RAW_METADATA_STORE_ENABLED:
+            return metadata, {}
+        keys = self._metadata_keys.get(asset_type)
+        pruned = MetadataExtractorFactory.prune(asset_type, metadata, keys) if keys else metadata
+        return pruned, metadata
+
+    def is_task_enabled(self, task_code: str) -> bool:
+        """任务开关：已缓存时直接返回，否则查询数据库（按需生成模式下缩略图/预览图视为关闭）"""
+        if self.derive_lazily and task_code in self.LAZY_TASK_CODES:
+            return False
+        if self._task_switches is not None and task_code in self._task_switches:
+            return self._task_switches[task_code]
+        return TaskDefinitionService.is_enabled(self.db, task_code)
 
-    def save_tags(self, asset: Asset, metadata: dict) -> dict:
-        """保存标签（支持默认 GPS 覆盖）
+    def map_tags(self, asset: Asset, metadata: dict, mappings: Optional[list] = None) -> dict:
+        """元数据 -> 标签（支持默认 GPS 覆盖，不落库）
 
         Args:
             asset: 素材对象
             metadata: 元数据
+            mappings: 已加载的映射规则（批量处理时由调用方缓存），为空则按素材类型查询
 
         Returns:
             映射后的标签字典
         """
-        if not metadata:
-            metadata = {}
-
-        try:
-            # 映射为统一格式
-            mapped_tags = MetadataTagMapper.map_metadata_to_tags(
-                metadata,
-                TagMappingService.list_active(self.db, asset.asset_type),
-            )
-
-            # GPS 覆盖逻辑：如果元数据中没有 GPS 且配置了默认 GPS，则使用默认值
-            if self.default_gps:
-                has_gps = 'gps_latitude' in mapped_tags and 'gps_longitude' in mapped_tags
-
-                if not has_gps:
-                    lng, lat = self.default_gps
-
-                    # 根据数值正负确定方向
-                    lat_ref = 'N' if lat >= 0 else 'S'
-                    lon_ref = 'E' if lng >= 0 else 'W'
-
-                    # 添加 GPS 标签（使用绝对值）
-                    mapped_tags['gps_latitude'] = str(abs(lat))
-                    mapped_tags['gps_longitude'] = str(abs(lng))
-                    mapped_tags['gps_latitude_ref'] = lat_ref
-                    mapped_tags['gps_longitude_ref'] = lon_ref
-
-                    logger.debug(
-                        f"Asset {asset.id} 使用默认 GPS: "
-                        f"{lat}°{lat_ref}, {lng}°{lon_ref}"
-                    )
-
-            # 批量保存标签
-            saved_count = TagService.batch_save_asset_tags(
-                db=self.db,
-                asset_id=asset.id,
-                asset_type=asset.asset_type,
-                tag_data=mapped_tags
-            )
-
-            if saved_count > 0:
-                logger.debug(f"Asset {asset.id} ({asset.asset_type}) 保存了 {saved_count} 个标签")
-
-            return mapped_tags
-
-        except Exception as e:
-            # 标签保存失败不影响素材导入
-            logger.warning(f"Asset {asset.id} 标签保存失败: {e}")
-            return {}
-
+        if mappings is None:
+            mappings = TagMappingService.list_active(self.db, asset.asset_type)
+        mapped_tags = MetadataTagMapper.map_metadata_to_tags(metadata or {}, mappings)
+
+        # GPS 覆盖逻辑：如果元数据中没有 GPS 且配置了默认 GPS，则使用默认值
+        if self.default_gps:
+            has_gps = 'gps_latitude' in mapped_tags and 'gps_longitude' in mapped_tags
+
+            if not has_gps:
+                lng, lat = self.default_gps
+
+                # 根据数值正负确定方向
+                lat_ref = 'N' if lat >= 0 else 'S'
+                lon_ref = 'E' if lng >= 0 else 'W'
+
+                # 添加 GPS 标签（使用绝对值）
+                mapped_tags['gps_latitude'] = str(abs(lat))
+                mapped_tags['gps_longitude'] = str(abs(lng))
+                mapped_tags['gps_latitude_ref'] = lat_ref
+                mapped_tags['gps_longitude_ref'] = lon_ref
+
+                logger.debug(
+                    f"Asset {asset.id} 使用默认 GPS: "
+                    f"{lat}°{lat_ref}, {lng}°{lon_ref}"
+                )
 
+        return mapped_tags
 
     @staticmethod
     def _parse_coordinate(coord_str: str, ref: str = None) -> float:
@@ -182,56 +246,173 @@ class AssetProcessor:
         except (ValueError, IndexError, ZeroDivisionError):
             return None
 
-    def generate_thumbnail(self, asset: Asset, original_path: str) -> bool:
+    @staticmethod
+    def thumbnail_rel_path(original_path: str) -> str:
+        """缩略图相对路径：processed/thumbnails/{原文件名去扩展名}_thumbnail.webp"""
+        filename_without_ext = os.path.splitext(os.path.basename(original_path))[0]
+        return f"processed/thumbnails/{filename_without_ext}_thumbnail.webp"
+
+    @staticmethod
+    def thumbnail_ladder_rel_paths(asset_type: str, original_path: str) -> Dict[int, str]:
+        """多档缩略图相对路径：{长边: processed/thumbnails/{原文件名去扩展名}_thumbnail_{长边}.webp}"""
+        filename_without_ext = os.path.splitext(os.path.basename(original_path))[0]
+        return {
+            size: f"processed/thumbnails/{filename_without_ext}_thumbnail_{size}.webp"
+            for size in ThumbnailGeneratorFactory.ladder_sizes(asset_type)
+        }
+
+    @staticmethod
+    def thumbnail_sizes(rendered: Dict[str, int], rel_paths: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """生成结果 {完整路径: 宽度} 转为素材记录的 {宽度: 相对路径}（无宽度信息时为 None）"""
+        sizes = {str(width): rel_paths[path] for path, width in rendered.items() if path in rel_paths}
+        return sizes or None
+
+    @staticmethod
+    def storyboard_rel_paths(asset_type: str, original_path: str) -> Optional[Tuple[str, str]]:
+        """故事板相对路径 (processed/storyboards/{原文件名去扩展名}_storyboard.webp, ....vtt)；该类型不生成时为 None"""
+        if ThumbnailGeneratorFactory.create_storyboard(asset_type) is None:
+            return None
+        filename_without_ext = os.path.splitext(os.path.basename(original_path))[0]
+        base = f"processed/storyboards/{filename_without_ext}_storyboard"
+        return f"{base}.webp", f"{base}.vtt"
+
+    @staticmethod
+    def storyboard_record(info: Optional[Dict], rel_paths: Tuple[str, str]) -> Optional[Dict]:
+        """生成结果（几何信息）加上相对路径，作为素材记录的 storyboard 字段（失败时为 None）"""
+        if not info:
+            return None
+        sprite, vtt = rel_paths
+        return {'sprite': sprite, 'vtt': vtt, **info}
+
+    @staticmethod
+    def preview_rel_path(original_path: str) -> str:
+        """预览图相对路径：processed/previews/{原文件名去扩展名}_preview.webp"""
+        filename_without_ext = os.path.splitext(os.path.basename(original_path))[0]
+        return f"processed/previews/{filename_without_ext}_preview.webp"
+
+    @staticmethod
+    def deep_zoom_rel_base(asset_type: str, original_path: str) -> Optional[str]:
+        """DZI 切片路径前缀 processed/deepzoom/{原文件名去扩展名}（.dzi 与 _files/ 目录）；该类型不生成时为 None"""
+        if PreviewGeneratorFactory.create_deep_zoom(asset_type) is None:
+            return None
+        filename_without_ext = os.path.splitext(os.path.basename(original_path))[0]
+        return f"processed/deepzoom/{filename_without_ext}"
+
+    @staticmethod
+    def deep_zoom_record(info: Optional[Dict], rel_base: str) -> Optional[Dict]:
+        """生成结果加上描述文件相对路径，作为素材记录的 deep_zoom 字段（未生成时为 None）"""
+        if not info:
+            return None
+        return {'dzi': f"{rel_base}.dzi", **info}
+
+    @staticmethod
+    def record_derivative_version(asset: Asset, kind: str, source_path: str) -> None:
+        """记录衍生图的生成器版本指纹、源文件哈希与源文件 stat 签名（不提交）
+
+        重新生成衍生图作业比对该记录，版本、哈希与签名都未变且文件存在时跳过；
+        签名与扫描清单同口径 (file_size, mtime_ns, inode)，源文件在磁盘上被替换或修改后即视为过期。
+
+        Args:
+            asset: 素材对象（file_hash 已确定）
+            kind: 'thumbnail' 或 'preview'
+            source_path: 生成所用源文件的完整路径
+        """
+        factory = ThumbnailGeneratorFactory if kind == 'thumbnail' else PreviewGeneratorFactory
+        signature = ScanManifestStore.stat_signature(source_path)
+        versions = dict(asset.derivative_versions or {})
+        versions[kind] = {
+            'version': factory.version(asset.asset_type),
+            'source_hash': asset.file_hash,
+            'source_signature': list(signature) if signature else None,
+        }
+        # 重新赋值新字典，JSON 列才会被标记为已修改
+        asset.derivative_versions = versions
+
+    def generate_thumbnail(self, asset: Asset, original_path: str, analysis: AssetAnalysis) -> bool:
         """生成缩略图
 
         Args:
             asset: 素材对象
             original_path: 原始文件相对路径
+            analysis: 该素材的分析上下文（复用其解码结果）
 
         Returns:
             是否成功
         """
-        if not TaskDefinitionService.is_enabled(self.db, 'thumbnail'):
+        if not self.is_task_enabled('thumbnail'):
             logger.debug(f"跳过缩略图（任务已关闭）: asset {asset.id}")
             return True
 
-        # 提取原始文件名（不含扩展名）
-        original_filename = os.path.basename(original_path)
-        filename_without_ext = os.path.splitext(original_filename)[0]
-
-        # 生成缩略图文件名
-        thumb_filename = f"{filename_without_ext}_thumbnail.webp"
-        thumb_rel_path = f"processed/thumbnails/{thumb_filename}"
+        thumb_rel_path = self.thumbnail_rel_path(original_path)
+        ladder_rel_paths = self.thumbnail_ladder_rel_paths(asset.asset_type, original_path)
 
         # 完整路径
         file_full_path = os.path.join(self.scan_path, original_path)
         thumb_full_path = os.path.join(self.scan_path, thumb_rel_path)
+        rel_paths = {
+            os.path.join(self.scan_path, rel_path): rel_path
+            for rel_path in (thumb_rel_path, *ladder_rel_paths.values())
+        }
 
         logger.debug(f"生成缩略图 - 原始: {file_full_path}")
         logger.debug(f"生成缩略图 - 目标: {thumb_full_path}")
 
-        # 生成缩略图
-        if ThumbnailGeneratorFactory.generate(asset.asset_type, file_full_path, thumb_full_path):
+        # 生成缩略图（图片同一次解码输出多档尺寸）
+        rendered = analysis.render_thumbnail_ladder(thumb_full_path, {
+            size: os.path.join(self.scan_path, rel_path) for size, rel_path in ladder_rel_paths.items()
+        })
+
+        if rendered is not None:
             asset.thumbnail_path = thumb_rel_path
-            self.db.commit()
+            asset.thumbnail_sizes = self.thumbnail_sizes(rendered, rel_paths)
+            self.record_derivative_version(asset, 'thumbnail', file_full_path)
             logger.info(f"缩略图生成成功: {thumb_rel_path}")
             return True
         else:
             logger.warning(f"缩略图生成失败: {original_path}")
             return False
 
-    def generate_preview(self, asset: Asset, original_path: str) -> bool:
+    def generate_storyboard(self, asset: Asset, original_path: str, analysis: AssetAnalysis) -> bool:
+        """生成视频故事板（拖动预览雪碧图 + WebVTT 索引）
+
+        与缩略图共用任务开关；不生成故事板的类型直接返回 True。
+
+        Args:
+            asset: 素材对象
+            original_path: 原始文件相对路径
+            analysis: 该素材的分析上下文
+
+        Returns:
+            是否成功
+        """
+        if not self.is_task_enabled('thumbnail'):
+            return True
+
+        rel_paths = self.storyboard_rel_paths(asset.asset_type, original_path)
+        if rel_paths is None:
+            return True
+
+        sprite_full_path, vtt_full_path = (os.path.join(self.scan_path, rel_path) for rel_path in rel_paths)
+        info = analysis.render_storyboard(sprite_full_path, vtt_full_path)
+        asset.storyboard = self.storyboard_record(info, rel_paths)
+        if asset.storyboard is None:
+            logger.warning(f"故事板生成失败: {original_path}")
+            return False
+        logger.info(f"故事板生成成功: {rel_paths[0]}")
+        return True
+
+    def generate_preview(self, asset: Asset, original_path: str, analysis: AssetAnalysis) -> bool:
         """生成预览图（针对 HEIC 等浏览器不支持的格式）
 
         Args:
             asset: 素材对象
             original_path: 原始文件相对路径
+            analysis: 该素材的分析上下文（复用其解码结果）
 
         Returns:
             是否成功（如果不需要生成预览图也返回 True）
         """
-        if not TaskDefinitionService.is_enabled(self.db, 'preview'):
+        if not self.is_task_enabled('preview'):
             logger.debug(f"跳过预览图（任务已关闭）: asset {asset.id}")
             return True
 
@@ -240,13 +421,7 @@ class AssetProcessor:
             logger.debug(f"跳过预览图生成（格式已支持）: {asset.mime_type}")
             return True
 
-        # 提取原始文件名（不含扩展名）
-        original_filename = os.path.basename(original_path)
-        filename_without_ext = os.path.splitext(original_filename)[0]
-
-        # 生成预览图文件名
-        preview_filename = f"{filename_without_ext}_preview.webp"
-        preview_rel_path = f"processed/previews/{preview_filename}"
+        preview_rel_path = self.preview_rel_path(original_path)
 
         # 完整路径
         file_full_path = os.path.join(self.scan_path, original_path)
@@ -256,124 +431,171 @@ class AssetProcessor:
         logger.debug(f"生成预览图 - 目标: {preview_full_path}")
 
         # 生成预览图
-        if PreviewGeneratorFactory.generate(asset.asset_type, file_full_path, preview_full_path):
+        if analysis.render_preview(preview_full_path):
             asset.preview_path = preview_rel_path
-            self.db.commit()
+            self.record_derivative_version(asset, 'preview', file_full_path)
             logger.info(f"预览图生成成功: {preview_rel_path}")
             return True
         else:
             logger.warning(f"预览图生成失败: {original_path}")
             return False
 
-    def send_async_tasks(self, asset: Asset, file_path: str, tags: dict = None):
-        """发送相关异步任务 (Phash, Geocoding)
+    def generate_deep_zoom(self, asset: Asset, original_path: str, analysis: AssetAnalysis) -> bool:
+        """为超过像素阈值的图片生成 DZI 切片金字塔
+
+        与预览图共用任务开关；该类型不生成切片或未达到阈值时不写 deep_zoom。
 
         Args:
             asset: 素材对象
+            original_path: 原始文件相对路径
+            analysis: 该素材的分析上下文（复用其原尺寸解码结果）
+
+        Returns:
+            是否已生成切片
+        """
+        if not self.is_task_enabled('preview'):
+            return False
+
+        rel_base = self.deep_zoom_rel_base(asset.asset_type, original_path)
+        if rel_base is None:
+            return False
+
+        info = analysis.render_deep_zoom(os.path.join(self.scan_path, rel_base))
+        asset.deep_zoom = self.deep_zoom_record(info, rel_base)
+        if asset.deep_zoom is None:
+            return False
+        logger.info(f"Deep Zoom 切片生成成功: {asset.deep_zoom['dzi']}")
+        return True
+
+    @staticmethod
+    def apply_perceptual_hashes(asset: Asset, hashes: Optional[Dict[str, str]]) -> bool:
+        """把导入时已算好的感知哈希写到素材对象上（不提交）
+
+        Returns:
+            是否已写入（写入后无需再发送 phash 异步任务）
+        """
+        if not hashes:
+            return False
+        asset.phash = hashes.get('phash')
+        asset.dhash = hashes.get('dhash')
+        asset.average_hash = hashes.get('average_hash')
+        asset.colorhash = hashes.get('colorhash')
+        return True
+
+    def compute_perceptual_hashes(self, asset: Asset, analysis: AssetAnalysis) -> bool:
+        """基于分析上下文同步计算图片/视频感知哈希，只写到素材对象上（不提交）
+
+        Returns:
+            是否已计算并保存（不支持的类型或提取失败返回 False，仍走异步任务）
+        """
+        if not self.is_task_enabled('phash'):
+            return False
+
+        if not self.apply_perceptual_hashes(asset, analysis.perceptual_hashes()):
+            return False
+
+        logger.debug(f"Phash 已在导入时计算 - Asset ID: {asset.id}")
+        return True
+
+    def plan_async_tasks(
+        self,
+        asset: Asset,
+        file_path: str,
+        tags: dict = None,
+        phash_ready: bool = False
+    ) -> List[dict]:
+        """规划需要发送的异步任务（不落库、不发送）
+
+        Args:
+            asset: 素材对象（需已有 ID）
             file_path: 文件完整路径
             tags: 标签字典（可选，用于地理编码）
+            phash_ready: 感知哈希是否已在导入时算好（是则不再规划 phash 任务）
+
+        Returns:
+            task_logs 行数据列表（可直接用于 TaskLog(**row) 或批量 INSERT）
         """
+        tasks = []
+
         # 1. Phash 任务
-        if TaskDefinitionService.is_enabled(self.db, 'phash'):
-            self._send_phash_task(asset, file_path)
+        if phash_ready:
+            logger.debug(f"跳过 phash 异步任务（已同步计算）: asset {asset.id}")
+        elif self.is_task_enabled('phash'):
+            tasks.append(self._task_log_row(
+                asset, 'phash',
+                {'file_path': file_path, 'asset_type': asset.asset_type},
+                max_retries=0,
+            ))
         else:
             logger.debug(f"跳过 phash（任务已关闭）: asset {asset.id}")
 
         # 2. Geocoding 任务
         if tags and 'gps_latitude' in tags and 'gps_longitude' in tags:
-            if TaskDefinitionService.is_enabled(self.db, 'geocoding'):
-                self._send_geocoding_task(asset, tags)
-            else:
+            if not self.is_task_enabled('geocoding'):
                 logger.debug(f"跳过地理编码（任务已关闭）: asset {asset.id}")
+                return tasks
+            latitude = self._parse_coordinate(tags.get('gps_latitude', ''), tags.get('gps_latitude_ref'))
+            longitude = self._parse_coordinate(tags.get('gps_longitude', ''), tags.get('gps_longitude_ref'))
+            if latitude is not None and longitude is not None:
+                tasks.append(self._task_log_row(
+                    asset, 'geocoding',
+                    {'latitude': latitude, 'longitude': longitude},
+                    max_retries=3,
+                ))
+
+        return tasks
 
-    def _send_phash_task(self, asset: Asset, file_path: str) -> None:
-        try:
-            task_log = TaskLog(
-                task_type='phash',
-                task_status='pending',
-                asset_id=asset.id,
-                task_params={'file_path': file_path, 'asset_type': asset.asset_type},
-                retry_count=0,
-                max_retries=0,
-                created_at=datetime.now(),
-            )
-            self.db.add(task_log)
-            self.db.commit()
+    @staticmethod
+    def _task_log_row(asset: Asset, task_type: str, task_params: dict, max_retries: int) -> dict:
+        return {
+            'task_type': task_type,
+            'task_status': 'pending',
+            'asset_id': asset.id,
+            'task_params': task_params,
+            'retry_count': 0,
+            'max_retries': max_retries,
+            'created_at': datetime.now(),
+        }
+
+    @staticmethod
+    def dispatch_async_task(task: dict, task_log_id: Optional[int] = None) -> None:
+        """把已落库的任务投递到任务队列
+
+        Args:
+            task: plan_async_tasks 返回的任务行数据
+            task_log_id: 对应 task_logs 记录 ID（地理编码任务回写状态用）
+        """
+        params = task['task_params']
+        if task['task_type'] == 'phash':
             run_coroutine_sync(
                 calculate_phash_task.kiq(
-                    asset_id=asset.id,
-                    file_path=file_path,
-                    asset_type=asset.asset_type,
+                    asset_id=task['asset_id'],
+                    file_path=params['file_path'],
+                    asset_type=params['asset_type'],
                 )
             )
-            logger.debug(f"Phash 异步任务已发送 - Asset ID: {asset.id}")
-        except Exception as e:
-            logger.warning(
-                f"Phash 异步任务发送失败 - Asset ID: {asset.id}: {e}",
-                exc_info=True,
-            )
-
-    def _send_geocoding_task(self, asset: Asset, tags: dict) -> None:
-        try:
-            lat_ref = tags.get('gps_latitude_ref')
-            lon_ref = tags.get('gps_longitude_ref')
-            latitude = self._parse_coordinate(tags.get('gps_latitude', ''), lat_ref)
-            longitude = self._parse_coordinate(tags.get('gps_longitude', ''), lon_ref)
-            if latitude is None or longitude is None:
-                return
-            task_log = TaskLog(
-                task_type='geocoding',
-                task_status='pending',
-                asset_id=asset.id,
-                task_params={'latitude': latitude, 'longitude': longitude},
-                retry_count=0,
-                max_retries=3,
-                created_at=datetime.now(),
-            )
-            self.db.add(task_log)
-            self.db.commit()
+            logger.debug(f"Phash 异步任务已发送 - Asset ID: {task['asset_id']}")
+        elif task['task_type'] == 'geocoding':
             run_coroutine_sync(
                 calculate_location_task.kiq(
-                    asset_id=asset.id,
-                    longitude=longitude,
-                    latitude=latitude,
-                    task_log_id=task_log.id,
+                    asset_id=task['asset_id'],
+                    longitude=params['longitude'],
+                    latitude=params['latitude'],
+                    task_log_id=task_log_id,
                 )
             )
-            logger.debug(f"地理编码异步任务已发送 - Asset ID: {asset.id}")
-        except Exception as e:
-            logger.warning(
-                f"地理编码异步任务发送失败 - Asset ID: {asset.id}: {e}",
-                exc_info=True,
-            )
+            logger.debug(f"地理编码异步任务已发送 - Asset ID: {task['asset_id']}")
 
-    def process_asset(self, asset: Asset, original_path: str) -> bool:
-        """处理单个素材（一站式方法）
+    def render_derivatives(self, asset: Asset, original_path: str, analysis: AssetAnalysis) -> bool:
+        """生成缩略图、预览图与感知哈希，只写到素材对象上（不提交）
 
-        Args:
-            asset: 素材对象
-            original_path: 原始文件相对路径
+        供批量写入使用：素材记录尚未落库，由调用方统一 INSERT。
 
         Returns:
-            是否完全成功
+            感知哈希是否已在导入时算好
         """
-        file_full_path = os.path.join(self.scan_path, original_path)
-
-        # 1. 提取元数据
-        metadata, shot_at = self.extract_metadata(asset.asset_type, file_full_path)
-
-        # 2. 保存标签（包括地理位置信息）
-        mapped_tags = {}
-        if metadata:
-            mapped_tags = self.save_tags(asset, metadata)
-
-        # 3. 生成缩略图
-        self.generate_thumbnail(asset, original_path)
-
-        # 4. 生成预览图（针对 HEIC 等浏览器不支持的格式）
-        self.generate_preview(asset, original_path)
-
-        # 5. 发送异步任务
-        self.send_async_tasks(asset, file_full_path, mapped_tags)
-
-        return True
+        self.generate_thumbnail(asset, original_path, analysis)
+        self.generate_storyboard(asset, original_path, analysis)
+        self.generate_preview(asset, original_path, analysis)
+        self.generate_deep_zoom(asset, original_path, analysis)
+        return self.compute_perceptual_hashes(asset, analysis)
@@ -0,0 +1,305 @@
+"""分布式扫描导入
+
+单个导入作业只能由一个进程执行，增加 Worker 节点对大目录首次导入没有帮助。
+分布式扫描（job_type=sharded_scan）把目录树切成分片，每个分片作为独立的 Taskiq 任务：
+
+- 协调：作业任务领取作业后规划分片（ShardPlanner，仅 stat），写入 ingestion_job_shards，逐个投递分片任务；
+  需要新建相册时先建好，分片统一按 album_id 关联，避免各分片重复创建同名相册
+- 执行：任意 Worker 领取分片，按分片的扫描范围运行导入流程，检查点写回分片并把所有分片的进度汇总到作业记录
+- 去重：分片之间按 file_hash 加跨进程锁（AssetHashLock），同内容文件只入库一次
+- 暂停/续跑：暂停请求在各分片的下一个检查点生效；续跑重新投递作业任务，由其重新排队未完成的分片
+- 结束：最后一个结束的分片汇总作业状态（有失败分片则 failed，有暂停分片则 paused，否则 done）
+"""
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from ...config import settings
+from ...db import SessionLocal
+from ...model import IngestionJob, IngestionJobShard
+from ...tools.utils import get_logger
+from ..album import AlbumService
+from ..scanning import ShardPlanner
+from .importer import AssetImportService
+from .jobs import IngestionJobService
+from .statistics import ImportCheckpoint, ImportStatistics
+
+logger = get_logger(__name__)
+
+# 进度汇总：作业计数 = 所有分片之和
+_SUMMED_COLUMNS = (
+    'files_total', 'files_done', 'files_imported', 'files_skipped', 'files_failed', 'bytes_total', 'bytes_done',
+)
+
+
+class ShardedScanService:
+    """分布式扫描导入的分片规划、投递、执行与汇总"""
+
+    @staticmethod
+    def dispatch(job_db: Session, job: IngestionJob) -> Dict:
+        """规划并投递分片（作业任务中调用，作业已被领取为 running）
+
+        首次执行时规划分片；续跑时重新排队已暂停、失败或 Worker 中断的分片。
+
+        Returns:
+            执行结果 {'job_id', 'status', 'summary'}
+        """
+        shards = ShardedScanService.list_shards(job_db, job.id)
+        if not shards:
+            shards = ShardedScanService._plan(job_db, job)
+            to_run = shards
+        else:
+            to_run = [
+                shard for shard in shards
+                if shard.status in ('paused', 'failed') or ShardedScanService.is_stale(shard)
+            ]
+            for shard in to_run:
+                shard.status = 'queued'
+                shard.error_message = None
+                shard.finished_at = None
+            job_db.commit()
+
+        for shard in to_run:
+            ShardedScanService._enqueue(job_db, shard)
+
+        # 没有可执行的分片（空目录、全部投递失败）时直接结束作业
+        ShardedScanService._finalize(job_db, job.id)
+
+        summary = f"已投递 {len(to_run)}/{len(shards)} 个分片"
+        logger.info(f"分布式导入作业{summary} - Job ID: {job.id}")
+        return {'job_id': job.id, 'status': 'dispatched', 'summary': summary}
+
+    @staticmethod
+    def list_shards(db: Session, job_id: int) -> List[IngestionJobShard]:
+        return db.query(IngestionJobShard).filter(
+            IngestionJobShard.job_id == job_id
+        ).order_by(IngestionJobShard.id).all()
+
+    @staticmethod
+    def is_stale(shard: IngestionJobShard) -> bool:
+        """排队或运行中的分片长时间未更新（任务丢失或 Worker 中断）"""
+        if shard.status not in ('queued', 'running') or not shard.updated_at:
+            return False
+        return datetime.now() - shard.updated_at > timedelta(seconds=IngestionJobService.STALE_SECONDS)
+
+    @staticmethod
+    def run_shard(shard_id: int) -> Dict:
+        """执行分片（Worker 中调用，阻塞直到分片导入结束或在检查点暂停）
+
+        与 IngestionJobService.run 相同，导入与进度更新使用两个会话。
+
+        Returns:
+            执行结果 {'shard_id', 'status', 'summary'}
+        """
+        db = SessionLocal()
+        job_db = SessionLocal()
+        job_id = None
+        try:
+            # 1. 领取分片（只处理排队中的分片，避免重复投递时并发执行）
+            claimed = job_db.query(IngestionJobShard).filter(
+                IngestionJobShard.id == shard_id,
+                IngestionJobShard.status == 'queued',
+            ).update({
+                'status': 'running',
+                'started_at': datetime.now(),
+                'worker': f"{socket.gethostname()}:{os.getpid()}"[:100],
+            })
+            job_db.commit()
+            if not claimed:
+                logger.info(f"分片不在排队状态，跳过 - Shard ID: {shard_id}")
+                return {'shard_id': shard_id, 'status': 'skipped', 'summary': None}
+
+            shard = job_db.query(IngestionJobShard).filter(IngestionJobShard.id == shard_id).one()
+            job_id = shard.job_id
+            job = IngestionJobService.get_job(job_db, job_id)
+
+            # 作业已请求暂停或已结束：分片不再执行
+            if job.pause_requested or job.status != 'running':
+                shard.status = 'paused'
+                job_db.commit()
+                ShardedScanService._finalize(job_db, job_id)
+                return {'shard_id': shard_id, 'status': 'paused', 'summary': None}
+
+            base = ImportCheckpoint(
+                checkpoint_path=shard.checkpoint_path,
+                files_done=shard.files_done,
+                bytes_done=shard.bytes_done,
+                imported=shard.files_imported,
+                skipped=shard.files_skipped,
+                failed=shard.files_failed,
+            )
+            planned_files, planned_bytes = shard.files_total, shard.bytes_total
+            logger.info(
+                f"分片开始 - Job ID: {job_id}, Shard ID: {shard_id}, "
+                f"范围: {len(shard.scopes)} 个目录, 检查点: {base.checkpoint_path or '无'}"
+            )
+
+            # 2. 每个检查点写回分片进度、汇总到作业，并读取作业的暂停请求
+            started = time.monotonic()
+
+            def on_checkpoint(checkpoint: ImportCheckpoint, statistics: ImportStatistics) -> bool:
+                try:
+                    IngestionJobService._apply_progress(shard, base, checkpoint, statistics, time.monotonic() - started)
+                    if not statistics.scan_complete:
+                        # 扫描未完成时以规划时的统计为准
+                        shard.files_total = max(shard.files_total, planned_files)
+                        shard.bytes_total = max(shard.bytes_total, planned_bytes)
+                    job_db.flush()
+                    ShardedScanService._aggregate(job_db, job_id)
+                    job_db.commit()
+                    return not job.pause_requested  # 提交后属性已过期，此处重新读取
+                except Exception:
+                    job_db.rollback()
+                    raise
+
+            config = IngestionJobService._build_config(job.params, db, base.checkpoint_path, on_checkpoint)
+            config.scan_scopes = [(rel_dir, bool(recursive)) for rel_dir, recursive in shard.scopes]
+            config.distributed_dedupe = True
+            config.lock_wait_seconds = settings.INGESTION_LOCK_WAIT_SECONDS
+            job_db.commit()  # 结束读事务，导入期间不长时间持有快照
+            statistics = AssetImportService(config).import_assets()
+
+            # 3. 结束：暂停（检查点回调要求停止）或完成，再汇总作业状态
+            shard.status = 'paused' if statistics.stopped else 'done'
+            if not statistics.stopped:
+                shard.scan_complete = True
+                shard.finished_at = datetime.now()
+            job_db.flush()
+            ShardedScanService._aggregate(job_db, job_id)
+            job_db.commit()
+            ShardedScanService._finalize(job_db, job_id)
+
+            summary = statistics.get_summary()
+            logger.info(f"分片{'已暂停' if statistics.stopped else '完成'} - Job ID: {job_id}, Shard ID: {shard_id}, {summary}")
+            return {'shard_id': shard_id, 'status': shard.status, 'summary': summary}
+
+        except Exception as e:
+            logger.error(f"分片执行失败 - Shard ID: {shard_id}: {e}", exc_info=True)
+            db.rollback()
+            job_db.rollback()
+            job_db.query(IngestionJobShard).filter(IngestionJobShard.id == shard_id).update({
+                'status': 'failed',
+                'error_message': str(e),
+                'finished_at': datetime.now(),
+            })
+            job_db.commit()
+            if job_id is not None:
+                ShardedScanService._aggregate(job_db, job_id)
+                job_db.commit()
+                ShardedScanService._finalize(job_db, job_id)
+            return {'shard_id': shard_id, 'status': 'failed', 'summary': str(e)}
+        finally:
+            db.close()
+            job_db.close()
+
+    @staticmethod
+    def _plan(job_db: Session, job: IngestionJob) -> List[IngestionJobShard]:
+        """规划分片、预建相册并写入分片记录"""
+        params = dict(job.params)
+        max_files = params.get('shard_max_files') or settings.INGESTION_SHARD_MAX_FILES
+        planned = ShardPlanner.plan(params['scan_path'], max_files)
+
+        if params.get('import_to_album') and not params.get('album_id'):
+            album, action = AlbumService.get_or_create_album(
+                db=job_db,
+                album_name=params.get('album_name'),
+                created_by=params['created_by'],
+                visibility=params.get('visibility', 'general'),
+                start_time=datetime.fromisoformat(params['album_start_time']) if params.get('album_start_time') else None,
+                end_time=datetime.fromisoformat(params['album_end_time']) if params.get('album_end_time') else None,
+            )
+            if not album:
+                raise RuntimeError(f"相册创建失败: {params.get('album_name')}")
+            logger.info(f"分布式导入使用相册: {album.name} (ID={album.id}, {action})")
+            params['album_id'] = album.id
+            params['album_name'] = None
+            job.params = params
+
+        shards = [
+            IngestionJobShard(
+                job_id=job.id,
+                scopes=[[rel_dir, recursive] for rel_dir, recursive in shard.scopes],
+                status='queued',
+                files_total=shard.file_count,
+                bytes_total=shard.byte_count,
+            )
+            for shard in planned
+        ]
+        job_db.add_all(shards)
+        job.files_total = sum(shard.file_count for shard in planned)
+        job.bytes_total = sum(shard.byte_count for shard in planned)
+        job.scan_complete = True  # 规划时已遍历整棵目录树
+        job_db.commit()
+        return shards
+
+    @staticmethod
+    def _enqueue(job_db: Session, shard: IngestionJobShard) -> None:
+        """投递分片任务；投递失败则标记分片失败（作业可续跑）"""
+        from ...tasks.ingestion_tasks import run_ingestion_shard_task
+        from ...tasks.sender import run_coroutine_sync
+
+        try:
+            run_coroutine_sync(run_ingestion_shard_task.kiq(shard_id=shard.id))
+        except Exception as e:
+            logger.error(f"分片投递失败 - Shard ID: {shard.id}: {e}")
+            shard.status = 'failed'
+            shard.error_message = f"分片投递失败: {e}"
+            job_db.commit()
+
+    @staticmethod
+    def _aggregate(job_db: Session, job_id: int) -> None:
+        """把所有分片的进度汇总到作业记录（单条 UPDATE，多个 Worker 并发写回时互不覆盖）"""
+        def summed(column):
+            return select(func.coalesce(func.sum(column), 0)).where(
+                IngestionJobShard.job_id == job_id
+            ).scalar_subquery()
+
+        def running_rate(column):
+            return select(func.sum(column)).where(
+                IngestionJobShard.job_id == job_id,
+                IngestionJobShard.status == 'running',
+            ).scalar_subquery()
+
+        values = {name: summed(getattr(IngestionJobShard, name)) for name in _SUMMED_COLUMNS}
+        values['files_per_second'] = running_rate(IngestionJobShard.files_per_second)
+        values['bytes_per_second'] = running_rate(IngestionJobShard.bytes_per_second)
+        job_db.execute(
+            update(IngestionJob).where(IngestionJob.id == job_id).values(**values),
+            execution_options={'synchronize_session': False},
+        )
+
+    @staticmethod
+    def _finalize(job_db: Session, job_id: int) -> None:
+        """所有分片都已结束时结束作业（多个分片同时结束时，至少最后提交的一个能看到全部结束）"""
+        statuses = [
+            status for (status,) in job_db.query(IngestionJobShard.status).filter(
+                IngestionJobShard.job_id == job_id
+            ).all()
+        ]
+        if any(status in ('queued', 'running') for status in statuses):
+            job_db.commit()
+            return
+
+        failed = statuses.count('failed')
+        if failed:
+            status = 'failed'
+        elif 'paused' in statuses:
+            status = 'paused'
+        else:
+            status = 'done'
+
+        values = {'status': status, 'pause_requested': False}
+        if status != 'paused':
+            values['finished_at'] = datetime.now()
+        if failed:
+            values['error_message'] = f"{failed}/{len(statuses)} 个分片失败，可续跑重试"
+        updated = job_db.query(IngestionJob).filter(
+            IngestionJob.id == job_id,
+            IngestionJob.status == 'running',
+        ).update(values)
+        job_db.commit()
+        if updated:
+            logger.info(f"分布式导入作业结束 - Job ID: {job_id}, 状态: {status}, 分片数: {len(statuses)}")
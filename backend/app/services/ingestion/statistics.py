@@ -1,6 +1,6 @@
 """导入统计结果"""
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
@@ -15,6 +15,11 @@ class ImportStatistics:
     imported: int = 0  # 成功导入数
     skipped: int = 0  # 跳过数（去重）
     failed: int = 0  # 失败数
+    hash_reused: int = 0  # 扫描清单命中数（签名未变化，免读取文件内容）
+    resumed: int = 0  # 从检查点续跑时跳过的已处理文件数（不计入 total）
+    total_bytes: int = 0  # 扫描到的文件总字节数
+    scan_complete: bool = False  # 目录是否已扫描完毕
+    stopped: bool = False  # 是否按检查点回调要求提前停止（未处理的文件留待续跑）
 
     # 失败记录
     failed_files: List[tuple] = field(default_factory=list)  # [(路径, 错误信息)]
@@ -27,6 +32,10 @@ class ImportStatistics:
         """记录跳过（去重）"""
         self.skipped += 1
 
+    def record_hash_reused(self):
+        """记录扫描清单命中"""
+        self.hash_reused += 1
+
     def record_failure(self, file_path: str, error: str):
         """记录失败
 
@@ -44,9 +53,28 @@ class ImportStatistics:
             f"总数: {self.total}, "
             f"成功: {self.imported}, "
             f"跳过: {self.skipped}, "
-            f"失败: {self.failed}"
+            f"失败: {self.failed}, "
+            f"清单命中: {self.hash_reused}"
+            + (f", 续跑跳过: {self.resumed}" if self.resumed else "")
+            + (", 已暂停" if self.stopped else "")
         )
 
     def has_failures(self) -> bool:
         """是否有失败记录"""
         return self.failed > 0
+
+
+@dataclass
+class ImportCheckpoint:
+    """导入检查点
+
+    按扫描顺序，checkpoint_path 及之前的文件均已处理完成（入库记录已提交或已跳过/失败）；
+    计数只统计这些文件，续跑时从 checkpoint_path 之后开始即可不重不漏。
+    """
+
+    checkpoint_path: Optional[str] = None  # 扫描顺序中最后一个已处理完成的文件（相对扫描路径）
+    files_done: int = 0  # 已处理完成的文件数
+    bytes_done: int = 0  # 已处理完成的字节数
+    imported: int = 0  # 其中成功导入数
+    skipped: int = 0  # 其中跳过数
+    failed: int = 0  # 其中失败数
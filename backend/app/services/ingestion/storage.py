@@ -14,12 +14,15 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import List
 import os
 import re
-import shutil
 import tempfile
+import uuid
 from pathlib import Path, PurePosixPath
 
+from ...tools.file_copy import STAGE_STRATEGIES, stage_file
+from ...tools.file_hash import StreamingFileHasher
 from ...tools.utils import get_logger
 
 logger = get_logger(__name__)
@@ -38,6 +41,39 @@ class StagedAssetFile:
     local_path: str
 
 
+@dataclass(frozen=True)
+class StreamedAssetFile:
+    """流式写入完成的文件（已在最终的内容寻址路径上）
+
+    Attributes:
+        staged: 入库路径信息
+        file_hash: 写入时同步计算的文件哈希
+        original_filename: 上传时的原始文件名
+        created: 是否由本次写入新建（False 表示该路径已存在同内容文件）
+    """
+
+    staged: StagedAssetFile
+    file_hash: str
+    original_filename: str
+    created: bool
+
+
+class StreamingStage(ABC):
+    """流式入库写入器：数据只写一次，边写边算哈希，完成后按哈希落到最终路径"""
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None:
+        """写入一段数据"""
+
+    @abstractmethod
+    def commit(self) -> StreamedAssetFile:
+        """写入完成：计算哈希并移动到内容寻址路径"""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """放弃写入并清理临时数据"""
+
+
 class AssetStorageBackend(ABC):
     """存储后端策略接口"""
 
@@ -58,16 +94,43 @@ class AssetStorageBackend(ABC):
     def ensure_staged(self, staged: StagedAssetFile, source_full_path: str) -> None:
         """执行入库动作（复制/上传等），保证 staged.local_path 可用"""
 
+    @abstractmethod
+    def open_stream(self, original_filename: str) -> StreamingStage:
+        """打开流式入库写入器（上传数据直接写入存储，不经过临时目录）"""
+
+    @abstractmethod
+    def discard(self, streamed: StreamedAssetFile) -> None:
+        """删除本次流式写入新建的文件（如判定为重复备份时）"""
+
+    @abstractmethod
+    def partial_path(self, upload_id: str) -> str:
+        """断点续传的分块数据文件路径（位于存储内，与最终路径同一文件系统）"""
+
+    @abstractmethod
+    def adopt(self, partial_path: str, original_filename: str, file_hash: str) -> StreamedAssetFile:
+        """把已写完、已算好哈希的文件移动到内容寻址路径（已移动过时直接返回，finalize 重试可重入）"""
+
+    @abstractmethod
+    def managed_paths(self) -> List[str]:
+        """由系统写入的本地目录（入库原件、衍生文件、上传临时文件），目录监控需排除"""
+
 
 class LocalNasStorage(AssetStorageBackend):
-    """本地 NAS 存储策略（当前默认实现）"""
+    """本地 NAS 存储策略（当前默认实现）
+
+    源文件不在 NAS 内时按 stage_strategy 入库：copy（内核态复制）、reflink（写时复制）、
+    hardlink（硬链接），后两者在跨设备或文件系统不支持时自动退回，见 tools/file_copy.py。
+    """
 
     _WINDOWS_FORBIDDEN_CHARS_RE = re.compile(r'[<>:"/\\\\|?*\x00-\x1F]')
 
-    def __init__(self, nas_root: str) -> None:
+    def __init__(self, nas_root: str, stage_strategy: str = "copy") -> None:
         if not nas_root:
             raise ValueError("NAS 根目录不能为空")
+        if stage_strategy not in STAGE_STRATEGIES:
+            raise ValueError(f"不支持的入库策略: {stage_strategy}，可选: {', '.join(STAGE_STRATEGIES)}")
         self._nas_root = Path(nas_root).expanduser().resolve()
+        self._stage_strategy = stage_strategy
 
     @property
     def processing_root(self) -> Path:
@@ -99,6 +162,55 @@ class LocalNasStorage(AssetStorageBackend):
             return
         self._ensure_copied_to_nas(str(source), staged.stored_path)
 
+    def open_stream(self, original_filename: str) -> StreamingStage:
+        self.ensure_ready()
+        return _LocalStreamingStage(self, original_filename)
+
+    def discard(self, streamed: StreamedAssetFile) -> None:
+        if not streamed.created:
+            return
+        try:
+            os.remove(streamed.staged.local_path)
+        except FileNotFoundError:
+            pass
+
+    def partial_path(self, upload_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            raise ValueError(f"非法上传ID: {upload_id}")
+        incoming = self._nas_root / _LocalStreamingStage.INCOMING_DIR
+        incoming.mkdir(parents=True, exist_ok=True)
+        return str(incoming / f"{upload_id}.part")
+
+    def adopt(self, partial_path: str, original_filename: str, file_hash: str) -> StreamedAssetFile:
+        stored_path = self._build_destination_relative_path(file_hash, original_filename)
+        dest = self._nas_root / Path(stored_path)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        created = True
+        if not os.path.exists(partial_path) and dest.exists():
+            # 上次 finalize 已移动完成（之后中断或导入失败），直接沿用；无法区分是否由上次新建，按已存在处理不删除
+            created = False
+        elif dest.exists() and dest.stat().st_size == os.path.getsize(partial_path):
+            # 同名同内容文件已入库，丢弃本次写入
+            os.remove(partial_path)
+            created = False
+        else:
+            os.replace(partial_path, dest)
+
+        return StreamedAssetFile(
+            staged=StagedAssetFile(stored_path=stored_path, local_path=str(dest)),
+            file_hash=file_hash,
+            original_filename=original_filename,
+            created=created,
+        )
+
+    def managed_paths(self) -> List[str]:
+        return [
+            str(self._nas_root / "original"),
+            str(self._nas_root / "processed"),
+            str(self._nas_root / _LocalStreamingStage.INCOMING_DIR),
+        ]
+
     def _is_under_nas(self, source: Path) -> bool:
         try:
             source.relative_to(self._nas_root)
@@ -132,16 +244,13 @@ class LocalNasStorage(AssetStorageBackend):
             except OSError:
                 pass
 
-        tmp_fd, tmp_path = tempfile.mkstemp(
-            prefix=f"{dest.name}.",
-            suffix=".tmp",
-            dir=str(dest.parent)
-        )
-        os.close(tmp_fd)
+        # 硬链接 / reflink 要求目标不存在，临时文件只取名不创建
+        tmp_path = str(dest.parent / f"{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
 
         try:
-            shutil.copy2(source, tmp_path)
+            method = stage_file(str(source), tmp_path, self._stage_strategy)
             os.replace(tmp_path, dest)
+            logger.debug(f"入库完成（{method}）: {source} -> {dest_relative_path}")
             return dest_relative_path
         finally:
             try:
@@ -180,6 +289,46 @@ class LocalNasStorage(AssetStorageBackend):
         return f"{stem}{suffix}".rstrip(" .")
 
 
+class _LocalStreamingStage(StreamingStage):
+    """本地 NAS 流式写入：先写入 NAS 内的临时文件（与目标同一文件系统），完成后原子改名"""
+
+    INCOMING_DIR = ".incoming"
+
+    def __init__(self, storage: LocalNasStorage, original_filename: str) -> None:
+        self._storage = storage
+        self._original_filename = original_filename
+        self._hasher = StreamingFileHasher()
+
+        incoming = storage.processing_root / self.INCOMING_DIR
+        incoming.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(prefix="upload.", suffix=".tmp", dir=str(incoming))
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hasher.update(chunk)
+
+    def commit(self) -> StreamedAssetFile:
+        try:
+            self._file.close()
+            # 大文件采样哈希包含 mtime，取写入完成后的值（改名不改变 mtime）
+            file_hash = self._hasher.hexdigest(os.path.getmtime(self._tmp_path))
+            return self._storage.adopt(self._tmp_path, self._original_filename, file_hash)
+        except Exception:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            try:
+                if os.path.exists(self._tmp_path):
+                    os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+
 class IngestionStorageFactory:
     """存储后端工厂（Factory）
 
@@ -187,11 +336,11 @@ class IngestionStorageFactory:
     """
 
     @classmethod
-    def create(cls, provider_name: str, nas_root: str) -> AssetStorageBackend:
+    def create(cls, provider_name: str, nas_root: str, stage_strategy: str = "copy") -> AssetStorageBackend:
         provider = (provider_name or "local").lower()
 
         if provider == "local":
-            return LocalNasStorage(nas_root)
+            return LocalNasStorage(nas_root, stage_strategy)
 
         if provider == "oss":
             raise NotImplementedError("ASSET_STORAGE_PROVIDER=oss 尚未实现")
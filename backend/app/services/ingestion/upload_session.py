@@ -0,0 +1,285 @@
+"""断点续传上传会话
+
+大文件分块上传：创建会话 → 按偏移量追加分块 → finalize。
+已接收的数据直接写在存储内的分块文件中（与最终路径同一文件系统），
+finalize 时一次读取同时完成完整 SHA256 校验与去重哈希计算，再原子移动到内容寻址路径。
+同一会话的并发 PATCH 由分块文件上的排他 flock 串行化，偏移量在持锁后校验。
+
+finalize 状态流转：uploading →（条件更新领取）finalizing →（移动到内容寻址路径）→ completed；
+导入失败回到 stored（文件已在最终路径，重试 finalize 直接重新导入），中断后超过 FINALIZE_STALE_SECONDS 可重新领取。
+"""
+import fcntl
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from ...model import UploadSession
+from ...tools.file_hash import CHUNK_SIZE, StreamingFileHasher
+from ...tools.utils import get_logger
+from ..scanning import FilesystemScanner
+from .storage import AssetStorageBackend, StreamedAssetFile
+
+logger = get_logger(__name__)
+
+
+class UploadOffsetConflict(ValueError):
+    """偏移量与已接收字节数不一致，或其他请求正在写入同一会话"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadFinalizeConflict(ValueError):
+    """会话不能领取 finalize（其他请求正在 finalize，或会话已结束）"""
+
+
+class UploadChunkWriter:
+    """单次 PATCH 的分块写入器：追加写入分块文件，持有分块文件排他锁，关闭时更新已接收字节数并释放锁"""
+
+    def __init__(self, service: 'UploadSessionService', session: UploadSession, handle: BinaryIO):
+        self._service = service
+        self._session = session
+        self._handle = handle
+        self._offset = handle.tell()
+
+    def write(self, chunk: bytes) -> None:
+        if self._offset + len(chunk) > self._session.total_size:
+            raise ValueError(f"数据超出声明的文件大小: {self._session.total_size}")
+        self._handle.write(chunk)
+        self._offset += len(chunk)
+
+    def close(self) -> int:
+        """关闭并提交进度（中途断开时已写入的部分同样保留）
+
+        Returns:
+            当前已接收字节数
+        """
+        self._handle.close()  # 关闭文件同时释放 flock
+        self._session.received_size = self._service.current_offset(self._session)
+        self._service.db.commit()
+        return self._session.received_size
+
+
+class UploadSessionService:
+    """上传会话服务
+
+    职责：
+    - 创建/查询/取消会话
+    - 校验偏移量并追加分块
+    - finalize：校验大小与哈希，移动到内容寻址路径，交给导入服务
+    """
+
+    # finalize 中的会话超过该时长未更新，视为进程已中断，可重新领取（大视频导入可能较久，留足余量）
+    FINALIZE_STALE_SECONDS = 1800
+
+    def __init__(self, db: Session, storage: AssetStorageBackend):
+        """初始化会话服务
+
+        Args:
+            db: 数据库会话
+            storage: 存储后端（分块文件与最终文件都在其中）
+        """
+        self.db = db
+        self.storage = storage
+
+    def create(
+        self,
+        filename: str,
+        total_size: int,
+        created_by: int,
+        expected_hash: Optional[str] = None,
+        import_options: Optional[Dict] = None
+    ) -> UploadSession:
+        """创建上传会话
+
+        Raises:
+            ValueError: 不支持的文件格式
+        """
+        FilesystemScanner.get_asset_type(os.path.splitext(filename)[1])
+
+        session = UploadSession(
+            upload_id=uuid.uuid4().hex,
+            filename=filename,
+            total_size=total_size,
+            received_size=0,
+            expected_hash=expected_hash.lower() if expected_hash else None,
+            status='uploading',
+            created_by=created_by,
+            import_options=import_options or {},
+        )
+        open(self.storage.partial_path(session.upload_id), 'wb').close()
+        self.db.add(session)
+        self.db.commit()
+        self.db.refresh(session)
+        logger.info(f"创建上传会话 {session.upload_id}: {filename} ({total_size} 字节)")
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        return self.db.query(UploadSession).filter(UploadSession.upload_id == upload_id).first()
+
+    def current_offset(self, session: UploadSession) -> int:
+        """已接收字节数（以分块文件实际大小为准，进程崩溃后仍可恢复）"""
+        if session.status != 'uploading':
+            return session.received_size
+        try:
+            return os.path.getsize(self.storage.partial_path(session.upload_id))
+        except FileNotFoundError:
+            return 0
+
+    def open_chunk_writer(self, session: UploadSession, offset: int) -> UploadChunkWriter:
+        """在指定偏移量处开始追加分块
+
+        先对分块文件加排他锁（非阻塞），持锁后按文件实际大小校验偏移量，
+        避免两个并发请求都通过校验后重复追加同一段数据。
+
+        Raises:
+            UploadOffsetConflict: 其他请求正在写入，或偏移量与已接收字节数不一致
+            ValueError: 会话不在上传中
+        """
+        if session.status != 'uploading':
+            raise ValueError(f"上传会话状态为 {session.status}，不能继续上传")
+
+        try:
+            # 不用追加模式打开：分块文件已被 finalize 移走时不能重新创建空文件
+            handle = open(self.storage.partial_path(session.upload_id), 'r+b')
+        except FileNotFoundError:
+            raise ValueError("上传会话已 finalize，不能继续上传")
+        try:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadOffsetConflict("其他请求正在上传该会话", self.current_offset(session))
+            # 持锁后重新读取状态：finalize 持同一把锁，领取后这里不会再写入
+            self.db.refresh(session)
+            if session.status != 'uploading':
+                raise ValueError(f"上传会话状态为 {session.status}，不能继续上传")
+            current = handle.seek(0, os.SEEK_END)
+            if offset != current:
+                raise UploadOffsetConflict(f"偏移量不一致: 请求 {offset}，已接收 {current}", current)
+        except Exception:
+            handle.close()
+            raise
+        return UploadChunkWriter(self, session, handle)
+
+    def finalize(self, session: UploadSession) -> StreamedAssetFile:
+        """领取会话，校验后移动到内容寻址路径（导入由调用方完成后调用 complete，失败时调用 release）
+
+        先用条件更新把会话置为 finalizing，并发的 finalize 只有一个能领取成功；
+        file_hash / stored_path 在移动前后分别落库，重试时跳过已完成的步骤。
+
+        Raises:
+            UploadFinalizeConflict: 其他请求正在 finalize，或会话已结束
+            ValueError: 大小不足或哈希校验失败（校验失败时会话标记为 failed 并删除数据）
+        """
+        if not self._claim(session):
+            raise UploadFinalizeConflict(f"上传会话状态为 {session.status}，不能 finalize")
+
+        try:
+            if not session.file_hash:
+                self._verify_and_hash(session)
+            streamed = self.storage.adopt(
+                self.storage.partial_path(session.upload_id), session.filename, session.file_hash
+            )
+        except ValueError:
+            raise
+        except Exception as exc:
+            self.release(session, str(exc))
+            raise
+
+        if session.stored_path != streamed.staged.stored_path:
+            session.stored_path = streamed.staged.stored_path
+            self.db.commit()
+        return streamed
+
+    def complete(self, session: UploadSession, result: Dict) -> None:
+        """记录导入结果（重复 finalize 时直接返回该结果）"""
+        session.status = 'completed'
+        session.result = result
+        self.db.commit()
+
+    def release(self, session: UploadSession, message: str) -> None:
+        """finalize 或导入失败后回到可重试状态
+
+        已移动到内容寻址路径的回到 stored（重试 finalize 直接重新导入），否则回到 uploading。
+        """
+        session.status = 'stored' if session.stored_path else 'uploading'
+        session.error_message = message
+        self.db.commit()
+
+    def fail(self, session: UploadSession, message: str) -> None:
+        session.status = 'failed'
+        session.error_message = message
+        self.db.commit()
+
+    def abort(self, session: UploadSession) -> None:
+        """取消上传并删除已接收的数据"""
+        if session.status == 'uploading':
+            self._remove_partial(session)
+            session.status = 'aborted'
+            self.db.commit()
+
+    def _claim(self, session: UploadSession) -> bool:
+        """条件更新领取 finalize：uploading / stored，或中断后长时间未更新的 finalizing"""
+        now = datetime.now()
+        claimed = self.db.query(UploadSession).filter(
+            UploadSession.id == session.id,
+            or_(
+                UploadSession.status.in_(('uploading', 'stored')),
+                and_(
+                    UploadSession.status == 'finalizing',
+                    UploadSession.updated_at < now - timedelta(seconds=self.FINALIZE_STALE_SECONDS),
+                ),
+            ),
+        ).update({'status': 'finalizing', 'updated_at': now}, synchronize_session=False)
+        self.db.commit()
+        self.db.refresh(session)
+        return claimed == 1
+
+    def _verify_and_hash(self, session: UploadSession) -> None:
+        """持分块文件排他锁校验大小、计算哈希，并在移动前记录 file_hash
+
+        Raises:
+            ValueError: 仍有分块在写入、大小不足或哈希校验失败
+        """
+        partial_path = self.storage.partial_path(session.upload_id)
+        with open(partial_path, 'rb') as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.release(session, "仍有分块在上传")
+                raise ValueError("仍有分块在上传，请稍后再 finalize")
+
+            received = os.fstat(f.fileno()).st_size
+            if received != session.total_size:
+                self.release(session, f"数据未接收完整: {received}/{session.total_size}")
+                raise ValueError(session.error_message)
+
+            # 一次读取同时计算完整 SHA256（校验用）与去重哈希（与 calculate_file_hash 同口径）
+            digest = hashlib.sha256()
+            hasher = StreamingFileHasher()
+            while True:
+                chunk = f.read(CHUNK_SIZE * 128)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                hasher.update(chunk)
+
+            if session.expected_hash and digest.hexdigest() != session.expected_hash:
+                self._remove_partial(session)
+                self.fail(session, f"文件校验失败: 期望 {session.expected_hash}，实际 {digest.hexdigest()}")
+                raise ValueError(session.error_message)
+
+            session.received_size = received
+            session.file_hash = hasher.hexdigest(os.path.getmtime(partial_path))
+            session.error_message = None
+            self.db.commit()
+
+    def _remove_partial(self, session: UploadSession) -> None:
+        try:
+            os.remove(self.storage.partial_path(session.upload_id))
+        except FileNotFoundError:
+            pass
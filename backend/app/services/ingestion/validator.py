@@ -2,6 +2,7 @@
 
 负责素材的去重检查和验证逻辑。
 """
+from typing import Dict, List, Sequence, Set
 from sqlalchemy.orm import Session
 from ...model import Asset
 from ...tools.file_hash import calculate_file_hash
@@ -20,6 +21,9 @@ class AssetValidator:
     - 区分完全相同和重复备份
     """
 
+    # 批量去重时单条 IN 查询的最大哈希数
+    DUPLICATE_QUERY_CHUNK = 500
+
     def __init__(self, db: Session):
         """初始化验证器
 
@@ -67,6 +71,38 @@ class AssetValidator:
         # 重复备份/副本（内容相同，路径不同）
         return True, 'duplicate'
 
+    def check_duplicates_bulk(self, pairs: Sequence[tuple[str, str]]) -> List[tuple[bool, str]]:
+        """批量检查素材是否重复（每个分块一条 IN 查询）
+
+        Args:
+            pairs: [(文件哈希, 原始路径)]
+
+        Returns:
+            与 pairs 一一对应的 (是否重复, 重复类型)，含义同 check_duplicate
+        """
+        existing_paths: Dict[str, Set[str]] = {}
+        unique_hashes = list(dict.fromkeys(file_hash for file_hash, _ in pairs))
+
+        for start in range(0, len(unique_hashes), self.DUPLICATE_QUERY_CHUNK):
+            chunk = unique_hashes[start:start + self.DUPLICATE_QUERY_CHUNK]
+            rows = self.db.query(Asset.file_hash, Asset.original_path).filter(
+                Asset.file_hash.in_(chunk),
+                Asset.is_deleted == False
+            ).all()
+            for file_hash, original_path in rows:
+                existing_paths.setdefault(file_hash, set()).add(original_path)
+
+        results = []
+        for file_hash, original_path in pairs:
+            paths = existing_paths.get(file_hash)
+            if not paths:
+                results.append((False, ''))
+            elif original_path in paths:
+                results.append((True, 'same'))
+            else:
+                results.append((True, 'duplicate'))
+        return results
+
     def validate_asset(self, file_path: str, relative_path: str) -> tuple[bool, str, str]:
         """验证素材（组合方法）
 
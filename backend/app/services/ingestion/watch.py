@@ -0,0 +1,163 @@
+"""监控模式：持续增量导入
+
+长驻进程监控 NAS_DATA_PATH（或 WATCH_PATHS 配置的源目录），去抖后只把变化的文件交给
+AssetImportService（ImportConfig.include_paths），新文件数秒内入库，无需整目录扫描。
+
+- 启动时可先做一次整目录补扫（扫描清单命中的文件零读取），覆盖监控停止期间新增的文件
+- NAS 内由系统写入的目录（original/processed/.incoming）与隐藏目录不监控
+- 删除文件不做处理
+
+启动：
+    python -m app.services.ingestion.watch
+    或 WATCH_ENABLED=true 时由 run.py 拉起
+"""
+import os
+import signal
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from ...config import settings
+from ...db import SessionLocal
+from ...tools.utils import get_logger
+from ..scanning.watcher import ChangeDebouncer, DirectoryWatcher, PollingWatcher, create_watcher
+from .config import ImportConfig
+from .importer import AssetImportService
+from .statistics import ImportStatistics
+from .storage import IngestionStorageFactory
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WatchConfig:
+    """监控配置"""
+
+    roots: List[str]  # 监控的源目录
+    created_by: int = 1  # 导入素材的创建者
+    visibility: str = "general"  # 导入素材的可见性
+    debounce_seconds: float = 2.0  # 文件静默多久后导入
+    poll_interval: float = 5.0  # 轮询模式的遍历间隔
+    use_inotify: bool = True  # Linux 下优先 inotify
+    initial_scan: bool = True  # 启动时整目录补扫一次
+    excluded: List[str] = field(default_factory=list)  # 排除的目录（完整路径）
+
+    @classmethod
+    def from_settings(cls) -> 'WatchConfig':
+        roots = [path.strip() for path in settings.WATCH_PATHS.split(',') if path.strip()] or [settings.NAS_DATA_PATH]
+        storage = IngestionStorageFactory.create(settings.ASSET_STORAGE_PROVIDER, settings.NAS_DATA_PATH)
+        return cls(
+            roots=roots,
+            created_by=settings.WATCH_CREATED_BY,
+            visibility=settings.WATCH_VISIBILITY,
+            debounce_seconds=settings.WATCH_DEBOUNCE_SECONDS,
+            poll_interval=settings.WATCH_POLL_INTERVAL,
+            use_inotify=settings.WATCH_USE_INOTIFY,
+            initial_scan=settings.WATCH_INITIAL_SCAN,
+            excluded=storage.managed_paths(),
+        )
+
+
+class IngestionWatcher:
+    """监控目录并增量导入
+
+    职责：
+    - 收集变更事件并去抖
+    - 按监控根目录分组，调用导入服务只处理变化的文件
+    - 事件丢失时整目录补扫
+    """
+
+    def __init__(self, config: WatchConfig):
+        self.config = config
+        self._stop = threading.Event()
+        self._watcher: Optional[DirectoryWatcher] = None
+        self._debouncer = ChangeDebouncer(config.debounce_seconds)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        """运行直到 stop() 被调用"""
+        for root in self.config.roots:
+            if not os.path.isdir(root):
+                raise FileNotFoundError(f"监控目录不存在: {root}")
+
+        self._watcher = create_watcher(
+            self.config.roots, self.config.excluded, self.config.poll_interval, self.config.use_inotify
+        )
+        if isinstance(self._watcher, PollingWatcher):
+            # 轮询只能看到签名变化，仍在写入的文件每轮都会变化；静默期至少覆盖一个轮询间隔
+            self._debouncer.quiet_seconds = self.config.debounce_seconds + self.config.poll_interval
+
+        try:
+            if self.config.initial_scan:
+                for root in self.config.roots:
+                    self._import(root, None)
+
+            logger.info(f"监控模式已启动 - 目录: {', '.join(self.config.roots)}")
+            while not self._stop.is_set():
+                self.run_once(timeout=min(1.0, self.config.debounce_seconds))
+        finally:
+            self._watcher.close()
+            logger.info("监控模式已停止")
+
+    def run_once(self, timeout: float) -> None:
+        """处理一轮事件：收集 → 去抖 → 导入就绪的文件"""
+        changes = self._watcher.poll(timeout)
+        self._debouncer.touch(changes.paths)
+
+        for root in changes.rescan_roots:
+            self._import(root, None)
+
+        ready = self._debouncer.pop_ready()
+        if not ready:
+            return
+
+        by_root: Dict[str, List[str]] = defaultdict(list)
+        for path in ready:
+            root = self._watcher.root_of(path)
+            if root:
+                by_root[root].append(os.path.relpath(path, root))
+        for root, rel_paths in by_root.items():
+            self._import(root, rel_paths)
+
+    def _import(self, root: str, rel_paths: Optional[List[str]]) -> Optional[ImportStatistics]:
+        """导入一个根目录下的指定文件（rel_paths 为 None 时整目录扫描）"""
+        if rel_paths is None:
+            logger.info(f"整目录补扫: {root}")
+        else:
+            logger.info(f"检测到 {len(rel_paths)} 个文件变化: {root}")
+
+        db = SessionLocal()
+        try:
+            config = ImportConfig(
+                scan_path=root,
+                created_by=self.config.created_by,
+                visibility=self.config.visibility,
+                db=db,
+                include_paths=rel_paths,
+                use_manifest=True,
+            )
+            return AssetImportService(config).import_assets()
+        except Exception as e:
+            logger.error(f"增量导入失败 {root}: {e}", exc_info=True)
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+
+def main() -> None:
+    watcher = IngestionWatcher(WatchConfig.from_settings())
+
+    def handle_signal(signum, frame):
+        logger.info(f"收到信号 {signum}，停止监控")
+        watcher.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    watcher.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""素材批量写入
+
+把通过去重、已生成衍生文件的素材攒成一批，在一个事务中写入：
+- 素材记录：一次 flush（支持 RETURNING 的数据库合并为多行 INSERT；MySQL 在同一事务内逐行取自增 ID）
+- 标签：一条 executemany INSERT
+- 任务日志：一条 executemany INSERT，地理编码任务所需的日志 ID 按素材 ID 回查
+- 原始元数据：按文件哈希留存完整提取结果（RAW_METADATA_STORE_ENABLED），供日后重新映射标签
+整批提交一次后再投递异步任务。
+
+单行失败只影响该行：批量写入失败时回滚到保存点，改为逐行写入以隔离出错的素材。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from sqlalchemy import insert
+from ...config import settings
+from ...model import Asset, TaskLog
+from ...services.metadata import MetadataExtractorFactory, RawMetadataStore
+from ...services.metadata_dictionary import MetadataDictionaryService
+from ...services.tags import TagService
+from ...services.tags.mapping_service import TagMappingService
+from ...tools.utils import get_logger
+
+if TYPE_CHECKING:
+    from .importer import AssetImportService
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PendingAsset:
+    """等待批量写入的素材"""
+
+    index: int
+    source_rel_path: str
+    asset: Asset  # 未持久化的素材对象（缩略图/预览图/感知哈希已写入）
+    local_path: str  # NAS 中的完整路径（异步任务读取）
+    metadata: Dict = field(default_factory=dict)  # 按需要的键裁剪后的元数据（标签映射用）
+    raw_metadata: Dict = field(default_factory=dict)  # 完整元数据（仅开启原始元数据留存时）
+    phash_ready: bool = False
+    tags: Dict = field(default_factory=dict)
+    tasks: List[Dict] = field(default_factory=list)
+
+
+class AssetBatchWriter:
+    """素材批量写入器
+
+    职责：
+    - 攒批，达到 batch_size 自动写入
+    - 一个事务写入素材、标签、任务日志，整批提交一次
+    - 行级失败隔离（保存点 + 逐行重试）
+    - 提交后投递异步任务、记录统计
+    """
+
+    def __init__(self, service: 'AssetImportService', batch_size: int):
+        """初始化写入器
+
+        Args:
+            service: 导入服务（复用其会话、处理器、统计与哈希占用）
+            batch_size: 每个事务写入的素材数（1 即逐个提交）
+        """
+        self.service = service
+        self.db = service.config.db
+        self.processor = service.processor
+        self.batch_size = batch_size
+        self._pending: List[PendingAsset] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, item: PendingAsset) -> None:
+        """加入待写入列表，满一批即写入"""
+        self._pending.append(item)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """写入当前攒下的所有素材"""
+        if not self._pending:
+            return
+
+        items, self._pending = self._pending, []
+
+        try:
+            # 1. 素材记录（需要自增 ID 供标签与任务日志关联）
+            items = self._insert_assets(items)
+            if not items:
+                return
+
+            # 2. 标签、任务日志与原始元数据（失败只记录警告，不影响素材导入）
+            location_pois = self._insert_tags(items)
+            task_log_ids = self._insert_task_logs(items)
+            if settings.RAW_METADATA_STORE_ENABLED:
+                self._save_raw_metadata(items)
+
+            # 3. 整批提交；提交前取出 ID 与路径，避免提交后逐个刷新对象
+            written = [(item, item.asset.id, item.asset.original_path) for item in items]
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for item in items:
+                self._fail(item, e)
+            return
+
+        # 4. 提交后：元数据字典、异步任务、统计
+        if location_pois:
+            try:
+                MetadataDictionaryService.upsert_scene_values(
+                    self.db, MetadataDictionaryService.SCENE_LOCATION_POI, location_pois
+                )
+            except Exception as e:
+                logger.warning(f"地点字典更新失败: {e}")
+                self.db.rollback()
+
+        for item, asset_id, stored_path in written:
+            self.service._release_hash_lock(item.asset.file_hash)
+            for task in item.tasks:
+                try:
+                    self.processor.dispatch_async_task(task, task_log_ids.get((asset_id, task['task_type'])))
+                except Exception as e:
+                    logger.warning(
+                        f"{task['task_type']} 异步任务发送失败 - Asset ID: {asset_id}: {e}",
+                        exc_info=True,
+                    )
+            self.service._record_success(item.index, item.source_rel_path, asset_id, stored_path)
+
+        logger.debug(f"批量写入 {len(written)} 个素材")
+
+    def _insert_assets(self, items: List[PendingAsset]) -> List[PendingAsset]:
+        """写入素材记录，返回写入成功的素材"""
+        try:
+            with self.db.begin_nested():
+                self.db.add_all([item.asset for item in items])
+            return items
+        except Exception as e:
+            if len(items) == 1:
+                self._fail(items[0], e)
+                return []
+            logger.warning(f"批量写入素材失败，改为逐行写入: {e}")
+
+        written = []
+        for item in items:
+            item.asset.id = None  # 保存点回滚后丢弃已分配的 ID
+            try:
+                with self.db.begin_nested():
+                    self.db.add(item.asset)
+                written.append(item)
+            except Exception as e:
+                self._fail(item, e)
+        return written
+
+    def _insert_tags(self, items: List[PendingAsset]) -> List[str]:
+        """映射并写入标签，返回需要写入元数据字典的 location_poi"""
+        mappings: Dict[str, list] = {}
+        template_keys: Dict[str, set] = {}
+        rows_by_item: List[Tuple[PendingAsset, List[Dict]]] = []
+
+        for item in items:
+            asset = item.asset
+            if item.metadata:
+                try:
+                    if asset.asset_type not in mappings:
+                        mappings[asset.asset_type] = TagMappingService.list_active(self.db, asset.asset_type)
+                    item.tags = self.processor.map_tags(asset, item.metadata, mappings[asset.asset_type])
+                except Exception as e:
+                    logger.warning(f"Asset {asset.id} 标签映射失败: {e}")
+                    item.tags = {}
+
+            # 异步任务依赖映射后的 GPS 标签，在此一并规划
+            item.tasks = self.processor.plan_async_tasks(asset, item.local_path, item.tags, item.phash_ready)
+
+            if item.tags:
+                rows_by_item.append((item, [
+                    {'asset_id': asset.id, 'tag_key': key, 'tag_value': value}
+                    for key, value in item.tags.items()
+                ]))
+
+        if not rows_by_item:
+            return []
+
+        for item, _ in rows_by_item:
+            asset_type = item.asset.asset_type
+            if asset_type not in template_keys:
+                template_keys[asset_type] = TagService.get_template_tag_keys(self.db, asset_type)
+
+        def save(batch: List[Tuple[PendingAsset, List[Dict]]]) -> List[str]:
+            # 按模板过滤后一条 INSERT 写入（模板按素材类型区分）
+            rows = [
+                row
+                for item, item_rows in batch
+                for row in item_rows
+                if row['tag_key'] in template_keys[item.asset.asset_type]
+            ]
+            with self.db.begin_nested():
+                return TagService.bulk_insert_new_asset_tags(self.db, rows)
+
+        try:
+            return save(rows_by_item)
+        except Exception as e:
+            logger.warning(f"批量保存标签失败，改为逐个素材保存: {e}")
+
+        pois = []
+        for entry in rows_by_item:
+            try:
+                pois.extend(save([entry]))
+            except Exception as e:
+                logger.error(f"保存标签失败 {entry[0].asset.original_path}: {e}")
+        return pois
+
+    def _insert_task_logs(self, items: List[PendingAsset]) -> Dict[Tuple[int, str], int]:
+        """写入任务日志，返回 (asset_id, task_type) -> task_log_id
+
+        写入失败的素材不再投递异步任务（与逐个发送时的行为一致）。
+        """
+        def save(batch: List[PendingAsset]) -> None:
+            rows = [task for item in batch for task in item.tasks]
+            if rows:
+                with self.db.begin_nested():
+                    self.db.execute(insert(TaskLog), rows)
+
+        try:
+            save(items)
+        except Exception as e:
+            logger.warning(f"批量写入任务日志失败，改为逐个素材写入: {e}")
+            for item in items:
+                try:
+                    save([item])
+                except Exception as item_error:
+                    logger.warning(f"任务日志写入失败 - Asset ID: {item.asset.id}: {item_error}")
+                    item.tasks = []
+
+        return self._lookup_task_log_ids(items)
+
+    def _save_raw_metadata(self, items: List[PendingAsset]) -> None:
+        """按文件哈希留存原始元数据（同一事务，失败只记录警告）"""
+        rows = [
+            {
+                'file_hash': item.asset.file_hash,
+                'asset_type': item.asset.asset_type,
+                'extractor': MetadataExtractorFactory.extractor_name(item.asset.asset_type),
+                'metadata': item.raw_metadata,
+            }
+            for item in items
+            if item.raw_metadata
+        ]
+        if not rows:
+            return
+        try:
+            with self.db.begin_nested():
+                RawMetadataStore.save_batch(self.db, rows)
+        except Exception as e:
+            logger.warning(f"原始元数据保存失败（不影响导入）: {e}")
+
+    def _lookup_task_log_ids(self, items: List[PendingAsset]) -> Dict[Tuple[int, str], int]:
+        """回查需要回写状态的任务日志 ID（executemany 无法返回自增 ID）"""
+        asset_ids = [item.asset.id for item in items if any(t['task_type'] == 'geocoding' for t in item.tasks)]
+        if not asset_ids:
+            return {}
+
+        rows = self.db.query(TaskLog.id, TaskLog.asset_id, TaskLog.task_type).filter(
+            TaskLog.asset_id.in_(asset_ids),
+            TaskLog.task_type == 'geocoding',
+        ).all()
+        # 新建素材每种任务只有一条日志
+        return {(row.asset_id, row.task_type): row.id for row in rows}
+
+    def _fail(self, item: PendingAsset, error: Exception) -> None:
+        """单个素材写入失败：释放哈希占用并记录失败（会话由调用方处理）"""
+        self.service._release_claim(item.asset.file_hash, item.asset.original_path)
+        self.service._record_failure(item.index, item.source_rel_path, error, rollback=False)
@@ -1,15 +1,18 @@
 """
 元数据提取模块
 
-负责从不同类型的素材文件中提取元数据。
+负责从不同类型的素材文件中提取元数据，并按文件哈希留存原始元数据。
 """
 from .extractor import MetadataExtractor, MetadataExtractorFactory
-from .image import ImageMetadataExtractor
+from .image import ImageMetadataExtractor, FastImageMetadataExtractor
 from .video import VideoMetadataExtractor
+from .raw_store import RawMetadataStore
 
 __all__ = [
     'MetadataExtractor',
     'MetadataExtractorFactory',
     'ImageMetadataExtractor',
+    'FastImageMetadataExtractor',
     'VideoMetadataExtractor',
+    'RawMetadataStore',
 ]
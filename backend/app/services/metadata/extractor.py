@@ -3,7 +3,7 @@
 遵循开闭原则和策略模式，支持扩展新的素材类型。
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple, Optional
+from typing import Dict, FrozenSet, Iterable, Tuple, Optional
 from datetime import datetime
 from ...tools.utils import get_logger
 
@@ -16,6 +16,30 @@ class MetadataExtractor(ABC):
     所有元数据提取器必须实现 extract() 方法。
     """
 
+    # 需要的元数据键（None 表示提取器默认输出）
+    required_keys: Optional[FrozenSet[str]] = None
+
+    def set_required_keys(self, keys: Optional[Iterable[str]]) -> None:
+        """设置需要的元数据键
+
+        只输出映射规则用得到的键的提取器据此裁剪解析范围；默认忽略，照常输出全部键。
+
+        Args:
+            keys: 需要的键（None 或空表示恢复默认）
+        """
+        self.required_keys = frozenset(keys) if keys else None
+
+    def prune(self, metadata: Dict, keys: Iterable[str]) -> Dict:
+        """把完整提取结果裁剪为设置 keys 后提取器会输出的结果
+
+        默认不裁剪（与 set_required_keys 默认忽略一致）。
+
+        Args:
+            metadata: 未裁剪的提取结果
+            keys: 需要的键
+        """
+        return metadata
+
     @abstractmethod
     def extract(self, file_path: str) -> Tuple[Dict, Optional[datetime]]:
         """提取文件的元数据
@@ -30,6 +54,20 @@ class MetadataExtractor(ABC):
         """
         pass
 
+    def extract_from_bytes(self, content: bytes, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+        """从已读入内存的文件内容提取元数据
+
+        默认回退到按路径读取；支持流式解析的提取器可覆盖此方法以避免重复读文件。
+
+        Args:
+            content: 文件完整内容
+            file_path: 文件完整路径（用于日志与回退）
+
+        Returns:
+            Tuple[元数据字典, 拍摄时间]
+        """
+        return self.extract(file_path)
+
 
 class MetadataExtractorFactory:
     """元数据提取器工厂
@@ -65,6 +103,34 @@ class MetadataExtractorFactory:
             logger.warning(f"未找到元数据提取器: {asset_type}")
         return extractor
 
+    @classmethod
+    def extractor_name(cls, asset_type: str) -> str:
+        """某类素材当前使用的提取器名称（记录原始元数据的提取口径，未注册时为空字符串）"""
+        extractor = cls._extractors.get(asset_type)
+        return extractor.__class__.__name__ if extractor else ''
+
+    @classmethod
+    def set_required_keys(cls, asset_type: str, keys: Optional[Iterable[str]]) -> None:
+        """设置某类素材需要的元数据键（未注册的类型忽略）"""
+        extractor = cls._extractors.get(asset_type)
+        if extractor:
+            extractor.set_required_keys(keys)
+
+    @classmethod
+    def prune(cls, asset_type: str, metadata: Dict, keys: Iterable[str]) -> Dict:
+        """按需要的键裁剪某类素材的完整提取结果（未注册的类型原样返回）"""
+        extractor = cls._extractors.get(asset_type)
+        return extractor.prune(metadata, keys) if extractor else metadata
+
+    @classmethod
+    def required_keys(cls) -> Dict[str, FrozenSet[str]]:
+        """当前各类型需要的元数据键（用于同步到进程池子进程）"""
+        return {
+            asset_type: extractor.required_keys
+            for asset_type, extractor in cls._extractors.items()
+            if extractor.required_keys is not None
+        }
+
     @classmethod
     def extract(cls, asset_type: str, file_path: str) -> Tuple[Dict, Optional[datetime]]:
         """便捷方法：直接提取元数据
@@ -82,3 +148,27 @@ class MetadataExtractorFactory:
         else:
             logger.warning(f"跳过元数据提取（不支持的类型）: {asset_type}")
             return {}, None
+
+    @classmethod
+    def extract_from_bytes(
+        cls,
+        asset_type: str,
+        content: bytes,
+        file_path: str
+    ) -> Tuple[Dict, Optional[datetime]]:
+        """便捷方法：从内存中的文件内容提取元数据
+
+        Args:
+            asset_type: 素材类型
+            content: 文件完整内容
+            file_path: 文件路径（用于日志与回退）
+
+        Returns:
+            Tuple[元数据字典, 拍摄时间]
+        """
+        extractor = cls.create(asset_type)
+        if extractor:
+            return extractor.extract_from_bytes(content, file_path)
+        else:
+            logger.warning(f"跳过元数据提取（不支持的类型）: {asset_type}")
+            return {}, None
@@ -0,0 +1,517 @@
+"""EXIF 头部快速解析
+
+exifread 会解析文件中的全部标签（含缩略图、所有子 IFD）并逐个字符串化，HEIC/RAW 上还会读入大量无关数据。
+这里只读取元数据所在的片段，并可只解析调用方需要的标签：
+- JPEG：逐个跳过标记段，只读 APP1（Exif），遇到 SOS 即停止
+- HEIF/HEIC：遍历顶层 box，只读 meta box，按 iinf/iloc 定位 Exif 条目后读取其数据区
+- PNG / WebP：跳过其他数据块，只读 eXIf / EXIF 块
+- TIFF（含基于 TIFF 的 RAW，如 DNG/NEF/CR2/ARW）：按 IFD 偏移随机读取
+
+输出与 exifread 一致：键为 "IFD 名 标签名"（如 'EXIF FNumber'），值为 str(IfdTag)，
+标签表与字符串化规则直接复用 exifread，与原提取器的结果可互换。
+无法识别的容器格式抛 UnsupportedFormat，由调用方回退到 exifread。
+"""
+import io
+import struct
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+from exifread.tags import IGNORE_TAGS
+from exifread.tags.exif import EXIF_TAGS, GPS_TAGS, INTEROP_TAGS
+from exifread.tags.fields import (
+    FIELD_DEFINITIONS,
+    FLOAT_FIELD_TYPES,
+    RATIO_FIELD_TYPES,
+    SIGNED_FIELD_TYPES,
+    FieldType,
+)
+from exifread.utils import Ratio
+
+# 单个元数据片段（HEIF meta box、Exif 条目、PNG/WebP 块）的读取上限，超出视为异常文件
+MAX_SEGMENT_BYTES = 4 * 1024 * 1024
+# 与 exifread 一致：超过该数量的数值型标签不展开（值为空列表）
+MAX_FIELD_COUNT = 1000
+# IFD 链最多跟随的个数（防止损坏文件的循环/超长链）
+MAX_IFD_CHAIN = 8
+
+HEIF_BRANDS = {b'heic', b'heix', b'heim', b'heis', b'hevc', b'hevx', b'mif1', b'msf1', b'avif'}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TIFF_HEADERS = (b'II*\x00', b'MM\x00*')
+
+EXIF_OFFSET_TAG = 0x8769
+
+# IFD 名 -> 标签表（IFD0/IFD1/Exif 子 IFD 共用 EXIF_TAGS，与 exifread 相同）
+_TAG_DICTS = {
+    'GPS': GPS_TAGS,
+    'Interoperability': INTEROP_TAGS,
+}
+
+
+class UnsupportedFormat(Exception):
+    """无法识别的容器格式（调用方应回退到 exifread）"""
+
+
+class ExifSegmentReader:
+    """按容器格式定位 TIFF 结构（Exif 数据），只读取元数据片段"""
+
+    @classmethod
+    def locate(cls, stream: BinaryIO) -> Optional[BinaryIO]:
+        """定位 TIFF 结构
+
+        Args:
+            stream: 可 seek 的二进制流（文件或 BytesIO）
+
+        Returns:
+            以 TIFF 头为起点的流；文件中没有 Exif 时返回 None
+
+        Raises:
+            UnsupportedFormat: 无法识别的容器格式
+        """
+        stream.seek(0)
+        head = stream.read(12)
+        if head[:2] == b'\xff\xd8':
+            return cls._wrap(cls._jpeg(stream))
+        if head[:4] in TIFF_HEADERS:
+            return stream
+        if head[4:8] == b'ftyp' and head[8:12] in HEIF_BRANDS:
+            return cls._wrap(cls._heif(stream))
+        if head[:8] == PNG_SIGNATURE:
+            return cls._wrap(cls._png(stream))
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return cls._wrap(cls._webp(stream))
+        raise UnsupportedFormat(f"未知的文件头: {head[:12]!r}")
+
+    @staticmethod
+    def _wrap(data: Optional[bytes]) -> Optional[BinaryIO]:
+        if not data or data[:4] not in TIFF_HEADERS:
+            return None
+        return io.BytesIO(data)
+
+    @staticmethod
+    def _read_exact(stream: BinaryIO, length: int) -> bytes:
+        if length > MAX_SEGMENT_BYTES:
+            raise ValueError(f"元数据片段过大: {length} bytes")
+        data = stream.read(length)
+        if len(data) != length:
+            raise ValueError("元数据片段被截断")
+        return data
+
+    @classmethod
+    def _jpeg(cls, stream: BinaryIO) -> Optional[bytes]:
+        """逐段跳过，只读 APP1（Exif）；SOS 之后是图像数据，不再查找"""
+        stream.seek(2)
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                return None
+            if byte != b'\xff':
+                continue
+            marker = stream.read(1)
+            while marker == b'\xff':  # 填充字节
+                marker = stream.read(1)
+            if not marker or marker in (b'\xd9', b'\xda'):  # EOI / SOS
+                return None
+            if b'\xd0' <= marker <= b'\xd7' or marker in (b'\x01', b'\x00'):  # 无长度字段的标记
+                continue
+            length_bytes = stream.read(2)
+            if len(length_bytes) != 2:
+                return None
+            length = struct.unpack('>H', length_bytes)[0] - 2
+            if marker == b'\xe1':
+                body = cls._read_exact(stream, length)
+                if body[:5] == b'Exif\x00':
+                    return body[6:]
+            else:
+                stream.seek(length, io.SEEK_CUR)
+
+    @classmethod
+    def _iter_boxes(cls, stream: BinaryIO, start: int, end: Optional[int]):
+        """遍历 ISO BMFF box，产出 (类型, 数据起点, 数据长度)"""
+        pos = start
+        while end is None or pos + 8 <= end:
+            stream.seek(pos)
+            header = stream.read(8)
+            if len(header) != 8:
+                return
+            size, box_type = struct.unpack('>I4s', header)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack('>Q', stream.read(8))[0]
+                header_size = 16
+            elif size == 0:  # 延伸到文件（或父 box）末尾
+                yield box_type, pos + header_size, None
+                return
+            if size < header_size:
+                return
+            yield box_type, pos + header_size, size - header_size
+            pos += size
+
+    @staticmethod
+    def _iter_child_boxes(data: bytes, pos: int = 0):
+        """遍历内存中的子 box，产出 (类型, 数据)"""
+        while pos + 8 <= len(data):
+            size, box_type = struct.unpack_from('>I4s', data, pos)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, pos + 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = len(data) - pos
+            if size < header_size:
+                return
+            yield box_type, data[pos + header_size:pos + size]
+            pos += size
+
+    @classmethod
+    def _heif(cls, stream: BinaryIO) -> Optional[bytes]:
+        """只读 meta box，按 iinf/iloc 找到 Exif 条目并读取其数据区"""
+        meta = None
+        for box_type, start, length in cls._iter_boxes(stream, 0, None):
+            if box_type == b'meta':
+                if length is None:
+                    raise ValueError("meta box 长度无效")
+                stream.seek(start)
+                meta = cls._read_exact(stream, length)
+                break
+        if meta is None:
+            return None
+
+        children = dict(cls._iter_child_boxes(meta, 4))  # meta 为 FullBox，跳过 version/flags
+        if b'iinf' not in children or b'iloc' not in children:
+            return None
+        exif_id = cls._heif_exif_item_id(children[b'iinf'])
+        if exif_id is None:
+            return None
+        location = cls._heif_item_location(children[b'iloc'], exif_id)
+        if location is None:
+            return None
+
+        construction_method, extents = location
+        data = b''
+        for offset, length in extents:
+            if construction_method == 0:
+                stream.seek(offset)
+                data += cls._read_exact(stream, length)
+            elif construction_method == 1 and b'idat' in children:
+                data += children[b'idat'][offset:offset + length]
+            else:
+                return None
+
+        # Exif 条目：4 字节 TIFF 头偏移 + 数据（通常以 'Exif\0\0' 开头）
+        if len(data) < 4:
+            return None
+        tiff_offset = 4 + struct.unpack_from('>I', data)[0]
+        if data[tiff_offset:tiff_offset + 4] not in TIFF_HEADERS:
+            candidates = [data.find(header, 4, 64) for header in TIFF_HEADERS]
+            candidates = [pos for pos in candidates if pos >= 0]
+            if not candidates:
+                return None
+            tiff_offset = min(candidates)
+        return data[tiff_offset:]
+
+    @classmethod
+    def _heif_exif_item_id(cls, iinf: bytes) -> Optional[int]:
+        version = iinf[0]
+        pos = 4 + (2 if version == 0 else 4)
+        for box_type, infe in cls._iter_child_boxes(iinf, pos):
+            if box_type != b'infe' or len(infe) < 4:
+                continue
+            infe_version = infe[0]
+            if infe_version < 2:
+                continue
+            if infe_version == 2:
+                item_id = struct.unpack_from('>H', infe, 4)[0]
+                item_type = infe[8:12]
+            else:
+                item_id = struct.unpack_from('>I', infe, 4)[0]
+                item_type = infe[10:14]
+            if item_type == b'Exif':
+                return item_id
+        return None
+
+    @staticmethod
+    def _heif_item_location(iloc: bytes, item_id: int) -> Optional[Tuple[int, List[Tuple[int, int]]]]:
+        """解析 iloc，返回 (construction_method, [(绝对偏移, 长度)])"""
+
+        def read_uint(pos: int, size: int) -> int:
+            return int.from_bytes(iloc[pos:pos + size], 'big') if size else 0
+
+        version = iloc[0]
+        offset_size = iloc[4] >> 4
+        length_size = iloc[4] & 0x0F
+        base_offset_size = iloc[5] >> 4
+        index_size = iloc[5] & 0x0F if version in (1, 2) else 0
+        pos = 6
+        id_size = 2 if version < 2 else 4
+        item_count = read_uint(pos, id_size)
+        pos += id_size
+
+        for _ in range(item_count):
+            current_id = read_uint(pos, id_size)
+            pos += id_size
+            construction_method = 0
+            if version in (1, 2):
+                construction_method = read_uint(pos, 2) & 0x0F
+                pos += 2
+            pos += 2  # data_reference_index
+            base_offset = read_uint(pos, base_offset_size)
+            pos += base_offset_size
+            extent_count = read_uint(pos, 2)
+            pos += 2
+            extents = []
+            for _ in range(extent_count):
+                pos += index_size
+                extent_offset = read_uint(pos, offset_size)
+                pos += offset_size
+                extent_length = read_uint(pos, length_size)
+                pos += length_size
+                extents.append((base_offset + extent_offset, extent_length))
+            if current_id == item_id:
+                return construction_method, extents
+        return None
+
+    @classmethod
+    def _png(cls, stream: BinaryIO) -> Optional[bytes]:
+        """跳过数据块，只读 eXIf"""
+        stream.seek(len(PNG_SIGNATURE))
+        while True:
+            header = stream.read(8)
+            if len(header) != 8:
+                return None
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'eXIf':
+                return cls._read_exact(stream, length)
+            if chunk_type == b'IEND':
+                return None
+            stream.seek(length + 4, io.SEEK_CUR)  # 数据 + CRC
+
+    @classmethod
+    def _webp(cls, stream: BinaryIO) -> Optional[bytes]:
+        """跳过其他块，只读 EXIF"""
+        stream.seek(12)
+        while True:
+            header = stream.read(8)
+            if len(header) != 8:
+                return None
+            chunk_type, length = struct.unpack('<4sI', header)
+            if chunk_type == b'EXIF':
+                data = cls._read_exact(stream, length)
+                return data[6:] if data[:6] == b'Exif\x00\x00' else data
+            stream.seek(length + (length & 1), io.SEEK_CUR)
+
+
+class FastExifParser:
+    """按需解析标签的 TIFF/EXIF 解析器
+
+    Args:
+        wanted_keys: 需要的键（exifread 命名，如 'EXIF FNumber'、'GPS GPSLatitude'）；
+            None 表示全部标签（与 exifread details=False 的输出相同，不含缩略图数据）
+    """
+
+    def __init__(self, wanted_keys: Optional[Iterable[str]] = None):
+        self.wanted_keys = None if wanted_keys is None else frozenset(wanted_keys)
+        # IFD 名 -> 需要的标签ID（None 表示全部）
+        self._wanted: Optional[Dict[str, Set[int]]] = None if wanted_keys is None else {}
+        for key in self.wanted_keys or ():
+            if ' Tag 0x' in key:  # 'Image Tag 0x1234' 这类无名标签
+                ifd_name, _, tag_name = key.partition(' Tag ')
+                tag_name = f"Tag {tag_name}"
+            elif key.startswith('IFD '):  # 'IFD 2 XXX'
+                ifd_name, _, tag_name = key.partition(' ')[2].partition(' ')
+                ifd_name = f"IFD {ifd_name}"
+            else:
+                ifd_name, _, tag_name = key.partition(' ')
+            tag_id = self._tag_id(ifd_name, tag_name)
+            if tag_id is not None:
+                self._wanted.setdefault(ifd_name, set()).add(tag_id)
+
+    @staticmethod
+    def _tag_id(ifd_name: str, tag_name: str) -> Optional[int]:
+        if tag_name.startswith('Tag 0x'):
+            try:
+                return int(tag_name[6:], 16)
+            except ValueError:
+                return None
+        for tag_id, entry in _TAG_DICTS.get(ifd_name, EXIF_TAGS).items():
+            if entry[0] == tag_name:
+                return tag_id
+        return None
+
+    def parse(self, stream: BinaryIO) -> Dict[str, str]:
+        """解析文件中需要的 EXIF 标签
+
+        Args:
+            stream: 可 seek 的二进制流
+
+        Returns:
+            {键: 字符串值}，只包含文件中存在的需要的键
+
+        Raises:
+            UnsupportedFormat: 无法识别的容器格式
+        """
+        tiff = ExifSegmentReader.locate(stream)
+        if tiff is None or self._wanted == {}:
+            return {}
+        return _TiffReader(tiff, self._wanted).read()
+
+
+class _TiffReader:
+    """在 TIFF 结构上按需读取 IFD（偏移相对 TIFF 头）"""
+
+    def __init__(self, stream: BinaryIO, wanted: Optional[Dict[str, Set[int]]]):
+        self.stream = stream
+        self.wanted = wanted
+        stream.seek(0)
+        self.endian = '<' if stream.read(2) == b'II' else '>'
+        self.result: Dict[str, str] = {}
+        self._next_ifd = 0
+
+    def read(self) -> Dict[str, str]:
+        follow_chain = self.wanted is None or any(name == 'Thumbnail' or name.startswith('IFD ') for name in self.wanted)
+        offset = self._unpack('I', 4)
+        exif_offset = None
+        visited = set()
+        for index in range(MAX_IFD_CHAIN):
+            if not offset or offset in visited:
+                break
+            visited.add(offset)
+            ifd_name = 'Image' if index == 0 else 'Thumbnail' if index == 1 else f'IFD {index}'
+            pointers = self._dump_ifd(offset, ifd_name, EXIF_TAGS)
+            if index == 0:
+                exif_offset = pointers.get(EXIF_OFFSET_TAG)
+            if not follow_chain:
+                break
+            offset = self._next_ifd
+
+        if exif_offset and (self._wants_ifd('EXIF') or self._wants_ifd('Interoperability')):
+            self._dump_ifd(exif_offset, 'EXIF', EXIF_TAGS)
+        return self.result
+
+    def _wants_ifd(self, ifd_name: str) -> bool:
+        return self.wanted is None or ifd_name in self.wanted
+
+    def _wants_tag(self, ifd_name: str, tag: int) -> bool:
+        if self.wanted is None:
+            return tag not in IGNORE_TAGS
+        return tag in self.wanted.get(ifd_name, ())
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self.stream.seek(offset)
+        return self.stream.read(length)
+
+    def _unpack(self, fmt: str, offset: int) -> int:
+        size = struct.calcsize(fmt)
+        data = self._read(offset, size)
+        if len(data) != size:
+            return 0
+        return struct.unpack(self.endian + fmt, data)[0]
+
+    def _dump_ifd(self, offset: int, ifd_name: str, tag_dict: dict) -> Dict[int, int]:
+        """解析一个 IFD 中需要的标签，并进入需要的子 IFD
+
+        Returns:
+            {标签ID: 偏移}（仅 Exif 子 IFD 指针，由调用方按 exifread 的顺序处理）
+        """
+        count = self._unpack('H', offset)
+        block = self._read(offset + 2, count * 12 + 4)
+        count = min(count, len(block) // 12)
+        self._next_ifd = (
+            struct.unpack_from(self.endian + 'I', block, count * 12)[0]
+            if len(block) >= count * 12 + 4 else 0
+        )
+
+        pointers = {}
+        for i in range(count):
+            tag, field_type_id, field_count, value = struct.unpack_from(self.endian + 'HHI4s', block, i * 12)
+            tag_entry = tag_dict.get(tag)
+            sub_ifd = tag_entry[1] if tag_entry and isinstance(tag_entry[1], tuple) else None
+            follow_sub_ifd = sub_ifd is not None and self._wants_ifd(sub_ifd[0])
+            is_exif_pointer = ifd_name == 'Image' and tag == EXIF_OFFSET_TAG
+            wanted = self._wants_tag(ifd_name, tag)
+            if not wanted and not is_exif_pointer and not follow_sub_ifd:
+                continue
+            try:
+                field_type = FieldType(field_type_id)
+            except ValueError:
+                continue
+            if field_type == FieldType.PROPRIETARY:
+                continue
+
+            values = self._values(field_type, field_count, value, offset + 2 + i * 12 + 8)
+            if wanted:
+                tag_name = tag_entry[0] if tag_entry else f"Tag 0x{tag:04X}"
+                try:
+                    self.result[f"{ifd_name} {tag_name}"] = self._printable(field_type, field_count, values, tag_entry)
+                except (IndexError, TypeError, ValueError):
+                    pass
+            if not values:
+                continue
+            if is_exif_pointer:
+                pointers[tag] = values[0]
+            elif follow_sub_ifd:
+                next_ifd = self._next_ifd
+                self._dump_ifd(values[0], sub_ifd[0], sub_ifd[1])
+                self._next_ifd = next_ifd
+        return pointers
+
+    def _values(self, field_type: FieldType, count: int, inline: bytes, inline_offset: int):
+        """读取字段值（与 exifread 的取值规则一致）"""
+        type_length = FIELD_DEFINITIONS[field_type][0]
+        size = count * type_length
+        if size > 4:
+            data_offset = struct.unpack(self.endian + 'I', inline)[0]
+        else:
+            data_offset = inline_offset
+
+        if field_type == FieldType.ASCII:
+            if count == 0:
+                return ''
+            raw = (inline[:count] if size <= 4 else self._read(data_offset, min(count, MAX_SEGMENT_BYTES)))
+            raw = raw.split(b'\x00', 1)[0]
+            try:
+                return raw.decode('utf-8')
+            except UnicodeDecodeError:
+                return raw
+
+        if count >= MAX_FIELD_COUNT:
+            return []
+        data = inline[:size] if size <= 4 else self._read(data_offset, size)
+        signed = field_type in SIGNED_FIELD_TYPES
+        values = []
+        for i in range(count):
+            pos = i * type_length
+            if field_type in RATIO_FIELD_TYPES:
+                fmt = 'ii' if signed else 'II'
+                if pos + 8 > len(data):
+                    values.append(Ratio(0, 0))
+                    continue
+                values.append(Ratio(*struct.unpack_from(self.endian + fmt, data, pos)))
+            elif field_type in FLOAT_FIELD_TYPES:
+                fmt = 'f' if field_type == FieldType.FLOAT_32 else 'd'
+                if pos + type_length <= len(data):
+                    values.append(struct.unpack_from(self.endian + fmt, data, pos))
+            else:
+                fmt = {1: 'B', 2: 'H', 4: 'I'}[type_length]
+                if signed:
+                    fmt = fmt.lower()
+                if pos + type_length > len(data):
+                    values.append(0)
+                    continue
+                values.append(struct.unpack_from(self.endian + fmt, data, pos)[0])
+        return values
+
+    @staticmethod
+    def _printable(field_type: FieldType, count: int, values, tag_entry) -> str:
+        """字符串化（与 exifread 的 IfdTag.printable 一致）"""
+        if count == 1 and field_type != FieldType.ASCII:
+            printable = str(values[0])
+        elif count > 50 and len(values) > 20 and not isinstance(values, str):
+            printable = str(values[0:20])[0:-1] + ", ... ]"
+        else:
+            printable = str(values)
+
+        if tag_entry and tag_entry[1] is not None:
+            if callable(tag_entry[1]):
+                printable = tag_entry[1](values)
+            elif isinstance(tag_entry[1], dict):
+                printable = ''.join(tag_entry[1].get(val, repr(val)) for val in values)
+        return printable
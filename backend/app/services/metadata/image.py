@@ -3,10 +3,12 @@
 支持从图片文件中提取 EXIF 元数据和拍摄时间。
 """
 import exifread
+import io
 import re
 from datetime import datetime
-from typing import Dict, Tuple, Optional
+from typing import Dict, FrozenSet, Iterable, Tuple, Optional
 from .extractor import MetadataExtractor
+from .fast_exif import FastExifParser, UnsupportedFormat
 from ...tools.utils import get_logger
 
 logger = get_logger(__name__)
@@ -46,28 +48,47 @@ class ImageMetadataExtractor(MetadataExtractor):
         Returns:
             Tuple[EXIF 元数据字典, 拍摄时间]
         """
-        metadata = {}
-        shot_at = None
-
         try:
             with open(file_path, 'rb') as f:
-                tags = exifread.process_file(f, details=False)
+                return self._extract_from_stream(f, file_path)
+        except FileNotFoundError:
+            logger.error(f"图片文件不存在: {file_path}")
+        except Exception as e:
+            logger.error(f"解析图片 EXIF 失败 {file_path}: {e}")
 
-                # 提取所有有用的标签
-                for tag_name in tags.keys():
-                    if tag_name not in self.EXCLUDED_TAGS:
-                        metadata[tag_name] = str(tags[tag_name])
+        return {}, None
 
-                # 提取拍摄时间
-                shot_at = self._extract_datetime(tags)
+    def extract_from_bytes(self, content: bytes, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+        """从内存中的图片内容提取 EXIF 元数据（不再读文件）
 
-            logger.debug(f"成功提取图片元数据: {file_path}, 标签数: {len(metadata)}")
+        Args:
+            content: 图片文件完整内容
+            file_path: 图片文件路径（仅用于日志）
 
-        except FileNotFoundError:
-            logger.error(f"图片文件不存在: {file_path}")
+        Returns:
+            Tuple[EXIF 元数据字典, 拍摄时间]
+        """
+        try:
+            return self._extract_from_stream(io.BytesIO(content), file_path)
         except Exception as e:
             logger.error(f"解析图片 EXIF 失败 {file_path}: {e}")
 
+        return {}, None
+
+    def _extract_from_stream(self, stream, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+        """从二进制流解析 EXIF 标签"""
+        metadata = {}
+        tags = exifread.process_file(stream, details=False)
+
+        # 提取所有有用的标签
+        for tag_name in tags.keys():
+            if tag_name not in self.EXCLUDED_TAGS:
+                metadata[tag_name] = str(tags[tag_name])
+
+        # 提取拍摄时间
+        shot_at = self._extract_datetime(tags)
+
+        logger.debug(f"成功提取图片元数据: {file_path}, 标签数: {len(metadata)}")
         return metadata, shot_at
 
     def _extract_datetime(self, tags: Dict) -> Optional[datetime]:
@@ -130,3 +151,50 @@ class ImageMetadataExtractor(MetadataExtractor):
             return dt
         except ValueError:
             return None
+
+
+class FastImageMetadataExtractor(ImageMetadataExtractor):
+    """图片元数据快速提取器
+
+    只读取文件头部的元数据片段（JPEG APP1、HEIF meta、PNG eXIf 等），键名与值的字符串格式与
+    ImageMetadataExtractor 一致：
+    - 设置了需要的键（set_required_keys，通常是生效映射规则的 source_key）时只解析这些键和拍摄时间标签
+    - 未设置时解析全部标签（供原始元数据存储），仍然只读头部片段、不解析厂商 MakerNote
+
+    无法识别的格式（非 TIFF 结构的 RAW 等）或解析失败时回退到 exifread，结果同样按需要的键裁剪。
+    """
+
+    def __init__(self, required_keys: Optional[Iterable[str]] = None):
+        self.set_required_keys(required_keys)
+
+    def set_required_keys(self, keys: Optional[Iterable[str]]) -> None:
+        super().set_required_keys(keys)
+        self._wanted_keys: Optional[FrozenSet[str]] = None
+        if self.required_keys is not None:
+            self._wanted_keys = self.required_keys | frozenset(self.DATETIME_TAGS)
+        self._parser = FastExifParser(self._wanted_keys)
+
+    def prune(self, metadata: Dict, keys: Iterable[str]) -> Dict:
+        """只保留需要的键与拍摄时间标签（与设置 keys 后的解析结果一致）"""
+        wanted = frozenset(keys) | frozenset(self.DATETIME_TAGS)
+        return {key: value for key, value in metadata.items() if key in wanted}
+
+    def _extract_from_stream(self, stream, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+        """解析头部元数据片段，无法处理时回退到 exifread"""
+        try:
+            metadata = self._parser.parse(stream)
+        except UnsupportedFormat:
+            return self._extract_with_exifread(stream, file_path)
+        except Exception as e:
+            logger.debug(f"快速解析 EXIF 失败，回退到 exifread {file_path}: {e}")
+            return self._extract_with_exifread(stream, file_path)
+
+        shot_at = self._extract_datetime(metadata)
+        logger.debug(f"成功提取图片元数据: {file_path}, 标签数: {len(metadata)}")
+        return metadata, shot_at
+
+    def _extract_with_exifread(self, stream, file_path: str) -> Tuple[Dict, Optional[datetime]]:
+        metadata, shot_at = super()._extract_from_stream(stream, file_path)
+        if self._wanted_keys is not None:
+            metadata = {key: value for key, value in metadata.items() if key in self._wanted_keys}
+        return metadata, shot_at
@@ -0,0 +1,96 @@
+"""原始元数据存储
+
+提取器输出的原始元数据（EXIF 标签字典、整理后的 ffprobe 结果）在映射成标签后就被丢弃，
+新增映射规则或模板字段时只能重新读取 NAS 上的每个原文件。这里按文件内容哈希留存一份：
+- 紧凑 JSON（无空白、保留中文）再 zlib 压缩，典型照片 1~3 KB
+- 同一内容只存一份，重复导入覆盖为最新的提取结果
+- 与素材、标签在同一事务中写入（由 AssetBatchWriter 调用）
+
+重新映射见 TagRemapService。
+"""
+import json
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ...model import AssetRawMetadata
+
+
+class RawMetadataStore:
+    """原始元数据读写"""
+
+    COMPRESS_LEVEL = 6
+
+    @staticmethod
+    def _dumps(metadata: Dict) -> bytes:
+        """紧凑 JSON（无法序列化的值转为字符串）"""
+        return json.dumps(metadata, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+    @staticmethod
+    def encode(metadata: Dict) -> bytes:
+        """元数据 -> 压缩后的字节"""
+        return zlib.compress(RawMetadataStore._dumps(metadata), RawMetadataStore.COMPRESS_LEVEL)
+
+    @staticmethod
+    def decode(payload: bytes) -> Dict:
+        """压缩后的字节 -> 元数据"""
+        return json.loads(zlib.decompress(payload))
+
+    @staticmethod
+    def save_batch(db: Session, rows: Iterable[Dict]) -> int:
+        """批量保存（不提交）
+
+        已存在的哈希覆盖为新结果，其余一条 executemany INSERT 写入；由调用方在同一事务中提交。
+
+        Args:
+            db: 数据库会话
+            rows: [{'file_hash': ..., 'asset_type': 'image', 'extractor': ..., 'metadata': {...}}, ...]
+
+        Returns:
+            写入的行数
+        """
+        records: Dict[str, Dict] = {}
+        for row in rows:
+            if not row.get('file_hash') or not row.get('metadata'):
+                continue
+            raw = RawMetadataStore._dumps(row['metadata'])
+            records[row['file_hash']] = {
+                'file_hash': row['file_hash'],
+                'asset_type': row['asset_type'],
+                'extractor': row.get('extractor') or '',
+                'payload': zlib.compress(raw, RawMetadataStore.COMPRESS_LEVEL),
+                'payload_size': len(raw),
+            }
+        if not records:
+            return 0
+
+        existing = db.query(AssetRawMetadata).filter(AssetRawMetadata.file_hash.in_(list(records))).all()
+        for item in existing:
+            record = records.pop(item.file_hash)
+            item.asset_type = record['asset_type']
+            item.extractor = record['extractor']
+            item.payload = record['payload']
+            item.payload_size = record['payload_size']
+
+        if records:
+            db.execute(insert(AssetRawMetadata), list(records.values()))
+        db.flush()
+        return len(existing) + len(records)
+
+    @staticmethod
+    def load(db: Session, file_hash: str) -> Optional[Dict]:
+        """读取单个文件的原始元数据（不存在时返回 None）"""
+        payload = db.query(AssetRawMetadata.payload).filter(AssetRawMetadata.file_hash == file_hash).scalar()
+        return RawMetadataStore.decode(payload) if payload is not None else None
+
+    @staticmethod
+    def load_many(db: Session, file_hashes: List[str]) -> Dict[str, Dict]:
+        """批量读取原始元数据：file_hash -> 元数据"""
+        if not file_hashes:
+            return {}
+        rows = db.query(AssetRawMetadata.file_hash, AssetRawMetadata.payload).filter(
+            AssetRawMetadata.file_hash.in_(file_hashes)
+        ).all()
+        return {row.file_hash: RawMetadataStore.decode(row.payload) for row in rows}
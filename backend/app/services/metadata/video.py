@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Dict, Tuple, Optional
 from .extractor import MetadataExtractor
 from ...tools.utils import get_logger
+from ...tools.video_probe import probe_video
 
 logger = get_logger(__name__)
 
@@ -50,8 +51,8 @@ class VideoMetadataExtractor(MetadataExtractor):
         shot_at = None
 
         try:
-            # 使用 ffmpeg.probe 获取完整元数据
-            probe = ffmpeg.probe(file_path)
+            # 使用 ffmpeg.probe 获取完整元数据（与缩略图、感知哈希共用探测缓存）
+            probe = probe_video(file_path)
 
             # 1. 提取容器级别的元数据
             format_info = probe.get('format', {})
@@ -1,10 +1,11 @@
 """
 预览图生成模块
 
-负责为浏览器不支持的格式（如 HEIC）生成 WebP 预览图。
+负责为浏览器不支持的格式（如 HEIC）生成 WebP 预览图，以及为超大图片生成 DZI 切片金字塔。
 """
 from .generator import PreviewGenerator, PreviewGeneratorFactory, needs_preview
 from .image import ImagePreviewGenerator
+from .deepzoom import DeepZoomGenerator
 
 # 注册图片预览图生成器
 PreviewGeneratorFactory.register('image', ImagePreviewGenerator())
@@ -13,5 +14,6 @@ __all__ = [
     'PreviewGenerator',
     'PreviewGeneratorFactory',
     'ImagePreviewGenerator',
+    'DeepZoomGenerator',
     'needs_preview',
 ]
\ No newline at end of file
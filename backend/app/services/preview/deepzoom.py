@@ -0,0 +1,181 @@
+"""超大图片的 Deep Zoom（DZI）切片金字塔生成器
+
+原尺寸预览图对一亿像素的全景图意味着浏览器要下载并解码整张大图。超过像素阈值的图片额外生成
+DZI 格式的切片金字塔，查看器（如 OpenSeadragon）只请求视口内、当前缩放级别的切片：
+
+    {base}.dzi                          # 描述文件（尺寸、切片大小、重叠、格式）
+    {base}_files/{level}/{col}_{row}.webp
+
+- 第 max_level 级为原尺寸，每低一级宽高减半（向上取整），第 0 级为 1×1
+- 内存有界：从原尺寸逐级 reduce(2) 生成下一级，只同时持有相邻两级（峰值约为原图解码内存的 1.25 倍），
+  切片逐个编码写盘；未达到阈值的图片只读文件头判断尺寸，不解码
+- 已有解码结果（如 HEIC 生成原尺寸预览图时）直接复用，不再解码
+- 解码经 open_image，受解码像素预算约束：超出预算的图片按预算缩小后切片（描述文件记录实际尺寸）
+"""
+import io
+import math
+import os
+import shutil
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from ...tools.image_decode import open_image
+from ...tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+# 默认配置
+DEFAULT_TILE_SIZE = 254  # 切片边长（加上两侧各 1px 重叠为 256）
+DEFAULT_OVERLAP = 1      # 相邻切片重叠像素
+DEFAULT_QUALITY = 85     # WebP 质量
+TILE_FORMAT = 'webp'
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+DZI_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+    'Format="{format}" Overlap="{overlap}" TileSize="{tile_size}">\n'
+    '  <Size Width="{width}" Height="{height}"/>\n'
+    '</Image>\n'
+)
+
+
+class DeepZoomGenerator:
+    """图片 DZI 切片金字塔生成器"""
+
+    def __init__(
+        self,
+        min_pixels: int,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+        quality: int = DEFAULT_QUALITY
+    ):
+        """初始化生成器
+
+        Args:
+            min_pixels: 像素阈值（宽 × 高），达到才生成
+            tile_size: 切片边长，默认 254
+            overlap: 切片重叠像素，默认 1
+            quality: WebP 质量，默认 85
+        """
+        self.min_pixels = min_pixels
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.quality = quality
+
+    def generate(
+        self,
+        source: Union[str, bytes],
+        dest_base: str,
+        image: Optional[Image.Image] = None
+    ) -> Optional[Dict]:
+        """生成切片金字塔（未达到阈值或失败返回 None）
+
+        Args:
+            source: 原始文件路径或文件内容（image 为 None 时读取）
+            dest_base: 输出路径前缀，生成 {dest_base}.dzi 与 {dest_base}_files/
+            image: 已按 EXIF 方向修正的原尺寸解码结果（提供时复用，不会被关闭）
+
+        Returns:
+            {width, height, tile_size, overlap, format, levels, tiles}
+        """
+        owned = None
+        try:
+            if image is None:
+                # 只读文件头得到尺寸，未达到阈值不解码
+                with Image.open(_reader(source)) as header:
+                    if header.width * header.height < self.min_pixels:
+                        return None
+                owned = open_image(_reader(source))
+                # 无需旋转时直接使用原图，避免 exif_transpose 额外复制一份像素
+                if owned.getexif().get(EXIF_ORIENTATION_TAG, 1) not in (None, 1):
+                    raw, owned = owned, ImageOps.exif_transpose(owned)
+                    raw.close()
+                image = owned
+            elif image.width * image.height < self.min_pixels:
+                return None
+
+            info = self._build(image, dest_base)
+            logger.info(
+                f"Deep Zoom 切片生成成功: {dest_base}, {info['width']}x{info['height']}, "
+                f"{info['levels']} 级 {info['tiles']} 个切片"
+            )
+            return info
+
+        except Exception as e:
+            logger.error(f"生成 Deep Zoom 切片失败 {dest_base}: {type(e).__name__} - {e}")
+            return None
+        finally:
+            if owned is not None:
+                owned.close()
+
+    def _build(self, image: Image.Image, dest_base: str) -> Dict:
+        """逐级生成切片（先写临时目录，完成后替换），并写描述文件"""
+        width, height = image.size
+        max_level = math.ceil(math.log2(max(width, height, 1)))
+        tiles_dir = f"{dest_base}_files"
+        tmp_dir = f"{tiles_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        tiles = 0
+        level_image = image
+        if level_image.mode not in ('RGB', 'RGBA'):
+            level_image = level_image.convert('RGB')
+        try:
+            for level in range(max_level, -1, -1):
+                tiles += self._save_level(level_image, os.path.join(tmp_dir, str(level)))
+                if level == 0:
+                    break
+                next_image = level_image.reduce(2)
+                if level_image is not image:
+                    level_image.close()
+                level_image = next_image
+        finally:
+            if level_image is not image:
+                level_image.close()
+
+        shutil.rmtree(tiles_dir, ignore_errors=True)
+        os.replace(tmp_dir, tiles_dir)
+        with open(f"{dest_base}.dzi", 'w', encoding='utf-8') as f:
+            f.write(DZI_TEMPLATE.format(
+                format=TILE_FORMAT, overlap=self.overlap, tile_size=self.tile_size, width=width, height=height
+            ))
+
+        return {
+            'width': width,
+            'height': height,
+            'tile_size': self.tile_size,
+            'overlap': self.overlap,
+            'format': TILE_FORMAT,
+            'levels': max_level + 1,
+            'tiles': tiles,
+        }
+
+    def _save_level(self, level_image: Image.Image, level_dir: str) -> int:
+        """切分并保存一级的全部切片，返回切片数"""
+        os.makedirs(level_dir, exist_ok=True)
+        columns = math.ceil(level_image.width / self.tile_size)
+        rows = math.ceil(level_image.height / self.tile_size)
+        for column in range(columns):
+            for row in range(rows):
+                box = self.tile_box(level_image.size, column, row)
+                tile = level_image.crop(box)
+                tile.save(os.path.join(level_dir, f"{column}_{row}.{TILE_FORMAT}"), 'WEBP', quality=self.quality)
+                tile.close()
+        return columns * rows
+
+    def tile_box(self, level_size: Tuple[int, int], column: int, row: int) -> Tuple[int, int, int, int]:
+        """切片在该级图像中的区域（左、上各向外扩展 overlap，右、下同理，裁到图像边界）"""
+        width, height = level_size
+        left = column * self.tile_size - (self.overlap if column > 0 else 0)
+        top = row * self.tile_size - (self.overlap if row > 0 else 0)
+        right = min((column + 1) * self.tile_size + self.overlap, width)
+        bottom = min((row + 1) * self.tile_size + self.overlap, height)
+        return left, top, right, bottom
+
+
+def _reader(source: Union[str, bytes]) -> Union[str, BinaryIO]:
+    """文件内容每次包装为新的流（图片关闭时会一并关闭传入的流）"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
@@ -4,9 +4,12 @@
 """
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from ...tools.utils import get_logger
 
+if TYPE_CHECKING:
+    from .deepzoom import DeepZoomGenerator
+
 logger = get_logger(__name__)
 
 # 需要生成预览图的 MIME 类型（浏览器不支持的格式）
@@ -35,7 +38,7 @@ def needs_preview(mime_type: str) -> bool:
 class PreviewGenerator(ABC):
     """预览图生成器抽象基类
 
-    所有预览图生成器必须实现 generate() 方法。
+    所有预览图生成器必须实现 generate() 与 generate_from_image() 方法。
     """
 
     @abstractmethod
@@ -55,6 +58,23 @@ class PreviewGenerator(ABC):
         """
         pass
 
+    @abstractmethod
+    def generate_from_image(self, img, dest_path: str) -> bool:
+        """基于已解码（且已按 EXIF 方向修正）的图片生成预览图
+
+        Args:
+            img: PIL Image 对象
+            dest_path: 预览图保存路径
+
+        Returns:
+            生成成功返回 True，失败返回 False
+        """
+        pass
+
+    def version(self) -> str:
+        """生成器版本指纹（算法版本 + 影响输出的参数，用法同缩略图生成器）"""
+        return self.__class__.__name__
+
     def _ensure_dest_dir(self, dest_path: str):
         """确保目标目录存在
 
@@ -73,6 +93,7 @@ class PreviewGeneratorFactory:
     """
 
     _generators: Dict[str, PreviewGenerator] = {}
+    _deep_zoom_generators: Dict[str, 'DeepZoomGenerator'] = {}
 
     @classmethod
     def register(cls, asset_type: str, generator: PreviewGenerator):
@@ -100,6 +121,28 @@ class PreviewGeneratorFactory:
             logger.warning(f"未找到预览图生成器: {asset_type}")
         return generator
 
+    @classmethod
+    def register_deep_zoom(cls, asset_type: str, generator: 'DeepZoomGenerator'):
+        """注册 Deep Zoom 切片金字塔生成器
+
+        Args:
+            asset_type: 素材类型（目前只有 'image'）
+            generator: 生成器实例
+        """
+        cls._deep_zoom_generators[asset_type] = generator
+        logger.debug(f"注册 Deep Zoom 生成器: {asset_type} -> {generator.__class__.__name__}")
+
+    @classmethod
+    def create_deep_zoom(cls, asset_type: str) -> Optional['DeepZoomGenerator']:
+        """该类型的 Deep Zoom 生成器（未注册时返回 None，视频等类型不生成切片）"""
+        return cls._deep_zoom_generators.get(asset_type)
+
+    @classmethod
+    def version(cls, asset_type: str) -> Optional[str]:
+        """该类型预览图生成器的版本指纹（未注册时为 None）"""
+        generator = cls._generators.get(asset_type)
+        return generator.version() if generator else None
+
     @classmethod
     def generate(
         cls,
@@ -5,6 +5,8 @@
 from PIL import Image, ImageOps
 from pillow_heif import register_heif_opener
 from .generator import PreviewGenerator
+from ...tools.atomic_file import save_image
+from ...tools.image_decode import open_image
 from ...tools.utils import get_logger
 
 # 注册 HEIF/HEIC 解码器（支持苹果 HEIC 格式）
@@ -12,17 +14,29 @@ register_heif_opener()
 
 logger = get_logger(__name__)
 
+# 默认配置
+DEFAULT_QUALITY = 90    # WebP 质量（较高以保证清晰度）
+GENERATOR_VERSION = 1   # 转换方式变化时递增
+
 
 class ImagePreviewGenerator(PreviewGenerator):
     """图片预览图生成器
 
     特性：
-    - 保持原始尺寸（不缩放）
+    - 保持原始尺寸（不缩放；超出解码像素预算的图片按预算缩小，见 tools/image_decode.py）
     - EXIF 方向自动修正
     - WebP 格式输出（浏览器兼容性好）
     - 高质量压缩
     """
 
+    def __init__(self, quality: int = DEFAULT_QUALITY):
+        """初始化生成器
+
+        Args:
+            quality: WebP 输出质量（0-100），默认 90
+        """
+        self.quality = quality
+
     def generate(
         self,
         source_path: str,
@@ -38,18 +52,10 @@ class ImagePreviewGenerator(PreviewGenerator):
             成功返回 True，失败返回 False
         """
         try:
-            with Image.open(source_path) as img:
+            with open_image(source_path) as img:
                 # 自动根据 EXIF 方向旋转图片
                 img = ImageOps.exif_transpose(img)
-
-                # 确保目标目录存在
-                self._ensure_dest_dir(dest_path)
-
-                # 保存为 WebP 格式（保持原始尺寸）
-                # 使用较高的质量以保证清晰度
-                img.save(dest_path, "WEBP", quality=90, optimize=True)
-
-                logger.debug(f"成功生成预览图: {dest_path}, 尺寸: {img.size}")
+                self._render(img, dest_path)
                 return True
 
         except FileNotFoundError:
@@ -59,4 +65,31 @@ class ImagePreviewGenerator(PreviewGenerator):
         except Exception as e:
             logger.error(f"生成预览图失败 {source_path}: {e}")
 
-        return False
\ No newline at end of file
+        return False
+
+    def generate_from_image(self, img: Image.Image, dest_path: str) -> bool:
+        """基于已解码（且已按 EXIF 方向修正）的图片生成预览图
+
+        Args:
+            img: PIL Image 对象
+            dest_path: 预览图保存路径
+
+        Returns:
+            成功返回 True，失败返回 False
+        """
+        try:
+            self._render(img, dest_path)
+            return True
+        except Exception as e:
+            logger.error(f"生成预览图失败 {dest_path}: {e}")
+        return False
+
+    def version(self) -> str:
+        """版本指纹：算法版本 + 质量"""
+        return f"image-preview.v{GENERATOR_VERSION}:webp:q{self.quality}"
+
+    def _render(self, img: Image.Image, dest_path: str) -> None:
+        """保存为 WebP（保持原始尺寸；先写临时文件再替换）"""
+        save_image(img, dest_path, "WEBP", quality=self.quality, optimize=True)
+
+        logger.debug(f"成功生成预览图: {dest_path}, 尺寸: {img.size}")
\ No newline at end of file
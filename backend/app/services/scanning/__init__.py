@@ -3,6 +3,26 @@
 
 负责从各种数据源扫描和发现素材文件。
 """
-from .filesystem import FilesystemScanner
+from .filesystem import FilesystemScanner, prefetch_batches
+from .sharding import ScanShard, ShardPlanner
+from .watcher import (
+    ChangeDebouncer,
+    DirectoryWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchChanges,
+    create_watcher,
+)
 
-__all__ = ['FilesystemScanner']
+__all__ = [
+    'FilesystemScanner',
+    'prefetch_batches',
+    'ScanShard',
+    'ShardPlanner',
+    'ChangeDebouncer',
+    'DirectoryWatcher',
+    'InotifyWatcher',
+    'PollingWatcher',
+    'WatchChanges',
+    'create_watcher',
+]
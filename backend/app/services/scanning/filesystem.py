@@ -3,8 +3,10 @@
 负责扫描本地文件系统并发现支持的素材文件。
 """
 import os
-from pathlib import Path
-from typing import List, Dict, Set
+import queue
+import stat
+import threading
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from datetime import datetime
 from ...tools.utils import get_logger
 
@@ -23,6 +25,9 @@ class FilesystemScanner:
     SUPPORTED_IMAGES: Set[str] = {'.jpg', '.jpeg', '.png', '.heic', '.raw'}
     SUPPORTED_VIDEOS: Set[str] = {'.mp4', '.mov', '.avi'}
 
+    # 流式扫描默认批大小
+    DEFAULT_BATCH_SIZE = 500
+
     @classmethod
     def get_supported_extensions(cls) -> Set[str]:
         """获取所有支持的文件扩展名"""
@@ -66,47 +71,303 @@ class FilesystemScanner:
         Returns:
             素材信息字典列表，每个字典包含基础文件信息（不含元数据）
         """
+        assets_to_import = [
+            asset
+            for batch in cls.iter_scan(root_path, created_by, visibility)
+            for asset in batch
+        ]
+        logger.info(f"扫描完成，共发现 {len(assets_to_import)} 个素材文件")
+        return assets_to_import
+
+    @classmethod
+    def iter_scan(
+        cls,
+        root_path: str,
+        created_by: int,
+        visibility: str = 'general',
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[List[Dict]]:
+        """流式扫描目录，边遍历边按批产出素材数据
+
+        基于 os.scandir 深度优先遍历（目录内按文件名排序，结果顺序稳定），
+        复用 DirEntry 的 stat 结果获取文件大小与创建时间。
+
+        Args:
+            root_path: 扫描根路径
+            created_by: 创建者用户ID
+            visibility: 素材可见性 ('general' 或 'private')
+            batch_size: 每批最多包含的素材数
+
+        Yields:
+            素材信息字典列表（每批不超过 batch_size 个）
+        """
         if not os.path.exists(root_path):
             logger.error(f"扫描路径不存在: {root_path}")
             raise FileNotFoundError(f"扫描路径不存在: {root_path}")
 
-        assets_to_import = []
+        logger.info(f"开始扫描目录: {root_path}")
+
+        batch: List[Dict] = []
+        for entry in cls.iter_supported_entries(root_path):
+            try:
+                batch.append(cls._build_asset(entry, root_path, created_by, visibility))
+            except Exception as e:
+                logger.error(f"处理文件失败 {entry.name}: {e}")
+                continue
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    @classmethod
+    def iter_paths(
+        cls,
+        root_path: str,
+        rel_paths: Iterable[str],
+        created_by: int,
+        visibility: str = 'general',
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[List[Dict]]:
+        """只扫描指定文件（监控模式增量导入），按扫描顺序按批产出
+
+        已不存在、不是普通文件或格式不支持的路径直接忽略。
+
+        Args:
+            root_path: 扫描根路径
+            rel_paths: 相对 root_path 的文件路径
+            created_by: 创建者用户ID
+            visibility: 素材可见性 ('general' 或 'private')
+            batch_size: 每批最多包含的素材数
+
+        Yields:
+            素材信息字典列表（每批不超过 batch_size 个）
+        """
         supported_extensions = cls.get_supported_extensions()
+        batch: List[Dict] = []
+        for rel_path in sorted({os.path.normpath(p) for p in rel_paths}, key=cls.order_key):
+            name = os.path.basename(rel_path)
+            if os.path.splitext(name)[1].lower() not in supported_extensions:
+                continue
+            try:
+                stat_result = os.stat(os.path.join(root_path, rel_path))
+            except OSError:
+                continue
+            if not stat.S_ISREG(stat_result.st_mode):
+                continue
 
-        logger.info(f"开始扫描目录: {root_path}")
+            batch.append(cls._asset_from_stat(name, rel_path, stat_result, created_by, visibility))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-        for root, dirs, files in os.walk(root_path):
-            for file in files:
-                ext = Path(file).suffix.lower()
+        if batch:
+            yield batch
 
-                if ext not in supported_extensions:
-                    continue
+    @classmethod
+    def iter_scopes(
+        cls,
+        root_path: str,
+        scopes: Iterable[Tuple[str, bool]],
+        created_by: int,
+        visibility: str = 'general',
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[List[Dict]]:
+        """只扫描 root_path 下的若干目录（分片导入），相对路径仍相对 root_path
 
-                try:
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path, root_path)
-
-                    # 获取文件基础信息
-                    file_size = os.path.getsize(full_path)
-                    asset_type = cls.get_asset_type(ext)
-                    created_time = datetime.fromtimestamp(os.path.getctime(full_path))
-
-                    asset = {
-                        "created_by": created_by,
-                        "original_path": rel_path,
-                        "asset_type": asset_type,
-                        "file_size": file_size,
-                        "mime_type": f"{asset_type}/{ext.lstrip('.')}",
-                        "visibility": visibility,
-                        "file_created_at": created_time,  # 文件创建时间（备用）
-                        "is_deleted": False,
-                    }
-
-                    assets_to_import.append(asset)
+        scopes 需按扫描顺序排列且互不重叠（由 ShardPlanner 保证），产出顺序即与 iter_scan 一致。
 
+        Args:
+            root_path: 扫描根路径
+            scopes: [(相对目录, 是否递归)]，'' 表示根目录；不递归时只产出该目录自身的文件
+            created_by: 创建者用户ID
+            visibility: 素材可见性 ('general' 或 'private')
+            batch_size: 每批最多包含的素材数
+
+        Yields:
+            素材信息字典列表（每批不超过 batch_size 个）
+        """
+        if not os.path.exists(root_path):
+            logger.error(f"扫描路径不存在: {root_path}")
+            raise FileNotFoundError(f"扫描路径不存在: {root_path}")
+
+        batch: List[Dict] = []
+        for rel_dir, recursive in scopes:
+            dir_path = os.path.join(root_path, rel_dir) if rel_dir else root_path
+            skip_dir = None if recursive else (lambda _path: True)
+            for entry in cls.iter_supported_entries(dir_path, skip_dir=skip_dir):
+                try:
+                    batch.append(cls._build_asset(entry, root_path, created_by, visibility))
                 except Exception as e:
-                    logger.error(f"处理文件失败 {file}: {e}")
+                    logger.error(f"处理文件失败 {entry.name}: {e}")
                     continue
 
-        logger.info(f"扫描完成，共发现 {len(assets_to_import)} 个素材文件")
-        return assets_to_import
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
+    @staticmethod
+    def order_key(rel_path: str) -> Tuple[Tuple[int, str], ...]:
+        """文件在扫描顺序中的排序键（与 iter_scan 的产出顺序一致）
+
+        同一目录内先产出文件、再依次进入子目录，均按名称排序；
+        因此每一级目录记为 (1, 名称)，文件记为 (0, 名称)，按元组比较即得扫描顺序。
+
+        Args:
+            rel_path: 相对扫描根目录的文件路径
+        """
+        parts = os.path.normpath(rel_path).split(os.sep)
+        return tuple((1, name) for name in parts[:-1]) + ((0, parts[-1]),)
+
+    @classmethod
+    def iter_supported_entries(
+        cls,
+        root_path: str,
+        skip_dir: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[os.DirEntry]:
+        """深度优先遍历目录，产出支持格式的文件条目（不跟随符号链接目录，与 os.walk 默认行为一致）
+
+        Args:
+            root_path: 扫描根路径
+            skip_dir: 目录过滤（参数为目录完整路径，返回 True 则不进入）
+        """
+        supported_extensions = cls.get_supported_extensions()
+        pending_dirs = [root_path]
+
+        while pending_dirs:
+            current = pending_dirs.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.error(f"读取目录失败 {current}: {e}")
+                continue
+
+            sub_dirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink() and not (skip_dir and skip_dir(entry.path)):
+                            sub_dirs.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+
+                if os.path.splitext(entry.name)[1].lower() in supported_extensions:
+                    yield entry
+
+            # 逆序压栈，保证子目录按名称顺序出栈
+            pending_dirs.extend(reversed(sub_dirs))
+
+    @classmethod
+    def _build_asset(
+        cls,
+        entry: os.DirEntry,
+        root_path: str,
+        created_by: int,
+        visibility: str
+    ) -> Dict:
+        """根据目录条目构建素材基础信息（仅一次 stat）"""
+        return cls._asset_from_stat(
+            entry.name, os.path.relpath(entry.path, root_path), entry.stat(), created_by, visibility
+        )
+
+    @classmethod
+    def describe_file(
+        cls,
+        file_path: str,
+        original_path: str,
+        created_by: int,
+        visibility: str = 'general'
+    ) -> Dict:
+        """构建单个文件的素材基础信息（流式上传等无需扫描目录的入口使用）
+
+        Args:
+            file_path: 文件完整路径
+            original_path: 记录到素材数据中的相对路径
+            created_by: 创建者用户ID
+            visibility: 素材可见性
+
+        Raises:
+            ValueError: 不支持的文件格式
+        """
+        return cls._asset_from_stat(
+            os.path.basename(file_path), original_path, os.stat(file_path), created_by, visibility
+        )
+
+    @classmethod
+    def _asset_from_stat(
+        cls,
+        name: str,
+        original_path: str,
+        stat_result: os.stat_result,
+        created_by: int,
+        visibility: str
+    ) -> Dict:
+        ext = os.path.splitext(name)[1].lower()
+        asset_type = cls.get_asset_type(ext)
+
+        return {
+            "created_by": created_by,
+            "original_path": original_path,
+            "asset_type": asset_type,
+            "file_size": stat_result.st_size,
+            "mime_type": f"{asset_type}/{ext.lstrip('.')}",
+            "visibility": visibility,
+            "file_created_at": datetime.fromtimestamp(stat_result.st_ctime),  # 文件创建时间（备用）
+            "file_mtime_ns": stat_result.st_mtime_ns,  # stat 签名（扫描清单使用，不落 assets 表）
+            "file_inode": stat_result.st_ino,
+            "is_deleted": False,
+        }
+
+
+def prefetch_batches(batches: Iterator[List[Dict]], max_pending: int = 4) -> Iterator[List[Dict]]:
+    """在后台线程中提前拉取批次，让扫描与下游处理并发进行
+
+    Args:
+        batches: 批次迭代器（通常来自 FilesystemScanner.iter_scan）
+        max_pending: 最多缓存的批次数（背压，避免扫描远超处理速度时占用过多内存）
+
+    Yields:
+        与输入相同的批次；扫描线程中的异常会在消费端原样抛出
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max_pending)
+    done = object()
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        """队列满时等待，消费端已退出则放弃（返回 False），避免扫描线程永久阻塞"""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for batch in batches:
+                if not _put(batch):
+                    return
+            _put(done)
+        except BaseException as e:  # noqa: B902 - 交给消费端处理
+            _put(e)
+
+    producer = threading.Thread(target=_produce, name="scanner-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,130 @@
+"""目录分片
+
+大目录首次导入时把目录树切成若干分片，分发给多个 Worker 并行导入：
+- 子树文件数不超过上限的目录整体作为一个范围（递归）
+- 超过上限的目录拆开：自身的文件一个范围（不递归），子目录分别继续切分
+- 按扫描顺序把相邻的范围装箱成分片，每个分片的文件数不超过上限（单个目录自身文件过多时除外）
+
+分片内的范围按扫描顺序排列、互不重叠，检查点（order_key）在分片内依然单调。
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from ...tools.utils import get_logger
+from .filesystem import FilesystemScanner
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ScanShard:
+    """一个导入分片"""
+
+    scopes: List[Tuple[str, bool]] = field(default_factory=list)  # [(相对目录, 是否递归)]，按扫描顺序
+    file_count: int = 0  # 支持格式的文件数
+    byte_count: int = 0  # 文件总字节数
+
+
+@dataclass
+class _DirStats:
+    files: int = 0  # 目录自身的文件数
+    bytes: int = 0
+    children: List[str] = field(default_factory=list)  # 子目录（相对路径，按名称排序）
+    tree_files: int = 0  # 整棵子树的文件数
+    tree_bytes: int = 0
+
+
+class ShardPlanner:
+    """目录分片规划"""
+
+    @classmethod
+    def plan(cls, root_path: str, max_files_per_shard: int) -> List[ScanShard]:
+        """遍历目录树（仅 stat，不读文件内容）并切分
+
+        Args:
+            root_path: 扫描根路径
+            max_files_per_shard: 每个分片的目标文件数上限
+
+        Returns:
+            按扫描顺序排列的分片（目录中没有支持的文件时为空）
+        """
+        if not os.path.isdir(root_path):
+            raise FileNotFoundError(f"扫描路径不存在: {root_path}")
+        if max_files_per_shard < 1:
+            raise ValueError(f"max_files_per_shard 必须 >= 1, 当前值: {max_files_per_shard}")
+
+        stats = cls._collect(root_path)
+        scopes = cls._split(stats, '', max_files_per_shard)
+
+        shards: List[ScanShard] = []
+        current = ScanShard()
+        for rel_dir, recursive, files, size in scopes:
+            if current.scopes and current.file_count + files > max_files_per_shard:
+                shards.append(current)
+                current = ScanShard()
+            current.scopes.append((rel_dir, recursive))
+            current.file_count += files
+            current.byte_count += size
+        if current.scopes:
+            shards.append(current)
+
+        logger.info(
+            f"目录分片完成 - 路径: {root_path}, 文件数: {stats[''].tree_files}, "
+            f"分片数: {len(shards)}, 每片上限: {max_files_per_shard}"
+        )
+        return shards
+
+    @staticmethod
+    def _collect(root_path: str) -> Dict[str, _DirStats]:
+        """统计每个目录自身的文件数/字节数，再自底向上汇总子树"""
+        supported_extensions = FilesystemScanner.get_supported_extensions()
+        stats: Dict[str, _DirStats] = {}
+        order: List[str] = []
+        pending = ['']
+
+        while pending:
+            rel_dir = pending.pop()
+            dir_stats = stats[rel_dir] = _DirStats()
+            order.append(rel_dir)
+            try:
+                with os.scandir(os.path.join(root_path, rel_dir) if rel_dir else root_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                logger.error(f"读取目录失败 {rel_dir or root_path}: {e}")
+                continue
+
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            dir_stats.children.append(os.path.join(rel_dir, entry.name) if rel_dir else entry.name)
+                        continue
+                    if os.path.splitext(entry.name)[1].lower() in supported_extensions:
+                        dir_stats.files += 1
+                        dir_stats.bytes += entry.stat().st_size
+                except OSError:
+                    continue
+            pending.extend(reversed(dir_stats.children))
+
+        # 先序遍历的逆序即子目录先于父目录
+        for rel_dir in reversed(order):
+            dir_stats = stats[rel_dir]
+            dir_stats.tree_files = dir_stats.files + sum(stats[child].tree_files for child in dir_stats.children)
+            dir_stats.tree_bytes = dir_stats.bytes + sum(stats[child].tree_bytes for child in dir_stats.children)
+        return stats
+
+    @classmethod
+    def _split(cls, stats: Dict[str, _DirStats], rel_dir: str, max_files: int) -> List[Tuple[str, bool, int, int]]:
+        """切分为扫描范围 [(相对目录, 是否递归, 文件数, 字节数)]，按扫描顺序"""
+        dir_stats = stats[rel_dir]
+        if dir_stats.tree_files == 0:
+            return []
+        if dir_stats.tree_files <= max_files or not dir_stats.children:
+            return [(rel_dir, True, dir_stats.tree_files, dir_stats.tree_bytes)]
+
+        scopes = []
+        if dir_stats.files:
+            scopes.append((rel_dir, False, dir_stats.files, dir_stats.bytes))
+        for child in dir_stats.children:
+            scopes.extend(cls._split(stats, child, max_files))
+        return scopes
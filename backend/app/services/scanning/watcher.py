@@ -0,0 +1,262 @@
+"""目录变更监控
+
+监控模式下只把发生变化的文件交给导入，不再遍历整棵目录树：
+- Linux：inotify（ctypes 直接调用 libc，无额外依赖），递归监听目录，只响应写入完成
+  （IN_CLOSE_WRITE）与移入（IN_MOVED_TO）；新建/移入的子目录自动加入监听并补扫其中已有的文件
+- 其他平台或 inotify 不可用（如监听数超过 max_user_watches）：定时遍历比较 stat 签名
+
+事件经 ChangeDebouncer 去抖：同一文件在静默期内的多次事件合并为一次，批量复制时自然攒成一批。
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ...tools.utils import get_logger
+from .filesystem import FilesystemScanner
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WatchChanges:
+    """一次轮询得到的变更"""
+
+    paths: Set[str] = field(default_factory=set)  # 新增或修改的文件（完整路径）
+    rescan_roots: Set[str] = field(default_factory=set)  # 事件丢失（队列溢出等），需要整目录补扫的根目录
+
+
+class DirectoryWatcher(ABC):
+    """目录变更来源"""
+
+    def __init__(self, roots: Iterable[str], excluded: Iterable[str] = ()):
+        """初始化监控
+
+        Args:
+            roots: 监控的根目录
+            excluded: 排除的目录（完整路径，如 NAS 内由系统写入的 original/processed）
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.excluded = {os.path.abspath(path) for path in excluded}
+
+    def is_excluded(self, dir_path: str) -> bool:
+        """隐藏目录与排除目录不监控"""
+        return os.path.basename(dir_path).startswith('.') or os.path.abspath(dir_path) in self.excluded
+
+    def root_of(self, path: str) -> Optional[str]:
+        """文件所属的监控根目录"""
+        for root in self.roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    @abstractmethod
+    def poll(self, timeout: float) -> WatchChanges:
+        """等待最多 timeout 秒，返回期间的变更"""
+
+    def close(self) -> None:
+        """释放资源"""
+
+    def _iter_files(self, dir_path: str) -> Iterable[str]:
+        for entry in FilesystemScanner.iter_supported_entries(dir_path, skip_dir=self.is_excluded):
+            yield entry.path
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """inotify 监控（仅 Linux）"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    _EVENT_HEADER = struct.Struct('iIII')
+    _READ_SIZE = 64 * 1024
+
+    def __init__(self, roots: Iterable[str], excluded: Iterable[str] = ()):
+        super().__init__(roots, excluded)
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "inotify 仅支持 Linux")
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, str] = {}  # watch descriptor -> 目录
+        try:
+            for root in self.roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+        logger.info(f"inotify 监控已启动 - 目录数: {len(self._dirs)}")
+
+    def poll(self, timeout: float) -> WatchChanges:
+        changes = WatchChanges()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changes
+
+        while True:
+            try:
+                data = os.read(self._fd, self._READ_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._parse(data, changes)
+        return changes
+
+    def close(self) -> None:
+        if getattr(self, '_fd', -1) >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _parse(self, data: bytes, changes: WatchChanges) -> None:
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                logger.warning("inotify 事件队列溢出，将整目录补扫")
+                changes.rescan_roots.update(self.roots)
+                continue
+            if mask & (self.IN_IGNORED | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                # 目录被删除或移走：移除监听（移入的新位置会收到 IN_MOVED_TO 并重新监听）
+                self._dirs.pop(wd, None)
+                continue
+
+            dir_path = self._dirs.get(wd)
+            if dir_path is None or not name:
+                continue
+            path = os.path.join(dir_path, name)
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not self.is_excluded(path):
+                    # 新目录：加入监听，并补扫监听建立前已写入的文件
+                    try:
+                        self._add_tree(path)
+                    except OSError as e:
+                        logger.warning(f"新目录加入监听失败，将整目录补扫 {path}: {e}")
+                        changes.rescan_roots.add(self.root_of(path) or path)
+                    changes.paths.update(self._iter_files(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changes.paths.add(path)
+
+    def _add_tree(self, root: str) -> None:
+        pending = [root]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and not self.is_excluded(entry.path):
+                            pending.append(entry.path)
+            except OSError as e:
+                logger.error(f"读取目录失败 {current}: {e}")
+
+    def _add_watch(self, dir_path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify 监听数已达上限（fs.inotify.max_user_watches）", dir_path)
+            raise OSError(err, os.strerror(err), dir_path)
+        self._dirs[wd] = dir_path
+
+
+class PollingWatcher(DirectoryWatcher):
+    """轮询监控：定时遍历目录比较 (大小, 修改时间)，首轮只建立基线"""
+
+    def __init__(self, roots: Iterable[str], excluded: Iterable[str] = (), interval: float = 5.0):
+        super().__init__(roots, excluded)
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+        logger.info(f"轮询监控已启动 - 间隔: {interval}s, 文件数: {len(self._snapshot)}")
+
+    def poll(self, timeout: float) -> WatchChanges:
+        changes = WatchChanges()
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return changes
+        if wait > 0:
+            time.sleep(wait)
+
+        snapshot = self._take_snapshot()
+        changes.paths = {
+            path for path, signature in snapshot.items()
+            if self._snapshot.get(path) != signature
+        }
+        self._snapshot = snapshot
+        self._next_poll = time.monotonic() + self.interval
+        return changes
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            for entry in FilesystemScanner.iter_supported_entries(root, skip_dir=self.is_excluded):
+                try:
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return snapshot
+
+
+def create_watcher(
+    roots: Iterable[str],
+    excluded: Iterable[str] = (),
+    poll_interval: float = 5.0,
+    use_inotify: bool = True
+) -> DirectoryWatcher:
+    """优先使用 inotify，不可用时退回轮询"""
+    roots = list(roots)
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots, excluded)
+        except OSError as e:
+            logger.warning(f"inotify 不可用，退回轮询监控: {e}")
+    return PollingWatcher(roots, excluded, poll_interval)
+
+
+class ChangeDebouncer:
+    """变更去抖：文件在静默期内没有新事件才视为就绪"""
+
+    def __init__(self, quiet_seconds: float):
+        self.quiet_seconds = quiet_seconds
+        self._last_seen: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    def touch(self, paths: Iterable[str], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        for path in paths:
+            self._last_seen[path] = now
+
+    def pop_ready(self, now: Optional[float] = None) -> List[str]:
+        """取出已静默足够久的文件"""
+        now = time.monotonic() if now is None else now
+        ready = [path for path, seen in self._last_seen.items() if now - seen >= self.quiet_seconds]
+        for path in ready:
+            del self._last_seen[path]
+        return ready
@@ -3,5 +3,6 @@ from .service import TagService
 from .mapper import MetadataTagMapper
 from .admin import TagAdminService
 from .mapping_service import TagMappingService
+from .remap import TagRemapService
 
-__all__ = ['TagService', 'MetadataTagMapper', 'TagAdminService', 'TagMappingService']
+__all__ = ['TagService', 'MetadataTagMapper', 'TagAdminService', 'TagMappingService', 'TagRemapService']
@@ -1,4 +1,7 @@
-"""标签映射读写"""
+"""标签映射读写
+
+规则增删改后按受影响的素材类型排队重新映射作业（见 remap.py），已有素材的标签随之更新。
+"""
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
@@ -36,6 +39,7 @@ class TagMappingService:
         db.add(item)
         db.commit()
         db.refresh(item)
+        TagMappingService._mappings_changed(db, [item.asset_type])
         return item
 
     @staticmethod
@@ -49,10 +53,13 @@ class TagMappingService:
         data = payload.model_dump(exclude_unset=True)
         if data.get("transform") and data["transform"] not in ALLOWED_TRANSFORMS:
             raise HTTPException(status_code=400, detail="不支持的 transform")
+        affected = [item.asset_type]
         for key, value in data.items():
             setattr(item, key, value)
         db.commit()
         db.refresh(item)
+        affected.append(item.asset_type)
+        TagMappingService._mappings_changed(db, affected)
         return item
 
     @staticmethod
@@ -65,3 +72,10 @@ class TagMappingService:
             raise HTTPException(status_code=404, detail="映射不存在")
         item.is_deleted = True
         db.commit()
+        TagMappingService._mappings_changed(db, [item.asset_type])
+
+    @staticmethod
+    def _mappings_changed(db: Session, asset_types: List[Optional[str]]) -> None:
+        from .remap import TagRemapService
+
+        TagRemapService.on_mappings_changed(db, asset_types)
@@ -0,0 +1,375 @@
+"""从留存的原始元数据重新映射标签
+
+新增或修改映射规则、模板字段后，不再需要重新读取 NAS 上的原文件。
+重新映射以作业形式持久化（tag_remap_jobs 表），由 Taskiq Worker 执行：
+- 按素材 ID 分批（键集分页）读取素材与 asset_raw_metadata 中的原始元数据，用当前生效的映射规则重新映射
+- 与已有标签比对出差异：缺失的键一条 executemany INSERT，值变化的标签一条按主键的批量 UPDATE
+- 每批与作业检查点（last_asset_id、计数、速率）一起提交；失败或 Worker 中断后从检查点续跑
+- 映射规则增删改后自动为受影响的素材类型排队一个作业（TAG_REMAP_ON_MAPPING_CHANGE）
+- 未开启原始元数据留存（RAW_METADATA_STORE_ENABLED）时没有可用的数据，不排队作业
+
+差异口径：按 ingest 模板过滤；只更新 source=system 的标签（用户语义标签保留人工编辑）；
+软删除的行不恢复、不更新；新规则不再产出的键保留原值（不删除）。
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ... import model
+from ...config import settings
+from ...db import SessionLocal
+from ...tools.utils import get_logger
+from ..metadata.raw_store import RawMetadataStore
+from ..metadata_dictionary import MetadataDictionaryService
+from .mapper import MetadataTagMapper
+from .mapping_service import TagMappingService
+from .service import TagService
+
+logger = get_logger(__name__)
+
+
+class TagRemapService:
+    """标签重新映射作业的创建、调度、续跑与执行"""
+
+    # 运行中的作业超过该时长未更新进度，视为 Worker 已中断
+    STALE_SECONDS = 600
+
+    @staticmethod
+    def create_job(
+        db: Session,
+        asset_type: Optional[str] = None,
+        trigger_type: str = 'manual',
+    ) -> Tuple[model.TagRemapJob, bool]:
+        """创建作业（状态 queued）
+
+        同范围已有未开始的作业时直接复用，连续修改多条规则只回填一次。
+
+        Returns:
+            (作业, 是否新建)；复用的作业已投递过，无需再次投递
+        """
+        scope = (
+            model.TagRemapJob.asset_type.is_(None) if asset_type is None
+            else model.TagRemapJob.asset_type == asset_type
+        )
+        job = db.query(model.TagRemapJob).filter(
+            model.TagRemapJob.status == 'queued',
+            model.TagRemapJob.started_at.is_(None),
+            scope,
+        ).order_by(model.TagRemapJob.id.desc()).first()
+        if job:
+            return job, False
+
+        job = model.TagRemapJob(asset_type=asset_type, trigger_type=trigger_type, status='queued')
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job, True
+
+    @staticmethod
+    def enqueue(db: Session, job: model.TagRemapJob) -> None:
+        """投递作业到 Taskiq 队列；投递失败则标记作业失败"""
+        from ...tasks.tag_tasks import remap_asset_tags_task
+        from ...tasks.sender import run_coroutine_sync
+
+        try:
+            run_coroutine_sync(remap_asset_tags_task.kiq(job_id=job.id))
+        except Exception as e:
+            logger.error(f"标签重新映射作业投递失败 - Job ID: {job.id}: {e}")
+            job.status = 'failed'
+            job.error_message = f"作业投递失败: {e}"
+            db.commit()
+            raise HTTPException(status_code=503, detail="任务队列不可用，作业已标记为失败，可稍后续跑")
+
+    @staticmethod
+    def schedule(db: Session, asset_type: Optional[str] = None, trigger_type: str = 'manual') -> model.TagRemapJob:
+        """创建并投递作业（复用已排队的作业时不重复投递）
+
+        Raises:
+            HTTPException: 未开启原始元数据留存（409）
+        """
+        TagRemapService.ensure_raw_store_enabled()
+        job, created = TagRemapService.create_job(db, asset_type, trigger_type)
+        if created:
+            TagRemapService.enqueue(db, job)
+        return job
+
+    @staticmethod
+    def on_mappings_changed(db: Session, asset_types: Iterable[Optional[str]]) -> None:
+        """映射规则变更后为受影响的素材类型排队回填作业（失败只记录警告，不影响规则保存）
+
+        Args:
+            asset_types: 变更前后规则的 asset_type（None 表示规则对所有类型生效）
+        """
+        if not settings.TAG_REMAP_ON_MAPPING_CHANGE:
+            return
+        if not settings.RAW_METADATA_STORE_ENABLED:
+            logger.info("未开启原始元数据留存，映射规则变更只对之后导入的素材生效")
+            return
+        types = set(asset_types)
+        scope = types.pop() if len(types) == 1 else None
+        try:
+            job = TagRemapService.schedule(db, scope, 'mapping_change')
+            logger.info(f"映射规则已变更，排队重新映射标签 - Job ID: {job.id}, 素材类型: {scope or '全部'}")
+        except Exception as e:
+            logger.warning(f"映射规则变更后排队重新映射失败（可手动续跑）: {e}")
+
+    @staticmethod
+    def ensure_raw_store_enabled() -> None:
+        """重新映射只读留存的原始元数据，未开启留存时所有素材都没有数据可映射"""
+        if not settings.RAW_METADATA_STORE_ENABLED:
+            raise HTTPException(
+                status_code=409,
+                detail="未开启原始元数据留存（RAW_METADATA_STORE_ENABLED），无法重新映射已有素材的标签",
+            )
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> model.TagRemapJob:
+        job = db.query(model.TagRemapJob).filter(model.TagRemapJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="重新映射作业不存在")
+        return job
+
+    @staticmethod
+    def list_jobs(db: Session, status: Optional[str] = None, limit: int = 20) -> List[model.TagRemapJob]:
+        query = db.query(model.TagRemapJob)
+        if status:
+            query = query.filter(model.TagRemapJob.status == status)
+        return query.order_by(model.TagRemapJob.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def resume(db: Session, job_id: int) -> model.TagRemapJob:
+        """续跑作业：失败或 Worker 中断的作业从检查点重新排队"""
+        TagRemapService.ensure_raw_store_enabled()
+        job = TagRemapService.get_job(db, job_id)
+        if job.status != 'failed' and not TagRemapService.is_stale(job):
+            raise HTTPException(status_code=400, detail=f"作业状态为 {job.status}，不能续跑")
+
+        job.status = 'queued'
+        job.error_message = None
+        job.finished_at = None
+        db.commit()
+        TagRemapService.enqueue(db, job)
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def is_stale(job: model.TagRemapJob) -> bool:
+        """排队或运行中的作业长时间未更新（任务丢失或 Worker 中断）"""
+        if job.status not in ('queued', 'running') or not job.updated_at:
+            return False
+        return datetime.now() - job.updated_at > timedelta(seconds=TagRemapService.STALE_SECONDS)
+
+    @staticmethod
+    def eta_seconds(job: model.TagRemapJob) -> Optional[float]:
+        """预计剩余秒数（仅运行中的作业提供）"""
+        if job.status != 'running' or not job.assets_per_second:
+            return None
+        return max(job.assets_total - job.assets_done, 0) / job.assets_per_second
+
+    @staticmethod
+    def run(job_id: int) -> Dict:
+        """执行作业（Worker 中调用，阻塞直到处理完所有素材）
+
+        Returns:
+            执行结果 {'job_id', 'status', 'summary'}
+        """
+        db = SessionLocal()
+        try:
+            # 只处理排队中的作业，避免重复投递时并发执行
+            claimed = db.query(model.TagRemapJob).filter(
+                model.TagRemapJob.id == job_id,
+                model.TagRemapJob.status == 'queued',
+            ).update({'status': 'running', 'started_at': datetime.now()})
+            db.commit()
+            if not claimed:
+                logger.info(f"重新映射作业不在排队状态，跳过 - Job ID: {job_id}")
+                return {'job_id': job_id, 'status': 'skipped', 'summary': None}
+
+            job = db.query(model.TagRemapJob).filter(model.TagRemapJob.id == job_id).one()
+            summary = TagRemapService.execute(db, job)
+            return {'job_id': job_id, 'status': job.status, 'summary': summary}
+
+        except Exception as e:
+            logger.error(f"重新映射作业执行失败 - Job ID: {job_id}: {e}", exc_info=True)
+            db.rollback()
+            db.query(model.TagRemapJob).filter(model.TagRemapJob.id == job_id).update({
+                'status': 'failed',
+                'error_message': str(e),
+                'finished_at': datetime.now(),
+            })
+            db.commit()
+            return {'job_id': job_id, 'status': 'failed', 'summary': str(e)}
+        finally:
+            db.close()
+
+    @staticmethod
+    def execute(db: Session, job: model.TagRemapJob, chunk_size: Optional[int] = None) -> str:
+        """从检查点开始分批处理，直到没有更多素材（每批提交一次，异常由调用方处理）
+
+        Args:
+            db: 数据库会话（标签写入与作业进度同一事务）
+            job: 已领取的作业
+            chunk_size: 每批素材数（默认 TAG_REMAP_CHUNK_SIZE）
+
+        Returns:
+            结果摘要
+        """
+        chunk_size = chunk_size or settings.TAG_REMAP_CHUNK_SIZE
+        context = _RemapContext(db)
+        base_done = job.assets_done
+        started = time.perf_counter()
+
+        job.assets_total = base_done + TagRemapService._asset_query(db, job.asset_type, job.last_asset_id).count()
+        db.commit()
+        logger.info(
+            f"重新映射作业开始 - Job ID: {job.id}, 素材类型: {job.asset_type or '全部'}, "
+            f"检查点: {job.last_asset_id}, 待处理: {job.assets_total - base_done}"
+        )
+
+        while True:
+            chunk = TagRemapService._asset_query(db, job.asset_type, job.last_asset_id).order_by(
+                model.Asset.id.asc()
+            ).limit(chunk_size).all()
+            if not chunk:
+                break
+
+            diff = TagRemapService._apply_chunk(db, chunk, context)
+
+            # 检查点与本批标签一起提交：中断后从这里续跑，不会重复或遗漏
+            job.last_asset_id = chunk[-1].id
+            job.assets_done += len(chunk)
+            job.assets_missing_metadata += diff.missing
+            job.tags_inserted += diff.inserted
+            job.tags_updated += diff.updated
+            elapsed = time.perf_counter() - started
+            if elapsed > 0:
+                job.assets_per_second = round((job.assets_done - base_done) / elapsed, 1)
+            db.commit()
+
+            if diff.location_pois:
+                try:
+                    MetadataDictionaryService.upsert_scene_values(
+                        db, MetadataDictionaryService.SCENE_LOCATION_POI, diff.location_pois
+                    )
+                except Exception as e:
+                    logger.warning(f"地点字典更新失败: {e}")
+                    db.rollback()
+
+        job.status = 'done'
+        job.finished_at = datetime.now()
+        db.commit()
+
+        summary = (
+            f"处理: {job.assets_done}, 缺少原始元数据: {job.assets_missing_metadata}, "
+            f"新增标签: {job.tags_inserted}, 更新标签: {job.tags_updated}, 速率: {job.assets_per_second}/s"
+        )
+        logger.info(f"重新映射作业完成 - Job ID: {job.id}, {summary}")
+        return summary
+
+    @staticmethod
+    def _asset_query(db: Session, asset_type: Optional[str], after_id: int):
+        """检查点之后的素材与原始元数据（只取需要的列）"""
+        query = db.query(
+            model.Asset.id,
+            model.Asset.asset_type,
+            model.AssetRawMetadata.payload,
+        ).outerjoin(
+            model.AssetRawMetadata,
+            model.AssetRawMetadata.file_hash == model.Asset.file_hash,
+        ).filter(
+            model.Asset.is_deleted == False,
+            model.Asset.id > after_id,
+        )
+        if asset_type:
+            query = query.filter(model.Asset.asset_type == asset_type)
+        return query
+
+    @staticmethod
+    def _apply_chunk(db: Session, chunk: list, context: '_RemapContext') -> '_ChunkDiff':
+        """映射一批素材，与已有标签比对后写入差异（不提交）"""
+        diff = _ChunkDiff()
+        desired: Dict[int, Dict[str, str]] = {}
+        for row in chunk:
+            if row.payload is None:
+                diff.missing += 1
+                continue
+            try:
+                tags = MetadataTagMapper.map_metadata_to_tags(
+                    RawMetadataStore.decode(row.payload), context.mappings(row.asset_type)
+                )
+            except Exception as e:
+                logger.warning(f"Asset {row.id} 重新映射失败: {e}")
+                continue
+            allowed = context.template_keys(row.asset_type)
+            desired[row.id] = {key: value for key, value in tags.items() if key in allowed}
+
+        if not any(desired.values()):
+            return diff
+
+        # 一次查询本批素材的已有标签（含软删除行，asset_tags 有 (asset_id, tag_key) 唯一约束）
+        existing = {
+            (row.asset_id, row.tag_key): row
+            for row in db.query(
+                model.AssetTag.id, model.AssetTag.asset_id, model.AssetTag.tag_key,
+                model.AssetTag.tag_value, model.AssetTag.is_deleted,
+            ).filter(model.AssetTag.asset_id.in_(list(desired))).all()
+        }
+
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        for asset_id, tags in desired.items():
+            for key, value in tags.items():
+                current = existing.get((asset_id, key))
+                if current is None:
+                    inserts.append({'asset_id': asset_id, 'tag_key': key, 'tag_value': value})
+                elif not current.is_deleted and current.tag_value != value and key in context.system_keys:
+                    updates.append({'id': current.id, 'tag_value': value})
+                    if key == 'location_poi' and value:
+                        diff.location_pois.append(value)
+
+        diff.location_pois.extend(TagService.bulk_insert_new_asset_tags(db, inserts))
+        if updates:
+            # ORM 按主键批量 UPDATE（executemany）
+            db.execute(update(model.AssetTag), updates)
+        diff.inserted, diff.updated = len(inserts), len(updates)
+        return diff
+
+
+@dataclass
+class _ChunkDiff:
+    """一批素材的写入结果"""
+
+    inserted: int = 0
+    updated: int = 0
+    missing: int = 0  # 没有留存原始元数据的素材数
+    location_pois: List[str] = field(default_factory=list)
+
+
+class _RemapContext:
+    """一次作业内缓存映射规则、模板键与系统标签键（作业开始后的规则变更由新排队的作业处理）"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._mappings: Dict[str, list] = {}
+        self._template_keys: Dict[str, Set[str]] = {}
+        self.system_keys: Set[str] = {
+            row.tag_key for row in db.query(model.TagDefinition.tag_key).filter(
+                model.TagDefinition.source == 'system',
+                model.TagDefinition.is_deleted == False,
+            ).all()
+        }
+
+    def mappings(self, asset_type: str) -> list:
+        if asset_type not in self._mappings:
+            self._mappings[asset_type] = TagMappingService.list_active(self.db, asset_type)
+        return self._mappings[asset_type]
+
+    def template_keys(self, asset_type: str) -> Set[str]:
+        if asset_type not in self._template_keys:
+            self._template_keys[asset_type] = TagService.get_template_tag_keys(self.db, asset_type)
+        return self._template_keys[asset_type]
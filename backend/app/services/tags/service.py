@@ -1,6 +1,7 @@
 """标签业务逻辑层"""
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from ... import model
 from ...tools.utils import get_logger
 from ..metadata_dictionary import MetadataDictionaryService
@@ -97,6 +98,27 @@ class TagService:
             return
         db.add(model.AssetTag(asset_id=asset_id, tag_key=tag_key, tag_value=tag_value))
 
+    @staticmethod
+    def bulk_insert_new_asset_tags(
+        db: Session,
+        tag_rows: List[Dict]
+    ) -> List[str]:
+        """为新建素材批量插入标签（一条 executemany INSERT，不提交）
+
+        新建素材不存在历史标签，因此无需逐个查询去重；
+        由调用方在同一事务中与素材记录一起提交。
+
+        Args:
+            db: 数据库会话
+            tag_rows: 已按模板过滤的标签行 [{'asset_id': 1, 'tag_key': 'device_make', 'tag_value': 'Apple'}, ...]
+
+        Returns:
+            本批涉及的 location_poi 值（提交后再写入元数据字典）
+        """
+        if tag_rows:
+            db.execute(insert(model.AssetTag), tag_rows)
+        return [row['tag_value'] for row in tag_rows if row['tag_key'] == 'location_poi' and row['tag_value']]
+
     @staticmethod
     def batch_save_asset_tags(
         db: Session,
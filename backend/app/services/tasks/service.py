@@ -71,3 +71,12 @@ class TaskDefinitionService:
             return {"queued": 0, "message": "没有需要补算的素材"}
         run_coroutine_sync(batch_calculate_phash_task.kiq(asset_ids=asset_ids))
         return {"queued": len(asset_ids), "message": "已发送批量补算"}
+
+    @staticmethod
+    def trigger_regenerate_derivatives(db: Session, payload: schema.RegenerateDerivativesRequest) -> dict:
+        if not TaskDefinitionService.is_enabled(db, "regenerate_derivatives"):
+            raise HTTPException(status_code=400, detail="重新生成衍生图任务已关闭")
+        from ..derivative.regenerate import DerivativeRegenerationService
+
+        task_log = DerivativeRegenerationService.schedule(db, payload)
+        return {"task_log_id": task_log.id, "message": "已发送重新生成衍生图作业"}
@@ -6,11 +6,14 @@
 from .generator import ThumbnailGenerator, ThumbnailGeneratorFactory
 from .image import ImageThumbnailGenerator, get_default_generator
 from .video import VideoThumbnailGenerator
+from .storyboard import StoryboardGenerator, VideoStoryboardGenerator
 
 __all__ = [
     'ThumbnailGenerator',
     'ThumbnailGeneratorFactory',
     'ImageThumbnailGenerator',
     'VideoThumbnailGenerator',
+    'StoryboardGenerator',
+    'VideoStoryboardGenerator',
     'get_default_generator',
 ]
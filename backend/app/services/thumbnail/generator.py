@@ -4,16 +4,19 @@
 """
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, Tuple, Optional
 from ...tools.utils import get_logger
 
+if TYPE_CHECKING:
+    from .storyboard import StoryboardGenerator
+
 logger = get_logger(__name__)
 
 
 class ThumbnailGenerator(ABC):
     """缩略图生成器抽象基类
 
-    所有缩略图生成器必须实现 generate() 方法。
+    所有缩略图生成器必须实现 generate() 与 generate_from_image() 方法。
     """
 
     @abstractmethod
@@ -35,6 +38,57 @@ class ThumbnailGenerator(ABC):
         """
         pass
 
+    def decode_size(self) -> Optional[int]:
+        """基于已解码图片生成时所需的最小长边（None 表示需要完整解码）"""
+        return None
+
+    def ladder_sizes(self) -> Tuple[int, ...]:
+        """多档缩略图的长边尺寸（空表示只生成单张缩略图）"""
+        return ()
+
+    def version(self) -> str:
+        """生成器版本指纹（算法版本 + 影响输出的参数）
+
+        生成成功后与源文件哈希一起记录在素材上（derivative_versions），
+        重新生成作业据此跳过已是最新的衍生图；调整质量、尺寸、格式后指纹随之变化。
+        """
+        return self.__class__.__name__
+
+    @abstractmethod
+    def generate_from_image(self, img, dest_path: str) -> bool:
+        """基于已解码（且已按 EXIF 方向修正）的图片生成缩略图
+
+        图片生成器基于解码结果、视频生成器基于已提取的封面帧。
+
+        Args:
+            img: PIL Image 对象
+            dest_path: 缩略图保存路径
+
+        Returns:
+            生成成功返回 True，失败返回 False
+        """
+        pass
+
+    def generate_ladder_from_image(
+        self,
+        img,
+        dest_path: str,
+        ladder_paths: Dict[int, str]
+    ) -> Optional[Dict[str, int]]:
+        """基于已解码的图片生成主缩略图与各档缩略图
+
+        默认不生成多档（如视频）：只生成主缩略图，成功返回空字典。
+
+        Args:
+            img: PIL Image 对象
+            dest_path: 主缩略图保存路径
+            ladder_paths: 档位保存路径 {长边: 保存路径}
+
+        Returns:
+            已生成的文件 {保存路径: 宽度}，失败返回 None
+        """
+        return {} if self.generate_from_image(img, dest_path) else None
+
     def _ensure_dest_dir(self, dest_path: str):
         """确保目标目录存在
 
@@ -53,6 +107,7 @@ class ThumbnailGeneratorFactory:
     """
 
     _generators: Dict[str, ThumbnailGenerator] = {}
+    _storyboard_generators: Dict[str, 'StoryboardGenerator'] = {}
 
     @classmethod
     def register(cls, asset_type: str, generator: ThumbnailGenerator):
@@ -80,6 +135,34 @@ class ThumbnailGeneratorFactory:
             logger.warning(f"未找到缩略图生成器: {asset_type}")
         return generator
 
+    @classmethod
+    def register_storyboard(cls, asset_type: str, generator: 'StoryboardGenerator'):
+        """注册故事板（拖动预览雪碧图）生成器
+
+        Args:
+            asset_type: 素材类型（目前只有 'video'）
+            generator: 生成器实例
+        """
+        cls._storyboard_generators[asset_type] = generator
+        logger.debug(f"注册故事板生成器: {asset_type} -> {generator.__class__.__name__}")
+
+    @classmethod
+    def create_storyboard(cls, asset_type: str) -> Optional['StoryboardGenerator']:
+        """该类型的故事板生成器（未注册时返回 None，图片等类型不生成故事板）"""
+        return cls._storyboard_generators.get(asset_type)
+
+    @classmethod
+    def ladder_sizes(cls, asset_type: str) -> Tuple[int, ...]:
+        """该类型的多档缩略图长边尺寸（未注册或不支持时为空）"""
+        generator = cls._generators.get(asset_type)
+        return generator.ladder_sizes() if generator else ()
+
+    @classmethod
+    def version(cls, asset_type: str) -> Optional[str]:
+        """该类型缩略图生成器的版本指纹（未注册时为 None）"""
+        generator = cls._generators.get(asset_type)
+        return generator.version() if generator else None
+
     @classmethod
     def generate(
         cls,
@@ -1,13 +1,17 @@
 """图片缩略图生成器
 
 使用 Pillow 和 smartcrop 库生成高质量的图片缩略图。
-支持智能裁剪和基于宽高比的尺寸计算。
+支持智能裁剪和基于宽高比的尺寸计算；按缩略图尺寸降分辨率解码（见 tools/image_decode.py）。
+智能裁剪在长边约 256px 的代理图上分析，裁剪框按比例换算回原图坐标。
+同一次解码可输出多档尺寸（ladder），各档共用裁剪区域，从大到小逐级缩放。
 """
 from PIL import Image, ImageOps
-from typing import Tuple, Optional
+from typing import Dict, Optional, Sequence, Tuple
 from pillow_heif import register_heif_opener
 from smartcrop import SmartCrop
 from .generator import ThumbnailGenerator
+from ...tools.atomic_file import save_image
+from ...tools.image_decode import open_image
 from ...tools.utils import get_logger
 
 # 注册 HEIF/HEIC 解码器（支持苹果 HEIC 格式）
@@ -18,24 +22,32 @@ logger = get_logger(__name__)
 # 默认配置
 DEFAULT_BASE_SIZE = 800  # 基准尺寸（长边像素）
 DEFAULT_QUALITY = 92     # WebP 质量（0-100）
+DEFAULT_SMART_CROP_PROXY_SIZE = 256  # 智能裁剪分析用代理图长边（0 表示按 smartcrop 默认预缩放分析）
+GENERATOR_VERSION = 1  # 裁剪/缩放算法变化时递增（参数变化已体现在版本指纹中，无需递增）
 
 
 class ImageThumbnailGenerator(ThumbnailGenerator):
     """图片缩略图生成器
 
     特性：
-    - 智能裁剪（基于内容分析，自动选择最佳裁剪区域）
+    - 智能裁剪（基于内容分析，自动选择最佳裁剪区域；在小尺寸代理图上分析）
     - 基于原图宽高比计算目标尺寸
     - EXIF 方向自动修正
     - WebP 格式输出（体积小、质量高）
     - Lanczos 重采样算法（高质量）
+    - 降分辨率解码（内嵌缩略图 / JPEG DCT 缩放 / 整数倍 reduce），不完整解码大图
+    - 多档尺寸（如 256/512/1024/2048）与主缩略图同一次解码输出
     """
 
     def __init__(
         self,
         base_size: int = DEFAULT_BASE_SIZE,
         quality: int = DEFAULT_QUALITY,
-        use_smart_crop: bool = True
+        use_smart_crop: bool = True,
+        reduced_decode: bool = True,
+        smart_crop_proxy_size: int = DEFAULT_SMART_CROP_PROXY_SIZE,
+        ladder_sizes: Sequence[int] = (),
+        output_format: str = 'WEBP'
     ):
         """初始化生成器
 
@@ -43,10 +55,18 @@ class ImageThumbnailGenerator(ThumbnailGenerator):
             base_size: 基准尺寸（长边像素），默认 800
             quality: WebP 输出质量（0-100），默认 92
             use_smart_crop: 是否使用智能裁剪，默认 True
+            reduced_decode: 是否按 base_size 降分辨率解码，默认 True
+            smart_crop_proxy_size: 智能裁剪代理图长边，默认 256；0 表示按 smartcrop 默认预缩放分析
+            ladder_sizes: 多档缩略图的长边尺寸，默认不生成
+            output_format: 输出格式（Pillow 格式名），默认 WEBP；JPEG 时转为 RGB
         """
         self.base_size = base_size
         self.quality = quality
         self.use_smart_crop = use_smart_crop
+        self.reduced_decode = reduced_decode
+        self.smart_crop_proxy_size = smart_crop_proxy_size
+        self.output_format = output_format
+        self._ladder_sizes = tuple(sorted({size for size in ladder_sizes if size > 0 and size != base_size}))
         self._smart_crop = SmartCrop() if use_smart_crop else None
 
     def generate(
@@ -68,31 +88,10 @@ class ImageThumbnailGenerator(ThumbnailGenerator):
             成功返回 True，失败返回 False
         """
         try:
-            with Image.open(source_path) as img:
+            with open_image(source_path, self.decode_size()) as img:
                 # 自动根据 EXIF 方向旋转图片
                 img = ImageOps.exif_transpose(img)
-
-                # 计算基于宽高比的目标尺寸
-                target_size = self._calculate_target_size(img.size)
-
-                logger.debug(
-                    f"原图尺寸: {img.size}, 目标尺寸: {target_size}, "
-                    f"智能裁剪: {self.use_smart_crop}"
-                )
-
-                # 生成缩略图
-                if self.use_smart_crop and self._smart_crop:
-                    thumb = self._generate_smart_crop(img, target_size)
-                else:
-                    thumb = self._generate_simple_resize(img, target_size)
-
-                # 确保目标目录存在
-                self._ensure_dest_dir(dest_path)
-
-                # 保存为 WebP 格式
-                thumb.save(dest_path, "WEBP", quality=self.quality, optimize=True)
-
-                logger.debug(f"成功生成缩略图: {dest_path}, 尺寸: {thumb.size}")
+                self._render(img, dest_path)
                 return True
 
         except FileNotFoundError:
@@ -104,27 +103,130 @@ class ImageThumbnailGenerator(ThumbnailGenerator):
 
         return False
 
-    def _calculate_target_size(self, original_size: Tuple[int, int]) -> Tuple[int, int]:
+    def decode_size(self) -> Optional[int]:
+        """解码所需的最小长边（None 表示完整解码）；最大档位决定解码尺寸"""
+        if not self.reduced_decode:
+            return None
+        return max((self.base_size,) + self._ladder_sizes)
+
+    def ladder_sizes(self) -> Tuple[int, ...]:
+        """多档缩略图的长边尺寸（升序，不含主缩略图尺寸）"""
+        return self._ladder_sizes
+
+    def version(self) -> str:
+        """版本指纹：算法版本 + 格式、质量、尺寸档位、智能裁剪参数"""
+        ladder = ','.join(str(size) for size in self._ladder_sizes)
+        crop = self.smart_crop_proxy_size if self.use_smart_crop else 'off'
+        return (
+            f"image-thumbnail.v{GENERATOR_VERSION}:{self.output_format.lower()}:q{self.quality}:"
+            f"{self.base_size}[{ladder}]:crop-{crop}"
+        )
+
+    def generate_from_image(self, img: Image.Image, dest_path: str) -> bool:
+        """基于已解码（且已按 EXIF 方向修正）的图片生成缩略图
+
+        Args:
+            img: PIL Image 对象
+            dest_path: 缩略图保存路径
+
+        Returns:
+            成功返回 True，失败返回 False
+        """
+        return self.generate_ladder_from_image(img, dest_path, {}) is not None
+
+    def generate_ladder_from_image(
+        self,
+        img: Image.Image,
+        dest_path: str,
+        ladder_paths: Dict[int, str]
+    ) -> Optional[Dict[str, int]]:
+        """基于已解码的图片生成主缩略图与各档缩略图
+
+        不超过原图长边的档位才生成（不放大）。
+
+        Args:
+            img: PIL Image 对象（已按 EXIF 方向修正）
+            dest_path: 主缩略图保存路径
+            ladder_paths: 档位保存路径 {长边: 保存路径}
+
+        Returns:
+            已生成的文件 {保存路径: 宽度}（含主缩略图），失败返回 None
+        """
+        try:
+            return self._render(img, dest_path, ladder_paths)
+        except Exception as e:
+            logger.error(f"生成缩略图失败 {dest_path}: {e}")
+        return None
+
+    def _render(
+        self,
+        img: Image.Image,
+        dest_path: str,
+        ladder_paths: Optional[Dict[int, str]] = None
+    ) -> Dict[str, int]:
+        """裁剪/缩放并保存为 WebP，返回 {保存路径: 宽度}"""
+        # 计算基于宽高比的目标尺寸
+        target_size = self._calculate_target_size(img.size)
+
+        logger.debug(
+            f"原图尺寸: {img.size}, 目标尺寸: {target_size}, "
+            f"智能裁剪: {self.use_smart_crop}"
+        )
+
+        outputs = {dest_path: target_size}
+        for size, path in (ladder_paths or {}).items():
+            if size < max(img.size):
+                outputs[path] = self._calculate_target_size(img.size, size)
+
+        # 裁剪区域只分析一次，各尺寸共用
+        region = self._crop_region(img, target_size)
+
+        # 从大到小逐级缩放：每档基于不小于其两倍的最小已生成档位，缩放像素量逐级减半
+        rendered: Dict[str, int] = {}
+        renditions = []
+        for path, size in sorted(outputs.items(), key=lambda item: item[1][0], reverse=True):
+            source = next((r for r in reversed(renditions) if r.width >= size[0] * 2), region)
+            thumb = source if source.size == size else source.resize(size, Image.Resampling.LANCZOS)
+
+            renditions.append(thumb)
+
+            # 保存为 WebP 格式（或指定格式）；先写临时文件再替换，重新生成时读者不会看到半个文件
+            if self.output_format == 'JPEG' and thumb.mode not in ('RGB', 'L'):
+                thumb = thumb.convert('RGB')
+            save_image(thumb, path, self.output_format, quality=self.quality, optimize=True)
+            rendered[path] = thumb.width
+
+            logger.debug(f"成功生成缩略图: {path}, 尺寸: {thumb.size}")
+
+        return rendered
+
+    def _calculate_target_size(
+        self,
+        original_size: Tuple[int, int],
+        long_edge: Optional[int] = None
+    ) -> Tuple[int, int]:
         """根据原图宽高比计算目标尺寸
 
-        保持原图宽高比，长边不超过 base_size。
+        保持原图宽高比，长边不超过 long_edge（默认 base_size）。
 
         Args:
             original_size: 原图尺寸 (width, height)
+            long_edge: 目标长边
 
         Returns:
             目标尺寸 (width, height)
         """
+        long_edge = long_edge or self.base_size
         orig_width, orig_height = original_size
         aspect_ratio = orig_width / orig_height
 
         if orig_width >= orig_height:
             # 横图：宽度为基准
-            target_width = min(orig_width, self.base_size)
+            target_width = min(orig_width, long_edge)
             target_height = int(target_width / aspect_ratio)
         else:
             # 竖图：高度为基准
-            target_height = min(orig_height, self.base_size)
+            target_height = min(orig_height, long_edge)
             target_width = int(target_height * aspect_ratio)
 
         # 确保尺寸至少为 1
@@ -133,12 +235,12 @@ class ImageThumbnailGenerator(ThumbnailGenerator):
 
         return (target_width, target_height)
 
-    def _generate_smart_crop(
+    def _crop_region(
         self,
         img: Image.Image,
         target_size: Tuple[int, int]
     ) -> Image.Image:
-        """使用智能裁剪生成缩略图
+        """智能裁剪区域（未启用或原图不大于目标尺寸时为原图）
 
         smartcrop 会分析图片内容（人脸、边缘、颜色等），
         自动选择最佳裁剪区域。
@@ -148,69 +250,87 @@ class ImageThumbnailGenerator(ThumbnailGenerator):
             target_size: 目标尺寸 (width, height)
 
         Returns:
-            裁剪后的 PIL Image 对象
+            裁剪后的 PIL Image 对象（原图坐标、原图分辨率）
         """
         target_width, target_height = target_size
 
-        # 如果原图比目标尺寸小，直接返回原图
+        if not (self.use_smart_crop and self._smart_crop):
+            return img
+
+        # 如果原图比目标尺寸小，不裁剪
         if img.width <= target_width and img.height <= target_height:
-            return img.copy()
+            return img
 
         try:
-            # 使用 smartcrop 分析最佳裁剪区域
-            # smartcrop 需要 RGB 模式
-            if img.mode != 'RGB':
-                analyze_img = img.convert('RGB')
-            else:
-                analyze_img = img
-
-            result = self._smart_crop.crop(analyze_img, target_width, target_height)
-            top_crop = result.get('top_crop')
-
-            if top_crop:
-                # 获取裁剪区域
-                x = top_crop['x']
-                y = top_crop['y']
-                width = top_crop['width']
-                height = top_crop['height']
-
-                # 裁剪
-                cropped = img.crop((x, y, x + width, y + height))
-
-                # 缩放到目标尺寸
-                thumb = cropped.resize(target_size, Image.Resampling.LANCZOS)
-
-                logger.debug(
-                    f"智能裁剪区域: ({x}, {y}, {width}x{height}), "
-                    f"评分: {top_crop.get('score', {}).get('total', 'N/A')}"
-                )
-
-                return thumb
+            box = self._smart_crop_box(img, target_size)
+            if box:
+                x, y, width, height = box
+                logger.debug(f"智能裁剪区域: ({x}, {y}, {width}x{height})")
+                return img.crop((x, y, x + width, y + height))
 
         except Exception as e:
             logger.warning(f"智能裁剪失败，降级到简单缩放: {e}")
 
         # 降级到简单缩放
-        return self._generate_simple_resize(img, target_size)
+        return img
 
-    def _generate_simple_resize(
+    def _smart_crop_box(
         self,
         img: Image.Image,
         target_size: Tuple[int, int]
-    ) -> Image.Image:
-        """简单缩放（保持宽高比）
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """分析最佳裁剪区域
+
+        smartcrop 的分析（特征图 + 逐候选框打分）与输入像素量成正比，
+        在长边 smart_crop_proxy_size 的代理图上分析，再把裁剪框换算回原图坐标，
+        不需要原图尺寸的 RGB 副本。
 
         Args:
             img: PIL Image 对象
             target_size: 目标尺寸 (width, height)
 
         Returns:
-            缩放后的 PIL Image 对象
+            原图坐标的裁剪框 (x, y, width, height)，无结果时返回 None
         """
-        # 创建副本避免修改原图
-        thumb = img.copy()
-        thumb.thumbnail(target_size, Image.Resampling.LANCZOS)
-        return thumb
+        target_width, target_height = target_size
+        proxy_size = self.smart_crop_proxy_size
+
+        if not proxy_size:
+            # smartcrop 默认：原图缩放到约目标尺寸后分析（需要原图尺寸的 RGB 副本）
+            analyze_img = img if img.mode == 'RGB' else img.convert('RGB')
+            top_crop = self._smart_crop.crop(analyze_img, target_width, target_height).get('top_crop')
+            if not top_crop:
+                return None
+            return top_crop['x'], top_crop['y'], top_crop['width'], top_crop['height']
+
+        scale = min(1.0, proxy_size / max(img.size))
+        proxy = img
+        if scale < 1:
+            proxy = img.resize(
+                (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                Image.Resampling.LANCZOS,
+                reducing_gap=3.0
+            )
+        if proxy.mode != 'RGB':
+            proxy = proxy.convert('RGB')
+
+        # 目标尺寸按同一比例换算，候选框相对原图的缩放范围与直接分析原图一致
+        scale_x = proxy.width / img.width
+        scale_y = proxy.height / img.height
+        top_crop = self._smart_crop.crop(
+            proxy,
+            max(1, round(target_width * scale_x)),
+            max(1, round(target_height * scale_y)),
+            prescale=False
+        ).get('top_crop')
+        if not top_crop:
+            return None
+
+        x = min(img.width - 1, round(top_crop['x'] / scale_x))
+        y = min(img.height - 1, round(top_crop['y'] / scale_y))
+        width = min(img.width - x, round(top_crop['width'] / scale_x))
+        height = min(img.height - y, round(top_crop['height'] / scale_y))
+        return x, y, width, height
 
 
 # 兼容旧版本：提供默认实例
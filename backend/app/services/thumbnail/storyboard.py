@@ -0,0 +1,153 @@
+"""视频故事板（拖动预览雪碧图）生成器
+
+详情页在视频原文件缓冲之前就能悬停/拖动预览：沿时间轴均匀取 N 帧，拼成一张雪碧图（WebP），
+并输出 WebVTT 索引（每个时间段对应雪碧图中的一格，`sprite.webp#xywh=x,y,w,h`）。
+
+- 一次 ffmpeg 调用取全部帧（只解码关键帧，见 tools/video_frames.py），在内存中拼图
+- 帧间隔不小于 min_interval，短视频取帧数相应减少
+- 几何信息（列数、行数、单帧尺寸、间隔）同时返回，写入素材记录，客户端按时间计算格子位置即可，无需再请求索引
+"""
+import math
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import ffmpeg
+from PIL import Image
+
+from ...tools.atomic_file import atomic_path, save_image
+from ...tools.utils import get_logger
+from ...tools.video_frames import extract_interval_frames
+from ...tools.video_probe import probe_video
+
+logger = get_logger(__name__)
+
+# 默认配置
+DEFAULT_FRAME_COUNT = 100   # 最多取帧数
+DEFAULT_FRAME_WIDTH = 160   # 单帧宽度（像素）
+DEFAULT_COLUMNS = 10        # 雪碧图列数
+DEFAULT_MIN_INTERVAL = 1.0  # 最小取帧间隔（秒）
+DEFAULT_QUALITY = 70        # WebP 质量
+
+
+class StoryboardGenerator(ABC):
+    """故事板生成器抽象基类"""
+
+    @abstractmethod
+    def generate(self, source_path: str, sprite_path: str, vtt_path: str) -> Optional[Dict]:
+        """生成雪碧图与 WebVTT 索引
+
+        Args:
+            source_path: 原始文件完整路径
+            sprite_path: 雪碧图保存路径
+            vtt_path: WebVTT 索引保存路径
+
+        Returns:
+            几何信息 {count, columns, rows, frame_width, frame_height, interval}，失败返回 None
+        """
+        pass
+
+
+class VideoStoryboardGenerator(StoryboardGenerator):
+    """使用 ffmpeg 生成视频故事板"""
+
+    def __init__(
+        self,
+        frame_count: int = DEFAULT_FRAME_COUNT,
+        frame_width: int = DEFAULT_FRAME_WIDTH,
+        columns: int = DEFAULT_COLUMNS,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        quality: int = DEFAULT_QUALITY
+    ):
+        """初始化生成器
+
+        Args:
+            frame_count: 最多取帧数，默认 100
+            frame_width: 单帧宽度，默认 160
+            columns: 雪碧图列数，默认 10
+            min_interval: 最小取帧间隔（秒），默认 1
+            quality: WebP 质量，默认 70
+        """
+        self.frame_count = frame_count
+        self.frame_width = frame_width
+        self.columns = columns
+        self.min_interval = min_interval
+        self.quality = quality
+
+    def generate(self, source_path: str, sprite_path: str, vtt_path: str) -> Optional[Dict]:
+        """生成雪碧图与 WebVTT 索引（失败返回 None）"""
+        frames: List[Image.Image] = []
+        try:
+            duration = float(probe_video(source_path)['format'].get('duration', 0))
+            if duration <= 0:
+                logger.warning(f"无法获取视频时长，跳过故事板: {source_path}")
+                return None
+
+            interval = max(duration / self.frame_count, self.min_interval)
+            max_frames = min(self.frame_count, max(1, math.ceil(duration / interval)))
+            frames = extract_interval_frames(source_path, interval, self.frame_width, max_frames)
+            if not frames:
+                logger.warning(f"未提取到帧，跳过故事板: {source_path}")
+                return None
+
+            info = self._save_sprite(frames, sprite_path)
+            info['interval'] = round(interval, 3)
+            self._save_vtt(info, duration, os.path.basename(sprite_path), vtt_path)
+            logger.info(f"故事板生成成功: {sprite_path}, {info['count']} 帧")
+            return info
+
+        except ffmpeg.Error as e:
+            stderr = e.stderr.decode('utf-8', errors='replace') if e.stderr else '未知错误'
+            logger.error(f"故事板提取帧失败 {source_path}: {stderr[-500:]}")
+            return None
+        except Exception as e:
+            logger.error(f"生成故事板失败 {source_path}: {type(e).__name__} - {e}")
+            return None
+        finally:
+            for frame in frames:
+                frame.close()
+
+    def _save_sprite(self, frames: List[Image.Image], sprite_path: str) -> Dict:
+        """按行优先拼接雪碧图并保存，返回几何信息"""
+        frame_width, frame_height = frames[0].size
+        columns = min(self.columns, len(frames))
+        rows = math.ceil(len(frames) / columns)
+
+        sprite = Image.new('RGB', (columns * frame_width, rows * frame_height))
+        for index, frame in enumerate(frames):
+            row, column = divmod(index, columns)
+            sprite.paste(frame, (column * frame_width, row * frame_height))
+
+        save_image(sprite, sprite_path, 'WEBP', quality=self.quality)
+        return {
+            'count': len(frames),
+            'columns': columns,
+            'rows': rows,
+            'frame_width': frame_width,
+            'frame_height': frame_height,
+        }
+
+    @staticmethod
+    def _save_vtt(info: Dict, duration: float, sprite_name: str, vtt_path: str) -> None:
+        """写 WebVTT 索引（格子引用与雪碧图同目录的相对路径）"""
+        lines = ['WEBVTT', '']
+        for index in range(info['count']):
+            start = index * info['interval']
+            end = duration if index == info['count'] - 1 else (index + 1) * info['interval']
+            row, column = divmod(index, info['columns'])
+            x, y = column * info['frame_width'], row * info['frame_height']
+            lines.append(f"{_vtt_time(start)} --> {_vtt_time(max(end, start))}")
+            lines.append(f"{sprite_name}#xywh={x},{y},{info['frame_width']},{info['frame_height']}")
+            lines.append('')
+
+        with atomic_path(vtt_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+
+
+def _vtt_time(seconds: float) -> str:
+    """WebVTT 时间戳 HH:MM:SS.mmm"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
@@ -1,23 +1,35 @@
 """视频缩略图生成器
 
 使用 ffmpeg 从视频中提取帧并生成高质量缩略图。
+封面帧与感知哈希用的中间帧在同一次 ffmpeg 调用中以原始像素经管道取回（见 tools/video_frames.py），
+缩略图在内存中缩放编码，不写临时文件。
 """
 import ffmpeg
-from typing import Tuple
+from PIL import Image
+from typing import List, Optional, Tuple
 from .generator import ThumbnailGenerator
+from ...tools.atomic_file import save_image
 from ...tools.utils import get_logger
+from ...tools.video_frames import extract_frames
+from ...tools.video_probe import probe_video
 
 logger = get_logger(__name__)
 
+# 提取帧的长边上限（与感知哈希的降分辨率解码尺寸一致，封面与哈希共用一次提取）
+DEFAULT_FRAME_SIZE = 800
+DEFAULT_SIZE = (400, 400)
+DEFAULT_QUALITY = 80
+GENERATOR_VERSION = 1  # 取帧位置或缩放方式变化时递增
+
 
 class VideoThumbnailGenerator(ThumbnailGenerator):
     """使用 ffmpeg 生成视频缩略图
 
     特性：
-    - 从视频第 1 秒提取帧
+    - 从视频第 1 秒（短视频 10% 位置）附近的关键帧提取封面
+    - 可在同一次 ffmpeg 调用中顺带提取中间帧（供感知哈希使用）
     - 自动保持宽高比缩放
     - 生成 WebP 格式（体积小、质量高）
-    - 硬件加速支持（如果可用）
 
     依赖：
     - 系统需要安装 ffmpeg（参见项目根目录 README.md）
@@ -28,14 +40,14 @@ class VideoThumbnailGenerator(ThumbnailGenerator):
         self,
         source_path: str,
         dest_path: str,
-        size: Tuple[int, int] = (400, 400)
+        size: Tuple[int, int] = DEFAULT_SIZE
     ) -> bool:
         """生成视频缩略图
 
         从视频中智能选择位置提取一帧，缩放后保存为 WebP 格式。
 
         提取策略：
-        - 先尝试从视频 10% 位置提取（避免黑帧）
+        - 长视频从 1 秒处、短视频从 10% 位置提取（避免黑帧），取该位置之前最近的关键帧
         - 如果失败，降级到首帧 (0秒)
 
         Args:
@@ -54,92 +66,91 @@ class VideoThumbnailGenerator(ThumbnailGenerator):
             ...     size=(400, 400)
             ... )
         """
+        frames = self.extract_frames(source_path, max_long_edge=max(DEFAULT_FRAME_SIZE, *size))
+        if not frames:
+            return False
         try:
-            # 确保目标目录存在
-            self._ensure_dest_dir(dest_path)
-
-            logger.debug(f"开始生成视频缩略图: {source_path}")
-
-            # 获取视频时长以智能选择提取位置
-            video_info = self.get_video_info(source_path)
-            duration = video_info.get('duration', 0)
-
-            # 根据时长选择提取位置
-            if duration > 2:
-                # 长视频：从 1 秒处提取（避免开头黑帧）
-                seek_time = 1
-            elif duration > 0:
-                # 短视频：从 10% 位置提取
-                seek_time = duration * 0.1
-            else:
-                # 无法获取时长：使用首帧
-                seek_time = 0
-
-            logger.debug(f"视频时长: {duration:.2f}s, 提取位置: {seek_time:.2f}s")
+            return self.generate_from_image(frames[0], dest_path, size)
+        finally:
+            for frame in frames:
+                frame.close()
 
-            # 尝试生成缩略图
-            success = self._generate_thumbnail(source_path, dest_path, size, seek_time)
+    def generate_from_image(self, img: Image.Image, dest_path: str, size: Tuple[int, int] = DEFAULT_SIZE) -> bool:
+        """基于已提取的封面帧生成缩略图（保持宽高比缩小到 size 以内）
 
-            # 如果失败且 seek_time 不是 0，尝试降级到首帧
-            if not success and seek_time > 0:
-                logger.warning(f"从 {seek_time}s 提取失败，降级到首帧重试")
-                success = self._generate_thumbnail(source_path, dest_path, size, 0)
-
-            if success:
-                logger.info(f"视频缩略图生成成功: {dest_path}")
-
-            return success
+        Args:
+            img: 封面帧（RGB，显示方向）
+            dest_path: 缩略图保存路径
+            size: 最大尺寸 (width, height)
 
+        Returns:
+            成功返回 True，失败返回 False
+        """
+        try:
+            thumb = img.copy()
+            thumb.thumbnail(size, Image.Resampling.LANCZOS)
+            save_image(thumb, dest_path, 'WEBP', quality=DEFAULT_QUALITY)
+            logger.info(f"视频缩略图生成成功: {dest_path}")
+            return True
         except Exception as e:
-            # 其他未知错误
-            logger.error(f"生成视频缩略图失败 {source_path}: {type(e).__name__} - {e}")
+            logger.error(f"保存视频缩略图失败 {dest_path}: {type(e).__name__} - {e}")
             return False
 
-    def _generate_thumbnail(
+    def version(self) -> str:
+        """版本指纹：算法版本 + 质量、尺寸"""
+        return f"video-thumbnail.v{GENERATOR_VERSION}:webp:q{DEFAULT_QUALITY}:{DEFAULT_SIZE[0]}x{DEFAULT_SIZE[1]}"
+
+    @staticmethod
+    def poster_time(duration: float) -> float:
+        """封面提取位置（秒）"""
+        if duration > 2:
+            # 长视频：从 1 秒处提取（避免开头黑帧）
+            return 1
+        if duration > 0:
+            # 短视频：从 10% 位置提取
+            return duration * 0.1
+        # 无法获取时长：使用首帧
+        return 0
+
+    def extract_frames(
         self,
         source_path: str,
-        dest_path: str,
-        size: Tuple[int, int],
-        seek_time: float
-    ) -> bool:
-        """执行 ffmpeg 缩略图生成
+        with_hash_frame: bool = False,
+        max_long_edge: int = DEFAULT_FRAME_SIZE
+    ) -> Optional[List[Image.Image]]:
+        """一次 ffmpeg 调用提取封面帧（以及感知哈希用的中间帧）
 
         Args:
-            source_path: 源视频路径
-            dest_path: 目标缩略图路径
-            size: 尺寸
-            seek_time: 提取位置（秒）
+            source_path: 视频文件路径
+            with_hash_frame: 是否同时提取中间帧（时长未知时不提取）
+            max_long_edge: 帧长边上限
 
         Returns:
-            成功返回 True，失败返回 False
+            [封面帧] 或 [封面帧, 中间帧]；失败返回 None
         """
-        try:
-            # 使用 ffmpeg 提取帧并生成缩略图
-            (
-                ffmpeg
-                # 输入视频，跳转到指定位置
-                .input(source_path, ss=seek_time)
-                # 缩放滤镜：保持宽高比，最大边不超过指定尺寸
-                .filter('scale', size[0], size[1], force_original_aspect_ratio='decrease')
-                # 输出配置
-                .output(
-                    dest_path,
-                    vframes=1,         # 只提取 1 帧
-                    format='webp',     # WebP 格式
-                    quality=80,        # 质量 80%
-                    lossless=0         # 有损压缩（体积更小）
-                )
-                # 覆盖已存在的文件
-                .overwrite_output()
-                # 执行（静默模式）
-                .run(capture_stdout=True, capture_stderr=True, quiet=True)
-            )
+        duration = self.get_video_info(source_path).get('duration', 0)
+        timestamps = [self.poster_time(duration)]
+        if with_hash_frame and duration > 0:
+            timestamps.append(duration / 2)
+        logger.debug(f"视频时长: {duration:.2f}s, 提取位置: {timestamps}")
 
-            return True
+        frames = self._extract(source_path, timestamps, max_long_edge)
+
+        # 如果失败且提取位置不是 0，尝试降级到首帧
+        if frames is None and any(timestamps):
+            logger.warning(f"从 {timestamps}s 提取失败，降级到首帧重试")
+            frames = self._extract(source_path, [0] * len(timestamps), max_long_edge)
+        return frames
+
+    @staticmethod
+    def _extract(source_path: str, timestamps: List[float], max_long_edge: int) -> Optional[List[Image.Image]]:
+        """执行 ffmpeg 提取帧，失败时记录原因并返回 None"""
+        try:
+            return extract_frames(source_path, timestamps, max_long_edge)
 
         except ffmpeg.Error as e:
             # ffmpeg 执行错误
-            stderr = e.stderr.decode('utf-8') if e.stderr else '未知错误'
+            stderr = e.stderr.decode('utf-8', errors='replace') if e.stderr else '未知错误'
 
             # 解析常见错误
             if 'Invalid data found' in stderr or 'moov atom not found' in stderr:
@@ -148,12 +159,10 @@ class VideoThumbnailGenerator(ThumbnailGenerator):
                 logger.error(f"视频文件不存在: {source_path}")
             elif 'Duration N/A' in stderr:
                 logger.error(f"无法获取视频时长（可能文件损坏）: {source_path}")
-            elif 'Cannot allocate memory' in stderr or 'No filtered frames' in stderr:
-                logger.warning(f"无可用帧（可能 seek 位置超出视频范围）: ss={seek_time}s")
             else:
-                logger.error(f"ffmpeg 处理失败 {source_path}: {stderr[:500]}")  # 限制日志长度
+                logger.error(f"ffmpeg 处理失败 {source_path}: {stderr[-500:]}")  # 限制日志长度
 
-            return False
+            return None
 
         except FileNotFoundError:
             # ffmpeg 未安装
@@ -161,12 +170,17 @@ class VideoThumbnailGenerator(ThumbnailGenerator):
                 "ffmpeg 未安装或不在系统 PATH 中。"
                 "请参考项目 README.md 安装 ffmpeg。"
             )
-            return False
+            return None
 
         except PermissionError as e:
             # 文件权限问题
             logger.error(f"权限不足，无法访问文件 {source_path}: {e}")
-            return False
+            return None
+
+        except ValueError as e:
+            # 输出帧数不符（如 seek 位置超出视频范围）
+            logger.warning(f"无可用帧 {source_path}: {e}")
+            return None
 
     @staticmethod
     def get_video_info(video_path: str) -> dict:
@@ -189,7 +203,7 @@ class VideoThumbnailGenerator(ThumbnailGenerator):
             }
         """
         try:
-            probe = ffmpeg.probe(video_path)
+            probe = probe_video(video_path)
 
             # 查找视频流
             video_stream = next(
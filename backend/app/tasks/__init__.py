@@ -6,6 +6,9 @@
 - broker.py: Taskiq Broker 配置（Redis 队列）
 - phash_tasks.py: 感知哈希计算任务
 - geocoding_tasks.py: 地理编码任务
+- ingestion_tasks.py: 扫描导入作业（可暂停/续跑）
+- tag_tasks.py: 从留存的原始元数据重新映射标签
+- derivative_tasks.py: 调整参数后重新生成缩略图/预览图
 
 使用方式：
     from app.tasks.phash_tasks import calculate_phash_task
@@ -34,5 +37,8 @@ from .broker import broker
 # Worker 启动时会加载此模块，从而注册所有任务
 from . import phash_tasks  # noqa: F401
 from . import geocoding_tasks  # noqa: F401
+from . import ingestion_tasks  # noqa: F401
+from . import tag_tasks  # noqa: F401
+from . import derivative_tasks  # noqa: F401
 
-__all__ = ['broker', 'phash_tasks', 'geocoding_tasks']
+__all__ = ['broker', 'phash_tasks', 'geocoding_tasks', 'ingestion_tasks', 'tag_tasks', 'derivative_tasks']
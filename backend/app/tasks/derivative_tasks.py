@@ -0,0 +1,36 @@
+"""衍生图异步任务
+
+执行重新生成衍生图作业（task_logs 中 task_type=regenerate_derivatives 的记录）：
+调整缩略图/预览图的质量、尺寸或格式后，按筛选条件为已有素材重建，已是最新的跳过。
+"""
+import asyncio
+from .broker import broker
+from ..tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@broker.task(task_name="regenerate_derivatives")
+async def regenerate_derivatives_task(task_log_id: int) -> dict:
+    """执行重新生成衍生图作业
+
+    Args:
+        task_log_id: 作业对应的任务日志 ID
+
+    Returns:
+        执行结果字典:
+        {
+            'task_log_id': int,
+            'status': str,   # success / failed / skipped（作业不在待执行状态）
+            'summary': str
+        }
+
+    说明:
+        - 编码在进程池中并行执行，数据库读写与进度提交留在本任务线程中
+        - 同步阻塞流程放到线程中执行，不阻塞 Worker 事件循环
+        - 中断后重新触发同样的作业即可，已重建的素材会被跳过
+    """
+    from ..services.derivative.regenerate import DerivativeRegenerationService
+
+    logger.info(f"🚀 开始执行重新生成衍生图作业 - Task Log ID: {task_log_id}")
+    return await asyncio.to_thread(DerivativeRegenerationService.run, task_log_id)
@@ -0,0 +1,60 @@
+"""导入作业异步任务
+
+在 Worker 中执行扫描导入作业（ingestion_jobs），进度按检查点写回作业记录；
+分布式扫描作业的每个目录分片（ingestion_job_shards）作为独立任务，可由任意 Worker 执行。
+"""
+import asyncio
+from .broker import broker
+from ..tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@broker.task(task_name="run_ingestion_job")
+async def run_ingestion_job_task(job_id: int) -> dict:
+    """执行导入作业
+
+    Args:
+        job_id: 导入作业 ID
+
+    Returns:
+        执行结果字典:
+        {
+            'job_id': int,
+            'status': str,   # done / paused / failed / skipped（作业不在排队状态）/ dispatched（分布式作业已投递分片）
+            'summary': str
+        }
+
+    说明:
+        - 导入是同步阻塞流程，放到线程中执行，不阻塞 Worker 事件循环
+        - 作业被暂停时在下一个检查点退出，续跑时重新投递
+    """
+    from ..services.ingestion.jobs import IngestionJobService
+
+    logger.info(f"🚀 开始执行导入作业 - Job ID: {job_id}")
+    return await asyncio.to_thread(IngestionJobService.run, job_id)
+
+
+@broker.task(task_name="run_ingestion_shard")
+async def run_ingestion_shard_task(shard_id: int) -> dict:
+    """执行分布式扫描导入作业的一个目录分片
+
+    Args:
+        shard_id: 分片 ID
+
+    Returns:
+        执行结果字典:
+        {
+            'shard_id': int,
+            'status': str,   # done / paused / failed / skipped（分片不在排队状态）
+            'summary': str
+        }
+
+    说明:
+        - 进度写回分片并汇总到所属作业；最后结束的分片负责结束作业
+        - 同内容文件跨分片去重依赖 MySQL 命名锁（GET_LOCK）
+    """
+    from ..services.ingestion.sharding import ShardedScanService
+
+    logger.info(f"🚀 开始执行导入分片 - Shard ID: {shard_id}")
+    return await asyncio.to_thread(ShardedScanService.run_shard, shard_id)
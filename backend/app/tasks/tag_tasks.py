@@ -0,0 +1,35 @@
+"""标签异步任务
+
+执行标签重新映射作业（tag_remap_jobs）：从留存的原始元数据（asset_raw_metadata）为已有素材重新映射标签，
+不读取原文件。
+"""
+import asyncio
+from .broker import broker
+from ..tools.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@broker.task(task_name="remap_asset_tags")
+async def remap_asset_tags_task(job_id: int) -> dict:
+    """执行标签重新映射作业
+
+    Args:
+        job_id: 重新映射作业 ID
+
+    Returns:
+        执行结果字典:
+        {
+            'job_id': int,
+            'status': str,   # done / failed / skipped（作业不在排队状态）
+            'summary': str
+        }
+
+    说明:
+        - 分批读取、分批提交，同步阻塞流程放到线程中执行，不阻塞 Worker 事件循环
+        - 失败或 Worker 中断后可续跑，从最后提交的检查点继续
+    """
+    from ..services.tags.remap import TagRemapService
+
+    logger.info(f"🚀 开始执行标签重新映射作业 - Job ID: {job_id}")
+    return await asyncio.to_thread(TagRemapService.run, job_id)
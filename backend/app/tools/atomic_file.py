@@ -0,0 +1,49 @@
+"""原子写入衍生文件
+
+缩略图、预览图等先写到同目录的临时文件，完成后 os.replace 到目标路径：
+读者（静态文件服务、接口、并行的重新生成作业）只会看到旧文件或完整的新文件；
+写入失败或进程中断时旧文件保持不变，临时文件带 .tmp 后缀便于清理。
+"""
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from PIL import Image
+
+TMP_SUFFIX = '.tmp'
+
+
+@contextmanager
+def atomic_path(dest_path: str) -> Iterator[str]:
+    """产出同目录的临时路径供写入；正常退出时替换到目标路径，异常时删除临时文件
+
+    Args:
+        dest_path: 目标文件路径（目录不存在时创建）
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex[:8]}{TMP_SUFFIX}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, dest_path)
+    finally:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def save_image(image: Image.Image, dest_path: str, format: str, **params) -> None:
+    """原子保存图片（临时文件没有图片扩展名，须显式指定格式）
+
+    Args:
+        image: PIL Image 对象
+        dest_path: 目标文件路径
+        format: Pillow 格式名（如 WEBP、JPEG）
+        **params: 传给 Image.save 的编码参数（quality 等）
+    """
+    with atomic_path(dest_path) as tmp_path:
+        image.save(tmp_path, format, **params)
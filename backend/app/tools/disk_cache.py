@@ -0,0 +1,239 @@
+"""按字节预算淘汰的磁盘 LRU 缓存与并发合并
+
+按需生成的衍生图（缩略图/预览图）写入缓存目录，总大小超过预算时淘汰最久未访问的文件：
+- 索引（键 -> 字节数，按访问顺序）在进程内维护，首次使用时按文件 mtime 从磁盘重建
+- 命中时更新文件 mtime，重启或多进程重建索引时保留近似的访问顺序
+- 写入先落临时文件再 os.replace，读者不会看到半个文件
+
+多个进程共用同一目录时各自按预算淘汰，被其他进程删除的文件在下次 get 时视为未命中。
+
+SingleFlight 合并同一键的并发调用：首个调用执行，其余调用等待并共享其结果（或异常）。
+FailureCache 记住近期失败的键，冷却期内不再重复执行必然失败的生成。
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, TypeVar
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+TMP_SUFFIX = '.tmp'
+
+
+class DiskLRUCache:
+    """磁盘 LRU 缓存（键即文件名，按两级目录分散）
+
+    Args:
+        root: 缓存目录
+        max_bytes: 字节预算（超过后淘汰最久未访问的文件）
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        """当前索引内的缓存总字节数"""
+        return self._total_bytes
+
+    def path_for(self, key: str) -> str:
+        """键对应的缓存文件路径"""
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        """命中时返回缓存文件路径并刷新访问顺序，否则返回 None"""
+        self._ensure_loaded()
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+            size = os.path.getsize(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key not in self._index:
+                # 其他进程写入的文件
+                self._index[key] = size
+                self._total_bytes += size
+            self._index.move_to_end(key)
+            self.hits += 1
+        return path
+
+    def put(self, key: str, write: Callable[[str], None]) -> str:
+        """生成并写入缓存
+
+        Args:
+            key: 缓存键（用作文件名）
+            write: 把内容写到给定临时路径的函数
+
+        Returns:
+            缓存文件路径
+
+        Raises:
+            write 抛出的异常（临时文件会被清理）
+        """
+        self._ensure_loaded()
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=TMP_SUFFIX)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._forget(key)
+            self._index[key] = size
+            self._total_bytes += size
+            evicted = self._evict(keep=key)
+        for evicted_path in evicted:
+            try:
+                os.remove(evicted_path)
+            except OSError:
+                pass
+        return path
+
+    def _forget(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self, keep: str) -> list:
+        """按访问顺序淘汰到预算以内（不淘汰刚写入的键），返回待删除的文件路径"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = next(iter(self._index.items()))
+            if key == keep:
+                break
+            self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            evicted.append(self.path_for(key))
+        return evicted
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时从磁盘重建索引（按 mtime 从旧到新）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            entries = []
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    file_path = os.path.join(dirpath, name)
+                    try:
+                        if name.endswith(TMP_SUFFIX):
+                            # 上次异常退出遗留的临时文件
+                            os.remove(file_path)
+                            continue
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name, stat.st_size))
+            for _, name, size in sorted(entries):
+                self._index[name] = size
+                self._total_bytes += size
+            self._loaded = True
+            evicted = self._evict(keep='')
+        for evicted_path in evicted:
+            try:
+                os.remove(evicted_path)
+            except OSError:
+                pass
+        if entries:
+            logger.info(f"衍生图缓存索引已加载: {len(self._index)} 个文件, {self._total_bytes / 1024 / 1024:.1f}MB")
+
+
+class SingleFlight:
+    """合并同一键的并发调用（同一进程内）"""
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        """执行 func；同一键已有调用在执行时等待其结果
+
+        Raises:
+            func 抛出的异常（等待者收到同一个异常）
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class FailureCache:
+    """近期失败的键（同一进程内，超过 TTL 后过期，超过条数上限时淘汰最早的记录）
+
+    Args:
+        ttl_seconds: 失败记录的有效期（秒）
+        max_entries: 最多记录的键数
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._failed: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: str) -> None:
+        """记录一次失败（重复记录时刷新时间）"""
+        with self._lock:
+            self._failed[key] = time.monotonic()
+            self._failed.move_to_end(key)
+            while len(self._failed) > self.max_entries:
+                self._failed.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            failed_at = self._failed.get(key)
+            if failed_at is None:
+                return False
+            if time.monotonic() - failed_at >= self.ttl_seconds:
+                del self._failed[key]
+                return False
+            return True
@@ -0,0 +1,167 @@
+"""入库文件复制：硬链接 / reflink（写时复制）/ 内核态复制
+
+源目录与 NAS 在同一文件系统时，硬链接与 reflink 不复制数据块，入库几乎不产生 I/O；
+跨设备时退回内核态复制（copy_file_range → sendfile），数据不经过用户态缓冲区。
+
+策略（stage_file 的 strategy 参数）：
+- copy：内核态复制
+- reflink：reflink（Btrfs/XFS/APFS 等），不支持时内核态复制
+- hardlink：硬链接，跨设备或不支持时依次退回 reflink、内核态复制
+  注意：硬链接与源文件共享 inode，原地修改源文件会同时改变入库文件；reflink 与复制不受影响
+"""
+import ctypes
+import errno
+import os
+import shutil
+import sys
+from typing import Callable, Dict, Tuple
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+STAGE_STRATEGIES: Tuple[str, ...] = ('copy', 'reflink', 'hardlink')
+
+# 每种策略依次尝试的方式
+_STRATEGY_CHAIN: Dict[str, Tuple[str, ...]] = {
+    'copy': ('copy',),
+    'reflink': ('reflink', 'copy'),
+    'hardlink': ('hardlink', 'reflink', 'copy'),
+}
+
+KERNEL_COPY_CHUNK = 64 * 1024 * 1024  # 单次 copy_file_range / sendfile 的字节数
+USERSPACE_COPY_BUFFER = 1024 * 1024
+
+# Linux ioctl FICLONE（_IOW(0x94, 9, int)）
+_FICLONE = 0x40049409
+
+
+def hardlink(source: str, dest: str) -> str:
+    """硬链接（仅限同一文件系统）"""
+    os.link(source, dest)
+    return 'hardlink'
+
+
+def reflink(source: str, dest: str) -> str:
+    """reflink：共享数据块，写时复制（Linux FICLONE / macOS clonefile）"""
+    if sys.platform == 'darwin':
+        _clonefile(source, dest)
+    elif sys.platform.startswith('linux'):
+        import fcntl
+
+        with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                fdst.close()
+                os.remove(dest)
+                raise
+        shutil.copystat(source, dest)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "当前平台不支持 reflink", source)
+    return 'reflink'
+
+
+def copy_with_copy_file_range(source: str, dest: str) -> str:
+    """内核态复制：copy_file_range（Linux ≥ 4.5；同文件系统时部分文件系统会直接 reflink 或服务端复制）"""
+    if not hasattr(os, 'copy_file_range'):
+        raise OSError(errno.ENOSYS, "os.copy_file_range 不可用", source)
+    return _kernel_copy(source, dest, _copy_file_range_chunk, 'copy_file_range')
+
+
+def copy_with_sendfile(source: str, dest: str) -> str:
+    """内核态复制：sendfile（Linux 支持文件到文件）"""
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, "sendfile 仅支持 Linux 文件到文件复制", source)
+    return _kernel_copy(source, dest, _sendfile_chunk, 'sendfile')
+
+
+def copy_userspace(source: str, dest: str) -> str:
+    """用户态复制（read/write 经过用户态缓冲区）"""
+    with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, USERSPACE_COPY_BUFFER)
+    shutil.copystat(source, dest)
+    return 'userspace'
+
+
+def kernel_copy(source: str, dest: str) -> str:
+    """内核态复制：依次尝试 copy_file_range、sendfile，都不可用时用户态复制
+
+    Returns:
+        实际使用的方式（copy_file_range / sendfile / userspace）
+    """
+    for method in (copy_with_copy_file_range, copy_with_sendfile):
+        try:
+            return method(source, dest)
+        except OSError as e:
+            logger.debug(f"{method.__name__} 不可用，尝试下一种方式: {e}")
+            _remove_quietly(dest)
+    return copy_userspace(source, dest)
+
+
+_METHODS: Dict[str, Callable[[str, str], str]] = {
+    'hardlink': hardlink,
+    'reflink': reflink,
+    'copy': kernel_copy,
+}
+
+
+def stage_file(source: str, dest: str, strategy: str = 'copy') -> str:
+    """把源文件放到 dest（dest 必须不存在），按策略依次尝试
+
+    Args:
+        source: 源文件路径
+        dest: 目标路径（调用方负责原子替换到最终位置）
+        strategy: copy / reflink / hardlink
+
+    Returns:
+        实际使用的方式（hardlink / reflink / copy_file_range / sendfile / userspace）
+    """
+    if strategy not in _STRATEGY_CHAIN:
+        raise ValueError(f"不支持的入库策略: {strategy}，可选: {', '.join(STAGE_STRATEGIES)}")
+
+    chain = _STRATEGY_CHAIN[strategy]
+    for name in chain[:-1]:
+        try:
+            return _METHODS[name](source, dest)
+        except OSError as e:
+            logger.debug(f"{name} 失败，退回下一种方式 ({source}): {e}")
+            _remove_quietly(dest)
+    return _METHODS[chain[-1]](source, dest)
+
+
+def _kernel_copy(source: str, dest: str, copy_chunk: Callable[[int, int, int, int], int], name: str) -> str:
+    with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            copied = copy_chunk(in_fd, out_fd, offset, min(KERNEL_COPY_CHUNK, size - offset))
+            if copied == 0:
+                # 部分文件系统（如 FUSE）不报错但不复制，视为不支持
+                raise OSError(errno.EIO, f"{name} 在偏移 {offset} 处未复制任何数据", source)
+            offset += copied
+    shutil.copystat(source, dest)
+    return name
+
+
+def _copy_file_range_chunk(in_fd: int, out_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(in_fd, out_fd, count, offset, offset)
+
+
+def _sendfile_chunk(in_fd: int, out_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(out_fd, in_fd, offset, count)
+
+
+def _clonefile(source: str, dest: str) -> None:
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.clonefile(os.fsencode(source), os.fsencode(dest), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), source)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        if os.path.lexists(path):
+            os.remove(path)
+    except OSError:
+        pass
@@ -1,6 +1,7 @@
 """文件哈希：导入去重用 SHA256。大文件（≥100MB）只采样头尾以换速度。"""
 import hashlib
 import os
+from collections import deque
 from .utils import get_logger
 
 logger = get_logger(__name__)
@@ -21,6 +22,11 @@ def _full_hash(file_path: str) -> str:
     return hash_func.hexdigest()
 
 
+def hash_bytes(content: bytes) -> str:
+    """对内存中的完整文件内容计算哈希（与小文件的完整哈希同口径）"""
+    return hashlib.sha256(content).hexdigest()
+
+
 def _sample_hash(file_path: str, file_size: int) -> str:
     hash_func = hashlib.sha256()
     sample_bytes = SAMPLE_SIZE_MB * 1024 * 1024
@@ -46,3 +52,62 @@ def calculate_file_hash(file_path: str, smart_mode: bool = True) -> str:
 
     logger.debug(f"小文件 ({file_size / 1024 / 1024:.2f}MB)，使用完整哈希")
     return _full_hash(file_path)
+
+
+class StreamingFileHasher:
+    """边写边算的文件哈希（与 calculate_file_hash(smart_mode=True) 同口径）
+
+    数据只经过一次：小文件累计完整哈希；≥100MB 时改用头尾采样，
+    头部取前 10MB，尾部只在内存中保留最后 10MB。
+
+    示例：
+        >>> hasher = StreamingFileHasher()
+        >>> for chunk in chunks:
+        ...     f.write(chunk)
+        ...     hasher.update(chunk)
+        >>> file_hash = hasher.hexdigest(os.path.getmtime(path))
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._full = hashlib.sha256()
+        self._head = bytearray()
+        self._tail = deque()
+        self._tail_size = 0
+
+    def update(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        sample_bytes = SAMPLE_SIZE_MB * 1024 * 1024
+        self.size += len(chunk)
+
+        # 超过阈值后完整哈希已无用，不再计算
+        if self.size < LARGE_FILE_THRESHOLD:
+            self._full.update(chunk)
+
+        if len(self._head) < sample_bytes:
+            self._head += chunk[:sample_bytes - len(self._head)]
+
+        # 尾部按块保留，丢弃整块时保证剩余数据仍不少于采样大小
+        self._tail.append(bytes(chunk))
+        self._tail_size += len(chunk)
+        while self._tail_size - len(self._tail[0]) >= sample_bytes:
+            self._tail_size -= len(self._tail.popleft())
+
+    def hexdigest(self, mtime: float) -> str:
+        """计算最终哈希
+
+        Args:
+            mtime: 写入完成后文件的修改时间（大文件采样哈希的一部分）
+        """
+        if self.size < LARGE_FILE_THRESHOLD:
+            return self._full.hexdigest()
+
+        sample_bytes = SAMPLE_SIZE_MB * 1024 * 1024
+        hash_func = hashlib.sha256()
+        hash_func.update(bytes(self._head))
+        if self.size > sample_bytes * 2:
+            hash_func.update(b''.join(self._tail)[-sample_bytes:])
+        hash_func.update(str(self.size).encode())
+        hash_func.update(str(int(mtime)).encode())
+        return hash_func.hexdigest()
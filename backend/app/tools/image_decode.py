@@ -0,0 +1,339 @@
+"""按需降分辨率的图片解码（带像素预算的解码守卫）
+
+缩略图只需要 800px 长边，感知哈希只需要 32px，完整解码一张 48MP 照片却要 140MB+ 像素内存与数百毫秒。
+open_image 在给定目标长边时按代价从低到高尝试：
+
+1. 内嵌缩略图足够大时直接用它：JPEG EXIF IFD1 缩略图、HEIF 内嵌缩略图（pillow_heif draft）
+2. JPEG DCT 缩放解码（Image.draft，1/2、1/4、1/8），解码时即只产生缩小后的像素
+3. 其他格式完整解码后按整数倍 Image.reduce（盒式平均，比 LANCZOS 快），减少后续裁剪/缩放/哈希的像素量
+
+结果长边始终不小于目标长边（原图更小时保持原尺寸），EXIF 信息保留，调用方照常 exif_transpose。
+
+缩略图、预览图、感知哈希、切片的图片解码都经过 open_image，同时作为解码守卫：
+
+- 文件头像素数超过 IMAGE_DECODE_SOURCE_MAX_PIXELS 视为解压炸弹，不解码直接拒绝
+- 进程内解码同时持有的像素不超过 IMAGE_DECODE_MAX_PIXELS：要求完整解码但超出预算时结果按预算缩小；
+  draft 能缩到预算内时在进程内解码，否则（PNG/TIFF 等只能完整解码的格式）交给受内存上限
+  （IMAGE_DECODE_ISOLATED_MAX_MB）约束的子进程解码并缩小，超限只会让子进程失败，不会拖垮 Worker
+- 每次解码记录策略、尺寸、峰值内存与耗时（decode_metrics）
+"""
+import io
+import math
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from PIL import ExifTags, Image
+from pillow_heif import register_heif_opener
+
+from ..config import settings
+from .utils import get_logger
+
+# 注册 HEIF/HEIC 解码器（支持苹果 HEIC 格式）
+register_heif_opener()
+
+# Pillow 自带的解压炸弹检查与守卫的源像素上限保持一致（守卫在解码前先行拒绝）
+Image.MAX_IMAGE_PIXELS = settings.IMAGE_DECODE_SOURCE_MAX_PIXELS or None
+
+logger = get_logger(__name__)
+
+EXIF_THUMBNAIL_OFFSET_TAG = 0x0201  # JPEGInterchangeFormat
+EXIF_THUMBNAIL_LENGTH_TAG = 0x0202  # JPEGInterchangeFormatLength
+EXIF_HEADER = b'Exif\x00\x00'
+
+# Image.reduce 支持的模式（P/1 等模式跳过，保持完整尺寸）
+REDUCIBLE_MODES = {'L', 'LA', 'RGB', 'RGBA', 'RGBa', 'La', 'CMYK', 'YCbCr', 'I', 'F', 'I;16'}
+
+# 内嵌缩略图与原图宽高比的允许误差（超过视为带黑边或裁剪过的缩略图，不使用）
+ASPECT_TOLERANCE = 0.02
+
+# 隔离解码子进程超时（秒）
+ISOLATED_DECODE_TIMEOUT = 300
+
+# 子进程以 python -m 运行本模块，工作目录为 backend 根目录
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 解码策略
+STRATEGY_FULL = 'full'                      # 完整解码
+STRATEGY_EXIF_THUMBNAIL = 'exif_thumbnail'  # 使用 EXIF 内嵌缩略图
+STRATEGY_REDUCED = 'reduced'                # draft / reduce 降分辨率解码
+STRATEGY_ISOLATED = 'isolated'              # 超出预算，子进程解码
+
+
+@dataclass
+class DecodeRecord:
+    """单次解码记录"""
+
+    strategy: str
+    source_size: Tuple[int, int]
+    result_size: Tuple[int, int]
+    peak_bytes: int  # 进程内为解码期间同时持有的像素内存；子进程解码为子进程峰值 RSS
+    elapsed_ms: float
+
+
+class DecodeMetrics:
+    """解码计数与峰值内存（进程内累计，线程安全；last() 为当前线程最近一次解码）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counts: Dict[str, int] = {}
+        self.rejected = 0
+        self.peak_bytes = 0
+
+    def record(self, record: DecodeRecord) -> None:
+        with self._lock:
+            self.counts[record.strategy] = self.counts.get(record.strategy, 0) + 1
+            self.peak_bytes = max(self.peak_bytes, record.peak_bytes)
+        self._local.last = record
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def last(self) -> Optional[DecodeRecord]:
+        """当前线程最近一次解码记录"""
+        return getattr(self._local, 'last', None)
+
+    def snapshot(self) -> Dict:
+        """累计指标 {counts: {策略: 次数}, rejected, peak_bytes}"""
+        with self._lock:
+            return {'counts': dict(self.counts), 'rejected': self.rejected, 'peak_bytes': self.peak_bytes}
+
+
+decode_metrics = DecodeMetrics()
+
+
+def open_image(
+    source: Union[str, BinaryIO],
+    min_long_edge: Optional[int] = None,
+    max_pixels: Optional[int] = None
+) -> Image.Image:
+    """打开并解码图片（受像素预算约束）
+
+    Args:
+        source: 文件路径或二进制流
+        min_long_edge: 结果长边的下限（None 表示完整解码）；超出像素预算时以预算为准
+        max_pixels: 进程内解码的像素预算（None 使用 IMAGE_DECODE_MAX_PIXELS，0 表示不限制）
+
+    Returns:
+        已解码（load 过）的图片，调用方负责 close
+
+    Raises:
+        Image.DecompressionBombError: 文件头像素数超过 IMAGE_DECODE_SOURCE_MAX_PIXELS
+        MemoryError: 超出预算且子进程解码失败（或未启用子进程解码）
+        其余与 Image.open / Image.load 相同
+    """
+    budget = settings.IMAGE_DECODE_MAX_PIXELS if max_pixels is None else max_pixels
+    started = time.perf_counter()
+    img = Image.open(source)
+    try:
+        source_size = img.size
+        source_limit = settings.IMAGE_DECODE_SOURCE_MAX_PIXELS
+        if source_limit and _pixels(source_size) > source_limit:
+            decode_metrics.reject()
+            raise Image.DecompressionBombError(
+                f"图片像素数 {source_size[0]}x{source_size[1]} 超过上限 {source_limit}，拒绝解码"
+            )
+
+        target = _target_long_edge(source_size, min_long_edge, budget)
+        if target is None:
+            img.load()
+            _record(STRATEGY_FULL, source_size, img.size, _image_bytes(img), started)
+            return img
+
+        thumbnail = _exif_thumbnail(img, target)
+        if thumbnail is not None:
+            img.close()
+            _record(STRATEGY_EXIF_THUMBNAIL, source_size, thumbnail.size, _image_bytes(thumbnail), started)
+            return thumbnail
+
+        # JPEG：DCT 缩放；HEIF：选用不小于目标尺寸的内嵌缩略图；其他格式为空操作
+        img.draft(None, _scaled_size(img.size, target))
+        if budget and _pixels(img.size) > budget:
+            info = img.info
+            if not isinstance(source, (str, os.PathLike)):
+                # 二进制流随图片关闭，先取出内容交给子进程
+                source.seek(0)
+                source = source.read()
+            img.close()
+            return _decode_isolated(source, target, budget, source_size, info, started)
+
+        img.load()
+        decoded_bytes = _image_bytes(img)
+        result = _reduce(img, target, budget)
+        peak_bytes = decoded_bytes + (_image_bytes(result) if result is not img else 0)
+        _record(STRATEGY_REDUCED, source_size, result.size, peak_bytes, started)
+        return result
+    except Exception:
+        img.close()
+        raise
+
+
+def _pixels(size: Tuple[int, int]) -> int:
+    return size[0] * size[1]
+
+
+def _image_bytes(img: Image.Image) -> int:
+    """图片像素内存（Pillow 中 1/L/P 每像素 1 字节，I;16 为 2 字节，其余按 4 字节存储）"""
+    if img.mode in ('1', 'L', 'P'):
+        pixel_bytes = 1
+    elif img.mode.startswith('I;16'):
+        pixel_bytes = 2
+    else:
+        pixel_bytes = 4
+    return _pixels(img.size) * pixel_bytes
+
+
+def _target_long_edge(size: Tuple[int, int], min_long_edge: Optional[int], budget: int) -> Optional[int]:
+    """解码目标长边；None 表示完整解码（未指定目标或原图不大于目标，且未超出预算）"""
+    long_edge = max(size)
+    target = min_long_edge if min_long_edge and min_long_edge < long_edge else None
+    if budget and _pixels(size) > budget:
+        # 预算内的最大长边：长边 e 时像素数为 e² × 短边 / 长边
+        budget_edge = max(1, int(math.sqrt(budget * long_edge / max(1, min(size)))))
+        target = min(target or long_edge, budget_edge)
+    return target
+
+
+def _reduce(img: Image.Image, target: int, budget: int) -> Image.Image:
+    """按整数倍缩小：长边不小于目标，且像素数不超过预算"""
+    factor = max(1, max(img.size) // target)
+    while budget and _pixels(_reduced_size(img.size, factor)) > budget:
+        factor += 1
+    if factor >= 2 and img.mode in REDUCIBLE_MODES:
+        reduced = img.reduce(factor)
+        img.close()
+        return reduced
+    return img
+
+
+def _reduced_size(size: Tuple[int, int], factor: int) -> Tuple[int, int]:
+    """Image.reduce 的结果尺寸（向上取整）"""
+    return -(-size[0] // factor), -(-size[1] // factor)
+
+
+def _record(strategy: str, source_size, result_size, peak_bytes: int, started: float) -> None:
+    record = DecodeRecord(
+        strategy=strategy,
+        source_size=source_size,
+        result_size=result_size,
+        peak_bytes=peak_bytes,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    decode_metrics.record(record)
+    logger.debug(
+        f"图片解码: {strategy} {source_size} -> {result_size}, "
+        f"峰值 {peak_bytes / 1024 / 1024:.1f}MB, {record.elapsed_ms}ms"
+    )
+
+
+def _decode_isolated(
+    source: Union[str, bytes],
+    target: int,
+    budget: int,
+    source_size: Tuple[int, int],
+    info: Dict,
+    started: float
+) -> Image.Image:
+    """超出预算的图片在受内存上限约束的子进程中解码并缩小，经管道取回原始像素"""
+    limit_mb = settings.IMAGE_DECODE_ISOLATED_MAX_MB
+    if not limit_mb:
+        raise MemoryError(f"图片 {source_size[0]}x{source_size[1]} 超出解码预算 {budget} 像素")
+
+    args = [sys.executable, '-m', __name__, str(target), str(budget), str(limit_mb)]
+    stdin = None
+    if isinstance(source, (str, os.PathLike)):
+        args.append(os.fspath(source))
+    else:
+        stdin = source
+
+    proc = subprocess.run(args, input=stdin, capture_output=True, cwd=_BACKEND_ROOT, timeout=ISOLATED_DECODE_TIMEOUT)
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode('utf-8', errors='replace').strip().splitlines()
+        raise MemoryError(
+            f"图片 {source_size[0]}x{source_size[1]} 隔离解码失败（内存上限 {limit_mb}MB）: "
+            f"{stderr[-1] if stderr else proc.returncode}"
+        )
+
+    header, _, pixels = proc.stdout.partition(b'\n')
+    mode, width, height, peak_bytes = header.decode().split()
+    img = Image.frombytes(mode, (int(width), int(height)), pixels)
+    for key in ('exif', 'icc_profile'):
+        if info.get(key):
+            img.info[key] = info[key]
+
+    _record(STRATEGY_ISOLATED, source_size, img.size, int(peak_bytes), started)
+    logger.info(f"图片超出解码预算，已在子进程中解码: {source_size} -> {img.size}, 子进程峰值 {int(peak_bytes) // 1024 // 1024}MB")
+    return img
+
+
+def _isolated_main(argv) -> None:
+    """子进程入口：限制地址空间后解码、缩小，向 stdout 写 "模式 宽 高 峰值字节\n" 与原始像素"""
+    target, budget, limit_mb = (int(value) for value in argv[:3])
+    resource.setrlimit(resource.RLIMIT_AS, (limit_mb * 1024 * 1024, limit_mb * 1024 * 1024))
+    source = argv[3] if len(argv) > 3 else io.BytesIO(sys.stdin.buffer.read())
+
+    img = Image.open(source)
+    img.draft(None, _scaled_size(img.size, target))
+    img.load()
+    if img.mode not in REDUCIBLE_MODES:
+        img = img.convert('RGBA' if img.has_transparency_data else 'RGB')
+    img = _reduce(img, target, budget)
+
+    peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    sys.stdout.buffer.write(f"{img.mode} {img.width} {img.height} {peak_bytes}\n".encode())
+    sys.stdout.buffer.write(img.tobytes())
+
+
+def _scaled_size(size: Tuple[int, int], min_long_edge: int) -> Tuple[int, int]:
+    """按长边等比缩放后的尺寸（向上取整，保证结果不小于目标）"""
+    width, height = size
+    long_edge = max(width, height)
+    return (
+        max(1, -(-width * min_long_edge // long_edge)),
+        max(1, -(-height * min_long_edge // long_edge)),
+    )
+
+
+def _exif_thumbnail(img: Image.Image, min_long_edge: int) -> Optional[Image.Image]:
+    """JPEG EXIF IFD1 中的缩略图（足够大且宽高比一致时返回，否则 None）
+
+    缩略图与主图方向相同，复制主图的 EXIF 供调用方按方向修正。
+    """
+    exif_bytes = img.info.get('exif')
+    if img.format != 'JPEG' or not exif_bytes:
+        return None
+    try:
+        ifd1 = img.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset = ifd1.get(EXIF_THUMBNAIL_OFFSET_TAG)
+        length = ifd1.get(EXIF_THUMBNAIL_LENGTH_TAG)
+        if not offset or not length:
+            return None
+
+        # 偏移相对 TIFF 头（APP1 中 "Exif\0\0" 之后）
+        base = len(EXIF_HEADER) if exif_bytes.startswith(EXIF_HEADER) else 0
+        data = exif_bytes[base + offset:base + offset + length]
+        thumbnail = Image.open(io.BytesIO(data))
+        width, height = thumbnail.size
+        if max(width, height) < min_long_edge:
+            return None
+        if abs(width / height - img.width / img.height) > ASPECT_TOLERANCE * (img.width / img.height):
+            return None
+
+        thumbnail.load()
+        thumbnail.info['exif'] = exif_bytes
+        logger.debug(f"使用 EXIF 内嵌缩略图: {thumbnail.size}（原图 {img.size}）")
+        return thumbnail
+    except Exception as e:
+        logger.debug(f"读取 EXIF 内嵌缩略图失败: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    _isolated_main(sys.argv[1:])
@@ -19,7 +19,11 @@ from PIL import Image
 import numpy
 import imagehash
 from pillow_heif import register_heif_opener
+from ..config import settings
 from ..tools.utils import get_logger
+from .image_decode import open_image
+from .video_frames import extract_frames
+from .video_probe import probe_video
 
 # 注册 HEIF/HEIC 解码器（支持苹果 HEIC 格式）
 register_heif_opener()
@@ -61,6 +65,9 @@ class MultiHashCalculator:
         }
     """
 
+    # 降分辨率解码的长边下限（与缩略图基准尺寸一致，导入时两者共用一次解码）
+    DECODE_SIZE = 800
+
     def __init__(self, hash_size: int = 8, use_color: bool = True):
         """初始化多哈希计算器
 
@@ -87,27 +94,9 @@ class MultiHashCalculator:
             }
         """
         try:
-            with Image.open(image_path) as img:
-                # 转换为 RGB（某些格式如 RGBA 需要转换）
-                if img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
-
-                hashes = {
-                    # phash: 基于 DCT 变换，对图像内容最敏感（推荐）
-                    'phash': str(imagehash.phash(img, hash_size=self.hash_size)),
-
-                    # dhash: 基于梯度，对边缘和结构敏感
-                    'dhash': str(imagehash.dhash(img, hash_size=self.hash_size)),
-
-                    # average_hash: 基于平均亮度（保留用于兼容）
-                    'average_hash': str(imagehash.average_hash(img, hash_size=self.hash_size)),
-                }
-
-                # 颜色哈希（可选，用于区分不同色调）
-                if self.use_color:
-                    hashes['colorhash'] = str(imagehash.colorhash(img))
-
-                return hashes
+            # 与导入时同口径：按缩略图尺寸降分辨率解码（哈希只需 32px）
+            with open_image(image_path, self.DECODE_SIZE if settings.IMAGE_REDUCED_DECODE else None) as img:
+                return self.calculate_from_image(img)
 
         except FileNotFoundError:
             logger.error(f"图片文件不存在: {image_path}")
@@ -116,10 +105,42 @@ class MultiHashCalculator:
             logger.error(f"计算图片多哈希失败 {image_path}: {e}")
             return None
 
+    def calculate_from_image(self, img: Image.Image) -> Dict[str, str]:
+        """基于已解码的图片计算多种感知哈希
+
+        注意：与 calculate_image 保持同一口径，传入未做 EXIF 方向修正的原始图像。
+
+        Args:
+            img: PIL Image 对象
+
+        Returns:
+            包含多种哈希的字典（结构同 calculate_image）
+        """
+        # 转换为 RGB（某些格式如 RGBA 需要转换）
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        hashes = {
+            # phash: 基于 DCT 变换，对图像内容最敏感（推荐）
+            'phash': str(imagehash.phash(img, hash_size=self.hash_size)),
+
+            # dhash: 基于梯度，对边缘和结构敏感
+            'dhash': str(imagehash.dhash(img, hash_size=self.hash_size)),
+
+            # average_hash: 基于平均亮度（保留用于兼容）
+            'average_hash': str(imagehash.average_hash(img, hash_size=self.hash_size)),
+        }
+
+        # 颜色哈希（可选，用于区分不同色调）
+        if self.use_color:
+            hashes['colorhash'] = str(imagehash.colorhash(img))
+
+        return hashes
+
     def calculate_video(self, video_path: str) -> Optional[Dict[str, str]]:
         """计算视频的多种感知哈希
 
-        策略：提取视频的中间帧，计算该帧的多种哈希
+        策略：提取视频中间位置（之前最近的关键帧）的一帧，经管道在内存中计算多种哈希
 
         Args:
             video_path: 视频文件路径
@@ -127,49 +148,26 @@ class MultiHashCalculator:
         Returns:
             包含多种哈希的字典，失败返回 None
         """
-        import ffmpeg
-        import tempfile
-        import os
-
-        temp_frame_path = None
-
         try:
-            # 1. 获取视频时长
-            probe = ffmpeg.probe(video_path)
+            # 1. 获取视频时长（导入时元数据提取已探测过，通常命中缓存）
+            probe = probe_video(video_path)
             duration = float(probe['format'].get('duration', 0))
 
             if duration == 0:
                 logger.warning(f"无法获取视频时长: {video_path}")
                 return None
 
-            # 2. 提取中间帧
-            middle_time = duration / 2
-            temp_frame_path = tempfile.mktemp(suffix='.jpg')
-
-            (
-                ffmpeg
-                .input(video_path, ss=middle_time)
-                .output(temp_frame_path, vframes=1)
-                .overwrite_output()
-                .run(capture_stdout=True, capture_stderr=True, quiet=True)
-            )
+            # 2. 提取中间帧（与图片同口径按 DECODE_SIZE 缩小）
+            frame, = extract_frames(video_path, [duration / 2], self.DECODE_SIZE)
 
             # 3. 计算提取帧的多种哈希
-            hashes = self.calculate_image(temp_frame_path)
-            return hashes
+            with frame:
+                return self.calculate_from_image(frame)
 
         except Exception as e:
             logger.error(f"计算视频多哈希失败 {video_path}: {e}")
             return None
 
-        finally:
-            # 清理临时文件
-            if temp_frame_path and os.path.exists(temp_frame_path):
-                try:
-                    os.remove(temp_frame_path)
-                except Exception:
-                    pass
-
     def calculate(self, file_path: str, asset_type: str) -> Optional[Dict[str, str]]:
         """计算感知哈希（便捷方法）
 
@@ -0,0 +1,129 @@
+"""单次 ffmpeg 调用提取视频多帧
+
+视频封面（缩略图）与感知哈希各需要一帧（封面取开头附近，哈希取中间），过去分别运行 ffmpeg，
+哈希还要先写临时 JPEG 再用 Pillow 解码。extract_frames 把多个时间点合并到一次 ffmpeg 调用：
+
+- 每个时间点作为一路输入，输入端 seek（-ss 在 -i 之前）且不做精确 seek（-noaccurate_seek），
+  只解码关键帧（-skip_frame nokey）：每帧只解码 seek 位置之前最近的一个关键帧
+- 各路取首帧、按长边缩小后 concat，以 PPM（无压缩 RGB，带尺寸头）经管道输出，在内存中转为 PIL 图片
+- ffmpeg 默认按旋转元数据自动旋转，输出帧即显示方向
+
+extract_interval_frames 供故事板（拖动预览雪碧图）使用：一次解码（只解关键帧）按固定间隔取帧。
+"""
+import re
+from typing import List, Optional, Sequence
+
+import ffmpeg
+from PIL import Image
+
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+# PPM（P6）帧头：魔数、宽、高、最大值，之后是一个空白字符与 宽×高×3 字节像素
+_PPM_HEADER = re.compile(rb'P6\s+(\d+)\s+(\d+)\s+(\d+)\s')
+
+
+def extract_frames(
+    video_path: str,
+    timestamps: Sequence[float],
+    max_long_edge: Optional[int] = None
+) -> List[Image.Image]:
+    """一次 ffmpeg 调用提取多个时间点的帧
+
+    Args:
+        video_path: 视频文件路径
+        timestamps: 提取位置（秒），按顺序返回
+        max_long_edge: 帧长边上限（只缩小不放大）；None 为原尺寸
+
+    Returns:
+        RGB 图片列表（与 timestamps 一一对应）
+
+    Raises:
+        ffmpeg.Error: ffmpeg 执行失败
+        FileNotFoundError: ffmpeg 未安装
+        ValueError: 输出帧数与请求不一致（如 seek 位置超出视频范围）
+    """
+    streams = []
+    for seek_time in timestamps:
+        stream = (
+            ffmpeg
+            .input(video_path, ss=seek_time, noaccurate_seek=None, skip_frame='nokey')
+            .video
+            .filter('trim', end_frame=1)
+        )
+        if max_long_edge:
+            stream = stream.filter(
+                'scale',
+                f'min(iw,{max_long_edge})',
+                f'min(ih,{max_long_edge})',
+                force_original_aspect_ratio='decrease'
+            )
+        streams.append(stream.filter('setsar', 1))
+
+    joined = streams[0] if len(streams) == 1 else ffmpeg.concat(*streams, v=1, a=0)
+    stdout, _ = (
+        joined
+        .output('pipe:', format='image2pipe', vcodec='ppm', vsync='passthrough')
+        .run(capture_stdout=True, capture_stderr=True, quiet=True)
+    )
+
+    frames = _split_ppm(stdout)
+    if len(frames) != len(timestamps):
+        raise ValueError(f"提取到 {len(frames)} 帧，期望 {len(timestamps)} 帧: {video_path}")
+    return frames
+
+
+def extract_interval_frames(
+    video_path: str,
+    interval: float,
+    frame_width: int,
+    max_frames: int
+) -> List[Image.Image]:
+    """一次 ffmpeg 调用按固定间隔提取帧（只解码关键帧，每个间隔取该时刻之前最近的关键帧）
+
+    Args:
+        video_path: 视频文件路径
+        interval: 取帧间隔（秒）
+        frame_width: 帧宽度（高度按宽高比）
+        max_frames: 最多提取的帧数
+
+    Returns:
+        RGB 图片列表（按时间顺序，第 k 帧对应 k × interval 秒；视频末尾可能少于 max_frames）
+
+    Raises:
+        ffmpeg.Error: ffmpeg 执行失败
+        FileNotFoundError: ffmpeg 未安装
+        ValueError: 输出无法解析
+    """
+    stdout, _ = (
+        ffmpeg
+        .input(video_path, skip_frame='nokey')
+        .video
+        .filter('fps', fps=f'1/{interval}')
+        .filter('scale', frame_width, -2)
+        .filter('setsar', 1)
+        .output('pipe:', format='image2pipe', vcodec='ppm', vframes=max_frames)
+        .run(capture_stdout=True, capture_stderr=True, quiet=True)
+    )
+    return _split_ppm(stdout)
+
+
+def _split_ppm(data: bytes) -> List[Image.Image]:
+    """把连续的 PPM 帧拆分为 PIL 图片"""
+    frames = []
+    offset = 0
+    while offset < len(data):
+        match = _PPM_HEADER.match(data, offset)
+        if not match:
+            raise ValueError(f"无法解析 ffmpeg 输出的帧（偏移 {offset}）")
+        width, height, max_value = (int(value) for value in match.groups())
+        if max_value > 255:
+            raise ValueError(f"不支持 16 位 PPM 帧: maxval={max_value}")
+        start = match.end()
+        end = start + width * height * 3
+        if end > len(data):
+            raise ValueError("ffmpeg 输出的帧不完整")
+        frames.append(Image.frombytes('RGB', (width, height), data[start:end]))
+        offset = end
+    return frames
@@ -0,0 +1,155 @@
+"""ffprobe 结果缓存
+
+同一个视频在一次导入中会被探测三次：元数据提取、视频缩略图（时长/宽高）、视频感知哈希（时长，在 Worker 中执行），
+每次都要起一个 ffprobe 子进程。这里按 (路径, 大小, mtime) 缓存探测结果，三处共用：
+- 进程内 LRU：同一进程内重复探测直接命中
+- 磁盘缓存（每个文件一个 JSON，原子写入）：流水线进程池的子进程、同机 Taskiq Worker 之间共享
+
+文件被改写后大小或 mtime 随之变化，键不同，不会读到旧结果；磁盘缓存超过 TTL 视为未命中，写入时顺带清理。
+探测失败（ffmpeg.Error 等）不缓存，异常原样抛给调用方。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import ffmpeg
+
+from ..config import settings
+from .utils import get_logger
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, int, int]
+
+
+class ProbeCache:
+    """按 (路径, 大小, mtime) 缓存 ffmpeg.probe 结果
+
+    Args:
+        cache_dir: 磁盘缓存目录（None 表示只用进程内缓存）
+        ttl_seconds: 磁盘缓存有效期
+        max_entries: 进程内 LRU 容量
+    """
+
+    def __init__(self, cache_dir: Optional[str], ttl_seconds: float = 3600, max_entries: int = 256):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[CacheKey, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def probe(self, path: str) -> Dict:
+        """返回 ffmpeg.probe(path) 的结果（优先取缓存）
+
+        Raises:
+            ffmpeg.Error: ffprobe 执行失败
+            FileNotFoundError: 文件不存在
+        """
+        try:
+            key = self._key(path)
+        except OSError:
+            # 无法 stat（如路径不存在）时不缓存，由 ffprobe 报告错误
+            return ffmpeg.probe(path)
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        cached = self._load(key)
+        if cached is None:
+            cached = ffmpeg.probe(path)
+            self.misses += 1
+            self._store(key, cached)
+        else:
+            self.hits += 1
+
+        with self._lock:
+            self._memory[key] = cached
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        """清空进程内缓存（磁盘缓存按 TTL 过期）"""
+        with self._lock:
+            self._memory.clear()
+
+    @staticmethod
+    def _key(path: str) -> CacheKey:
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        return real_path, stat.st_size, stat.st_mtime_ns
+
+    def _file_for(self, key: CacheKey) -> str:
+        digest = hashlib.sha1(f"{key[0]}\0{key[1]}\0{key[2]}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, key: CacheKey) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        file_path = self._file_for(key)
+        try:
+            if time.time() - os.path.getmtime(file_path) > self.ttl_seconds:
+                return None
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"读取 ffprobe 缓存失败 {key[0]}: {e}")
+            return None
+
+    def _store(self, key: CacheKey, result: Dict) -> None:
+        if not self.cache_dir:
+            return
+        file_path = self._file_for(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.debug(f"写入 ffprobe 缓存失败 {key[0]}: {e}")
+            return
+        self._prune()
+
+    def _prune(self) -> None:
+        """删除过期的磁盘缓存（每个 TTL 周期最多清理一次）"""
+        now = time.time()
+        if now - self._last_prune < self.ttl_seconds:
+            return
+        self._last_prune = now
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    try:
+                        if now - entry.stat().st_mtime > self.ttl_seconds:
+                            os.remove(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"清理 ffprobe 缓存失败: {e}")
+
+
+probe_cache = ProbeCache(
+    cache_dir=settings.FFPROBE_CACHE_DIR or os.path.join(tempfile.gettempdir(), 'lumiharbor-ffprobe'),
+    ttl_seconds=settings.FFPROBE_CACHE_TTL_SECONDS,
+)
+
+
+def probe_video(path: str) -> Dict:
+    """ffmpeg.probe 的缓存版本（元数据提取、视频缩略图、视频感知哈希共用）"""
+    return probe_cache.probe(path)
@@ -8,11 +8,13 @@ FastAPI 应用启动脚本
 功能:
     - 启动 FastAPI 应用（端口 8000）
     - 自动启动 Taskiq Worker（开发环境）
+    - 按需启动目录监控进程（持续增量导入）
     - 通过环境变量控制行为
 
 环境变量:
     AUTO_START_WORKER=true|false   是否自动启动 Worker（默认: true）
     WORKER_COUNT=N                  Worker 数量（默认: 2）
+    WATCH_ENABLED=true|false       是否启动目录监控（默认: false）
     LOG_LEVEL=debug|info|warning    日志级别（默认: info）
 """
 import sys
@@ -26,6 +28,7 @@ from app.config import settings
 
 # 全局变量存储 Worker 进程
 worker_process = None
+watcher_process = None
 
 
 def check_redis_connection():
@@ -133,9 +136,53 @@ def stop_worker():
             print(f"❌ 停止 Worker 失败: {e}")
 
 
+def start_watcher():
+    """启动目录监控子进程（持续增量导入）"""
+    global watcher_process
+
+    if not settings.WATCH_ENABLED:
+        return None
+
+    cmd = [sys.executable, "-m", "app.services.ingestion.watch"]
+    print("\n" + "=" * 50)
+    print("👀 启动目录监控")
+    print("=" * 50)
+    print(f"监控目录: {settings.WATCH_PATHS or settings.NAS_DATA_PATH}")
+    print(f"命令: {' '.join(cmd)}")
+    print("=" * 50 + "\n")
+
+    try:
+        watcher_process = subprocess.Popen(
+            cmd,
+            stdout=sys.stdout,
+            stderr=sys.stderr,
+        )
+        return watcher_process
+    except Exception as e:
+        print(f"❌ 目录监控启动异常: {e}\n")
+        return None
+
+
+def stop_watcher():
+    """停止目录监控进程（正在导入的批次完成后退出）"""
+    global watcher_process
+
+    if watcher_process and watcher_process.poll() is None:
+        print("\n🛑 正在停止目录监控...")
+        watcher_process.terminate()
+        try:
+            watcher_process.wait(timeout=30)
+            print("✅ 目录监控已停止")
+        except subprocess.TimeoutExpired:
+            print("⚠️  目录监控未响应，强制终止...")
+            watcher_process.kill()
+            watcher_process.wait()
+
+
 def signal_handler(sig, frame):
     """处理终止信号（Ctrl+C）"""
     print("\n收到终止信号，正在清理...")
+    stop_watcher()
     stop_worker()
     sys.exit(0)
 
@@ -148,6 +195,9 @@ if __name__ == "__main__":
     # 启动 Worker（如果启用）
     start_worker()
 
+    # 启动目录监控（如果启用）
+    start_watcher()
+
     # 启动 FastAPI 应用
     print("=" * 50)
     print("🌐 启动 FastAPI 应用")
@@ -165,5 +215,6 @@ if __name__ == "__main__":
             log_level=settings.LOG_LEVEL.lower()  # uvicorn 要求小写的日志级别
         )
     finally:
-        # 确保 Worker 被停止
+        # 确保 Worker 与目录监控被停止
+        stop_watcher()
         stop_worker()
@@ -0,0 +1,236 @@
+"""单素材分析上下文基准测试
+
+对比导入一张图片时旧流程与 AssetAnalysis 的读取字节数、解码次数与元数据提取次数。
+
+旧流程（逐环节各自读文件）：
+    calculate_file_hash → extract_metadata ×2 → 缩略图 → 预览图 → phash 任务
+新流程：
+    AssetAnalysis：读一次、提取一次、解码一次
+
+用法（在 backend 目录下）：
+    python -m scripts.benchmarks.asset_analysis --count 20 --width 4032 --height 3024
+    python -m scripts.benchmarks.asset_analysis --format heic
+"""
+import argparse
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy
+from PIL import Image, ImageFile
+from pillow_heif.as_plugin import _LibHeifImageFile as HeifImageFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services import MetadataExtractorFactory, ThumbnailGeneratorFactory  # noqa: E402  (触发工厂注册)
+from app.services.ingestion.analysis import AssetAnalysis  # noqa: E402
+from app.services.preview import PreviewGeneratorFactory  # noqa: E402
+from app.tools.file_hash import calculate_file_hash  # noqa: E402
+from app.tools.perceptual_hash import MultiHashCalculator  # noqa: E402
+
+
+class _Counters:
+    """读取与解码计数（仅统计样本目录下的文件）"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.bytes_read = 0
+        self.opens = 0
+        self.decodes = 0
+
+    def reset(self) -> None:
+        self.bytes_read = 0
+        self.opens = 0
+        self.decodes = 0
+
+
+class _CountingFile:
+    """文件对象代理：统计 read/readinto 返回的字节数"""
+
+    def __init__(self, raw, counters: _Counters):
+        self._raw = raw
+        self._counters = counters
+
+    def read(self, *args):
+        data = self._raw.read(*args)
+        self._counters.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        size = self._raw.readinto(buffer)
+        self._counters.bytes_read += size or 0
+        return size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._raw.close()
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def _decoded(img) -> bool:
+    """像素是否已解码（兼容 Pillow 新旧版本的内部字段）"""
+    return (img.__dict__.get('_im') or img.__dict__.get('im')) is not None
+
+
+@contextmanager
+def _instrument(counters: _Counters):
+    """临时替换 open 与各解码器的 load，统计读取字节数与解码次数"""
+    original_open = builtins.open
+    image_classes = [ImageFile.ImageFile, HeifImageFile]
+    original_loads = {cls: cls.__dict__['load'] for cls in image_classes if 'load' in cls.__dict__}
+
+    def counting_open(file, mode='r', *args, **kwargs):
+        handle = original_open(file, mode, *args, **kwargs)
+        if isinstance(file, str) and file.startswith(counters.root) and 'r' in mode and 'b' in mode:
+            counters.opens += 1
+            return _CountingFile(handle, counters)
+        return handle
+
+    def make_counting_load(original_load):
+        def counting_load(self):
+            before = _decoded(self)
+            result = original_load(self)
+            if not before and _decoded(self):
+                counters.decodes += 1
+            return result
+        return counting_load
+
+    builtins.open = counting_open
+    for cls, original_load in original_loads.items():
+        cls.load = make_counting_load(original_load)
+    try:
+        yield
+    finally:
+        builtins.open = original_open
+        for cls, original_load in original_loads.items():
+            cls.load = original_load
+
+
+def _make_samples(root: str, count: int, width: int, height: int, fmt: str) -> List[str]:
+    """生成带 EXIF 的样本图片（随机噪声 + 渐变，避免被过度压缩）"""
+    rng = numpy.random.RandomState(42)
+    ext = {'jpeg': '.jpg', 'heic': '.heic'}[fmt]
+    paths = []
+    for i in range(count):
+        gradient = numpy.linspace(0, 255, width, dtype=numpy.float32)[None, :, None]
+        noise = rng.rand(height, width, 3) * 64
+        pixels = numpy.clip(gradient + noise, 0, 255).astype('uint8')
+        img = Image.fromarray(pixels)
+
+        exif = img.getexif()
+        exif[0x0110] = 'Benchmark Camera'  # Model
+        exif[0x0132] = '2024:05:01 12:00:00'  # DateTime
+        exif[0x0112] = 6 if i % 2 else 1  # Orientation：一半需要旋转
+
+        path = os.path.join(root, f'sample_{i:04d}{ext}')
+        img.save(path, 'HEIF' if fmt == 'heic' else 'JPEG', quality=90, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def _legacy(path: str, out_dir: str, with_preview: bool) -> None:
+    """旧流程：各环节按路径分别读文件"""
+    calculate_file_hash(path, smart_mode=True)
+    MetadataExtractorFactory.extract('image', path)  # _create_asset_record
+    MetadataExtractorFactory.extract('image', path)  # process_asset
+    ThumbnailGeneratorFactory.generate('image', path, os.path.join(out_dir, 'legacy_thumb.webp'))
+    if with_preview:
+        PreviewGeneratorFactory.generate('image', path, os.path.join(out_dir, 'legacy_preview.webp'))
+    MultiHashCalculator().calculate_image(path)  # phash 异步任务
+
+
+def _analysis(path: str, out_dir: str, with_preview: bool) -> None:
+    """新流程：AssetAnalysis 共享一次读取与一次解码"""
+    with AssetAnalysis(path, 'image') as analysis:
+        analysis.file_hash()
+        analysis.metadata()
+        analysis.render_thumbnail(os.path.join(out_dir, 'analysis_thumb.webp'))
+        if with_preview:
+            analysis.render_preview(os.path.join(out_dir, 'analysis_preview.webp'))
+        analysis.perceptual_hashes()
+
+
+def _measure(name: str, func, paths: List[str], out_dir: str, with_preview: bool, counters: _Counters) -> Dict:
+    counters.reset()
+    metadata_calls = {'count': 0}
+    extractor = MetadataExtractorFactory.create('image')
+    original_stream = extractor._extract_from_stream
+
+    def counting_stream(stream, file_path):
+        metadata_calls['count'] += 1
+        return original_stream(stream, file_path)
+
+    extractor._extract_from_stream = counting_stream
+    started = time.perf_counter()
+    try:
+        with _instrument(counters):
+            for path in paths:
+                func(path, out_dir, with_preview)
+    finally:
+        del extractor._extract_from_stream
+    elapsed = time.perf_counter() - started
+
+    total_size = sum(os.path.getsize(p) for p in paths)
+    count = len(paths)
+    return {
+        'name': name,
+        'bytes_per_asset': counters.bytes_read / count,
+        'read_amplification': counters.bytes_read / total_size,
+        'opens_per_asset': counters.opens / count,
+        'decodes_per_asset': counters.decodes / count,
+        'metadata_per_asset': metadata_calls['count'] / count,
+        'ms_per_asset': elapsed * 1000 / count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='AssetAnalysis 单次读取/单次解码基准测试')
+    parser.add_argument('--count', type=int, default=10, help='样本图片数量')
+    parser.add_argument('--width', type=int, default=4032, help='样本宽度')
+    parser.add_argument('--height', type=int, default=3024, help='样本高度')
+    parser.add_argument('--format', choices=['jpeg', 'heic'], default='jpeg', help='样本格式（heic 会同时生成预览图）')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='lumi_bench_')
+    try:
+        sample_dir = os.path.join(root, 'samples')
+        out_dir = os.path.join(root, 'out')
+        os.makedirs(sample_dir)
+        os.makedirs(out_dir)
+
+        paths = _make_samples(sample_dir, args.count, args.width, args.height, args.format)
+        with_preview = args.format == 'heic'
+        counters = _Counters(sample_dir)
+
+        results = [
+            _measure('legacy', _legacy, paths, out_dir, with_preview, counters),
+            _measure('analysis', _analysis, paths, out_dir, with_preview, counters),
+        ]
+
+        avg_size = sum(os.path.getsize(p) for p in paths) / len(paths)
+        print(f"样本: {args.count} × {args.width}x{args.height} {args.format}, 平均大小 {avg_size / 1024:.0f} KB")
+        print(f"{'流程':<10}{'读取KB/素材':>14}{'读放大':>10}{'open/素材':>12}{'解码/素材':>12}{'元数据/素材':>14}{'ms/素材':>10}")
+        for r in results:
+            print(
+                f"{r['name']:<10}{r['bytes_per_asset'] / 1024:>14.0f}{r['read_amplification']:>10.2f}"
+                f"{r['opens_per_asset']:>12.1f}{r['decodes_per_asset']:>12.1f}"
+                f"{r['metadata_per_asset']:>14.1f}{r['ms_per_asset']:>10.1f}"
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
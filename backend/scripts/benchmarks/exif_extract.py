@@ -0,0 +1,190 @@
+"""图片 EXIF 提取基准测试
+
+按文件类型对比两种图片元数据提取器的单文件耗时与读取字节数：
+    exifread  ImageMetadataExtractor：exifread 全量解析并逐个字符串化
+    fast      FastImageMetadataExtractor：只读头部元数据片段，只解析内置映射用到的键（--full 时解析全部键，
+              即开启原始元数据留存时的导入口径）
+
+同时校验一致性：fast 输出的每个键与 exifread 结果中的同名键比较，不一致计入「差异」。
+exifread 读不出 EXIF 的格式（如部分 WebP/HEIC）不计差异，只统计 fast 多读出的键数。
+
+默认生成各格式的带 EXIF 样本；--corpus 指向真实照片目录时按扩展名分组测试（推荐，覆盖厂商差异）。
+
+用法（在 backend 目录下）：
+    python -m scripts.benchmarks.exif_extract --count 20 --width 4032 --height 3024
+    python -m scripts.benchmarks.exif_extract --corpus /Volumes/Photos/2023 --limit 200
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from fractions import Fraction
+from typing import Dict, List
+
+import numpy
+from PIL import ExifTags, Image
+from PIL.TiffImagePlugin import IFDRational
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.metadata import FastImageMetadataExtractor, ImageMetadataExtractor  # noqa: E402
+from app.services.tags import MetadataTagMapper  # noqa: E402
+
+FORMATS = {
+    'jpeg': ('.jpg', 'JPEG'),
+    'png': ('.png', 'PNG'),
+    'tiff': ('.tif', 'TIFF'),
+    'webp': ('.webp', 'WEBP'),
+    'heic': ('.heic', 'HEIF'),
+}
+
+
+class _CountingFile:
+    """文件对象代理：统计 read 返回的字节数"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_read = 0
+
+    def read(self, *args):
+        data = self._raw.read(*args)
+        self.bytes_read += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def _make_samples(root: str, fmt: str, count: int, width: int, height: int) -> List[str]:
+    """生成带常见 EXIF/GPS 标签的样本（随机噪声，避免被过度压缩）"""
+    if fmt == 'heic':
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+
+    ext, pil_format = FORMATS[fmt]
+    rng = numpy.random.RandomState(42)
+    paths = []
+    for i in range(count):
+        img = Image.fromarray((rng.rand(height, width, 3) * 255).astype('uint8'))
+        exif = img.getexif()
+        exif[0x010F] = 'Benchmark'  # Make
+        exif[0x0110] = 'Camera X'  # Model
+        exif[0x0132] = '2024:05:01 12:00:00'  # DateTime
+        sub = exif.get_ifd(ExifTags.IFD.Exif)
+        sub[0x829A] = IFDRational(1, 125)  # ExposureTime
+        sub[0x829D] = IFDRational(28, 10)  # FNumber
+        sub[0x8827] = 200 + i  # ISOSpeedRatings
+        sub[0x920A] = IFDRational(35, 1)  # FocalLength
+        sub[0x9003] = '2024:05:01 11:59:58'  # DateTimeOriginal
+        sub[0x9209] = 16  # Flash
+        sub[0xA002] = width  # ExifImageWidth
+        sub[0xA003] = height  # ExifImageLength
+        gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+        gps[1], gps[3] = 'N', 'E'
+        gps[2] = (IFDRational(31), IFDRational(14), IFDRational(Fraction(1234, 100)))
+        gps[4] = (IFDRational(121), IFDRational(28), IFDRational(Fraction(550, 100)))
+
+        path = os.path.join(root, f'sample_{i:04d}{ext}')
+        img.save(path, pil_format, exif=exif.tobytes())
+        paths.append(path)
+    return paths
+
+
+def _collect_corpus(corpus: str, limit: int) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for dirpath, _, filenames in os.walk(corpus):
+        for name in sorted(filenames):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in ('.jpg', '.jpeg', '.png', '.heic', '.heif', '.tif', '.tiff', '.dng', '.webp', '.raw'):
+                group = groups.setdefault(ext, [])
+                if len(group) < limit:
+                    group.append(os.path.join(dirpath, name))
+    return groups
+
+
+def _run(extractor, path: str):
+    with open(path, 'rb') as raw:
+        stream = _CountingFile(raw)
+        started = time.perf_counter()
+        try:
+            metadata, shot_at = extractor._extract_from_stream(stream, path)
+        except Exception:  # 与 extract() 一致：解析失败按无元数据处理
+            metadata, shot_at = {}, None
+        elapsed = time.perf_counter() - started
+    return metadata, shot_at, elapsed, stream.bytes_read
+
+
+def _measure(paths: List[str], repeat: int, full: bool) -> Dict:
+    slow, fast = ImageMetadataExtractor(), FastImageMetadataExtractor()
+    if not full:
+        fast.set_required_keys(MetadataTagMapper.FALLBACK_MAP.keys())
+    result = {'slow_ms': [], 'fast_ms': [], 'slow_kb': [], 'fast_kb': [], 'mismatch': 0, 'extra': 0}
+    for path in paths:
+        slow_times, fast_times = [], []
+        for _ in range(repeat):
+            slow_meta, slow_shot, elapsed, slow_bytes = _run(slow, path)
+            slow_times.append(elapsed)
+            fast_meta, fast_shot, elapsed, fast_bytes = _run(fast, path)
+            fast_times.append(elapsed)
+        result['slow_ms'].append(statistics.median(slow_times) * 1000)
+        result['fast_ms'].append(statistics.median(fast_times) * 1000)
+        result['slow_kb'].append(slow_bytes / 1024)
+        result['fast_kb'].append(fast_bytes / 1024)
+        if slow_meta:
+            result['mismatch'] += sum(1 for key, value in fast_meta.items() if slow_meta.get(key) != value)
+            result['mismatch'] += int(fast_shot != slow_shot)
+        else:
+            result['extra'] += len(fast_meta)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='图片 EXIF 提取（exifread vs 头部快速解析）基准测试')
+    parser.add_argument('--corpus', help='真实照片目录（按扩展名分组）；不指定则生成样本')
+    parser.add_argument('--limit', type=int, default=100, help='--corpus 时每种扩展名最多测试的文件数')
+    parser.add_argument('--formats', default='jpeg,png,tiff,webp,heic', help='生成样本的格式，逗号分隔')
+    parser.add_argument('--count', type=int, default=10, help='每种格式的样本数量')
+    parser.add_argument('--width', type=int, default=4032, help='样本宽度')
+    parser.add_argument('--height', type=int, default=3024, help='样本高度')
+    parser.add_argument('--repeat', type=int, default=5, help='每个文件重复次数（取中位数）')
+    parser.add_argument('--full', action='store_true', help='fast 解析全部键（原始元数据留存口径）')
+    args = parser.parse_args()
+
+    root = None
+    try:
+        if args.corpus:
+            groups = _collect_corpus(args.corpus, args.limit)
+        else:
+            root = tempfile.mkdtemp(prefix='lumi_bench_')
+            groups = {}
+            for fmt in args.formats.split(','):
+                groups[FORMATS[fmt][0]] = _make_samples(root, fmt, args.count, args.width, args.height)
+
+        print(
+            f"{'类型':<8}{'文件数':>8}{'平均KB':>10}"
+            f"{'exifread ms':>14}{'fast ms':>10}{'加速':>8}"
+            f"{'exifread 读KB':>16}{'fast 读KB':>12}{'差异':>6}{'fast 多出':>10}"
+        )
+        for ext, paths in sorted(groups.items()):
+            if not paths:
+                continue
+            r = _measure(paths, args.repeat, args.full)
+            slow_ms = statistics.median(r['slow_ms'])
+            fast_ms = statistics.median(r['fast_ms'])
+            avg_kb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+            print(
+                f"{ext:<8}{len(paths):>8}{avg_kb:>10.0f}"
+                f"{slow_ms:>14.2f}{fast_ms:>10.2f}{slow_ms / max(fast_ms, 1e-6):>7.1f}x"
+                f"{statistics.mean(r['slow_kb']):>16.1f}{statistics.mean(r['fast_kb']):>12.1f}"
+                f"{r['mismatch']:>6}{r['extra']:>10}"
+            )
+    finally:
+        if root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""图片缩略图降分辨率解码基准测试
+
+按格式与尺寸对比 ImageThumbnailGenerator 两种解码方式的单图耗时与进程峰值内存：
+    full     完整解码后缩放/裁剪（reduced_decode=False，旧行为）
+    reduced  按缩略图尺寸降分辨率解码（内嵌缩略图 / JPEG DCT 缩放 / 整数倍 reduce）
+
+每种组合在独立子进程中运行，峰值内存取子进程的 ru_maxrss（含解释器与依赖的基线）。
+同时输出两种方式缩略图的平均像素差（关闭智能裁剪时比较，0~255），用于确认画质一致。
+
+默认生成 JPEG/HEIC/PNG 三种格式、12MP 与 48MP 两档样本；--corpus 指向真实照片目录时按扩展名分组测试。
+
+用法（在 backend 目录下）：
+    python -m scripts.benchmarks.thumbnail_decode --count 2
+    python -m scripts.benchmarks.thumbnail_decode --sizes 4032x3024,8064x6048 --formats jpeg,heic
+    python -m scripts.benchmarks.thumbnail_decode --corpus /Volumes/Photos/2023 --limit 20
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import numpy
+from PIL import Image, ImageChops, ImageStat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+FORMATS = {
+    'jpeg': ('.jpg', 'JPEG'),
+    'heic': ('.heic', 'HEIF'),
+    'png': ('.png', 'PNG'),
+}
+CORPUS_EXTENSIONS = ('.jpg', '.jpeg', '.heic', '.heif', '.png', '.webp', '.tif', '.tiff')
+
+
+def _make_samples(root: str, fmt: str, size: Tuple[int, int], count: int) -> List[str]:
+    """生成带 EXIF 方向的样本（渐变 + 纹理；HEIC 编码较慢，48MP 单张约需数十秒）"""
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+
+    width, height = size
+    ext, pil_format = FORMATS[fmt]
+    x = numpy.arange(width, dtype=numpy.float32)[None, :]
+    y = numpy.arange(height, dtype=numpy.float32)[:, None]
+    paths = []
+    for i in range(count):
+        pixels = numpy.stack([
+            x * 255 / width + 0 * y,
+            y * 255 / height + 0 * x,
+            128 + 127 * numpy.sin(x / (37 + i)) * numpy.cos(y / 53),
+        ], axis=-1).astype('uint8')
+        img = Image.fromarray(pixels)
+        exif = img.getexif()
+        exif[0x0112] = 6 if i % 2 else 1  # Orientation：一半需要旋转
+
+        path = os.path.join(root, f'{fmt}_{width}x{height}_{i:03d}{ext}')
+        img.save(path, pil_format, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def _collect_corpus(corpus: str, limit: int) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for dirpath, _, filenames in os.walk(corpus):
+        for name in sorted(filenames):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in CORPUS_EXTENSIONS:
+                group = groups.setdefault(ext, [])
+                if len(group) < limit:
+                    group.append(os.path.join(dirpath, name))
+    return groups
+
+
+def _generate_thumbnails(paths: List[str], out_dir: str, reduced: bool, smart_crop: bool) -> Tuple[float, float]:
+    """逐个生成缩略图，返回单图耗时中位数（ms）与进程峰值内存（MB）"""
+    from app.services.thumbnail import ImageThumbnailGenerator
+
+    os.makedirs(out_dir, exist_ok=True)
+    generator = ImageThumbnailGenerator(use_smart_crop=smart_crop, reduced_decode=reduced)
+    times = []
+    for i, path in enumerate(paths):
+        started = time.perf_counter()
+        ok = generator.generate(path, os.path.join(out_dir, f'{i:04d}.webp'))
+        times.append(time.perf_counter() - started)
+        if not ok:
+            raise RuntimeError(f"缩略图生成失败: {path}")
+    # Linux 为 KB，macOS 为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    return statistics.median(times) * 1000, peak_mb
+
+
+def _call(queue, func, args) -> None:
+    try:
+        queue.put(('ok', func(*args)))
+    except Exception as e:
+        queue.put(('error', repr(e)))
+
+
+def _in_subprocess(func, *args):
+    """在全新子进程中执行（ru_maxrss 跨 exec 继承父进程峰值，所以生成样本也放在子进程里，保持父进程精简）"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_call, args=(queue, func, args))
+    process.start()
+    status, result = queue.get()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(result)
+    return result
+
+
+def _pixel_diff(dir_a: str, dir_b: str) -> float:
+    """两组缩略图的平均像素差（尺寸不同时按 a 的尺寸对齐）"""
+    diffs = []
+    for name in sorted(os.listdir(dir_a)):
+        with Image.open(os.path.join(dir_a, name)) as a, Image.open(os.path.join(dir_b, name)) as b:
+            a, b = a.convert('RGB'), b.convert('RGB')
+            if a.size != b.size:
+                b = b.resize(a.size, Image.Resampling.LANCZOS)
+            diffs.append(statistics.mean(ImageStat.Stat(ImageChops.difference(a, b)).mean))
+    return statistics.mean(diffs) if diffs else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='图片缩略图（完整解码 vs 降分辨率解码）基准测试')
+    parser.add_argument('--corpus', help='真实照片目录（按扩展名分组）；不指定则生成样本')
+    parser.add_argument('--limit', type=int, default=20, help='--corpus 时每种扩展名最多测试的文件数')
+    parser.add_argument('--formats', default='jpeg,heic,png', help='生成样本的格式，逗号分隔')
+    parser.add_argument('--sizes', default='4032x3024,8064x6048', help='生成样本的尺寸（12MP、48MP），逗号分隔')
+    parser.add_argument('--count', type=int, default=2, help='每种格式/尺寸的样本数量')
+    parser.add_argument('--no-smart-crop', action='store_true', help='计时时关闭智能裁剪（默认与导入一致开启）')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='lumi_bench_')
+    try:
+        if args.corpus:
+            groups = _collect_corpus(args.corpus, args.limit)
+        else:
+            groups = {}
+            sample_dir = os.path.join(root, 'samples')
+            os.makedirs(sample_dir)
+            for fmt in args.formats.split(','):
+                for size in args.sizes.split(','):
+                    width, height = (int(v) for v in size.split('x'))
+                    groups[f'{fmt} {width}x{height}'] = _in_subprocess(
+                        _make_samples, sample_dir, fmt, (width, height), args.count
+                    )
+
+        smart_crop = not args.no_smart_crop
+        print(
+            f"{'分组':<22}{'文件数':>6}{'平均KB':>10}"
+            f"{'full ms':>10}{'reduced ms':>12}{'加速':>8}"
+            f"{'full 峰值MB':>14}{'reduced 峰值MB':>16}{'像素差':>8}"
+        )
+        for index, (name, paths) in enumerate(sorted(groups.items())):
+            if not paths:
+                continue
+            out = os.path.join(root, f'out_{index}')
+            full_ms, full_mb = _in_subprocess(_generate_thumbnails, paths, os.path.join(out, 'full'), False, smart_crop)
+            reduced_ms, reduced_mb = _in_subprocess(
+                _generate_thumbnails, paths, os.path.join(out, 'reduced'), True, smart_crop
+            )
+            # 画质对比关闭智能裁剪，避免裁剪框差异掩盖解码差异
+            _in_subprocess(_generate_thumbnails, paths, os.path.join(out, 'full_plain'), False, False)
+            _in_subprocess(_generate_thumbnails, paths, os.path.join(out, 'reduced_plain'), True, False)
+            diff = _pixel_diff(os.path.join(out, 'full_plain'), os.path.join(out, 'reduced_plain'))
+
+            avg_kb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+            print(
+                f"{name:<22}{len(paths):>6}{avg_kb:>10.0f}"
+                f"{full_ms:>10.0f}{reduced_ms:>12.0f}{full_ms / max(reduced_ms, 1e-6):>7.1f}x"
+                f"{full_mb:>14.0f}{reduced_mb:>16.0f}{diff:>8.2f}"
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
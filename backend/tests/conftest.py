@@ -5,12 +5,43 @@
 import pytest
 import sys
 from pathlib import Path
+from sqlalchemy import BIGINT, create_engine, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
 
 # 添加项目根目录到 sys.path
 backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
 
+@compiles(BIGINT, 'sqlite')
+def _bigint_as_integer(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 才自增
+    return 'INTEGER'
+
+
+@pytest.fixture
+def db():
+    """内存 SQLite 数据库会话（按模型建好全部表）
+
+    session.selects 记录执行过的 SELECT 语句，用于验证批量查询次数
+    """
+    from app import model  # noqa: F401  注册全部模型
+    from app.db import Base
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    selects = []
+    event.listen(
+        engine, 'before_cursor_execute',
+        lambda conn, cursor, statement, *args: selects.append(statement) if statement.startswith('SELECT') else None,
+    )
+    session.selects = selects
+    yield session
+    session.close()
+
+
 @pytest.fixture
 def sample_video_path():
     """提供示例视频文件路径的 fixture
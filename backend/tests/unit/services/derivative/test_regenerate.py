@@ -0,0 +1,65 @@
+"""重新生成衍生图：生成器版本、源文件哈希与 stat 签名都与记录一致且文件存在时跳过；missing_only 只补缺失的文件"""
+import os
+
+from app import model
+from app.config import settings
+from app.services.derivative.regenerate import DerivativeRegenerationService
+from app.services.ingestion.manifest import ScanManifestStore
+from app.services.thumbnail import ThumbnailGeneratorFactory
+
+KINDS = ['thumbnail', 'preview']
+
+
+def _asset(tmp_path, version):
+    thumb = tmp_path / 'processed' / 'thumbnails' / 'a_thumbnail.webp'
+    thumb.parent.mkdir(parents=True)
+    thumb.write_bytes(b'x')
+    source = tmp_path / 'original' / 'a.jpg'
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b'jpeg')
+    signature = list(ScanManifestStore.stat_signature(str(source)))
+    return model.Asset(
+        id=1, asset_type='image', mime_type='image/jpeg', original_path='original/a.jpg', file_hash='h1',
+        thumbnail_path='processed/thumbnails/a_thumbnail.webp',
+        derivative_versions={'thumbnail': {'version': version, 'source_hash': 'h1', 'source_signature': signature}},
+    )
+
+
+def test_skips_up_to_date_and_rebuilds_on_version_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'NAS_DATA_PATH', str(tmp_path))
+    current = ThumbnailGeneratorFactory.version('image')
+
+    assert DerivativeRegenerationService.plan(_asset(tmp_path, current), KINDS, False, False) is None
+
+    stale = _asset(tmp_path / 'stale', current.replace(':q', ':q1'))
+    monkeypatch.setattr(settings, 'NAS_DATA_PATH', str(tmp_path / 'stale'))
+    plan = DerivativeRegenerationService.plan(stale, KINDS, False, False)
+    assert plan.thumbnail_path == stale.thumbnail_path
+    assert plan.preview_path is None  # JPEG 不需要预览图
+
+    # missing_only：文件仍在则跳过，即使版本已变化；force：已是最新也重建
+    assert DerivativeRegenerationService.plan(stale, KINDS, True, False) is None
+    up_to_date = _asset(tmp_path / 'stale' / 'force', current)
+    monkeypatch.setattr(settings, 'NAS_DATA_PATH', str(tmp_path / 'stale' / 'force'))
+    assert DerivativeRegenerationService.plan(up_to_date, KINDS, False, True).thumbnail_path is not None
+
+
+def test_missing_file_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'NAS_DATA_PATH', str(tmp_path))
+    asset = _asset(tmp_path, ThumbnailGeneratorFactory.version('image'))
+    (tmp_path / asset.thumbnail_path).unlink()
+
+    plan = DerivativeRegenerationService.plan(asset, KINDS, True, False)
+    assert plan.thumbnail_path == asset.thumbnail_path
+    assert set(plan.thumbnail_ladder) == set(ThumbnailGeneratorFactory.ladder_sizes('image'))
+
+
+def test_source_changed_on_disk_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'NAS_DATA_PATH', str(tmp_path))
+    asset = _asset(tmp_path, ThumbnailGeneratorFactory.version('image'))
+    assert DerivativeRegenerationService.plan(asset, KINDS, False, False) is None
+
+    source = tmp_path / asset.original_path
+    source.write_bytes(b'edited jpeg')
+    os.utime(source, ns=(0, source.stat().st_mtime_ns + 1_000_000))
+    assert DerivativeRegenerationService.plan(asset, KINDS, False, False).thumbnail_path == asset.thumbnail_path
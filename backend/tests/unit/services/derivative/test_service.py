@@ -0,0 +1,52 @@
+"""按需衍生图：只有按需生成模式导入的素材返回衍生图 URL；生成失败后冷却期内不再重试"""
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app import model
+from app.services.asset import AssetService
+from app.services.derivative import DerivativeService
+from app.services.derivative.service import _version_tag
+from app.services.thumbnail import ImageThumbnailGenerator
+
+
+def _asset(asset_id, derive_lazily, asset_type='video'):
+    return model.Asset(
+        id=asset_id, asset_type=asset_type, mime_type='video/mp4', original_path='original/a.mp4',
+        file_hash=f'h{asset_id}', derive_lazily=derive_lazily,
+    )
+
+
+def test_render_failure_is_cached(monkeypatch):
+    url_provider = MagicMock()
+    assert AssetService.thumbnail_url(_asset(1, derive_lazily=False), url_provider) is None
+
+    asset = _asset(2, derive_lazily=True)
+    assert AssetService.thumbnail_url(asset, url_provider) == DerivativeService.url(asset, 800)
+
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = asset
+    render = MagicMock(side_effect=RuntimeError("视频封面提取失败"))
+    monkeypatch.setattr(DerivativeService, '_render', render)
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            DerivativeService.get_or_create(db, 2, 800, 'webp')
+
+    assert render.call_count == 1
+    assert AssetService.thumbnail_url(asset, url_provider) is None
+
+
+def test_cache_key_and_url_follow_generator_version(monkeypatch):
+    """测试：生成器版本变化（如调整质量）后缓存键与 URL 都随之变化"""
+    asset = _asset(3, derive_lazily=True, asset_type='image')
+    key, url = DerivativeService.cache_key(asset, 800, 'webp'), DerivativeService.url(asset, 800)
+
+    monkeypatch.setattr(ImageThumbnailGenerator, 'version', lambda self: 'image-thumbnail.v999')
+    _version_tag.cache_clear()
+    try:
+        assert DerivativeService.cache_key(asset, 800, 'webp') != key
+        assert DerivativeService.url(asset, 800) != url
+    finally:
+        monkeypatch.undo()
+        _version_tag.cache_clear()
@@ -0,0 +1,54 @@
+"""扫描清单批量存取单元测试
+
+使用内存 SQLite 建表，统计 SELECT 语句数验证每批只查询一次
+"""
+from app import model
+from app.services.ingestion.manifest import ScanManifestStore
+
+
+def _data(size: int, mtime_ns: int = 1) -> dict:
+    return {'file_size': size, 'file_mtime_ns': mtime_ns, 'file_inode': size}
+
+
+def test_batch_lookup_and_upsert(db):
+    """测试：一批文件一条 IN 查询；新记录插入、签名变化的记录更新"""
+    paths = [f'/nas/{i}.jpg' for i in range(5)]
+    store = ScanManifestStore(db)
+    store.prefetch(paths)
+    assert all(store.lookup(path, _data(i)) is None for i, path in enumerate(paths))
+    for i, path in enumerate(paths):
+        store.remember(path, _data(i), f'h{i}')
+    assert store.flush() == 5
+    db.commit()
+    assert len(db.selects) == 1
+
+    db.selects.clear()
+    store = ScanManifestStore(db)
+    store.prefetch(paths)
+    hits = [store.lookup(path, _data(i, mtime_ns=2 if i == 0 else 1)) for i, path in enumerate(paths)]
+    assert hits == [None, 'h1', 'h2', 'h3', 'h4']
+    store.remember(paths[0], _data(0, mtime_ns=2), 'h0-new')
+    store.flush()
+    db.commit()
+    assert len(db.selects) == 1
+
+    rows = db.query(model.ScanManifest).order_by(model.ScanManifest.id).all()
+    assert [(row.file_hash, row.mtime_ns) for row in rows] == [('h0-new', 2), ('h1', 1), ('h2', 1), ('h3', 1), ('h4', 1)]
+
+
+def test_flush_without_lookup_updates_existing(db):
+    """测试：verify 模式不经过 lookup，flush 时一条查询补齐已有记录后更新"""
+    store = ScanManifestStore(db)
+    store.remember('/nas/a.jpg', _data(1), 'old')
+    store.flush()
+    db.commit()
+
+    store = ScanManifestStore(db)
+    store.remember('/nas/a.jpg', _data(1), 'new')
+    store.remember('/nas/b.jpg', _data(2), 'hb')
+    store.flush()
+    db.commit()
+
+    assert {row.source_path: row.file_hash for row in db.query(model.ScanManifest)} == {
+        '/nas/a.jpg': 'new', '/nas/b.jpg': 'hb'
+    }
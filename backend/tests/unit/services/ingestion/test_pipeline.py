@@ -0,0 +1,85 @@
+"""并行导入流水线：单个文件的阶段异常只记为该文件失败，其余文件照常完成；在途文件数不超过各阶段上限之和"""
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.services.ingestion import pipeline
+from app.services.ingestion.config import ImportConfig
+from app.services.ingestion.pipeline import ImportPipeline
+
+FILE_COUNT = 30
+BAD_INDEX = 7
+
+
+class _FakeService:
+    """只提供流水线用到的接口；缩略图/预览图/感知哈希关闭，元数据之后直接交给写入器"""
+
+    def __init__(self, config: ImportConfig):
+        self.config = config
+        self.manifest = None
+        self.failures = []
+        self.processor = MagicMock(scan_path=config.scan_path)
+        self.processor.is_task_enabled.return_value = False
+        self.processor.split_metadata.side_effect = lambda asset_type, metadata: (metadata, {})
+        self.validator = MagicMock()
+        self.validator.calculate_hash.side_effect = self._hash
+        self.validator.check_duplicates_bulk.side_effect = lambda pairs: [(False, '')] * len(pairs)
+        self.storage = MagicMock()
+        self.storage.plan_stage.side_effect = lambda source, file_hash, rel_path: SimpleNamespace(
+            stored_path=rel_path, local_path=source
+        )
+        self.writer = MagicMock()
+
+    @staticmethod
+    def _hash(path: str) -> str:
+        time.sleep(0.002)
+        if path.endswith(f"f{BAD_INDEX}.jpg"):
+            raise OSError("读取失败")
+        return f"hash-{path}"
+
+    def _lookup_manifest_hash(self, full_path, data):
+        return None
+
+    def _remember_manifest_hash(self, full_path, data, file_hash):
+        pass
+
+    def _release_claim(self, file_hash, stored_path):
+        pass
+
+    def _claim_hash(self, file_hash, stored_path):
+        return None
+
+    def _record_failure(self, index, rel_path, error):
+        self.failures.append((index, rel_path, str(error)))
+
+    def _build_asset_record(self, data, file_hash, metadata, shot_at):
+        return SimpleNamespace(original_path=data['original_path'], thumbnail_path=None, preview_path=None)
+
+
+def test_stage_failure_is_isolated_and_queues_stay_bounded(monkeypatch):
+    monkeypatch.setattr(pipeline, '_extract_metadata_job', lambda asset_type, path: ({}, None))
+    config = ImportConfig(
+        scan_path='/scan', created_by=1, pipeline=True, hash_workers=1, copy_workers=1,
+        metadata_workers=1, derive_workers=1, stage_queue_factor=1, dedupe_batch_size=1,
+    )
+    service = _FakeService(config)
+    runner = ImportPipeline(service)
+    max_items = sum(runner._limits.values())
+    observed = []
+
+    def source():
+        for index in range(FILE_COUNT):
+            observed.append(runner._items_in_pipeline())
+            yield {'original_path': f"f{index}.jpg", 'asset_type': 'image'}
+
+    thread = threading.Thread(target=runner.run, args=(source(),), daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive(), "流水线未结束"
+    persisted = sorted(call.args[0].source_rel_path for call in service.writer.add.call_args_list)
+    assert persisted == sorted(f"f{index}.jpg" for index in range(FILE_COUNT) if index != BAD_INDEX)
+    assert service.failures == [(BAD_INDEX + 1, f"f{BAD_INDEX}.jpg", "读取失败")]
+    # 拉取时从未超过上限，且确实被填满过（背压生效）
+    assert max(observed) == max_items - 1
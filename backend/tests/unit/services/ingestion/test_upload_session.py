@@ -0,0 +1,65 @@
+"""断点续传分块写入单元测试"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.ingestion.storage import LocalNasStorage
+from app.services.ingestion.upload_session import UploadFinalizeConflict, UploadOffsetConflict, UploadSessionService
+
+
+@pytest.fixture
+def service(tmp_path):
+    storage = SimpleNamespace(partial_path=lambda upload_id: str(tmp_path / upload_id))
+    (tmp_path / 'u1').write_bytes(b'')
+    return UploadSessionService(MagicMock(), storage)
+
+
+def _session():
+    return SimpleNamespace(upload_id='u1', status='uploading', total_size=8, received_size=0)
+
+
+def test_concurrent_chunk_is_rejected_while_locked(service):
+    """测试：同一会话已有请求在写入时，第二个请求返回冲突；释放后按新偏移量继续"""
+    session = _session()
+    writer = service.open_chunk_writer(session, 0)
+    with pytest.raises(UploadOffsetConflict):
+        service.open_chunk_writer(session, 0)
+
+    writer.write(b'abcd')
+    assert writer.close() == 4
+
+    with pytest.raises(UploadOffsetConflict) as exc:
+        service.open_chunk_writer(session, 0)  # 过期偏移量在持锁后被拒绝
+    assert exc.value.offset == 4
+
+    writer = service.open_chunk_writer(session, 4)
+    writer.write(b'efgh')
+    assert writer.close() == 8
+
+
+def test_finalize_is_claimed_once_and_retried_from_stored_file(db, tmp_path):
+    """测试：finalize 只能领取一次；导入失败回到 stored 后重试沿用已移动的文件；中断的 finalizing 过期后可重新领取"""
+    service = UploadSessionService(db, LocalNasStorage(str(tmp_path)))
+    session = service.create('a.jpg', 4, created_by=1)
+    writer = service.open_chunk_writer(session, 0)
+    writer.write(b'abcd')
+    writer.close()
+
+    streamed = service.finalize(session)
+    assert session.status == 'finalizing'
+    assert session.stored_path == streamed.staged.stored_path
+    with pytest.raises(UploadFinalizeConflict):
+        service.finalize(session)
+
+    service.release(session, '导入失败')
+    assert session.status == 'stored'
+    assert service.current_offset(session) == 4
+    retried = service.finalize(session)
+    assert retried.staged.local_path == streamed.staged.local_path
+    assert (tmp_path / streamed.staged.stored_path).read_bytes() == b'abcd'
+
+    session.updated_at = datetime.now() - timedelta(seconds=UploadSessionService.FINALIZE_STALE_SECONDS + 1)
+    db.commit()
+    assert service.finalize(session).staged.stored_path == streamed.staged.stored_path
@@ -0,0 +1,43 @@
+"""批量去重单元测试
+
+使用内存 SQLite 建表，验证按输入顺序返回结果、批内重复哈希与分块查询
+"""
+from app import model
+from app.services.ingestion.validator import AssetValidator
+
+
+def _add_asset(db, asset_id: int, file_hash: str, original_path: str, is_deleted: bool = False) -> None:
+    db.add(model.Asset(
+        id=asset_id, created_by=1, original_path=original_path,
+        asset_type='image', file_hash=file_hash, is_deleted=is_deleted,
+    ))
+
+
+def test_check_duplicates_bulk_keeps_input_order(db, monkeypatch):
+    """测试：库内同路径为 same、异路径为 duplicate、软删除与新哈希不算重复；批内重复哈希逐条判断"""
+    _add_asset(db, 1, 'h1', 'original/h1_a.jpg')
+    _add_asset(db, 2, 'h2', 'original/h2_b.jpg')
+    _add_asset(db, 3, 'h3', 'original/h3_c.jpg', is_deleted=True)
+    db.commit()
+    db.selects.clear()
+    monkeypatch.setattr(AssetValidator, 'DUPLICATE_QUERY_CHUNK', 2)
+
+    pairs = [
+        ('h4', 'original/h4_d.jpg'),
+        ('h1', 'original/h1_a.jpg'),
+        ('h2', 'backup/b.jpg'),
+        ('h3', 'original/h3_c.jpg'),
+        ('h1', 'backup/a.jpg'),        # 批内重复（库内已有）
+        ('h4', 'original/h4_d.jpg'),   # 批内重复（库内没有，由导入服务按先到先得认领）
+    ]
+    results = AssetValidator(db).check_duplicates_bulk(pairs)
+
+    assert results == [
+        (False, ''),
+        (True, 'same'),
+        (True, 'duplicate'),
+        (False, ''),
+        (True, 'duplicate'),
+        (False, ''),
+    ]
+    assert len(db.selects) == 2  # 4 个不同哈希，每块 2 个
@@ -0,0 +1,70 @@
+"""素材批量写入单元测试
+
+使用内存 SQLite 建表，验证批内单行违反约束时只有该行失败
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app import model
+from app.services.ingestion.processor import AssetProcessor
+from app.services.ingestion.writer import AssetBatchWriter, PendingAsset
+
+
+class _FakeService:
+    """只提供写入器用到的导入服务接口"""
+
+    def __init__(self, db):
+        self.config = SimpleNamespace(db=db)
+        self.processor = MagicMock()
+        self.processor.map_tags.side_effect = lambda asset, metadata, mappings: {'device_make': 'Canon'}
+        self.processor.plan_async_tasks.side_effect = lambda asset, path, tags, phash_ready: [
+            AssetProcessor._task_log_row(asset, 'phash', {'file_path': path, 'asset_type': asset.asset_type}, 0)
+        ]
+        self.succeeded = []
+        self.failed = []
+
+    def _release_hash_lock(self, file_hash):
+        pass
+
+    def _release_claim(self, file_hash, stored_path):
+        pass
+
+    def _record_success(self, index, source_rel_path, asset_id, stored_path):
+        self.succeeded.append(source_rel_path)
+
+    def _record_failure(self, index, source_rel_path, error, rollback=True):
+        self.failed.append(source_rel_path)
+
+
+def _pending(index: int, asset_type='image') -> PendingAsset:
+    asset = model.Asset(
+        created_by=1, original_path=f'a/{index}.jpg', asset_type=asset_type,
+        file_hash=f'h{index}', visibility='general',
+    )
+    return PendingAsset(
+        index=index, source_rel_path=f'{index}.jpg', asset=asset,
+        local_path=f'/nas/a/{index}.jpg', metadata={'Image Make': 'Canon'},
+    )
+
+
+def test_flush_isolates_row_violating_constraint(db):
+    """测试：批内一行违反 NOT NULL 约束，其余素材连同标签、任务日志照常提交"""
+    service = _FakeService(db)
+    writer = AssetBatchWriter(service, batch_size=10)
+
+    with patch('app.services.ingestion.writer.TagService.get_template_tag_keys', return_value={'device_make'}), \
+            patch('app.services.ingestion.writer.settings.RAW_METADATA_STORE_ENABLED', False):
+        for index in range(1, 5):
+            writer.add(_pending(index, asset_type=None if index == 2 else 'image'))
+        writer.flush()
+
+    assert service.failed == ['2.jpg']
+    assert service.succeeded == ['1.jpg', '3.jpg', '4.jpg']
+
+    assets = db.query(model.Asset).order_by(model.Asset.id).all()
+    assert [asset.original_path for asset in assets] == ['a/1.jpg', 'a/3.jpg', 'a/4.jpg']
+    asset_ids = {asset.id for asset in assets}
+    assert {tag.asset_id for tag in db.query(model.AssetTag)} == asset_ids
+    assert {log.asset_id for log in db.query(model.TaskLog)} == asset_ids
+    assert db.query(model.TaskLog).count() == 3
+    assert service.processor.dispatch_async_task.call_count == 3
@@ -0,0 +1,104 @@
+"""FastImageMetadataExtractor 单元测试
+
+用 Pillow 生成带 EXIF 的图片，校验快速解析结果与 exifread 一致
+"""
+import io
+from datetime import datetime
+from fractions import Fraction
+
+import pytest
+from PIL import ExifTags, Image
+from PIL.TiffImagePlugin import IFDRational
+
+from app.services.metadata import FastImageMetadataExtractor, ImageMetadataExtractor
+
+
+def _make_image(fmt: str) -> bytes:
+    img = Image.new('RGB', (64, 48), (120, 30, 200))
+    exif = img.getexif()
+    exif[0x010F] = 'Canon'  # Make
+    exif[0x0110] = 'EOS R5'  # Model
+    exif[0x0132] = '2023:05:01 10:00:00'  # DateTime
+    sub = exif.get_ifd(ExifTags.IFD.Exif)
+    sub[0x829A] = IFDRational(1, 100)  # ExposureTime
+    sub[0x829D] = IFDRational(28, 10)  # FNumber
+    sub[0x8827] = 400  # ISOSpeedRatings
+    sub[0x9003] = '2023:05:01 09:59:58'  # DateTimeOriginal
+    sub[0x9209] = 16  # Flash
+    sub[0xA002] = 64  # ExifImageWidth
+    sub[0xA003] = 48  # ExifImageLength
+    sub[0xA434] = 'RF24-70mm F2.8'  # LensModel
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps[1], gps[3] = 'N', 'E'
+    gps[2] = (IFDRational(31), IFDRational(14), IFDRational(Fraction(1234, 100)))
+    gps[4] = (IFDRational(121), IFDRational(28), IFDRational(Fraction(550, 100)))
+
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class TestFastImageMetadataExtractor:
+    """FastImageMetadataExtractor 测试类"""
+
+    def setup_method(self):
+        self.extractor = FastImageMetadataExtractor()
+
+    @pytest.mark.parametrize('fmt', ['JPEG', 'PNG', 'TIFF'])
+    def test_matches_exifread(self, fmt):
+        """测试：未设置需要的键时，输出的键、值、拍摄时间与 exifread 全量解析一致"""
+        content = _make_image(fmt)
+        metadata, shot_at = self.extractor.extract_from_bytes(content, f'sample.{fmt.lower()}')
+        expected, expected_shot_at = ImageMetadataExtractor().extract_from_bytes(content, 'sample')
+
+        assert metadata == expected
+        assert shot_at == expected_shot_at == datetime(2023, 5, 1, 9, 59, 58)
+        assert metadata['EXIF ExposureTime'] == '1/100'
+        assert metadata['GPS GPSLatitude'] == '[31, 14, 617/50]'
+        assert metadata['EXIF Flash'] == expected['EXIF Flash']
+
+    def test_only_required_keys(self):
+        """测试：只返回需要的键与拍摄时间标签"""
+        self.extractor.set_required_keys(['Image Make', 'GPS GPSLatitude'])
+        metadata, _ = self.extractor.extract_from_bytes(_make_image('JPEG'), 'sample.jpg')
+
+        assert set(metadata) == {'Image Make', 'GPS GPSLatitude', 'Image DateTime', 'EXIF DateTimeOriginal'}
+
+    def test_prune_matches_required_keys_extraction(self):
+        """测试：完整提取结果裁剪后与设置需要的键后的提取结果一致（开启原始元数据留存时使用）"""
+        content = _make_image('JPEG')
+        full, _ = self.extractor.extract_from_bytes(content, 'sample.jpg')
+        self.extractor.set_required_keys(['Image Make', 'GPS GPSLatitude'])
+        pruned, _ = self.extractor.extract_from_bytes(content, 'sample.jpg')
+
+        assert self.extractor.prune(full, ['Image Make', 'GPS GPSLatitude']) == pruned
+
+    def test_reads_only_header(self):
+        """测试：JPEG 只读到 APP1，不读图像数据"""
+        img = Image.effect_noise((2000, 1500), 64).convert('RGB')
+        exif = img.getexif()
+        exif[0x010F] = 'Canon'
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', exif=exif.tobytes())
+
+        class CountingStream(io.BytesIO):
+            bytes_read = 0
+
+            def read(self, *args):
+                data = super().read(*args)
+                CountingStream.bytes_read += len(data)
+                return data
+
+        stream = CountingStream(buffer.getvalue())
+        self.extractor.set_required_keys(['Image Make'])
+        metadata, _ = self.extractor._extract_from_stream(stream, 'large.jpg')
+
+        assert metadata == {'Image Make': 'Canon'}
+        assert CountingStream.bytes_read < 4096 < len(buffer.getvalue())
+
+    def test_unsupported_format_falls_back_to_exifread(self):
+        """测试：无法识别的格式回退到 exifread（无 EXIF 时返回空）"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'BMP')
+
+        assert self.extractor.extract_from_bytes(buffer.getvalue(), 'sample.bmp') == ({}, None)
@@ -0,0 +1,106 @@
+"""原始元数据存储与标签重新映射单元测试
+
+使用内存 SQLite 建表，映射规则与模板用内置回退 / 固定键集代替
+"""
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app import model
+from app.services.metadata import RawMetadataStore
+from app.services.tags import TagRemapService
+
+
+def _add_asset(db, asset_id: int, file_hash: str) -> None:
+    db.add(model.Asset(
+        id=asset_id, created_by=1, original_path=f'a/{asset_id}.jpg',
+        asset_type='image', file_hash=file_hash,
+    ))
+
+
+def test_encode_roundtrip_is_compact():
+    """测试：编码可还原，非 JSON 类型转为字符串，结果比原始 JSON 小"""
+    metadata = {'Image Make': 'Canon', 'EXIF Comment': '西湖' * 200, 'duration': 12.5, 'raw': b'x'}
+    payload = RawMetadataStore.encode(metadata)
+
+    assert RawMetadataStore.decode(payload) == {**metadata, 'raw': "b'x'"}
+    assert len(payload) < len(str(metadata).encode('utf-8'))
+
+
+def test_save_batch_overwrites_existing_hash(db):
+    """测试：同一哈希重复保存时覆盖为最新结果"""
+    RawMetadataStore.save_batch(db, [{'file_hash': 'h1', 'asset_type': 'image', 'metadata': {'Image Make': 'A'}}])
+    RawMetadataStore.save_batch(db, [
+        {'file_hash': 'h1', 'asset_type': 'image', 'metadata': {'Image Make': 'B'}},
+        {'file_hash': 'h2', 'asset_type': 'image', 'metadata': {}},  # 无元数据不保存
+    ])
+    db.commit()
+
+    assert RawMetadataStore.load_many(db, ['h1', 'h2']) == {'h1': {'Image Make': 'B'}}
+
+
+def _remap(db, job, **kwargs):
+    with patch('app.services.tags.remap.TagMappingService.list_active', return_value=[]), \
+         patch('app.services.tags.remap.TagService.get_template_tag_keys', return_value={'device_make', 'device_model'}):
+        return TagRemapService.execute(db, job, **kwargs)
+
+
+def test_remap_job_applies_tag_diff(db):
+    """测试：补齐缺失标签、更新值变化的系统标签，保留用户标签与软删除行，缺少原始元数据的素材单独计数"""
+    for asset_id in (1, 2, 3):
+        _add_asset(db, asset_id, f'h{asset_id}')
+    db.add(model.TagDefinition(tag_key='device_make', tag_name='品牌', source='system'))
+    db.add(model.TagDefinition(tag_key='device_model', tag_name='型号', source='user'))
+    db.add_all([
+        model.AssetTag(asset_id=1, tag_key='device_make', tag_value='旧品牌'),
+        model.AssetTag(asset_id=1, tag_key='device_model', tag_value='用户修改'),
+        model.AssetTag(asset_id=2, tag_key='device_make', tag_value='已删除', is_deleted=True),
+    ])
+    RawMetadataStore.save_batch(db, [
+        {'file_hash': 'h1', 'asset_type': 'image', 'metadata': {'Image Make': 'Canon', 'Image Model': 'R5'}},
+        {'file_hash': 'h2', 'asset_type': 'image', 'metadata': {'Image Make': 'Sony', 'Image Model': 'A7'}},
+    ])
+    job, _ = TagRemapService.create_job(db, 'image')
+
+    _remap(db, job, chunk_size=2)
+
+    tags = {(row.asset_id, row.tag_key): row.tag_value for row in db.query(model.AssetTag).all()}
+    assert tags == {
+        (1, 'device_make'): 'Canon',
+        (1, 'device_model'): '用户修改',
+        (2, 'device_make'): '已删除',
+        (2, 'device_model'): 'A7',
+    }
+    assert (job.status, job.last_asset_id, job.assets_total, job.assets_done) == ('done', 3, 3, 3)
+    assert (job.assets_missing_metadata, job.tags_inserted, job.tags_updated) == (1, 1, 1)
+
+
+def test_remap_job_resumes_after_checkpoint(db):
+    """测试：续跑时只处理检查点之后的素材，计数在上次的基础上累加"""
+    for asset_id in (1, 2):
+        _add_asset(db, asset_id, f'h{asset_id}')
+    RawMetadataStore.save_batch(db, [
+        {'file_hash': f'h{asset_id}', 'asset_type': 'image', 'metadata': {'Image Make': 'Canon'}}
+        for asset_id in (1, 2)
+    ])
+    job, _ = TagRemapService.create_job(db, None)
+    job.last_asset_id, job.assets_done = 1, 1
+    db.commit()
+
+    _remap(db, job)
+
+    assert [row.asset_id for row in db.query(model.AssetTag).all()] == [2]
+    assert (job.assets_total, job.assets_done, job.tags_inserted) == (2, 2, 1)
+    assert TagRemapService.create_job(db, None)[1] is True  # 已完成的作业不再复用
+
+
+def test_remap_not_queued_without_raw_store(db):
+    """测试：未开启原始元数据留存时规则变更不排队作业，手动触发返回 409"""
+    with patch('app.services.tags.remap.settings.RAW_METADATA_STORE_ENABLED', False):
+        TagRemapService.on_mappings_changed(db, ['image'])
+        with pytest.raises(HTTPException) as exc:
+            TagRemapService.schedule(db, 'image')
+
+    assert exc.value.status_code == 409
+    assert db.query(model.TagRemapJob).count() == 0
@@ -0,0 +1,34 @@
+"""DZI 切片金字塔：逐级减半到 1×1，切片带重叠且裁到图像边界；未达到阈值不生成"""
+import os
+
+from PIL import Image
+
+from app.services.preview import DeepZoomGenerator
+
+
+def test_pyramid_levels_and_tiles(tmp_path):
+    source = tmp_path / 'pano.png'
+    Image.new('RGB', (600, 300), 'red').save(source)
+    dest_base = str(tmp_path / 'out' / 'pano')
+
+    info = DeepZoomGenerator(min_pixels=100_000, tile_size=254, overlap=1).generate(str(source), dest_base)
+
+    # 600×300 → 第 10 级原尺寸（2^10 ≥ 600），第 0 级 1×1
+    assert info == {
+        'width': 600, 'height': 300, 'tile_size': 254, 'overlap': 1, 'format': 'webp', 'levels': 11, 'tiles': 17,
+    }
+    top = os.path.join(f"{dest_base}_files", '10')
+    assert sorted(os.listdir(top)) == [f"{col}_{row}.webp" for col in range(3) for row in range(2)]
+    assert Image.open(os.path.join(top, '0_0.webp')).size == (255, 255)
+    assert Image.open(os.path.join(top, '1_1.webp')).size == (256, 47)
+    assert Image.open(os.path.join(top, '2_0.webp')).size == (93, 255)
+    assert Image.open(os.path.join(f"{dest_base}_files", '0', '0_0.webp')).size == (1, 1)
+    assert 'Width="600" Height="300"' in open(f"{dest_base}.dzi", encoding='utf-8').read()
+
+
+def test_below_threshold_skipped(tmp_path):
+    source = tmp_path / 'small.png'
+    Image.new('RGB', (200, 100), 'red').save(source)
+
+    assert DeepZoomGenerator(min_pixels=100_000).generate(str(source), str(tmp_path / 'small')) is None
+    assert not os.path.exists(tmp_path / 'small_files')
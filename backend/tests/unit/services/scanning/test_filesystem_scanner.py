@@ -0,0 +1,96 @@
+"""FilesystemScanner 单元测试
+
+测试流式扫描的批次划分、遍历顺序与过滤规则
+"""
+import os
+import threading
+import time
+import pytest
+from app.services.scanning import FilesystemScanner, prefetch_batches
+
+
+def _touch(path, content=b'x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+class TestFilesystemScanner:
+    """FilesystemScanner 测试类"""
+
+    @pytest.fixture
+    def scan_root(self, tmp_path):
+        """构造测试目录：包含子目录、不支持的格式与符号链接目录"""
+        _touch(str(tmp_path / 'b.jpg'), b'12345')
+        _touch(str(tmp_path / 'a.MP4'))
+        _touch(str(tmp_path / 'notes.txt'))
+        _touch(str(tmp_path / 'sub' / 'c.png'))
+        _touch(str(tmp_path / 'sub' / 'deep' / 'd.heic'))
+        os.symlink(str(tmp_path / 'sub'), str(tmp_path / 'link'))
+        return str(tmp_path)
+
+    def test_iter_scan_batches_and_order(self, scan_root):
+        """测试：按批产出，顺序稳定，且不跟随符号链接目录"""
+        batches = list(FilesystemScanner.iter_scan(scan_root, created_by=1, batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 2]
+        paths = [asset['original_path'] for batch in batches for asset in batch]
+        assert paths == [
+            'a.MP4',
+            'b.jpg',
+            os.path.join('sub', 'c.png'),
+            os.path.join('sub', 'deep', 'd.heic'),
+        ]
+
+    def test_order_key_matches_scan_order(self, scan_root):
+        """测试：order_key 排序与扫描顺序一致（目录内文件先于子目录，续跑检查点依赖此顺序）"""
+        _touch(os.path.join(scan_root, 'z.jpg'))
+        _touch(os.path.join(scan_root, 'sub', 'a.jpg'))
+        paths = [asset['original_path'] for asset in FilesystemScanner.scan(scan_root, created_by=1)]
+
+        assert sorted(paths, key=FilesystemScanner.order_key) == paths
+        assert paths.index('z.jpg') < paths.index(os.path.join('sub', 'a.jpg'))
+
+    def test_asset_fields(self, scan_root):
+        """测试：素材字段与 scan() 保持一致"""
+        assets = FilesystemScanner.scan(scan_root, created_by=7, visibility='private')
+        image = next(asset for asset in assets if asset['original_path'] == 'b.jpg')
+
+        assert image['asset_type'] == 'image'
+        assert image['mime_type'] == 'image/jpg'
+        assert image['file_size'] == 5
+        assert image['created_by'] == 7
+        assert image['visibility'] == 'private'
+        assert image['is_deleted'] is False
+
+    def test_missing_root(self, tmp_path):
+        """测试：扫描路径不存在时抛出 FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            list(FilesystemScanner.iter_scan(str(tmp_path / 'missing'), created_by=1))
+
+    def test_prefetch_batches_propagates_error(self, tmp_path):
+        """测试：后台扫描线程的异常在消费端抛出"""
+        batches = prefetch_batches(FilesystemScanner.iter_scan(str(tmp_path / 'missing'), created_by=1))
+        with pytest.raises(FileNotFoundError):
+            list(batches)
+
+    def test_prefetch_batches_producer_exits_when_consumer_stops(self):
+        """测试：消费端提前退出且队列已满时，扫描线程放弃投递结束标记并退出"""
+        batches = prefetch_batches(iter([[{'n': 1}], [{'n': 2}]]), max_pending=1)
+        assert next(batches) == [{'n': 1}]
+        time.sleep(0.1)  # 第二批入队后队列已满，扫描线程等待投递结束标记
+        batches.close()
+
+        deadline = time.monotonic() + 3
+        while any(t.name == 'scanner-prefetch' for t in threading.enumerate()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not any(t.name == 'scanner-prefetch' for t in threading.enumerate())
+
+    def test_iter_paths_only_given_files(self, scan_root):
+        """测试：iter_paths 只产出指定的文件，按扫描顺序，忽略不存在与不支持的路径"""
+        rel_paths = [os.path.join('sub', 'c.png'), 'b.jpg', 'notes.txt', 'gone.jpg', 'sub']
+        batches = list(FilesystemScanner.iter_paths(scan_root, rel_paths, created_by=1))
+
+        paths = [asset['original_path'] for batch in batches for asset in batch]
+        assert paths == ['b.jpg', os.path.join('sub', 'c.png')]
+        assert batches[0][0]['file_size'] == 5
@@ -0,0 +1,68 @@
+"""ShardPlanner 单元测试
+
+测试目录分片的切分、装箱与扫描顺序
+"""
+import os
+import pytest
+from app.services.scanning import FilesystemScanner, ShardPlanner
+
+
+def _touch(path, content=b'x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+class TestShardPlanner:
+    """ShardPlanner 测试类"""
+
+    @pytest.fixture
+    def scan_root(self, tmp_path):
+        """根目录 2 个文件；big/ 下 3 个文件 + 两个子目录（各 2 个）；small/ 1 个文件"""
+        for rel_path in (
+            'a.jpg', 'b.jpg',
+            'big/1.jpg', 'big/2.jpg', 'big/3.jpg',
+            'big/x/1.jpg', 'big/x/2.jpg',
+            'big/y/1.jpg', 'big/y/2.mp4',
+            'small/1.png', 'small/notes.txt',
+        ):
+            _touch(str(tmp_path / rel_path), b'12345')
+        return str(tmp_path)
+
+    def test_small_tree_single_shard(self, scan_root):
+        """测试：文件数不超过上限时整棵树一个分片"""
+        shards = ShardPlanner.plan(scan_root, max_files_per_shard=100)
+
+        assert len(shards) == 1
+        assert shards[0].scopes == [('', True)]
+        assert shards[0].file_count == 10
+        assert shards[0].byte_count == 50
+
+    def test_split_and_pack(self, scan_root):
+        """测试：超过上限的目录拆成自身文件 + 子目录，相邻范围按上限装箱"""
+        shards = ShardPlanner.plan(scan_root, max_files_per_shard=4)
+
+        assert [shard.scopes for shard in shards] == [
+            [('', False)],
+            [('big', False)],
+            [(os.path.join('big', 'x'), True), (os.path.join('big', 'y'), True)],
+            [('small', True)],
+        ]
+        assert all(shard.file_count <= 4 for shard in shards)
+
+    def test_shards_cover_scan_in_order(self, scan_root):
+        """测试：按分片依次扫描与整目录扫描的文件及顺序完全一致（续跑检查点依赖此顺序）"""
+        full = [asset['original_path'] for asset in FilesystemScanner.scan(scan_root, created_by=1)]
+        sharded = [
+            asset['original_path']
+            for shard in ShardPlanner.plan(scan_root, max_files_per_shard=3)
+            for batch in FilesystemScanner.iter_scopes(scan_root, shard.scopes, created_by=1)
+            for asset in batch
+        ]
+
+        assert sharded == full
+
+    def test_empty_tree(self, tmp_path):
+        """测试：没有支持的文件时不产生分片"""
+        _touch(str(tmp_path / 'notes.txt'))
+        assert ShardPlanner.plan(str(tmp_path), max_files_per_shard=10) == []
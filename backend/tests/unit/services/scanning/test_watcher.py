@@ -0,0 +1,83 @@
+"""目录变更监控单元测试
+
+测试去抖合并、inotify / 轮询对新文件的检测与排除目录
+"""
+import os
+import sys
+import pytest
+from app.services.scanning import ChangeDebouncer, InotifyWatcher, PollingWatcher
+
+
+def _write(path, content=b'x'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def _poll_until(watcher, expected, attempts=20):
+    """多轮收集事件，直到包含期望的路径"""
+    seen = set()
+    for _ in range(attempts):
+        seen |= watcher.poll(0.1).paths
+        if expected <= seen:
+            break
+    return seen
+
+
+class TestChangeDebouncer:
+    """ChangeDebouncer 测试类"""
+
+    def test_ready_after_quiet_period(self):
+        """测试：静默期内的重复事件合并，静默足够久才就绪"""
+        debouncer = ChangeDebouncer(quiet_seconds=2.0)
+        debouncer.touch(['/a.jpg', '/b.jpg'], now=0.0)
+        debouncer.touch(['/a.jpg'], now=1.5)
+
+        assert debouncer.pop_ready(now=2.5) == ['/b.jpg']
+        assert debouncer.pop_ready(now=3.0) == []
+        assert debouncer.pop_ready(now=3.5) == ['/a.jpg']
+        assert len(debouncer) == 0
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify 仅支持 Linux")
+class TestInotifyWatcher:
+    """InotifyWatcher 测试类"""
+
+    def test_detects_new_files_and_directories(self, tmp_path):
+        """测试：新文件写入完成、新目录中的文件均被检测，排除目录与隐藏目录不监控"""
+        root = str(tmp_path)
+        excluded = os.path.join(root, 'original')
+        os.makedirs(excluded)
+        watcher = InotifyWatcher([root], excluded=[excluded])
+        try:
+            new_file = os.path.join(root, 'a.jpg')
+            nested = os.path.join(root, 'trip', 'day1', 'b.mp4')
+            _write(new_file)
+            _write(nested)
+            _write(os.path.join(excluded, 'c.jpg'))
+            _write(os.path.join(root, '.cache', 'd.jpg'))
+
+            seen = _poll_until(watcher, {new_file, nested})
+            assert seen == {new_file, nested}
+            assert watcher.root_of(nested) == root
+        finally:
+            watcher.close()
+
+
+class TestPollingWatcher:
+    """PollingWatcher 测试类"""
+
+    def test_first_poll_builds_baseline(self, tmp_path):
+        """测试：已有文件只作为基线，之后新增或修改的文件才报告"""
+        existing = str(tmp_path / 'old.jpg')
+        _write(existing)
+        watcher = PollingWatcher([str(tmp_path)], interval=0)
+
+        new_file = str(tmp_path / 'sub' / 'new.png')
+        _write(new_file)
+        _write(str(tmp_path / 'notes.txt'))
+        assert watcher.poll(0).paths == {new_file}
+
+        _write(existing, b'changed')
+        assert watcher.poll(0).paths == {existing}
+        assert watcher.poll(0).paths == set()
@@ -0,0 +1,77 @@
+"""图片缩略图：代理图智能裁剪与按原图分析的裁剪框一致"""
+import random
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services.thumbnail import ImageThumbnailGenerator
+
+
+def _sample(size, seed):
+    """灰底 + 随机色块 + 一个肤色圆（smartcrop 的主要关注点），位置随 seed 变化"""
+    rng = random.Random(seed)
+    width, height = size
+    img = Image.new('RGB', size, (90, 90, 90))
+    draw = ImageDraw.Draw(img)
+    for _ in range(30):
+        x, y, r = rng.randrange(width), rng.randrange(height), rng.randint(width // 60, width // 20)
+        draw.rectangle((x, y, x + r, y + r // 2), fill=tuple(rng.randrange(256) for _ in range(3)))
+    cx = rng.choice([width // 6, width // 2, 5 * width // 6])
+    cy = rng.choice([height // 5, height // 2, 4 * height // 5])
+    r = min(size) // 8
+    draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(200, 146, 112))
+    return img.filter(ImageFilter.GaussianBlur(2))
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlap = max(0, min(ax + aw, bx + bw) - max(ax, bx)) * max(0, min(ay + ah, by + bh) - max(ay, by))
+    return overlap / (aw * ah + bw * bh - overlap)
+
+
+@pytest.mark.parametrize('size', [(2000, 1500), (1200, 1600), (2400, 800)])
+def test_proxy_crop_box_matches_full_analysis(size):
+    proxy = ImageThumbnailGenerator(smart_crop_proxy_size=256)
+    full = ImageThumbnailGenerator(smart_crop_proxy_size=0)
+
+    for seed in range(4):
+        img = _sample(size, seed)
+        target = full._calculate_target_size(img.size)
+        box = proxy._smart_crop_box(img, target)
+        x, y, width, height = box
+
+        assert 0 <= x and 0 <= y and x + width <= img.width and y + height <= img.height
+        assert _iou(box, full._smart_crop_box(img, target)) >= 0.8
+
+
+def test_smart_crop_does_not_fall_back(tmp_path):
+    """smartcrop 0.5 的 score 为 float，不应触发降级到简单缩放"""
+    source = tmp_path / 'source.png'
+    _sample((1600, 1200), 0).save(source)
+    generator = ImageThumbnailGenerator(reduced_decode=False)
+
+    with patch('app.services.thumbnail.image.logger') as logger:
+        assert generator.generate(str(source), str(tmp_path / 'thumb.webp'))
+    logger.warning.assert_not_called()
+
+    with Image.open(tmp_path / 'thumb.webp') as thumb:
+        assert thumb.size == (800, 600)
+
+
+def test_ladder_from_single_decode(tmp_path):
+    """多档尺寸与主缩略图一起生成，超过原图长边的档位跳过"""
+    generator = ImageThumbnailGenerator(ladder_sizes=[4096, 2048, 1024, 512, 256, 800])
+    img = _sample((1500, 3000), 1)
+    ladder_paths = {size: str(tmp_path / f'thumb_{size}.webp') for size in generator.ladder_sizes()}
+
+    rendered = generator.generate_ladder_from_image(img, str(tmp_path / 'thumb.webp'), ladder_paths)
+
+    assert generator.ladder_sizes() == (256, 512, 1024, 2048, 4096)
+    assert generator.decode_size() == 4096
+    assert sorted(rendered.values()) == [128, 256, 400, 512, 1024]
+    assert str(tmp_path / 'thumb_4096.webp') not in rendered
+    for path, width in rendered.items():
+        with Image.open(path) as thumb:
+            assert thumb.width == width and thumb.height == width * 2
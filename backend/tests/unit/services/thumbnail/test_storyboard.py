@@ -0,0 +1,25 @@
+"""视频故事板：雪碧图按行优先排列，WebVTT 每段引用对应格子，最后一段覆盖到视频结尾"""
+from PIL import Image
+
+from app.services.thumbnail import VideoStoryboardGenerator
+
+
+def test_sprite_and_vtt_layout(tmp_path):
+    generator = VideoStoryboardGenerator(columns=3)
+    frames = [Image.new('RGB', (160, 90), (index * 40, 0, 0)) for index in range(5)]
+    sprite_path = tmp_path / 'a_storyboard.webp'
+    vtt_path = tmp_path / 'a_storyboard.vtt'
+
+    info = generator._save_sprite(frames, str(sprite_path))
+    info['interval'] = 2.5
+    generator._save_vtt(info, 13.2, sprite_path.name, str(vtt_path))
+
+    assert info == {
+        'count': 5, 'columns': 3, 'rows': 2, 'frame_width': 160, 'frame_height': 90, 'interval': 2.5,
+    }
+    assert Image.open(sprite_path).size == (480, 180)
+
+    lines = vtt_path.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == 'WEBVTT'
+    assert lines[2:4] == ['00:00:00.000 --> 00:00:02.500', 'a_storyboard.webp#xywh=0,0,160,90']
+    assert lines[-2:] == ['00:00:10.000 --> 00:00:13.200', 'a_storyboard.webp#xywh=160,90,160,90']
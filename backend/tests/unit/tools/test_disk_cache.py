@@ -0,0 +1,80 @@
+"""磁盘 LRU 缓存：按字节预算淘汰最久未访问的文件；SingleFlight 合并同一键的并发调用"""
+import os
+import threading
+import time
+
+import pytest
+
+from app.tools.disk_cache import DiskLRUCache, SingleFlight
+
+
+def _writer(size):
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+    return write
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=250)
+    for key in ('aa1', 'bb2', 'cc3'):
+        cache.put(key, _writer(100))
+
+    # 写入 cc3 时淘汰最早的 aa1；bb2 被读过后，写入 dd4 时淘汰最久未访问的 cc3
+    assert cache.get('aa1') is None
+    assert cache.get('bb2') is not None
+    cache.put('dd4', _writer(100))
+
+    assert cache.get('cc3') is None
+    assert cache.get('bb2') is not None
+    assert cache.total_bytes == 200
+    assert cache.evictions == 2
+    assert not os.path.exists(cache.path_for('cc3'))
+
+
+def test_index_rebuilt_from_disk(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+    cache.put('aa1', _writer(100))
+    os.makedirs(tmp_path / 'zz', exist_ok=True)
+    (tmp_path / 'zz' / 'leftover.tmp').write_bytes(b'x')
+
+    reopened = DiskLRUCache(str(tmp_path), max_bytes=1000)
+    assert reopened.get('aa1') == cache.path_for('aa1')
+    assert reopened.total_bytes == 100
+    assert not (tmp_path / 'zz' / 'leftover.tmp').exists()
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+    def broken(path):
+        raise RuntimeError('decode failed')
+
+    with pytest.raises(RuntimeError):
+        cache.put('aa1', broken)
+    assert cache.get('aa1') is None
+    assert os.listdir(tmp_path / 'aa') == []
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', slow))) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['result'] * 5
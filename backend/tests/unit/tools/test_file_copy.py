@@ -0,0 +1,47 @@
+"""入库复制：各策略结果一致，不支持时逐级退回"""
+import errno
+import filecmp
+import os
+
+import pytest
+
+from app.tools import file_copy
+from app.tools.file_copy import stage_file
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'source.mov'
+    path.write_bytes(os.urandom(3 * 1024 * 1024 + 7))
+    return str(path)
+
+
+@pytest.mark.parametrize('strategy', ['copy', 'reflink', 'hardlink'])
+def test_stage_file_preserves_content(tmp_path, source, strategy):
+    dest = str(tmp_path / f'{strategy}.mov')
+    method = stage_file(source, dest, strategy)
+
+    assert method in ('hardlink', 'reflink', 'copy_file_range', 'sendfile', 'userspace')
+    assert filecmp.cmp(source, dest, shallow=False)
+    assert os.path.getmtime(dest) == os.path.getmtime(source)
+
+
+def test_hardlink_falls_back_across_devices(tmp_path, source, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    def unsupported(src, dst):
+        raise OSError(errno.EOPNOTSUPP, 'Operation not supported')
+
+    monkeypatch.setitem(file_copy._METHODS, 'hardlink', cross_device)
+    monkeypatch.setitem(file_copy._METHODS, 'reflink', unsupported)
+    monkeypatch.setattr(file_copy, 'KERNEL_COPY_CHUNK', 1024 * 1024)  # 覆盖多次分块复制
+    dest = str(tmp_path / 'dest.mov')
+
+    assert stage_file(source, dest, 'hardlink') in ('copy_file_range', 'sendfile', 'userspace')
+    assert filecmp.cmp(source, dest, shallow=False)
+
+
+def test_unknown_strategy(tmp_path, source):
+    with pytest.raises(ValueError):
+        stage_file(source, str(tmp_path / 'dest.mov'), 'symlink')
@@ -0,0 +1,35 @@
+"""流式哈希与按路径计算的哈希同口径"""
+import os
+
+import pytest
+
+from app.tools import file_hash
+from app.tools.file_hash import StreamingFileHasher, calculate_file_hash
+
+
+def _stream_hash(path: str, chunk_size: int) -> str:
+    hasher = StreamingFileHasher()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest(os.path.getmtime(path))
+
+
+@pytest.mark.parametrize('size', [0, 1, 5000, 70000])
+def test_small_file_matches_full_hash(tmp_path, size):
+    path = tmp_path / 'small.bin'
+    path.write_bytes(os.urandom(size))
+    assert _stream_hash(str(path), 4096) == calculate_file_hash(str(path))
+
+
+@pytest.mark.parametrize('size', [3 * 1024 * 1024, 2 * 1024 * 1024 + 1, 5 * 1024 * 1024 - 7])
+def test_large_file_matches_sample_hash(tmp_path, monkeypatch, size):
+    # 缩小阈值与采样大小，用几 MB 的文件覆盖头尾采样分支
+    monkeypatch.setattr(file_hash, 'LARGE_FILE_THRESHOLD', 2 * 1024 * 1024)
+    monkeypatch.setattr(file_hash, 'SAMPLE_SIZE_MB', 1)
+    path = tmp_path / 'large.bin'
+    path.write_bytes(os.urandom(size))
+    assert _stream_hash(str(path), 300 * 1024) == calculate_file_hash(str(path))
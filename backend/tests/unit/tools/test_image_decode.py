@@ -0,0 +1,120 @@
+"""降分辨率解码：结果长边不小于目标，方向信息保留，小图不变；解码守卫按像素预算缩小、拒绝解压炸弹"""
+import io
+import struct
+import zlib
+
+import pytest
+from PIL import Image, ImageOps
+
+from app.tools.image_decode import STRATEGY_ISOLATED, STRATEGY_REDUCED, decode_metrics, open_image
+
+
+def _save(tmp_path, name, size, fmt='JPEG', mode='RGB', exif=None):
+    path = tmp_path / name
+    img = Image.new(mode, size, 'red' if mode == 'RGB' else 1)
+    if exif is not None:
+        img.save(path, fmt, exif=exif)
+    else:
+        img.save(path, fmt)
+    return str(path)
+
+
+def _exif_with_thumbnail(thumbnail: bytes, orientation: int = 1) -> bytes:
+    """手工拼装 EXIF：IFD0 只有方向，IFD1 指向 JPEG 缩略图（大端）"""
+    ifd0_offset = 8
+    ifd1_offset = ifd0_offset + 2 + 12 + 4
+    data_offset = ifd1_offset + 2 + 2 * 12 + 4
+    tiff = b'MM\x00\x2a' + struct.pack('>I', ifd0_offset)
+    tiff += struct.pack('>H', 1) + struct.pack('>HHIHH', 0x0112, 3, 1, orientation, 0)
+    tiff += struct.pack('>I', ifd1_offset)
+    tiff += struct.pack('>H', 2)
+    tiff += struct.pack('>HHII', 0x0201, 4, 1, data_offset)
+    tiff += struct.pack('>HHII', 0x0202, 4, 1, len(thumbnail))
+    tiff += struct.pack('>I', 0)
+    return b'Exif\x00\x00' + tiff + thumbnail
+
+
+@pytest.mark.parametrize('target', [None, 800])
+def test_small_or_unbounded_decode_keeps_size(tmp_path, target):
+    path = _save(tmp_path, 'small.jpg', (640, 480))
+
+    with open_image(path, target) as img:
+        assert img.size == (640, 480)
+
+
+def test_jpeg_draft_keeps_long_edge_above_target(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    path = _save(tmp_path, 'large.jpg', (4000, 3000), exif=exif)
+
+    with open_image(path, 800) as img:
+        assert 800 <= max(img.size) < 4000
+        assert img.getexif().get(0x0112) == 6
+        assert ImageOps.exif_transpose(img).height > img.height
+
+
+def test_png_reduce(tmp_path):
+    path = _save(tmp_path, 'large.png', (3300, 1650), fmt='PNG')
+
+    with open_image(path, 800) as img:
+        assert img.size == (825, 413)
+
+
+def test_palette_image_is_not_reduced(tmp_path):
+    path = _save(tmp_path, 'palette.png', (2400, 1200), fmt='PNG', mode='P')
+
+    with open_image(path, 800) as img:
+        assert img.size == (2400, 1200)
+
+
+def test_exif_thumbnail_used_when_large_enough(tmp_path):
+    buffer = io.BytesIO()
+    Image.new('RGB', (1024, 768), 'blue').save(buffer, 'JPEG')
+    path = _save(tmp_path, 'with_thumb.jpg', (4000, 3000), exif=_exif_with_thumbnail(buffer.getvalue(), 8))
+
+    with open_image(path, 800) as img:
+        assert img.size == (1024, 768)
+        assert img.getpixel((10, 10))[2] > 200
+        assert img.getexif().get(0x0112) == 8
+
+    # 缩略图小于目标时退回 DCT 缩放解码
+    with open_image(path, 1200) as img:
+        assert img.size == (2000, 1500)
+        assert img.getpixel((10, 10))[0] > 200
+
+
+def test_full_decode_over_budget_is_reduced(tmp_path):
+    path = _save(tmp_path, 'pano.jpg', (4000, 1000))
+
+    # JPEG 经 draft 缩到预算内，在进程内解码
+    with open_image(path, max_pixels=1_000_000) as img:
+        assert img.size == (2000, 500)
+        assert decode_metrics.last().strategy == STRATEGY_REDUCED
+        assert decode_metrics.last().peak_bytes == 2000 * 500 * 4
+
+
+def test_png_over_budget_decoded_in_subprocess(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    path = _save(tmp_path, 'pano.png', (3000, 1000), fmt='PNG', exif=exif)
+
+    with open(path, 'rb') as f:
+        source = io.BytesIO(f.read())
+    with open_image(source, 800, max_pixels=1_000_000) as img:
+        assert img.size == (1000, 334)
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+        assert img.getexif().get(0x0112) == 6
+        assert decode_metrics.last().strategy == STRATEGY_ISOLATED
+
+
+def test_decompression_bomb_rejected_before_decode():
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    # 只有文件头：声明 40000×40000，实际没有像素数据
+    header = b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 40000, 40000, 8, 2, 0, 0, 0))
+    rejected = decode_metrics.snapshot()['rejected']
+
+    with pytest.warns(Image.DecompressionBombWarning), pytest.raises(Image.DecompressionBombError):
+        open_image(io.BytesIO(header + chunk(b'IEND', b'')))
+    assert decode_metrics.snapshot()['rejected'] == rejected + 1
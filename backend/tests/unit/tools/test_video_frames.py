@@ -0,0 +1,26 @@
+"""ffmpeg 管道输出的 PPM 帧拆分"""
+import io
+
+import pytest
+from PIL import Image
+
+from app.tools.video_frames import _split_ppm
+
+
+def _ppm(size, color):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PPM')
+    return buffer.getvalue()
+
+
+def test_split_concatenated_frames():
+    frames = _split_ppm(_ppm((64, 36), 'red') + _ppm((32, 18), 'blue'))
+
+    assert [frame.size for frame in frames] == [(64, 36), (32, 18)]
+    assert frames[0].getpixel((0, 0)) == (255, 0, 0)
+    assert frames[1].getpixel((31, 17)) == (0, 0, 255)
+
+
+def test_truncated_frame_rejected():
+    with pytest.raises(ValueError):
+        _split_ppm(_ppm((64, 36), 'red')[:-10])
@@ -0,0 +1,84 @@
+"""ffprobe 缓存：同一文件只探测一次，文件变化后重新探测"""
+import os
+
+import ffmpeg
+import pytest
+
+from app.tools.video_probe import ProbeCache
+
+
+@pytest.fixture
+def probe_calls(monkeypatch):
+    calls = []
+
+    def fake_probe(path):
+        calls.append(path)
+        return {'format': {'duration': str(len(calls)), 'filename': path}, 'streams': []}
+
+    monkeypatch.setattr(ffmpeg, 'probe', fake_probe)
+    return calls
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'clip.mov'
+    path.write_bytes(b'\x00' * 1024)
+    return str(path)
+
+
+def test_probe_once_per_file(tmp_path, video, probe_calls):
+    cache = ProbeCache(str(tmp_path / 'cache'))
+
+    first = cache.probe(video)
+    second = cache.probe(video)
+
+    assert first == second
+    assert probe_calls == [video]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_cache_shared_across_processes(tmp_path, video, probe_calls):
+    cache_dir = str(tmp_path / 'cache')
+    ProbeCache(cache_dir).probe(video)
+
+    # 另一个进程（新实例，进程内缓存为空）直接命中磁盘缓存
+    other = ProbeCache(cache_dir)
+    assert other.probe(video)['format']['duration'] == '1'
+    assert len(probe_calls) == 1
+
+
+def test_modified_file_is_probed_again(tmp_path, video, probe_calls):
+    cache = ProbeCache(str(tmp_path / 'cache'))
+    cache.probe(video)
+
+    with open(video, 'ab') as f:
+        f.write(b'\x01')
+    os.utime(video, ns=(0, 1_000_000_000))
+
+    assert cache.probe(video)['format']['duration'] == '2'
+    assert len(probe_calls) == 2
+
+
+def test_expired_disk_cache_is_ignored(tmp_path, video, probe_calls):
+    cache_dir = str(tmp_path / 'cache')
+    ProbeCache(cache_dir, ttl_seconds=0).probe(video)
+    for name in os.listdir(cache_dir):
+        os.utime(os.path.join(cache_dir, name), (0, 0))
+
+    ProbeCache(cache_dir, ttl_seconds=60).probe(video)
+    assert len(probe_calls) == 2
+
+
+def test_errors_are_not_cached(tmp_path, video, monkeypatch):
+    calls = []
+
+    def failing_probe(path):
+        calls.append(path)
+        raise ffmpeg.Error('ffprobe', b'', b'invalid data')
+
+    monkeypatch.setattr(ffmpeg, 'probe', failing_probe)
+    cache = ProbeCache(str(tmp_path / 'cache'))
+    for _ in range(2):
+        with pytest.raises(ffmpeg.Error):
+            cache.probe(video)
+    assert len(calls) == 2
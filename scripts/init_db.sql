@@ -23,6 +23,11 @@ CREATE TABLE `assets` (
   `original_path` varchar(255) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'NAS 物理相对路径',
   `thumbnail_path` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '缩略图路径',
   `preview_path` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '预览图路径（用于浏览器不支持的格式如HEIC）',
+  `thumbnail_sizes` json DEFAULT NULL COMMENT '多尺寸缩略图 {宽度: 相对路径}（含主缩略图）',
+  `storyboard` json DEFAULT NULL COMMENT '视频故事板 {sprite, vtt, count, columns, rows, frame_width, frame_height, interval}',
+  `deep_zoom` json DEFAULT NULL COMMENT 'DZI 切片金字塔 {dzi, width, height, tile_size, overlap, format, levels, tiles}',
+  `derivative_versions` json DEFAULT NULL COMMENT '衍生图生成记录 {thumbnail|preview: {version, source_hash, source_signature}}',
+  `derive_lazily` tinyint(1) NOT NULL DEFAULT '0' COMMENT '导入时是否跳过衍生图生成（按需生成模式）',
   `asset_type` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '资源类型: image, video, audio',
   `mime_type` varchar(100) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'MIME类型: image/jpeg, video/mp4',
   `file_size` bigint DEFAULT NULL COMMENT '文件大小（字节）',
@@ -487,7 +492,8 @@ INSERT INTO task_definitions (task_code, name, description, run_mode, is_enabled
 ('preview', '预览图生成', 'HEIC 等浏览器不支持格式转 WebP 预览', 'sync', TRUE, NULL),
 ('phash', '感知哈希', '异步计算四哈希，供相似推荐', 'async', TRUE, NULL),
 ('geocoding', '逆地理编码', '有 GPS 时异步写入地点标签', 'async', TRUE, JSON_OBJECT('max_retries', 3)),
-('batch_phash', '批量补算哈希', '运维补跑缺失的感知哈希', 'async', TRUE, NULL);
+('batch_phash', '批量补算哈希', '运维补跑缺失的感知哈希', 'async', TRUE, NULL),
+('regenerate_derivatives', '重新生成衍生图', '调整缩略图/预览图参数后按筛选条件重建，已是最新的跳过', 'async', TRUE, NULL);
 
 -- ==========================================
 -- 异步任务日志表（通用）
@@ -496,11 +502,11 @@ CREATE TABLE IF NOT EXISTS task_logs (
     id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '任务日志ID',
 
     -- 任务标识
-    task_type VARCHAR(50) NOT NULL COMMENT '任务类型: phash, geocoding, face_detection 等',
+    task_type VARCHAR(50) NOT NULL COMMENT '任务类型: phash, geocoding, regenerate_derivatives, face_detection 等',
     task_status VARCHAR(20) NOT NULL DEFAULT 'pending' COMMENT '任务状态: pending, running, success, failed',
 
     -- 关联资源
-    asset_id BIGINT NOT NULL COMMENT '关联的资源ID',
+    asset_id BIGINT NOT NULL COMMENT '关联的资源ID（批量作业为 0）',
 
     -- 任务参数（JSON 格式，适配不同任务类型）
     task_params JSON COMMENT '任务参数，如: {"latitude": 39.9042, "longitude": 116.4074}',
@@ -521,6 +527,180 @@ CREATE TABLE IF NOT EXISTS task_logs (
     INDEX idx_asset_id (asset_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='异步任务日志表';
 
+-- ==========================================
+-- 扫描清单表（重复扫描时跳过未变化文件的哈希计算）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS scan_manifests (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '清单记录ID',
+
+    -- 路径（绝对路径可能很长，唯一键建在其 SHA256 上）
+    path_hash CHAR(64) NOT NULL COMMENT '源文件绝对路径的 SHA256',
+    source_path TEXT NOT NULL COMMENT '源文件绝对路径',
+
+    -- stat 签名
+    file_size BIGINT NOT NULL COMMENT '文件大小（字节）',
+    mtime_ns BIGINT NOT NULL COMMENT '修改时间（纳秒）',
+    inode BIGINT NOT NULL COMMENT 'inode 编号',
+
+    -- 内容哈希
+    file_hash VARCHAR(64) NOT NULL COMMENT '文件内容哈希（与 assets.file_hash 同口径）',
+
+    -- 时间戳
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    UNIQUE KEY uk_path_hash (path_hash),
+    INDEX idx_file_hash (file_hash)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='扫描清单表';
+
+-- ==========================================
+-- 上传会话表（大文件断点续传）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '会话记录ID',
+    upload_id VARCHAR(32) NOT NULL COMMENT '上传ID',
+
+    -- 文件信息
+    filename VARCHAR(255) NOT NULL COMMENT '原始文件名',
+    total_size BIGINT NOT NULL COMMENT '文件总大小（字节）',
+    received_size BIGINT NOT NULL DEFAULT 0 COMMENT '已接收字节数',
+    expected_hash VARCHAR(64) COMMENT '客户端提供的完整 SHA256',
+
+    -- 状态
+    status VARCHAR(20) NOT NULL DEFAULT 'uploading' COMMENT '会话状态: uploading, finalizing, stored, completed, failed, aborted',
+
+    -- finalize 结果（导入失败或中断后重试时沿用）
+    file_hash VARCHAR(64) COMMENT '去重哈希',
+    stored_path VARCHAR(255) COMMENT '内容寻址路径（NAS 相对路径）',
+
+    -- 导入参数与结果
+    created_by BIGINT NOT NULL COMMENT '创建者用户ID',
+    import_options JSON COMMENT '导入参数',
+    result JSON COMMENT '导入结果',
+    error_message TEXT COMMENT '错误信息（仅失败时记录）',
+
+    -- 时间戳
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    UNIQUE KEY uk_upload_id (upload_id),
+    INDEX idx_status_updated (status, updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='上传会话表';
+
+-- ==========================================
+-- 导入作业表（可暂停/续跑，按检查点恢复）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '作业ID',
+    job_type VARCHAR(20) NOT NULL DEFAULT 'scan' COMMENT '作业类型: scan, sharded_scan',
+
+    -- 状态
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' COMMENT '作业状态: queued, running, paused, done, failed',
+    params JSON NOT NULL COMMENT '导入参数',
+    pause_requested BOOLEAN NOT NULL DEFAULT FALSE COMMENT '是否已请求暂停',
+
+    -- 检查点与进度
+    checkpoint_path TEXT COMMENT '最后一个已处理完成的文件（扫描顺序）',
+    scan_complete BOOLEAN NOT NULL DEFAULT FALSE COMMENT '目录是否已扫描完毕',
+    files_total BIGINT NOT NULL DEFAULT 0 COMMENT '已发现的文件总数',
+    files_done BIGINT NOT NULL DEFAULT 0 COMMENT '已处理完成的文件数',
+    files_imported BIGINT NOT NULL DEFAULT 0 COMMENT '成功导入数',
+    files_skipped BIGINT NOT NULL DEFAULT 0 COMMENT '跳过数',
+    files_failed BIGINT NOT NULL DEFAULT 0 COMMENT '失败数',
+    bytes_total BIGINT NOT NULL DEFAULT 0 COMMENT '已发现文件的总字节数',
+    bytes_done BIGINT NOT NULL DEFAULT 0 COMMENT '已处理完成的字节数',
+    files_per_second DOUBLE COMMENT '文件处理速率',
+    bytes_per_second DOUBLE COMMENT '字节处理速率',
+    error_message TEXT COMMENT '错误信息（仅失败时记录）',
+
+    -- 时间戳
+    started_at DATETIME COMMENT '本次运行开始时间',
+    finished_at DATETIME COMMENT '结束时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    INDEX idx_status_updated (status, updated_at),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='导入作业表';
+
+-- ==========================================
+-- 导入作业分片表（分布式扫描导入）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS ingestion_job_shards (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '分片ID',
+    job_id BIGINT NOT NULL COMMENT '所属作业ID',
+    scopes JSON NOT NULL COMMENT '扫描范围 [[相对目录, 是否递归], ...]',
+
+    -- 状态
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' COMMENT '分片状态: queued, running, paused, done, failed',
+    worker VARCHAR(100) COMMENT '最近一次执行的 Worker',
+
+    -- 检查点与进度
+    checkpoint_path TEXT COMMENT '最后一个已处理完成的文件（扫描顺序）',
+    scan_complete BOOLEAN NOT NULL DEFAULT FALSE COMMENT '分片是否已扫描完毕',
+    files_total BIGINT NOT NULL DEFAULT 0 COMMENT '文件总数',
+    files_done BIGINT NOT NULL DEFAULT 0 COMMENT '已处理完成的文件数',
+    files_imported BIGINT NOT NULL DEFAULT 0 COMMENT '成功导入数',
+    files_skipped BIGINT NOT NULL DEFAULT 0 COMMENT '跳过数',
+    files_failed BIGINT NOT NULL DEFAULT 0 COMMENT '失败数',
+    bytes_total BIGINT NOT NULL DEFAULT 0 COMMENT '文件总字节数',
+    bytes_done BIGINT NOT NULL DEFAULT 0 COMMENT '已处理完成的字节数',
+    files_per_second DOUBLE COMMENT '文件处理速率',
+    bytes_per_second DOUBLE COMMENT '字节处理速率',
+    error_message TEXT COMMENT '错误信息（仅失败时记录）',
+
+    -- 时间戳
+    started_at DATETIME COMMENT '本次运行开始时间',
+    finished_at DATETIME COMMENT '结束时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    INDEX idx_job_status (job_id, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='导入作业分片表';
+
+-- ==========================================
+-- 原始元数据表（按文件哈希保存，供重新映射标签）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS asset_raw_metadata (
+    file_hash VARCHAR(64) PRIMARY KEY COMMENT '文件内容哈希（与 assets.file_hash 同口径）',
+    asset_type VARCHAR(20) NOT NULL COMMENT '素材类型: image, video, audio',
+    extractor VARCHAR(50) NOT NULL COMMENT '提取器名称',
+    payload MEDIUMBLOB NOT NULL COMMENT 'zlib 压缩的 JSON（提取器输出的原始元数据）',
+    payload_size INT NOT NULL DEFAULT 0 COMMENT '未压缩的 JSON 字节数',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    INDEX idx_asset_type (asset_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='原始元数据表';
+
+-- ==========================================
+-- 标签重新映射作业表（映射规则变更后回填已有素材，可续跑）
+-- ==========================================
+CREATE TABLE IF NOT EXISTS tag_remap_jobs (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '作业ID',
+    asset_type VARCHAR(20) COMMENT '素材类型（为空表示全部）',
+    trigger_type VARCHAR(20) NOT NULL DEFAULT 'manual' COMMENT '触发方式: manual, mapping_change',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' COMMENT '作业状态: queued, running, done, failed',
+
+    -- 检查点与进度
+    last_asset_id BIGINT NOT NULL DEFAULT 0 COMMENT '最后一个已处理完成的素材ID',
+    assets_total BIGINT NOT NULL DEFAULT 0 COMMENT '待处理的素材数',
+    assets_done BIGINT NOT NULL DEFAULT 0 COMMENT '已处理的素材数',
+    assets_missing_metadata BIGINT NOT NULL DEFAULT 0 COMMENT '没有原始元数据的素材数',
+    tags_inserted BIGINT NOT NULL DEFAULT 0 COMMENT '新增标签数',
+    tags_updated BIGINT NOT NULL DEFAULT 0 COMMENT '更新标签数',
+    assets_per_second DOUBLE COMMENT '素材处理速率',
+    error_message TEXT COMMENT '错误信息（仅失败时记录）',
+
+    -- 时间戳
+    started_at DATETIME COMMENT '本次运行开始时间',
+    finished_at DATETIME COMMENT '结束时间',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    INDEX idx_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='标签重新映射作业表';
+
 -- ==========================================
 -- 用户收藏表（多对多关系）
 -- ==========================================